@@ -0,0 +1,50 @@
+"""full text search columns
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 10:00:00
+
+Adds generated ``search_vector`` tsvector columns with GIN indexes to
+documents, notes, citations and annotations. New databases get them from
+``create_all`` already; the statements are idempotent. Adding a stored
+generated column rewrites the table.
+
+This is the first revision but not a baseline: the tables themselves are
+created by ``init_db`` (``Base.metadata.create_all``) when the backend
+starts, and the migrations only bring databases created by older versions
+up to date. On an empty database, start the backend once before running
+``alembic upgrade head``.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.core.full_text import FULL_TEXT_INDEXES, FullTextIndex, search_config
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# documents 在这一版本中索引 content 列，0006 改为 search_text
+INDEXES = [
+    FullTextIndex("documents", (("title", "A"), ("filename", "B"), ("content", "C"))),
+    *(index for table, index in FULL_TEXT_INDEXES.items() if table != "documents"),
+]
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    for index in INDEXES:
+        for statement in index.create_sql(search_config()):
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    for index in INDEXES:
+        for statement in index.drop_sql():
+            op.execute(statement)
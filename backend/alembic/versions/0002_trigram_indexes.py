@@ -0,0 +1,40 @@
+"""trigram indexes for typeahead
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 14:00:00
+
+Enables pg_trgm and adds GIN trigram indexes on document titles and
+filenames, note titles and space names for search-as-you-type.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.core.full_text import (
+    TRIGRAM_COLUMNS,
+    TRIGRAM_EXTENSION_SQL,
+    trigram_create_sql,
+    trigram_index_name,
+)
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute(TRIGRAM_EXTENSION_SQL)
+    for table, column in TRIGRAM_COLUMNS:
+        op.execute(trigram_create_sql(table, column))
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    for table, column in TRIGRAM_COLUMNS:
+        op.execute(f"DROP INDEX IF EXISTS {trigram_index_name(table, column)}")
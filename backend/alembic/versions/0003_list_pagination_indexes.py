@@ -0,0 +1,38 @@
+"""composite indexes for list pagination
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 09:00:00
+
+Adds ``(owner, sort column, id)`` indexes so list endpoints can filter,
+order and page (by offset or by keyset cursor) without sorting in memory.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (索引名, 表, 列)，与 app.models.models 中的定义一致
+INDEXES = (
+    ("idx_space_user_created", "spaces", ["user_id", "created_at", "id"]),
+    ("idx_document_user_created", "documents", ["user_id", "created_at", "id"]),
+    ("idx_document_space_created", "documents", ["space_id", "created_at", "id"]),
+    ("idx_note_user_updated", "notes", ["user_id", "updated_at", "id"]),
+    ("idx_note_space_updated", "notes", ["space_id", "updated_at", "id"]),
+    ("idx_conversation_user_updated", "conversations", ["user_id", "updated_at", "id"]),
+)
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade() -> None:
+    for name, table, _ in INDEXES:
+        op.drop_index(name, table_name=table, if_exists=True)
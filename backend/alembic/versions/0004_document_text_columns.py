@@ -0,0 +1,55 @@
+"""document text storage columns
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 12:00:00
+
+Adds the columns that point documents at their out-of-row text in
+``document_text_chunks``: a short list preview, the full-text hash, its
+length and the per-page offsets used for page-range reads. The chunk table itself is new and comes from ``create_all``; only
+the existing ``documents`` table has to be altered. Databases created by
+``create_all`` already have the columns, so every step is idempotent.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _columns() -> list[sa.Column]:
+    """与 app.models.models.Document 中的定义一致."""
+    return [
+        sa.Column("preview", sa.String(500)),
+        sa.Column("content_hash", sa.String(64)),
+        sa.Column("content_length", sa.Integer()),
+        sa.Column("page_offsets", sa.LargeBinary()),
+    ]
+
+
+def _existing_columns() -> set[str]:
+    # 不是所有方言都支持 ADD COLUMN IF NOT EXISTS，先查表结构
+    return {column["name"] for column in sa.inspect(op.get_bind()).get_columns("documents")}
+
+
+def upgrade() -> None:
+    existing = _existing_columns()
+    for column in _columns():
+        if column.name not in existing:
+            op.add_column("documents", column)
+    op.create_index(
+        "idx_document_content_hash", "documents", ["content_hash"], if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_document_content_hash", table_name="documents", if_exists=True)
+    existing = _existing_columns()
+    for column in reversed(_columns()):
+        if column.name in existing:
+            op.drop_column("documents", column.name)
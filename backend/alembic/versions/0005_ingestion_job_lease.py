@@ -0,0 +1,44 @@
+"""ingestion job lease
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 15:00:00
+
+Adds ``lease_expires_at`` to ``ingestion_jobs``. Workers claim a job with a
+conditional UPDATE and hold it until the lease expires, so a running job is
+only picked up again once the worker that claimed it has gone away. The
+table itself comes from ``create_all``; the step is skipped where it does
+not exist yet or already has the column.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _existing_columns() -> set[str] | None:
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("ingestion_jobs"):
+        return None
+    return {column["name"] for column in inspector.get_columns("ingestion_jobs")}
+
+
+def upgrade() -> None:
+    existing = _existing_columns()
+    if existing is not None and "lease_expires_at" not in existing:
+        op.add_column(
+            "ingestion_jobs",
+            sa.Column("lease_expires_at", sa.DateTime(timezone=True)),
+        )
+
+
+def downgrade() -> None:
+    existing = _existing_columns()
+    if existing is not None and "lease_expires_at" in existing:
+        op.drop_column("ingestion_jobs", "lease_expires_at")
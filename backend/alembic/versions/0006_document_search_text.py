@@ -0,0 +1,85 @@
+"""document search text
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 16:00:00
+
+Moves the full-text search source out of ``documents.content``. The row
+keeps only a 1000 character excerpt again (the full text lives in
+``document_text_chunks``), and a new deferred ``search_text`` column holds
+the indexed prefix of the text. On PostgreSQL the generated
+``search_vector`` column is rebuilt over ``search_text``.
+
+Existing rows are backfilled from ``content``. Documents without a
+``content_hash`` predate the chunk store, so their ``content`` is the only
+copy of the text and is left untouched.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.full_text import (
+    FULL_TEXT_INDEXES,
+    MAX_INDEXED_CHARS,
+    FullTextIndex,
+    search_config,
+)
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CONTENT_EXCERPT_CHARS = 1000
+
+# 0001 建立的定义，降级时恢复
+CONTENT_INDEX = FullTextIndex(
+    "documents", (("title", "A"), ("filename", "B"), ("content", "C"))
+)
+
+documents = sa.table(
+    "documents",
+    sa.column("content", sa.Text),
+    sa.column("content_hash", sa.String),
+    sa.column("search_text", sa.Text),
+)
+
+
+def _existing_columns() -> set[str]:
+    return {column["name"] for column in sa.inspect(op.get_bind()).get_columns("documents")}
+
+
+def _rebuild_search_vector(old: FullTextIndex, new: FullTextIndex) -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    for statement in old.drop_sql() + new.create_sql(search_config()):
+        op.execute(statement)
+
+
+def upgrade() -> None:
+    if "search_text" not in _existing_columns():
+        op.add_column("documents", sa.Column("search_text", sa.Text()))
+
+    op.execute(
+        documents.update()
+        .where(documents.c.search_text.is_(None), documents.c.content.isnot(None))
+        .values(search_text=sa.func.substr(documents.c.content, 1, MAX_INDEXED_CHARS))
+    )
+    op.execute(
+        documents.update()
+        .where(
+            documents.c.content_hash.isnot(None),
+            sa.func.length(documents.c.content) > CONTENT_EXCERPT_CHARS,
+        )
+        .values(content=sa.func.substr(documents.c.content, 1, CONTENT_EXCERPT_CHARS))
+    )
+    _rebuild_search_vector(CONTENT_INDEX, FULL_TEXT_INDEXES["documents"])
+
+
+def downgrade() -> None:
+    # 文档行中的全文不会恢复，旧版本按 content_hash 从分块表读取全文
+    _rebuild_search_vector(FULL_TEXT_INDEXES["documents"], CONTENT_INDEX)
+    if "search_text" in _existing_columns():
+        op.drop_column("documents", "search_text")
@@ -13,6 +13,7 @@ from app.api.v1.endpoints import (
     health,
     notes,
     ollama,
+    search,
     spaces,
     users,
 )
@@ -43,6 +44,9 @@ api_router.include_router(documents.router, prefix="/documents", tags=["文档"]
 # 笔记路由
 api_router.include_router(notes.router, prefix="/notes", tags=["笔记"])
 
+# 搜索路由
+api_router.include_router(search.router, prefix="/search", tags=["搜索"])
+
 # === 内容增强 ===
 # 标注路由
 api_router.include_router(annotations.router, prefix="/annotations", tags=["标注"])
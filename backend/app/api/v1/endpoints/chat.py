@@ -1,5 +1,6 @@
 """Chat endpoints v2 - 完整整合版本，支持文本和多模态聊天."""
 
+import hashlib
 import os
 import tempfile
 from pathlib import Path
@@ -23,6 +24,7 @@ from app import crud
 from app.core.auth import get_current_active_user
 from app.core.config import settings
 from app.core.database import get_db
+from app.crud.listing import InvalidCursorError
 from app.models.models import Conversation, User
 from app.models.models import Message as DBMessage
 from app.schemas.chat import (
@@ -230,6 +232,7 @@ async def get_conversations(
     mode: str | None = Query(None, description="对话模式"),
     skip: int = Query(0, ge=0, description="跳过的记录数"),
     limit: int = Query(20, ge=1, le=100, description="返回的记录数"),
+    cursor: str | None = Query(None, description="上一页返回的 next_cursor，传入时忽略 skip"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ) -> ConversationListResponse:
@@ -254,26 +257,28 @@ async def get_conversations(
                 )
 
     # 获取对话列表
-    conversations = await ConversationService.get_user_conversations(
-        db,
-        user=current_user,
-        space_id=space_id,
-        mode=mode,
-        skip=skip,
-        limit=limit,
-    )
-
-    # 获取总数
-    # 对于毕业设计项目，简单返回当前页的数量
-    # 实际项目中应该使用单独的 COUNT 查询
-    total = len(conversations)
+    try:
+        page = await crud.crud_conversation.get_page(
+            db,
+            user_id=current_user.id,
+            space_id=space_id,
+            mode=mode,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="无效的分页游标"
+        ) from e
 
     return ConversationListResponse(
-        conversations=[ConversationResponse.model_validate(c) for c in conversations],
-        total=total,
+        conversations=[ConversationResponse.model_validate(c) for c in page.items],
+        total=page.total,
         page=skip // limit + 1,
         page_size=limit,
-        has_next=total > skip + limit,
+        has_next=page.next_cursor is not None,
+        next_cursor=page.next_cursor,
     )
 
 
@@ -481,6 +486,7 @@ async def analyze_attachments(
             file_path=Path(tmp_path),
             filename=file.filename or "unknown",
             prefer_vision=False,  # 获取所有可能的信息
+            file_hash=hashlib.sha256(content).hexdigest(),
         )
 
         results.append(
@@ -763,11 +769,12 @@ async def _process_attachments(
             tmp.write(content)
             tmp_path = tmp.name
 
-        # 准备附件信息
+        # 准备附件信息（按内容哈希命中缓存时跳过提取）
         attachment_info = await multimodal_helper.prepare_attachment_for_chat(
             file_path=Path(tmp_path),
             filename=file.filename or "unknown",
             prefer_vision=auto_switch_vision,
+            file_hash=hashlib.sha256(content).hexdigest(),
         )
 
         processed.append(
@@ -1,32 +1,50 @@
 """Document endpoints v2 - 使用服务层和CRUD层的完整版本."""
 
+import hashlib
 import logging
+from collections.abc import AsyncGenerator
 from datetime import datetime
 from pathlib import Path
-from typing import Any
+from typing import Annotated, Any
 
 from fastapi import (
     APIRouter,
     Depends,
     File,
     Form,
+    Header,
     HTTPException,
     Query,
+    Response,
     UploadFile,
     status,
 )
-from fastapi.responses import FileResponse
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud
 from app.core.auth import get_current_active_user
 from app.core.config import settings
 from app.core.database import get_db
+from app.core.http_ranges import (
+    RangeNotSatisfiableError,
+    content_disposition,
+    etag_matches,
+    parse_range,
+)
+from app.core.uploads import UploadTooLargeError, spool_upload
+from app.crud.listing import InvalidCursorError
 from app.models.models import User
 from app.schemas.documents import (
+    BatchUploadError,
+    BatchUploadResponse,
     DocumentListResponse,
     DocumentResponse,
+    DocumentStatusResponse,
+    DocumentSummary,
     DocumentUpdate,
+    DocumentUploadResponse,
+    IngestionJobResponse,
     SearchRequest,
     SearchResponse,
     SearchResult,
@@ -39,25 +57,39 @@ from app.schemas.web_import import (
     URLImportResponse,
     WebSnapshotResponse,
 )
-from app.services import document_service
+from app.services import (
+    blob_service,
+    document_service,
+    document_text_service,
+    ingestion_service,
+)
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
-@router.post(
-    "/upload", response_model=DocumentResponse, status_code=status.HTTP_201_CREATED
-)
-async def upload_document(
-    space_id: int = Form(..., description="空间ID"),
-    file: UploadFile = File(..., description="要上传的文件"),
-    title: str | None = Form(None, description="文档标题"),
-    tags: str | None = Form(None, description="标签，逗号分隔"),
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
-) -> DocumentResponse:
-    """上传文档到知识空间."""
-    # 检查空间权限
+# 浏览器未识别类型时按扩展名修正MIME类型
+CONTENT_TYPE_BY_EXTENSION = {
+    ".pdf": "application/pdf",
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    ".doc": "application/msword",
+    ".txt": "text/plain",
+    ".md": "text/markdown",
+    ".pptx": "application/vnd.openxmlformats-officedocument.presentationml.presentation",
+    ".ppt": "application/vnd.ms-powerpoint",
+    ".xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    ".xls": "application/vnd.ms-excel",
+    ".csv": "text/csv",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".gif": "image/gif",
+    ".webp": "image/webp",
+}
+
+
+async def _check_upload_access(db: AsyncSession, space_id: int, user: User) -> None:
+    """检查用户是否可以在空间内上传文档."""
     space = await crud.crud_space.get(db, id=space_id)
     if not space:
         raise HTTPException(
@@ -65,10 +97,10 @@ async def upload_document(
             detail="空间不存在",
         )
 
-    if space.user_id != current_user.id:
+    if space.user_id != user.id:
         # 检查协作权限
         access = await crud.crud_space.get_user_access(
-            db, space_id=space_id, user_id=current_user.id
+            db, space_id=space_id, user_id=user.id
         )
         if not access or not access.can_edit:
             raise HTTPException(
@@ -76,35 +108,20 @@ async def upload_document(
                 detail="无权在此空间上传文档",
             )
 
-    # 验证文件并修正MIME类型
+
+def _resolve_content_type(file: UploadFile) -> str:
+    """验证文件类型，浏览器检测失败时按扩展名修正."""
     detected_content_type = file.content_type
-    
+
     # 如果浏览器检测失败或检测为generic类型，使用文件扩展名修正
     if not detected_content_type or detected_content_type in ["application/octet-stream", ""]:
         if file.filename:
             file_ext = Path(file.filename).suffix.lower()
-            content_type_map = {
-                ".pdf": "application/pdf",
-                ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                ".doc": "application/msword",
-                ".txt": "text/plain",
-                ".md": "text/markdown",
-                ".pptx": "application/vnd.openxmlformats-officedocument.presentationml.presentation",
-                ".ppt": "application/vnd.ms-powerpoint",
-                ".xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                ".xls": "application/vnd.ms-excel",
-                ".csv": "text/csv",
-                ".jpg": "image/jpeg",
-                ".jpeg": "image/jpeg",
-                ".png": "image/png",
-                ".gif": "image/gif",
-                ".webp": "image/webp",
-            }
-            corrected_type = content_type_map.get(file_ext)
+            corrected_type = CONTENT_TYPE_BY_EXTENSION.get(file_ext)
             if corrected_type:
                 logger.info(f"🔧 MIME类型修正: {detected_content_type} → {corrected_type} (基于扩展名 {file_ext})")
                 detected_content_type = corrected_type
-    
+
     if not detected_content_type:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -117,163 +134,73 @@ async def upload_document(
             detail=f"不支持的文件类型: {detected_content_type}",
         )
 
-    # 检查文件大小
-    try:
-        content = await file.read()
-    except Exception as e:
-        logger.error(f"Failed to read file content: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"无法读取文件内容: {str(e)}",
-        )
+    return detected_content_type
+
+
+def _parse_tags(tags: str | None) -> list[str] | None:
+    if not tags:
+        return None
+    return [tag.strip() for tag in tags.split(",") if tag.strip()] or None
 
-    # 检查内容是否为空
-    if content is None:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="文件内容为空（None）",
-        )
 
-    file_size = len(content)
+async def _accept_upload(
+    db: AsyncSession,
+    space_id: int,
+    file: UploadFile,
+    user: User,
+    title: str | None,
+    tag_list: list[str] | None,
+) -> DocumentUploadResponse:
+    """暂存并保存上传文件，创建后台入库任务."""
+    content_type = _resolve_content_type(file)
 
-    if file_size > settings.max_file_size_bytes:
+    # 流式读取到临时文件，边读边计算哈希并检查大小
+    try:
+        upload = await spool_upload(
+            file,
+            settings.max_file_size_bytes,
+            suffix=Path(file.filename or "").suffix,
+        )
+    except UploadTooLargeError as e:
         raise HTTPException(
             status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
             detail=f"文件大小超过限制（{settings.MAX_FILE_SIZE_MB}MB）",
-        )
-
-    if file_size == 0:
+        ) from e
+    except Exception as e:
+        logger.error(f"Failed to read file content: {e}")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="文件为空",
+            detail=f"无法读取文件内容: {str(e)}",
         )
 
-    # 处理标签
-    tag_list: list[str] | None = None
-    if tags:
-        tag_list = [tag.strip() for tag in tags.split(",") if tag.strip()]
-
     try:
-        # 智能处理文件内容
-        processed_content = None
-        
-        # 检查是否需要内容提取的文件类型
-        extraction_needed_types = [
-            "application/pdf",
-            "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-            "application/vnd.openxmlformats-officedocument.presentationml.presentation",
-            "application/msword",
-            "application/vnd.ms-powerpoint"
-        ]
-        
-        logger.info(f"🔍 检查文件类型: detected_content_type={detected_content_type}")
-        logger.info(f"📋 需要提取内容的类型: {extraction_needed_types}")
-        logger.info(f"🎯 是否需要内容提取: {detected_content_type in extraction_needed_types}")
-        
-        if detected_content_type in extraction_needed_types:
-            # 需要内容提取的文件类型，保存到临时文件并使用create_document_from_file
-            import tempfile
-            import os
-            
-            # 创建临时文件
-            with tempfile.NamedTemporaryFile(delete=False, suffix=Path(file.filename).suffix) as tmp_file:
-                tmp_file.write(content)
-                tmp_file_path = Path(tmp_file.name)
-            
-            try:
-                # 使用增强的文档创建方法（包含内容提取）
-                document = await document_service.create_document_from_file(
-                    db,
-                    space_id=space_id,
-                    file_path=tmp_file_path,
-                    user=current_user,
-                    title=title or file.filename,
-                    original_filename=file.filename,  # 显式传递原始文件名
-                )
-                
-                logger.info(f"✅ 文档内容提取成功: {file.filename}, 内容长度: {len(document.content or '')} 字符")
-                
-            finally:
-                # 清理临时文件
-                try:
-                    os.unlink(tmp_file_path)
-                except Exception:
-                    pass
-                    
-        elif detected_content_type.startswith('text/') or detected_content_type in ['text/markdown', 'text/plain']:
-            # 处理文本文件
-            # 确保content不为空且是bytes类型
-            if content is None:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="文件内容为空，无法处理文本文件",
-                )
-            
-            if not isinstance(content, bytes):
-                logger.error(f"Expected bytes content, got {type(content)}")
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"文件内容类型错误: 期望bytes，得到{type(content)}",
-                )
-            
-            try:
-                # 尝试UTF-8解码
-                processed_content = content.decode("utf-8")
-                logger.info("Successfully decoded file as UTF-8")
-            except UnicodeDecodeError as e:
-                logger.warning(f"UTF-8 decoding failed: {e}")
-                try:
-                    # 尝试其他常见编码
-                    import chardet
-                    detected_encoding = chardet.detect(content)
-                    encoding = detected_encoding.get('encoding', 'utf-8') if detected_encoding else 'utf-8'
-                    processed_content = content.decode(encoding, errors="ignore")
-                    logger.info(f"🔤 检测到文件编码: {encoding}")
-                except Exception as e:
-                    logger.warning(f"编码检测失败: {e}，使用UTF-8 ignore")
-                    processed_content = content.decode("utf-8", errors="ignore")
-            except Exception as e:
-                logger.error(f"文本文件解码失败: {e}")
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"文本文件解码失败: {str(e)}",
-                )
-            
-            # 创建文本文档
-            document = await document_service.create_document(
-                db,
-                space_id=space_id,
-                filename=file.filename or "未命名文档",
-                content=processed_content,
-                content_type=detected_content_type,
-                file_size=file_size,
-                user=current_user,
-            )
-        else:
-            # 其他二进制文件（如图片），不需要内容提取
-            document = await document_service.create_document(
-                db,
-                space_id=space_id,
-                filename=file.filename or "未命名文档",
-                content=None,
-                content_type=detected_content_type,
-                file_size=file_size,
-                user=current_user,
+        if upload.size == 0:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="文件为空",
             )
 
-        # 更新文档的标题和标签
-        if title or tag_list:
-            update_data = {}
-            if title:
-                update_data["title"] = title
-            if tag_list:
-                update_data["tags"] = tag_list
-
-            document = await crud.crud_document.update(
-                db, db_obj=document, obj_in=update_data
-            )
+        document, job, duplicate = await ingestion_service.submit_upload(
+            db,
+            upload=upload,
+            space_id=space_id,
+            user=user,
+            filename=file.filename or "未命名文档",
+            content_type=content_type,
+            title=title,
+            tags=tag_list,
+        )
+        logger.info(
+            f"📥 文档已受理: {file.filename} (document_id={document.id}, "
+            f"job_id={job.id if job else None}, duplicate={duplicate})"
+        )
 
-        return DocumentResponse.model_validate(document)
+        return DocumentUploadResponse(
+            **DocumentResponse.model_validate(document).model_dump(),
+            job_id=job.id if job else None,
+            duplicate=duplicate,
+            status_url=f"{settings.API_V1_STR}/documents/{document.id}/status",
+        )
 
     except HTTPException:
         raise
@@ -282,6 +209,71 @@ async def upload_document(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"上传文档失败: {str(e)}",
         ) from e
+    finally:
+        upload.cleanup()
+
+
+@router.post(
+    "/upload",
+    response_model=DocumentUploadResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def upload_document(
+    space_id: int = Form(..., description="空间ID"),
+    file: UploadFile = File(..., description="要上传的文件"),
+    title: str | None = Form(None, description="文档标题"),
+    tags: str | None = Form(None, description="标签，逗号分隔"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> DocumentUploadResponse:
+    """上传文档到知识空间.
+
+    文件保存后立即返回202，内容提取、摘要和向量化在后台执行，
+    通过 status_url 查询处理进度。
+    """
+    await _check_upload_access(db, space_id, current_user)
+    return await _accept_upload(
+        db, space_id, file, current_user, title, _parse_tags(tags)
+    )
+
+
+@router.post(
+    "/upload/batch",
+    response_model=BatchUploadResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def upload_documents_batch(
+    space_id: int = Form(..., description="空间ID"),
+    files: list[UploadFile] = File(..., description="要上传的文件"),
+    tags: str | None = Form(None, description="标签，逗号分隔"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> BatchUploadResponse:
+    """批量上传文档，每个文件单独受理，单个文件失败不影响其他文件."""
+    if len(files) > settings.INGESTION_BATCH_MAX_FILES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"单次最多上传 {settings.INGESTION_BATCH_MAX_FILES} 个文件",
+        )
+
+    await _check_upload_access(db, space_id, current_user)
+    tag_list = _parse_tags(tags)
+
+    accepted: list[DocumentUploadResponse] = []
+    failed: list[BatchUploadError] = []
+    for file in files:
+        try:
+            accepted.append(
+                await _accept_upload(db, space_id, file, current_user, None, tag_list)
+            )
+        except HTTPException as e:
+            failed.append(
+                BatchUploadError(
+                    filename=file.filename, status_code=e.status_code, error=str(e.detail)
+                )
+            )
+
+    return BatchUploadResponse(accepted=accepted, failed=failed, total=len(files))
 
 
 @router.get("/", response_model=DocumentListResponse)
@@ -291,6 +283,7 @@ async def get_documents(
     limit: int = Query(20, ge=1, le=100, description="返回的记录数"),
     search: str | None = Query(None, description="搜索关键词"),
     processing_status: str | None = Query(None, description="处理状态"),
+    cursor: str | None = Query(None, description="上一页返回的 next_cursor，传入时忽略 skip"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ) -> DocumentListResponse:
@@ -315,44 +308,30 @@ async def get_documents(
                     detail="无权访问此空间",
                 )
 
-        # 获取空间文档
-        if search:
-            documents = await crud.crud_document.search(
-                db, space_id=space_id, query=search, skip=skip, limit=limit
-            )
-        else:
-            documents = await crud.crud_document.get_by_space(
-                db, space_id=space_id, skip=skip, limit=limit, status=processing_status
-            )
-    else:
-        # 获取用户的所有文档
-        documents = await crud.crud_document.get_user_documents(
-            db, user_id=current_user.id, skip=skip, limit=limit
+    try:
+        # 指定空间时列出空间内文档，否则列出用户上传的所有文档
+        page = await crud.crud_document.get_page(
+            db,
+            user_id=current_user.id,
+            space_id=space_id or None,
+            search=search,
+            status=processing_status,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
         )
-
-        # 应用搜索筛选
-        if search:
-            documents = [
-                d
-                for d in documents
-                if search.lower() in (d.title or d.filename).lower()
-                or (d.content and search.lower() in d.content.lower())
-            ]
-
-        if processing_status:
-            documents = [
-                d for d in documents if d.processing_status == processing_status
-            ]
-
-    # 获取总数
-    total = len(documents)
+    except InvalidCursorError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="无效的分页游标"
+        ) from e
 
     return DocumentListResponse(
-        documents=[DocumentResponse.model_validate(doc) for doc in documents],
-        total=total,
+        documents=[DocumentSummary.model_validate(doc) for doc in page.items],
+        total=page.total,
         page=skip // limit + 1,
         page_size=limit,
-        has_next=total > skip + limit,
+        has_next=page.next_cursor is not None,
+        next_cursor=page.next_cursor,
     )
 
 
@@ -374,6 +353,33 @@ async def get_document(
     return DocumentResponse.model_validate(document)
 
 
+@router.get("/{document_id}/status", response_model=DocumentStatusResponse)
+async def get_document_status(
+    document_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> DocumentStatusResponse:
+    """获取文档处理状态及最近的入库任务."""
+    document = await document_service.get_document_by_id(db, document_id, current_user)
+
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="文档不存在或无权访问",
+        )
+
+    job = await crud.crud_ingestion_job.get_latest_by_document(
+        db, document_id=document.id
+    )
+    return DocumentStatusResponse(
+        document_id=document.id,
+        processing_status=document.processing_status,
+        extraction_status=document.extraction_status,
+        embedding_status=document.embedding_status,
+        job=IngestionJobResponse.model_validate(job) if job else None,
+    )
+
+
 @router.put("/{document_id}", response_model=DocumentResponse)
 async def update_document(
     document_id: int,
@@ -458,13 +464,19 @@ async def delete_document(
         ) from e
 
 
-@router.post("/{document_id}/download")
+@router.api_route("/{document_id}/download", methods=["GET", "POST"])
 async def download_document(
     document_id: int,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
-) -> FileResponse:
-    """下载文档文件."""
+    range_header: Annotated[str | None, Header(alias="Range")] = None,
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Response:
+    """下载文档原始文件.
+
+    直接从存储流式返回，支持 Range 断点续传和 ETag 条件请求。
+    没有原始文件的旧文档返回提取的文本。
+    """
     # 获取文档
     document = await document_service.get_document_by_id(db, document_id, current_user)
 
@@ -474,27 +486,58 @@ async def download_document(
             detail="文档不存在或无权访问",
         )
 
-    # 注意：在简化版本中，文件内容存储在数据库中
-    # 在实际应用中，应该从文件系统或对象存储中读取
-    if not document.content:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="文档内容不存在",
-        )
-
-    # 创建临时文件返回
-    import tempfile
+    body: bytes | None = None
+    if blob_service.is_blob_key(document.file_path):
+        size = document.file_size
+        etag = f'"{document.file_hash}"'
+        media_type = document.content_type or "application/octet-stream"
+    else:
+        content = await document_text_service.get_text(db, document)
+        if not content:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="文档内容不存在",
+            )
+        body = content.encode("utf-8")
+        size = len(body)
+        etag = f'"{document.content_hash or hashlib.sha256(body).hexdigest()}"'
+        media_type = "text/plain; charset=utf-8"
+
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": content_disposition(document.filename),
+    }
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
 
-    with tempfile.NamedTemporaryFile(
-        mode="w", delete=False, suffix=f"_{document.filename}"
-    ) as tmp:
-        tmp.write(document.content)
-        tmp_path = tmp.name
+    try:
+        byte_range = parse_range(range_header, size)
+    except RangeNotSatisfiableError:
+        return Response(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            headers={"Content-Range": f"bytes */{size}"},
+        )
 
-    return FileResponse(
-        path=tmp_path,
-        filename=document.filename,
-        media_type=document.content_type,
+    start, end = byte_range or (0, size)
+    headers["Content-Length"] = str(end - start)
+    status_code = status.HTTP_200_OK
+    if byte_range is not None:
+        status_code = status.HTTP_206_PARTIAL_CONTENT
+        headers["Content-Range"] = f"bytes {start}-{end - 1}/{size}"
+
+    if body is not None:
+        return Response(
+            content=body[start:end],
+            status_code=status_code,
+            headers=headers,
+            media_type=media_type,
+        )
+    return StreamingResponse(
+        blob_service.backend.stream(document.file_path, start, end),
+        status_code=status_code,
+        headers=headers,
+        media_type=media_type,
     )
 
 
@@ -533,7 +576,14 @@ async def get_document_preview(
 
     # 根据文档类型返回预览
     if document.content_type and "pdf" in document.content_type.lower():
-        # PDF文档
+        # PDF文档：有页索引时按页读取该页文本
+        content = None
+        if page is not None:
+            if document.page_offsets:
+                content = await document_text_service.read_page(db, document, page)
+            elif page == 1:
+                # 没有页索引的旧文档，第一页返回全文
+                content = await document_text_service.get_text(db, document)
         return {
             "type": "pdf",
             "filename": document.filename,
@@ -544,7 +594,7 @@ async def get_document_preview(
             if document.meta_data
             else None,
             "current_page": page,
-            "content": document.content if page == 1 else None,  # 第一页返回提取的文本
+            "content": content,
         }
     elif document.content_type and any(
         img in document.content_type.lower()
@@ -562,7 +612,7 @@ async def get_document_preview(
         }
     elif document.content:
         # 文本类文档
-        content = document.content
+        content = await document_text_service.get_text(db, document) or ""
 
         # 根据格式返回
         if format == "html":
@@ -627,8 +677,8 @@ async def get_document_content(
     current_user: User = Depends(get_current_active_user),
 ) -> dict[str, Any]:
     """获取文档的文本内容（支持分页）."""
-    # 获取文档
-    document = await crud.crud_document.get(db, id=document_id)
+    # 获取文档（不加载正文，片段由数据库按范围读取）
+    document = await crud.crud_document.get_without_content(db, id=document_id)
     if not document:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -649,16 +699,16 @@ async def get_document_content(
                         detail="无权访问此文档",
                     )
 
-    if not document.content:
+    total_length = await document_text_service.load_length(db, document)
+    if not total_length:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="此文档没有可用的文本内容",
         )
 
-    # 获取内容片段
-    total_length = len(document.content)
+    # 获取内容片段（只读取涉及的分块，旧文档由数据库截取）
     end = min(start + length, total_length)
-    content_slice = document.content[start:end]
+    content_slice = await document_text_service.read_range(db, document, start, end)
 
     return {
         "document_id": document_id,
@@ -739,8 +789,12 @@ async def batch_import_urls(
     import_data: BatchURLImportRequest,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
-) -> list[URLImportResponse]:
-    """批量从URL导入网页内容."""
+) -> list[URLImportResponse] | StreamingResponse:
+    """批量从URL导入网页内容.
+
+    网页并发抓取。stream=true 时以SSE逐条返回每个URL的导入结果，
+    不必等待最后一个URL完成。
+    """
     # 检查空间权限（同上）
     space = await crud.crud_space.get(db, id=import_data.space_id)
     if not space:
@@ -759,10 +813,37 @@ async def batch_import_urls(
                 detail="无权在此空间导入文档",
             )
 
+    urls = [str(url) for url in import_data.urls]
+
+    if import_data.stream:
+        # 流式响应：按完成顺序逐条返回
+        async def generate() -> AsyncGenerator[str, None]:
+            async for result in document_service.iter_import_urls(
+                db,
+                urls=urls,
+                space_id=import_data.space_id,
+                user=current_user,
+                tags=import_data.tags,
+                save_snapshot=import_data.save_snapshot,
+            ):
+                response = await _url_import_response(db, result)
+                if response is not None:
+                    yield f"data: {response.model_dump_json()}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(
+            generate(),
+            media_type="text/event-stream",
+            headers={
+                "Cache-Control": "no-cache",
+                "X-Accel-Buffering": "no",
+            },
+        )
+
     # 批量导入
     results = await document_service.batch_import_urls(
         db,
-        urls=[str(url) for url in import_data.urls],
+        urls=urls,
         space_id=import_data.space_id,
         user=current_user,
         tags=import_data.tags,
@@ -772,34 +853,40 @@ async def batch_import_urls(
     # 构建响应
     responses = []
     for result in results:
-        if result["status"] == "success":
-            document = await crud.crud_document.get(db, id=result["document_id"])
-            if document:
-                responses.append(
-                    URLImportResponse(
-                        document_id=document.id,
-                        url=result["url"],
-                        title=document.title or "未命名文档",
-                        status="success",
-                        metadata=result.get("metadata"),
-                        created_at=document.created_at,
-                    )
-                )
-        else:
-            responses.append(
-                URLImportResponse(
-                    document_id=0,
-                    url=result["url"],
-                    title="",
-                    status="error",
-                    error=result.get("error"),
-                    created_at=datetime.now(),
-                )
-            )
+        response = await _url_import_response(db, result)
+        if response is not None:
+            responses.append(response)
 
     return responses
 
 
+async def _url_import_response(
+    db: AsyncSession, result: dict[str, Any]
+) -> URLImportResponse | None:
+    """把单个URL的导入结果转换为响应，导入成功但文档不存在时返回None."""
+    if result["status"] != "success":
+        return URLImportResponse(
+            document_id=0,
+            url=result["url"],
+            title="",
+            status="error",
+            error=result.get("error"),
+            created_at=datetime.now(),
+        )
+
+    document = await crud.crud_document.get(db, id=result["document_id"])
+    if not document:
+        return None
+    return URLImportResponse(
+        document_id=document.id,
+        url=result["url"],
+        title=document.title or "未命名文档",
+        status="success",
+        metadata=result.get("metadata"),
+        created_at=document.created_at,
+    )
+
+
 @router.get("/{document_id}/snapshot", response_model=WebSnapshotResponse)
 async def get_web_snapshot(
     document_id: int,
@@ -862,104 +949,47 @@ async def search_documents(
                     detail="无权访问此空间",
                 )
 
-    # 执行搜索
+    # 执行搜索：权限、匹配、排序和分页都在数据库中完成
     import time
 
     start_time = time.time()
 
-    # 简单的关键词搜索实现
-    # 在实际应用中，这里应该调用 vector_service 进行向量搜索
-    query = search_request.query.lower()
-    all_documents = await crud.crud_document.get_multi(db, limit=1000)
-
-    # 过滤用户可访问的文档
-    accessible_docs = []
-    for doc in all_documents:
-        # 检查文档权限
-        if doc.user_id == current_user.id:
-            accessible_docs.append(doc)
-        elif doc.space_id:
-            space = await crud.crud_space.get(db, id=doc.space_id)
-            if space and (space.is_public or space.user_id == current_user.id):
-                accessible_docs.append(doc)
-            else:
-                # 检查协作权限
-                access = await crud.crud_space.get_user_access(
-                    db, space_id=doc.space_id, user_id=current_user.id
-                )
-                if access:
-                    accessible_docs.append(doc)
-
-    # 如果指定了space_id，只搜索该空间的文档
-    if search_request.space_id:
-        accessible_docs = [
-            doc for doc in accessible_docs if doc.space_id == search_request.space_id
-        ]
+    rows, total = await crud.crud_document.search_accessible(
+        db,
+        query=search_request.query,
+        user_id=current_user.id,
+        space_id=search_request.space_id,
+        skip=search_request.offset,
+        limit=search_request.limit,
+    )
 
-    # 执行搜索
     results = []
-    for doc in accessible_docs:
-        score = 0.0
-        highlights = {}
-
-        # 搜索标题
-        if doc.title and query in doc.title.lower():
-            score += 2.0
-            highlights["title"] = [doc.title]
-
-        # 搜索文件名
-        if query in doc.filename.lower():
-            score += 1.5
-            highlights["filename"] = [doc.filename]
-
-        # 搜索内容
-        if doc.content and query in doc.content.lower():
-            score += 1.0
-            # 提取包含查询词的片段
-            content_lower = doc.content.lower()
-            idx = content_lower.find(query)
-            if idx != -1:
-                start = max(0, idx - 50)
-                end = min(len(doc.content), idx + len(query) + 50)
-                snippet = doc.content[start:end]
-                if start > 0:
-                    snippet = "..." + snippet
-                if end < len(doc.content):
-                    snippet = snippet + "..."
-                highlights["content"] = [snippet]
-
-        # 搜索标签
-        if doc.tags:
-            for tag in doc.tags:
-                if query in tag.lower():
-                    score += 0.5
-                    highlights["tags"] = doc.tags
-                    break
-
-        if score > 0:
-            results.append(
-                SearchResult(
-                    document_id=doc.id,
-                    title=doc.title or doc.filename,
-                    snippet=highlights.get("content", [""])[0]
-                    if "content" in highlights
-                    else doc.summary or "",
-                    score=score,
-                    highlight=highlights,
-                )
+    for row in rows:
+        doc = row.Document
+        highlights = {
+            field: [getattr(row, f"{field}_headline")]
+            for field in ("title", "filename", "content")
+            if getattr(row, f"{field}_matched")
+        }
+        if row.tags_matched:
+            highlights["tags"] = doc.tags
+        results.append(
+            SearchResult(
+                document_id=doc.id,
+                title=doc.title or doc.filename,
+                snippet=highlights["content"][0]
+                if "content" in highlights
+                else doc.summary or "",
+                score=row.score,
+                highlight=highlights,
             )
-
-    # 按分数排序
-    results.sort(key=lambda x: x.score, reverse=True)
-
-    # 限制结果数量
-    results = results[: search_request.limit]
+        )
 
     search_time = time.time() - start_time
 
     return SearchResponse(
         results=results,
-        total=len(results),
+        total=total,
         query=search_request.query,
         search_time=search_time,
     )
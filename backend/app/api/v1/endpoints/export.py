@@ -25,6 +25,7 @@ from app.schemas.export import (
     NoteExportRequest,
     SpaceExportRequest,
 )
+from app.services.document_text_service import document_text_service
 from app.services.export_service import export_service
 from app.services.note_service import note_service
 
@@ -267,7 +268,7 @@ async def export_documents(
                     "file_size": doc.file_size,
                     "created_at": doc.created_at.isoformat(),
                     "tags": doc.tags or [],
-                    "extracted_text": getattr(doc, "extracted_text", doc.content) or "",
+                    "extracted_text": await document_text_service.get_text(db, doc) or "",
                 }
                 docs_data.append(doc_dict)
 
@@ -301,7 +302,7 @@ async def export_documents(
                 "id": doc.id,
                 "title": doc.title,
                 "filename": doc.filename,
-                "content": doc.content,
+                "content": await document_text_service.get_text(db, doc),
                 "created_at": doc.created_at.isoformat(),
                 "file_size": doc.file_size,
             }
@@ -357,11 +358,16 @@ async def export_space(
     notes = []
 
     if request.include_documents:
-        documents = await crud_document.get_by_space(db, space_id=request.space_id)
+        documents = await crud_document.get_by_space(
+            db, space_id=request.space_id, with_content=request.include_content
+        )
 
     if request.include_notes:
         notes = await crud_note.get_by_space(
-            db, space_id=request.space_id, user_id=current_user.id
+            db,
+            space_id=request.space_id,
+            user_id=current_user.id,
+            with_content=request.include_content,
         )
 
     # 根据格式导出
@@ -382,7 +388,9 @@ async def export_space(
                     "title": doc.title,
                     "filename": doc.filename,
                     "summary": doc.summary,
-                    "content": doc.content if request.include_content else None,
+                    "content": await document_text_service.get_text(db, doc)
+                    if request.include_content
+                    else None,
                 }
             )
 
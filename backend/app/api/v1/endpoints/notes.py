@@ -8,7 +8,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app import crud
 from app.core.auth import get_current_active_user
 from app.core.database import get_db
-from app.crud.note import crud_note
+from app.crud.listing import InvalidCursorError
+from app.crud.note import NOTE_SORT_COLUMNS, crud_note
 from app.models.models import User
 from app.schemas.note import (
     NoteAIGenerateRequest,
@@ -19,6 +20,7 @@ from app.schemas.note import (
     NoteListResponse,
     NoteResponse,
     NoteSearchRequest,
+    NoteSummary,
     NoteUpdate,
 )
 from app.schemas.note_version import (
@@ -37,57 +39,57 @@ router = APIRouter()
 async def get_notes(
     space_id: int | None = Query(None, description="Space ID筛选"),
     note_type: str | None = Query(None, description="笔记类型筛选"),
-    tags: list[str] | None = Query(None, description="标签筛选"),
+    tags: list[str] | None = Query(None, description="标签筛选（包含任一标签）"),
     skip: int = Query(0, ge=0, description="跳过的记录数"),
     limit: int = Query(20, ge=1, le=100, description="返回的记录数"),
-    sort_by: str = Query("created_at", description="排序字段"),
+    sort_by: str = Query("updated_at", description="排序字段：created_at、updated_at 或 title"),
     sort_order: str = Query("desc", description="排序方向"),
+    cursor: str | None = Query(None, description="上一页返回的 next_cursor，传入时忽略 skip"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ) -> NoteListResponse:
     """获取笔记列表."""
-    if space_id:
-        # 获取特定Space的笔记
-        notes = await crud_note.get_by_space(
-            db=db,
-            space_id=space_id,
+    if sort_by not in NOTE_SORT_COLUMNS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"不支持的排序字段: {sort_by}",
+        )
+
+    try:
+        page = await crud_note.get_page(
+            db,
             user_id=current_user.id,
+            space_id=space_id,
+            note_type=note_type,
+            tags=tags,
             skip=skip,
             limit=limit,
             sort_by=sort_by,
             sort_order=sort_order,
+            cursor=cursor,
         )
-        # 对于毕业设计项目，使用列表长度作为总数是可以接受的
-        # 实际项目中应该使用: total = await crud_note.count_by_space(db, space_id, current_user.id)
-        total = len(notes)
-    else:
-        # 获取用户的所有笔记
-        # 注意：这里简化处理，实际应该在crud层支持过滤
-        all_notes = await crud_note.get_multi(db=db, skip=0, limit=1000)
-        # 手动过滤用户的笔记
-        user_notes = [n for n in all_notes if n.user_id == current_user.id]
-        if note_type:
-            user_notes = [n for n in user_notes if n.note_type == note_type]
-        # 分页
-        notes = user_notes[skip : skip + limit]
-        total = len(user_notes)
+    except InvalidCursorError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="无效的分页游标"
+        ) from e
 
     return NoteListResponse(
-        notes=[NoteResponse.model_validate(note) for note in notes],
-        total=total,
+        notes=[NoteSummary.model_validate(note) for note in page.items],
+        total=page.total,
         page=skip // limit + 1,
         page_size=limit,
-        has_next=total > skip + limit,
+        has_next=page.next_cursor is not None,
+        next_cursor=page.next_cursor,
     )
 
 
-@router.get("/recent", response_model=list[NoteResponse])
+@router.get("/recent", response_model=list[NoteSummary])
 async def get_recent_notes(
     limit: int = Query(10, ge=1, le=50, description="返回的记录数"),
     note_type: str | None = Query(None, description="笔记类型筛选"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
-) -> list[NoteResponse]:
+) -> list[NoteSummary]:
     """获取最近的笔记."""
     notes = await crud_note.get_recent_notes(
         db=db,
@@ -95,7 +97,7 @@ async def get_recent_notes(
         limit=limit,
         note_type=note_type,
     )
-    return [NoteResponse.model_validate(note) for note in notes]
+    return [NoteSummary.model_validate(note) for note in notes]
 
 
 @router.post("/search", response_model=NoteListResponse)
@@ -117,7 +119,7 @@ async def search_notes(
     )
 
     return NoteListResponse(
-        notes=[NoteResponse.model_validate(note) for note in notes],
+        notes=[NoteSummary.model_validate(note) for note in notes],
         total=total,
         page=1,
         page_size=request.limit,
@@ -0,0 +1,72 @@
+"""Search endpoints."""
+
+import time
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.auth import get_current_active_user
+from app.core.database import get_db
+from app.models.models import User
+from app.schemas.search import (
+    SuggestResponse,
+    SuggestType,
+    UnifiedSearchRequest,
+    UnifiedSearchResponse,
+)
+from app.services.typeahead_service import typeahead_service
+from app.services.unified_search_service import (
+    InvalidCursorError,
+    unified_search_service,
+)
+
+router = APIRouter()
+
+
+@router.get("/suggest", response_model=SuggestResponse)
+async def suggest(
+    q: str = Query(..., min_length=1, max_length=100, description="搜索框当前输入"),
+    types: list[SuggestType] | None = Query(None, description="限定对象类型"),
+    limit: int = Query(8, ge=1, le=20, description="返回条目数"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> SuggestResponse:
+    """输入联想：按标题、文件名和空间名模糊匹配，按相似度排序."""
+    items, cached = await typeahead_service.suggest(
+        db, current_user, q, limit=limit, types=types
+    )
+    return SuggestResponse(query=q, items=items, cached=cached)
+
+
+@router.post("/", response_model=UnifiedSearchResponse)
+async def unified_search(
+    search_request: UnifiedSearchRequest,
+    current_user: User = Depends(get_current_active_user),
+) -> UnifiedSearchResponse:
+    """统一搜索：同时搜索文档、笔记、引用、标注和对话，按归一化得分合并排序."""
+    start_time = time.time()
+    try:
+        result = await unified_search_service.search(
+            current_user.id,
+            search_request.query,
+            types=search_request.types,
+            quotas=search_request.quotas,
+            limit=search_request.limit,
+            cursor=search_request.cursor,
+            time_budget_ms=search_request.time_budget_ms,
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)
+        ) from e
+
+    return UnifiedSearchResponse(
+        query=search_request.query,
+        results=result.hits,
+        next_cursor=result.next_cursor,
+        counts=result.counts,
+        partial=bool(result.timed_out),
+        timed_out=result.timed_out,
+        cached=result.cached,
+        search_time=time.time() - start_time,
+    )
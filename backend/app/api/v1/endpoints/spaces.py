@@ -6,6 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app import crud
 from app.core.auth import get_current_active_user
 from app.core.database import get_db
+from app.crud.listing import InvalidCursorError
 from app.models.models import User
 from app.schemas.spaces import (
     SpaceCreate,
@@ -63,49 +64,35 @@ async def get_spaces(
     tags: list[str] | None = Query(None, description="标签筛选"),
     is_public: bool | None = Query(None, description="是否公开"),
     include_public: bool = Query(False, description="是否包含公开空间"),
+    cursor: str | None = Query(None, description="上一页返回的 next_cursor，传入时忽略 skip"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ) -> SpaceListResponse:
     """获取用户的知识空间列表."""
-    # 获取用户空间
-    if include_public:
-        spaces = await crud.crud_space.get_user_spaces(
+    try:
+        page = await crud.crud_space.get_page(
             db,
             user_id=current_user.id,
+            include_public=include_public,
+            search=search,
+            tags=tags,
+            is_public=is_public,
             skip=skip,
             limit=limit,
-            include_public=True,
+            cursor=cursor,
         )
-    else:
-        spaces = await SpaceService.get_user_spaces(db, current_user, skip, limit)
-
-    # 应用筛选条件
-    # TODO: 优化 - 这些筛选应该在数据库层面完成，而不是在内存中
-    if search:
-        spaces = [
-            s
-            for s in spaces
-            if search.lower() in s.name.lower()
-            or (s.description and search.lower() in s.description.lower())
-        ]
-
-    if tags:
-        spaces = [s for s in spaces if s.tags and any(tag in s.tags for tag in tags)]
-
-    if is_public is not None:
-        spaces = [s for s in spaces if s.is_public == is_public]
-
-    # 获取总数
-    # 对于毕业设计项目，简单返回当前筛选后的数量
-    # 实际项目中应该使用单独的 COUNT 查询
-    total = len(spaces)
+    except InvalidCursorError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="无效的分页游标"
+        ) from e
 
     return SpaceListResponse(
-        spaces=[SpaceResponse.model_validate(space) for space in spaces],
-        total=total,
+        spaces=[SpaceResponse.model_validate(space) for space in page.items],
+        total=page.total,
         page=skip // limit + 1,
         page_size=limit,
-        has_next=total > skip + limit,
+        has_next=page.next_cursor is not None,
+        next_cursor=page.next_cursor,
     )
 
 
@@ -6,6 +6,9 @@ This module provides essential components including:
 - Application configuration management
 - Database connection and session management
 - Rate limiting functionality
+- In-process caching
+- Process pool for CPU-bound work
+- Streaming upload spooling
 """
 
 from app.core.auth import (
@@ -15,6 +18,7 @@ from app.core.auth import (
     get_current_user,
     oauth2_scheme,
 )
+from app.core.cache import LRUCache
 from app.core.config import settings
 from app.core.database import (
     Base,
@@ -25,10 +29,17 @@ from app.core.database import (
     get_db,
     init_db,
 )
+from app.core.process_pool import (
+    ProcessPool,
+    WorkerError,
+    WorkerTimeoutError,
+    extraction_pool,
+)
 from app.core.rate_limiter import (
     RateLimiter,
     rate_limiter,
 )
+from app.core.uploads import SpooledUpload, UploadTooLargeError, spool_upload
 
 __all__ = [
     # Auth exports
@@ -37,6 +48,8 @@ __all__ = [
     "get_current_active_user",
     "get_current_premium_user",
     "oauth2_scheme",
+    # Cache exports
+    "LRUCache",
     # Config exports
     "settings",
     # Database exports
@@ -47,7 +60,16 @@ __all__ = [
     "init_db",
     "close_db",
     "check_db_health",
+    # Process pool exports
+    "ProcessPool",
+    "WorkerError",
+    "WorkerTimeoutError",
+    "extraction_pool",
     # Rate limiter exports
     "RateLimiter",
     "rate_limiter",
+    # Upload exports
+    "SpooledUpload",
+    "UploadTooLargeError",
+    "spool_upload",
 ]
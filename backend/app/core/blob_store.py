@@ -0,0 +1,185 @@
+"""Storage backends for content-addressed raw file blobs."""
+
+import logging
+import os
+import shutil
+import tempfile
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from pathlib import Path
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 流式读取的块大小
+STREAM_CHUNK_SIZE = 256 * 1024
+
+
+def blob_key(sha256: str) -> str:
+    """内容哈希对应的存储键（按前两位分目录，避免单目录文件过多）."""
+    return f"blobs/{sha256[:2]}/{sha256}"
+
+
+class BlobBackend(ABC):
+    """原始文件存储后端接口（同步方法，由调用方放到线程中执行）."""
+
+    @abstractmethod
+    def put_file(self, key: str, source: Path, content_type: str) -> None:
+        """写入文件. 写入成功后 source 可能被移动，调用方不应再使用."""
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        """对象是否存在."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """删除对象（不存在时忽略）."""
+
+    def local_path(self, key: str) -> Path | None:
+        """对象在本地文件系统中的路径，非本地后端返回 None."""
+        return None
+
+    @abstractmethod
+    def download(self, key: str, target: Path) -> None:
+        """下载对象到本地文件."""
+
+    @abstractmethod
+    def stream(
+        self, key: str, start: int, end: int, chunk_size: int = STREAM_CHUNK_SIZE
+    ) -> Iterator[bytes]:
+        """按块读取对象的 [start, end) 字节范围."""
+
+
+class LocalBlobBackend(BlobBackend):
+    """本地文件系统后端（开发和单机部署使用）."""
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+
+    def _path(self, key: str) -> Path:
+        return self.root / key
+
+    def put_file(self, key: str, source: Path, content_type: str) -> None:
+        target = self._path(key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # 先写到同目录的临时文件再原子替换，读取方不会看到写了一半的文件
+        fd, tmp_name = tempfile.mkstemp(dir=target.parent, prefix=".tmp-")
+        os.close(fd)
+        try:
+            shutil.move(str(source), tmp_name)
+            os.replace(tmp_name, target)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+    def exists(self, key: str) -> bool:
+        return self._path(key).is_file()
+
+    def delete(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+
+    def local_path(self, key: str) -> Path | None:
+        return self._path(key)
+
+    def download(self, key: str, target: Path) -> None:
+        shutil.copyfile(self._path(key), target)
+
+    def stream(
+        self, key: str, start: int, end: int, chunk_size: int = STREAM_CHUNK_SIZE
+    ) -> Iterator[bytes]:
+        with open(self._path(key), "rb") as f:
+            f.seek(start)
+            remaining = end - start
+            while remaining > 0:
+                chunk = f.read(min(chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+
+class MinioBlobBackend(BlobBackend):
+    """MinIO / S3 兼容对象存储后端."""
+
+    def __init__(
+        self,
+        endpoint: str,
+        access_key: str,
+        secret_key: str,
+        bucket: str,
+        secure: bool = False,
+    ) -> None:
+        from minio import Minio
+
+        self.client = Minio(
+            endpoint, access_key=access_key, secret_key=secret_key, secure=secure
+        )
+        self.bucket = bucket
+        self._bucket_ready = False
+
+    def _ensure_bucket(self) -> None:
+        if self._bucket_ready:
+            return
+        if not self.client.bucket_exists(self.bucket):
+            self.client.make_bucket(self.bucket)
+            logger.info(f"创建存储桶: {self.bucket}")
+        self._bucket_ready = True
+
+    def put_file(self, key: str, source: Path, content_type: str) -> None:
+        self._ensure_bucket()
+        self.client.fput_object(
+            self.bucket, key, str(source), content_type=content_type
+        )
+        source.unlink(missing_ok=True)
+
+    def exists(self, key: str) -> bool:
+        from minio.error import S3Error
+
+        self._ensure_bucket()
+        try:
+            self.client.stat_object(self.bucket, key)
+            return True
+        except S3Error as e:
+            if e.code in ("NoSuchKey", "NoSuchObject"):
+                return False
+            raise
+
+    def delete(self, key: str) -> None:
+        self._ensure_bucket()
+        self.client.remove_object(self.bucket, key)
+
+    def download(self, key: str, target: Path) -> None:
+        self._ensure_bucket()
+        self.client.fget_object(self.bucket, key, str(target))
+
+    def stream(
+        self, key: str, start: int, end: int, chunk_size: int = STREAM_CHUNK_SIZE
+    ) -> Iterator[bytes]:
+        if end <= start:
+            return
+        self._ensure_bucket()
+        # 范围请求由对象存储完成，只传输需要的字节
+        response = self.client.get_object(
+            self.bucket, key, offset=start, length=end - start
+        )
+        try:
+            yield from response.stream(chunk_size)
+        finally:
+            response.close()
+            response.release_conn()
+
+
+def create_blob_backend() -> BlobBackend:
+    """按配置创建存储后端."""
+    if settings.BLOB_STORAGE_BACKEND == "minio":
+        return MinioBlobBackend(
+            endpoint=settings.MINIO_ENDPOINT,
+            access_key=settings.MINIO_ACCESS_KEY,
+            secret_key=settings.MINIO_SECRET_KEY,
+            bucket=settings.MINIO_BUCKET_NAME,
+            secure=settings.MINIO_SECURE,
+        )
+    if settings.BLOB_STORAGE_BACKEND != "local":
+        raise ValueError(f"不支持的存储后端: {settings.BLOB_STORAGE_BACKEND}")
+    return LocalBlobBackend(settings.BLOB_LOCAL_DIR)
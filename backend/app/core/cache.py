@@ -0,0 +1,137 @@
+"""In-process LRU cache with size bound and optional TTL."""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any, Generic, TypeVar
+
+V = TypeVar("V")
+
+
+class LRUCache(Generic[V]):
+    """线程安全的LRU缓存.
+
+    同时支持条目数上限和总字节数上限，超出任一上限时淘汰最久未使用的条目。
+    可选的TTL在读取时惰性过期。
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: int | None = None,
+        ttl: float | None = None,
+        sizeof: Callable[[Any], int] | None = None,
+    ) -> None:
+        """初始化缓存.
+
+        Args:
+            max_entries: 最大条目数
+            max_bytes: 最大总字节数（None表示不限制）
+            ttl: 条目存活时间（秒，None表示永不过期）
+            sizeof: 计算条目大小的函数，默认按 str/bytes 长度估算
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._sizeof = sizeof or _default_sizeof
+        self._data: OrderedDict[Hashable, tuple[V, int, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> V | None:
+        """读取缓存条目，未命中或已过期返回None."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, size, expires_at = entry
+            if expires_at and expires_at <= time.monotonic():
+                self._pop(key)
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: V, size: int | None = None) -> None:
+        """写入缓存条目.
+
+        单个条目超过 max_bytes 时不缓存。
+        """
+        if size is None:
+            size = self._sizeof(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+
+        expires_at = time.monotonic() + self.ttl if self.ttl else 0.0
+        with self._lock:
+            if key in self._data:
+                self._pop(key)
+            self._data[key] = (value, size, expires_at)
+            self._total_bytes += size
+            self._evict()
+
+    def delete(self, key: Hashable) -> bool:
+        """删除缓存条目."""
+        with self._lock:
+            if key not in self._data:
+                return False
+            self._pop(key)
+            return True
+
+    def clear(self) -> None:
+        """清空缓存（保留统计）."""
+        with self._lock:
+            self._data.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> dict[str, Any]:
+        """获取缓存统计信息."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "bytes": self._total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._data.get(key)
+            return entry is not None and not (
+                entry[2] and entry[2] <= time.monotonic()
+            )
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _pop(self, key: Hashable) -> None:
+        _, size, _ = self._data.pop(key)
+        self._total_bytes -= size
+
+    def _evict(self) -> None:
+        while self._data and (
+            len(self._data) > self.max_entries
+            or (self.max_bytes is not None and self._total_bytes > self.max_bytes)
+        ):
+            oldest = next(iter(self._data))
+            self._pop(oldest)
+            self.evictions += 1
+
+
+def _default_sizeof(value: Any) -> int:
+    """估算条目大小."""
+    if isinstance(value, str | bytes | bytearray):
+        return len(value)
+    return sys.getsizeof(value)
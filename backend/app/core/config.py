@@ -83,6 +83,10 @@ class Settings(BaseSettings):
     OLLAMA_BASE_URL: str = "http://localhost:11434"
     OLLAMA_ENABLED: bool = True
 
+    # 模拟LLM配置（压测用，启用后只使用模拟提供商，不会调用 OpenRouter）
+    MOCK_LLM_ENABLED: bool = False
+    MOCK_LLM_BASE_URL: str = "http://localhost:8100/v1"
+
     # 默认AI模型配置
     DEFAULT_CHAT_MODEL: str = "openrouter/auto"
     DEFAULT_SEARCH_MODEL: str = "perplexity/sonar"
@@ -103,6 +107,67 @@ class Settings(BaseSettings):
         "image/gif",
         "image/webp",
     ]
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024  # 流式读取上传文件的块大小（字节）
+    UPLOAD_TMP_DIR: str | None = None  # 上传暂存目录（默认使用系统临时目录）
+
+    # 文档提取进程池配置
+    EXTRACTION_POOL_ENABLED: bool = True  # 在独立进程中提取文档内容，避免阻塞事件循环
+    EXTRACTION_POOL_SIZE: int = 0  # 工作进程数（0表示CPU核数）
+    EXTRACTION_MAX_TASKS_PER_CHILD: int = 50  # 工作进程处理任务数上限，达到后回收（0表示不回收）
+    EXTRACTION_TIMEOUT: int = 120  # 单个文件提取超时（秒）
+    EXTRACTION_MEMORY_LIMIT_MB: int = 2048  # 工作进程内存上限（0表示不限制，Windows不生效）
+    PDF_PAGES_PER_JOB: int = 20  # PDF并行提取时每个任务的最少页数
+
+    # 原始文件存储配置（按SHA-256内容寻址，所有用户和空间共享一份）
+    BLOB_STORAGE_BACKEND: str = "local"  # local 或 minio（使用上面的 MINIO_* 配置）
+    BLOB_LOCAL_DIR: str = "data/blobs"  # local 后端的存储目录
+    BLOB_GC_GRACE_SECONDS: int = 3600  # 引用归零后保留多久才回收
+    BLOB_GC_INTERVAL_SECONDS: int = 3600  # 定期回收间隔（0表示不自动回收）
+
+    # 文档入库任务配置（上传后在后台提取、摘要和向量化）
+    INGESTION_WORKERS: int = 2  # 后台入库工作协程数
+    INGESTION_MAX_ATTEMPTS: int = 3  # 单个任务最大尝试次数
+    INGESTION_RETRY_BACKOFF: float = 5.0  # 重试退避基数（秒），每次失败翻倍
+    INGESTION_LEASE_SECONDS: int = 1800  # 执行中任务的租约（秒），每个阶段续约，过期视为中断
+    INGESTION_BATCH_MAX_FILES: int = 20  # 批量上传单次最多文件数
+
+    # 网页导入抓取配置（共享连接池，批量导入时并发抓取）
+    WEB_FETCH_CONCURRENCY: int = 10  # 全局同时抓取的页面数
+    WEB_FETCH_PER_HOST: int = 2  # 同一主机同时抓取的页面数
+    WEB_FETCH_MAX_BYTES: int = 5 * 1024 * 1024  # 单个页面最大字节数，超过时中止下载
+    WEB_FETCH_TIMEOUT: float = 30.0  # 单个页面请求超时（秒）
+    HTML_EXTRACTOR: str = "auto"  # 网页解析引擎: auto/lxml/html.parser（auto在安装了lxml时使用lxml）
+    WEB_CACHE_ENABLED: bool = True  # 缓存抓取结果，过期后发送条件请求
+    WEB_CACHE_TTL_SECONDS: int = 3600  # 新鲜期内直接复用，不访问源站
+    WEB_CACHE_MAX_ENTRIES: int = 5000  # 缓存条目上限，超过时淘汰最久未使用的
+
+    # 文档全文存储配置（独立表压缩分块存储）
+    DOCUMENT_TEXT_CHUNK_CHARS: int = 64 * 1024  # 每块字符数，范围读取按块解压
+    DOCUMENT_PREVIEW_CHARS: int = 300  # 列表预览字符数（不超过500）
+
+    # 全文检索配置（PostgreSQL 生成列 + GIN 索引，修改后需重建检索列）
+    FULL_TEXT_SEARCH_CONFIG: str = "english"  # 文本搜索配置（决定分词和词干化）
+    TYPEAHEAD_CACHE_TTL_SECONDS: float = 15.0  # 输入联想结果按用户缓存，新建内容最多延迟这么久出现
+    TYPEAHEAD_CACHE_MAX_ENTRIES: int = 10000
+    UNIFIED_SEARCH_DEFAULT_QUOTA: int = 20  # 统一搜索中每类对象默认最多取出的结果数
+    UNIFIED_SEARCH_TIME_BUDGET_MS: int = 1500  # 超时后只返回已完成的对象类型
+    UNIFIED_SEARCH_CACHE_TTL_SECONDS: float = 30.0  # 合并结果缓存，翻页直接读取
+    UNIFIED_SEARCH_CACHE_MAX_ENTRIES: int = 2000
+
+    # 联网搜索配置（Perplexity）
+    WEB_SEARCH_CACHE_TTL_SECONDS: float = 300.0  # 相同查询在此期间内直接复用结果
+    WEB_SEARCH_CACHE_MAX_ENTRIES: int = 1000
+    WEB_SEARCH_MAX_CONNECTIONS: int = 20  # 共享HTTP客户端的连接池大小
+
+    # 多模态图片预处理配置
+    IMAGE_MAX_DIMENSION: int = 1568  # 长边像素上限（主流视觉模型的有效分辨率）
+    IMAGE_OUTPUT_FORMAT: str = "JPEG"  # JPEG 或 WEBP
+    IMAGE_QUALITY: int = 85  # 重新编码质量（1-95）
+    IMAGE_CACHE_MAX_MB: int = 64  # 预处理结果缓存大小
+
+    # 聊天附件预处理缓存配置
+    ATTACHMENT_CACHE_MAX_ENTRIES: int = 256
+    ATTACHMENT_CACHE_MAX_MB: int = 256
 
     # CORS配置
     ALLOWED_ORIGINS: str = "http://localhost:3000,http://localhost:5173,http://43.160.192.140,http://43.160.192.140:80,http://43.160.192.140:3000"
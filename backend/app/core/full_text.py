@@ -0,0 +1,245 @@
+"""Full-text search over generated tsvector columns.
+
+On PostgreSQL every searchable table carries a generated ``search_vector``
+column (weighted ``to_tsvector`` over its text columns) with a GIN index, and
+queries are ranked with ``ts_rank_cd`` and excerpted with ``ts_headline``.
+The columns are not mapped on the models: they are created by DDL hooks when
+``create_all`` runs against PostgreSQL and by the Alembic migration for
+existing databases. Other dialects (SQLite in tests) fall back to substring
+matching with a weighted score, so callers do not need to branch.
+Queries containing CJK text use the same fallback on PostgreSQL as well: the
+built-in text search configurations do not segment CJK, so a tsquery would
+only match whole runs of characters between spaces or punctuation.
+
+Short name columns used by search-as-you-type also get pg_trgm GIN indexes,
+which serve both substring (ILIKE) and fuzzy (word similarity) matching.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import (
+    DDL,
+    Float,
+    MetaData,
+    case,
+    cast,
+    event,
+    func,
+    literal_column,
+    or_,
+    type_coerce,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.core.config import settings
+
+SEARCH_VECTOR = "search_vector"
+
+# 只索引每个字段的前 N 个字符（tsvector 上限 1MB）
+MAX_INDEXED_CHARS = 500_000
+# ts_headline 需要重新分词，只在文本开头这一段中找片段
+HEADLINE_MAX_CHARS = 100_000
+HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxWords=35, MinWords=15, MaxFragments=2"
+# 回退实现的片段长度（匹配位置前后）
+FALLBACK_SNIPPET_BEFORE = 60
+FALLBACK_SNIPPET_CHARS = 200
+
+# 中日韩文字（假名、汉字、谚文），内置的文本搜索配置不能对其分词
+CJK_PATTERN = re.compile(r"[\u3040-\u30ff\u3400-\u9fff\uac00-\ud7af\uf900-\ufaff]")
+
+# ts_rank 的默认权重 {D, C, B, A}
+WEIGHT_SCORES = {"A": 1.0, "B": 0.4, "C": 0.2, "D": 0.1}
+
+
+@dataclass(frozen=True)
+class FullTextIndex:
+    """一张表的全文检索列定义."""
+
+    table: str
+    columns: tuple[tuple[str, str], ...]  # (列名, 权重 A-D)
+
+    @property
+    def index_name(self) -> str:
+        return f"ix_{self.table}_{SEARCH_VECTOR}"
+
+    def vector_sql(self, config: str) -> str:
+        """生成列表达式（只能使用 IMMUTABLE 函数，文本搜索配置须为常量）."""
+        return " || ".join(
+            f"setweight(to_tsvector('{config}'::regconfig, "
+            f"left(coalesce({column}, ''), {MAX_INDEXED_CHARS})), '{weight}')"
+            for column, weight in self.columns
+        )
+
+    def create_sql(self, config: str) -> list[str]:
+        return [
+            f"ALTER TABLE {self.table} ADD COLUMN IF NOT EXISTS {SEARCH_VECTOR} tsvector "
+            f"GENERATED ALWAYS AS ({self.vector_sql(config)}) STORED",
+            f"CREATE INDEX IF NOT EXISTS {self.index_name} "
+            f"ON {self.table} USING gin ({SEARCH_VECTOR})",
+        ]
+
+    def drop_sql(self) -> list[str]:
+        return [
+            f"DROP INDEX IF EXISTS {self.index_name}",
+            f"ALTER TABLE {self.table} DROP COLUMN IF EXISTS {SEARCH_VECTOR}",
+        ]
+
+
+FULL_TEXT_INDEXES = {
+    index.table: index
+    for index in (
+        FullTextIndex(
+            "documents", (("title", "A"), ("filename", "B"), ("search_text", "C"))
+        ),
+        FullTextIndex("notes", (("title", "A"), ("content", "B"))),
+        FullTextIndex(
+            "citations",
+            (("title", "A"), ("bibtex_key", "A"), ("abstract", "B"), ("journal", "C")),
+        ),
+        FullTextIndex("annotations", (("selected_text", "A"), ("content", "B"))),
+    )
+}
+
+
+# 输入联想的三元组索引 (表, 列)
+TRIGRAM_COLUMNS = (
+    ("documents", "title"),
+    ("documents", "filename"),
+    ("notes", "title"),
+    ("spaces", "name"),
+)
+TRIGRAM_EXTENSION_SQL = "CREATE EXTENSION IF NOT EXISTS pg_trgm"
+
+
+def trigram_index_name(table: str, column: str) -> str:
+    return f"ix_{table}_{column}_trgm"
+
+
+def trigram_create_sql(table: str, column: str) -> str:
+    return (
+        f"CREATE INDEX IF NOT EXISTS {trigram_index_name(table, column)} "
+        f"ON {table} USING gin ({column} gin_trgm_ops)"
+    )
+
+
+def search_config() -> str:
+    """文本搜索配置名（会直接拼入SQL，只允许标识符）."""
+    config = settings.FULL_TEXT_SEARCH_CONFIG
+    if not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", config):
+        raise ValueError(f"无效的文本搜索配置: {config}")
+    return config
+
+
+def attach_full_text_indexes(metadata: MetaData) -> None:
+    """在 PostgreSQL 上 create_all 建表后追加全文检索列和GIN索引."""
+    for name, index in FULL_TEXT_INDEXES.items():
+        table = metadata.tables[name]
+        for statement in index.create_sql(search_config()):
+            event.listen(
+                table, "after_create", DDL(statement).execute_if(dialect="postgresql")
+            )
+
+
+def attach_trigram_indexes(metadata: MetaData) -> None:
+    """在 PostgreSQL 上 create_all 时启用 pg_trgm 并建三元组索引."""
+    event.listen(
+        metadata,
+        "before_create",
+        DDL(TRIGRAM_EXTENSION_SQL).execute_if(dialect="postgresql"),
+    )
+    for table, column in TRIGRAM_COLUMNS:
+        event.listen(
+            metadata.tables[table],
+            "after_create",
+            DDL(trigram_create_sql(table, column)).execute_if(dialect="postgresql"),
+        )
+
+
+def is_postgres(db: AsyncSession) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def has_cjk(text: str) -> bool:
+    return CJK_PATTERN.search(text) is not None
+
+
+class FullTextQuery:
+    """按会话的数据库方言编译的一次全文检索.
+
+    PostgreSQL 使用 websearch_to_tsquery（支持引号短语、OR 和 -排除），
+    其他方言以及包含中日韩文字的查询按 ilike 子串匹配，得分为命中字段权重之和。
+    """
+
+    def __init__(self, db: AsyncSession, model: Any, query: str) -> None:
+        self.model = model
+        self.query = query
+        self.index = FULL_TEXT_INDEXES[model.__tablename__]
+        self.postgres = is_postgres(db)
+        # 中日韩文字不经分词，按子串匹配
+        self.tsearch = self.postgres and not has_cjk(query)
+
+    def _config(self) -> ColumnElement[Any]:
+        return literal_column(f"'{search_config()}'::regconfig")
+
+    def _tsquery(self) -> ColumnElement[Any]:
+        return func.websearch_to_tsquery(self._config(), self.query)
+
+    def _vector(self) -> ColumnElement[Any]:
+        return literal_column(f"{self.index.table}.{SEARCH_VECTOR}", TSVECTOR)
+
+    def _columns(self) -> list[tuple[Any, str]]:
+        return [(getattr(self.model, name), weight) for name, weight in self.index.columns]
+
+    def condition(self) -> ColumnElement[bool]:
+        """匹配条件."""
+        if self.tsearch:
+            return self._vector().bool_op("@@")(self._tsquery())
+        pattern = f"%{self.query}%"
+        return or_(*(column.ilike(pattern) for column, _ in self._columns()))
+
+    def rank(self) -> ColumnElement[float]:
+        """相关度，范围 [0, 1)，越大越相关."""
+        if self.tsearch:
+            # 32: rank / (rank + 1)，不同查询之间的得分可以比较
+            return func.ts_rank_cd(self._vector(), self._tsquery(), 32)
+        pattern = f"%{self.query}%"
+        total = sum(WEIGHT_SCORES[weight] for _, weight in self._columns())
+        score = sum(
+            (
+                case((column.ilike(pattern), WEIGHT_SCORES[weight]), else_=0.0)
+                for column, weight in self._columns()
+            ),
+            start=cast(0.0, Float),
+        )
+        # 与 PostgreSQL 的归一化保持同一量纲
+        return type_coerce(score / (total + 1.0), Float)
+
+    def matches(self, column: Any) -> ColumnElement[bool]:
+        """单个字段是否命中（用于决定返回哪些字段的高亮，只对结果页计算）."""
+        if self.tsearch:
+            # 与索引一致只取前 MAX_INDEXED_CHARS 字符，避免超出 tsvector 的 1MB 上限
+            return func.to_tsvector(
+                self._config(), func.left(func.coalesce(column, ""), MAX_INDEXED_CHARS)
+            ).bool_op("@@")(self._tsquery())
+        return column.ilike(f"%{self.query}%")
+
+    def headline(self, column: Any) -> ColumnElement[str]:
+        """字段中匹配位置附近的片段，PostgreSQL 上用 <mark> 标出命中词."""
+        if self.tsearch:
+            return func.ts_headline(
+                self._config(),
+                func.left(func.coalesce(column, ""), HEADLINE_MAX_CHARS),
+                self._tsquery(),
+                HEADLINE_OPTIONS,
+            )
+        if self.postgres:
+            position = func.strpos(func.lower(column), self.query.lower())
+            start = func.greatest(position - FALLBACK_SNIPPET_BEFORE, 1)
+        else:
+            position = func.instr(func.lower(column), self.query.lower())
+            start = func.max(position - FALLBACK_SNIPPET_BEFORE, 1)
+        return func.substr(column, start, FALLBACK_SNIPPET_CHARS)
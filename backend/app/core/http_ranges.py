@@ -0,0 +1,62 @@
+"""HTTP conditional and range request helpers for file downloads."""
+
+from urllib.parse import quote
+
+
+class RangeNotSatisfiableError(Exception):
+    """Range 请求头超出文件大小."""
+
+
+def parse_range(header: str | None, size: int) -> tuple[int, int] | None:
+    """解析单个字节范围.
+
+    支持 bytes=start-end、bytes=start- 和 bytes=-suffix。多个范围或格式无法
+    识别时返回 None，按完整内容响应（RFC 9110 允许忽略 Range）。
+
+    Returns:
+        半开区间 (start, end)，不需要范围响应时返回 None
+
+    Raises:
+        RangeNotSatisfiableError: 范围起点超出文件大小
+    """
+    if not header:
+        return None
+    unit, _, spec = header.strip().partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+
+    first, sep, last = spec.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if not first:
+            # 最后 N 个字节
+            suffix = int(last)
+            if suffix <= 0:
+                raise RangeNotSatisfiableError
+            return max(size - suffix, 0), size
+        start = int(first)
+        end = int(last) + 1 if last else size
+    except ValueError:
+        return None
+
+    if start >= size:
+        raise RangeNotSatisfiableError
+    if end <= start:
+        return None
+    return start, min(end, size)
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match 是否命中（弱比较）."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+def content_disposition(filename: str) -> str:
+    """下载文件名（RFC 5987 编码，兼容中文）."""
+    return f"attachment; filename*=UTF-8''{quote(filename.encode('utf-8'))}"
@@ -0,0 +1,165 @@
+"""Bounded process pool for CPU-bound work with per-job timeouts."""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from collections.abc import Callable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, TypeVar
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class WorkerError(Exception):
+    """工作进程执行失败（崩溃、内存超限等）."""
+
+
+class WorkerTimeoutError(WorkerError):
+    """工作进程执行超时."""
+
+
+def _init_worker(memory_limit_mb: int) -> None:
+    """工作进程初始化：设置内存上限."""
+    if memory_limit_mb <= 0:
+        return
+    try:
+        import resource
+
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ImportError, ValueError, OSError) as e:
+        # Windows 没有 resource 模块；部分平台不允许设置 RLIMIT_AS
+        logger.warning(f"无法设置工作进程内存上限: {e}")
+
+
+class ProcessPool:
+    """有界进程池.
+
+    - 并发任务数不超过进程数，排队时间不计入任务超时
+    - 任务超时或进程崩溃时终止整个进程池并重建，被连带中断的任务重试一次
+    - 工作进程执行指定数量的任务后自动回收，避免解析库的内存泄漏累积
+    """
+
+    def __init__(
+        self,
+        max_workers: int | None = None,
+        max_tasks_per_child: int | None = None,
+        timeout: float | None = None,
+        memory_limit_mb: int = 0,
+        preload: Sequence[str] = (),
+    ) -> None:
+        """初始化进程池（工作进程在首次提交任务时创建）.
+
+        Args:
+            max_workers: 工作进程数，默认CPU核数
+            max_tasks_per_child: 每个工作进程执行的任务数上限，None表示不回收
+            timeout: 默认任务超时（秒），None表示不限制
+            memory_limit_mb: 每个工作进程的内存上限，0表示不限制
+            preload: forkserver 预加载的模块，新工作进程无需重复导入
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_tasks_per_child = max_tasks_per_child
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.preload = list(preload)
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._slots: asyncio.Semaphore | None = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # fork 与工作进程回收不兼容，优先使用 forkserver
+                method = (
+                    "forkserver"
+                    if "forkserver" in multiprocessing.get_all_start_methods()
+                    else "spawn"
+                )
+                context = multiprocessing.get_context(method)
+                if method == "forkserver" and self.preload:
+                    context.set_forkserver_preload(self.preload)
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=context,
+                    initializer=_init_worker,
+                    initargs=(self.memory_limit_mb,),
+                    max_tasks_per_child=self.max_tasks_per_child,
+                )
+            return self._executor
+
+    def _discard_executor(self, executor: ProcessPoolExecutor) -> None:
+        """终止工作进程并丢弃进程池，下次提交时重建."""
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+
+        processes = getattr(executor, "_processes", None) or {}
+        for process in list(processes.values()):
+            if process.is_alive():
+                process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def run(
+        self, fn: Callable[..., T], *args: Any, timeout: float | None = None
+    ) -> T:
+        """在工作进程中执行函数.
+
+        Args:
+            fn: 可被pickle的模块级函数
+            *args: 函数参数
+            timeout: 超时（秒），默认使用进程池配置
+
+        Raises:
+            WorkerTimeoutError: 执行超时（工作进程已被终止）
+            WorkerError: 工作进程崩溃或内存超限
+        """
+        timeout = timeout if timeout is not None else self.timeout
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers)
+
+        async with self._slots:
+            loop = asyncio.get_running_loop()
+            for attempt in range(2):
+                executor = self._get_executor()
+                future = loop.run_in_executor(executor, fn, *args)
+                try:
+                    return await asyncio.wait_for(future, timeout)
+                except TimeoutError:
+                    self._discard_executor(executor)
+                    raise WorkerTimeoutError(f"任务执行超过 {timeout} 秒，已终止") from None
+                except MemoryError:
+                    raise WorkerError(
+                        f"任务内存超过 {self.memory_limit_mb}MB 上限"
+                    ) from None
+                except BrokenProcessPool:
+                    # 可能是其他任务超时/崩溃导致进程池被重建，重试一次
+                    self._discard_executor(executor)
+                    if attempt:
+                        raise WorkerError("工作进程异常退出") from None
+                    logger.warning(f"工作进程异常退出，重试任务 {fn.__name__}")
+        raise WorkerError("工作进程异常退出")  # pragma: no cover
+
+    def shutdown(self) -> None:
+        """关闭进程池."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+# 文档提取进程池
+extraction_pool = ProcessPool(
+    max_workers=settings.EXTRACTION_POOL_SIZE or None,
+    max_tasks_per_child=settings.EXTRACTION_MAX_TASKS_PER_CHILD or None,
+    timeout=settings.EXTRACTION_TIMEOUT or None,
+    memory_limit_mb=settings.EXTRACTION_MEMORY_LIMIT_MB,
+    preload=["app.services.document_content_service"],
+)
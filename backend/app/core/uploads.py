@@ -0,0 +1,85 @@
+"""Streaming upload spooling with incremental hashing and size limits."""
+
+import hashlib
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+
+from fastapi import UploadFile
+
+from app.core.config import settings
+
+
+class UploadTooLargeError(Exception):
+    """上传文件超过大小限制."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        super().__init__(f"上传文件超过 {max_bytes} 字节限制")
+
+
+@dataclass
+class SpooledUpload:
+    """已暂存到磁盘的上传文件."""
+
+    path: Path
+    size: int
+    sha256: str  # 原始字节的SHA-256
+
+    def read_bytes(self) -> bytes:
+        """读取暂存文件内容."""
+        return self.path.read_bytes()
+
+    def cleanup(self) -> None:
+        """删除暂存文件."""
+        self.path.unlink(missing_ok=True)
+
+
+async def spool_upload(
+    file: UploadFile,
+    max_bytes: int,
+    suffix: str = "",
+    chunk_size: int | None = None,
+) -> SpooledUpload:
+    """按块读取上传文件并写入临时文件，同时计算哈希和检查大小.
+
+    请求声明的大小已超限时直接拒绝；读取过程中累计大小一旦超限立即停止，
+    不会把整个文件读入内存。
+
+    Args:
+        file: 上传文件
+        max_bytes: 最大字节数
+        suffix: 临时文件后缀（供按扩展名识别格式的解析器使用）
+        chunk_size: 每次读取的字节数，默认使用配置值
+
+    Returns:
+        暂存文件信息，调用方负责调用 cleanup()
+
+    Raises:
+        UploadTooLargeError: 文件超过大小限制
+    """
+    declared_size = getattr(file, "size", None)
+    if isinstance(declared_size, int) and declared_size > max_bytes:
+        raise UploadTooLargeError(max_bytes)
+
+    chunk_size = chunk_size or settings.UPLOAD_CHUNK_SIZE
+    hasher = hashlib.sha256()
+    size = 0
+
+    tmp_file = tempfile.NamedTemporaryFile(
+        delete=False, suffix=suffix, dir=settings.UPLOAD_TMP_DIR
+    )
+    path = Path(tmp_file.name)
+    try:
+        with tmp_file:
+            while chunk := await file.read(chunk_size):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError(max_bytes)
+                hasher.update(chunk)
+                tmp_file.write(chunk)
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+
+    return SpooledUpload(path=path, size=size, sha256=hasher.hexdigest())
@@ -17,6 +17,7 @@ from app.crud.base import CRUDBase
 from app.crud.citation import crud_citation
 from app.crud.conversation import crud_conversation
 from app.crud.document import crud_document
+from app.crud.ingestion_job import crud_ingestion_job
 from app.crud.message import crud_message
 from app.crud.note import crud_note
 from app.crud.note_version import crud_note_version
@@ -40,6 +41,7 @@ __all__ = [
     "crud_space",
     # Document related
     "crud_document",
+    "crud_ingestion_job",
     "crud_annotation",
     "crud_citation",
     # Note related
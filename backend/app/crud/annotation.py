@@ -5,6 +5,7 @@ from typing import Any
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.full_text import FullTextQuery
 from app.crud.base import CRUDBase
 from app.models.models import Annotation, Document
 from app.schemas.annotation import AnnotationCreate, AnnotationUpdate
@@ -162,9 +163,10 @@ class CRUDAnnotation(CRUDBase[Annotation, AnnotationCreate, AnnotationUpdate]):
 
         # 文本搜索
         if query:
-            search_filter = self.model.content.ilike(f"%{query}%") | \
-                          self.model.selected_text.ilike(f"%{query}%")
-            stmt = stmt.where(search_filter)
+            fts = FullTextQuery(db, self.model, query)
+            search_filter = fts.condition()
+            # 相关度优先，后面的时间排序作为次序
+            stmt = stmt.where(search_filter).order_by(fts.rank().desc())
             count_stmt = count_stmt.where(search_filter)
 
         # 文档过滤
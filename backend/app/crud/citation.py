@@ -2,9 +2,10 @@
 
 from typing import Any
 
-from sqlalchemy import String, and_, func, or_, select
+from sqlalchemy import String, and_, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.full_text import FullTextQuery
 from app.crud.base import CRUDBase
 from app.models.models import Citation
 from app.schemas.citation import CitationCreate, CitationUpdate
@@ -93,13 +94,9 @@ class CRUDCitation(CRUDBase[Citation, CitationCreate, CitationUpdate]):
 
         # 关键词搜索
         if query:
-            search_filter = or_(
-                self.model.title.ilike(f"%{query}%"),
-                self.model.abstract.ilike(f"%{query}%"),
-                self.model.bibtex_key.ilike(f"%{query}%"),
-                self.model.journal.ilike(f"%{query}%"),
-            )
-            stmt = stmt.where(search_filter)
+            fts = FullTextQuery(db, self.model, query)
+            # 相关度优先，后面的年份排序作为次序
+            stmt = stmt.where(fts.condition()).order_by(fts.rank().desc())
 
         # 空间筛选
         if space_id:
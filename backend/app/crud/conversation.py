@@ -6,6 +6,7 @@ from sqlalchemy import and_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.crud.base import CRUDBase
+from app.crud.listing import Page, paginate
 from app.models.models import Conversation, Message
 from app.schemas.conversations import ConversationCreate, ConversationUpdate
 
@@ -47,6 +48,34 @@ class CRUDConversation(CRUDBase[Conversation, ConversationCreate, ConversationUp
         result = await db.execute(query)
         return list(result.scalars().all())
 
+    async def get_page(
+        self,
+        db: AsyncSession,
+        *,
+        user_id: int,
+        space_id: int | None = None,
+        mode: str | None = None,
+        skip: int = 0,
+        limit: int = 20,
+        cursor: str | None = None,
+    ) -> Page[Conversation]:
+        """Filter, count and page a user's conversations in SQL, most recently active first."""
+        query = select(Conversation).where(Conversation.user_id == user_id)
+        if space_id is not None:
+            query = query.where(Conversation.space_id == space_id)
+        if mode:
+            query = query.where(Conversation.mode == mode)
+
+        return await paginate(
+            db,
+            query,
+            order_column=Conversation.updated_at,
+            id_column=Conversation.id,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+        )
+
     async def get_with_messages(
         self,
         db: AsyncSession,
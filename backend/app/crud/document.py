@@ -2,13 +2,30 @@
 
 from typing import Any
 
-from sqlalchemy import and_, or_, select
+from sqlalchemy import Float, Row, and_, case, cast, func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
 
+from app.core.full_text import FullTextQuery
 from app.crud.base import CRUDBase
+from app.crud.listing import Page, json_array_any_contains, paginate
+from app.crud.space import crud_space
 from app.models.models import Document
 from app.schemas.documents import DocumentCreate, DocumentUpdate
 
+# Heavy columns skipped by list queries (meta_data of web imports holds a
+# full page snapshot, page_offsets grows with the page count). raiseload
+# makes accidental access fail loudly instead of issuing an implicit query
+# on the async session.
+LIST_LOAD_OPTIONS = (
+    defer(Document.content, raiseload=True),
+    defer(Document.meta_data, raiseload=True),
+    defer(Document.page_offsets, raiseload=True),
+)
+
+# Score added when a tag contains the query (below a match in any text field)
+TAG_MATCH_SCORE = 0.05
+
 
 class CRUDDocument(CRUDBase[Document, DocumentCreate, DocumentUpdate]):
     """CRUD operations for Document model."""
@@ -58,9 +75,16 @@ class CRUDDocument(CRUDBase[Document, DocumentCreate, DocumentUpdate]):
         skip: int = 0,
         limit: int = 100,
         status: str | None = None,
+        with_content: bool = False,
     ) -> list[Document]:
-        """Get documents in a specific space."""
+        """Get documents in a specific space.
+
+        By default content and meta_data are not loaded; pass
+        ``with_content=True`` when the caller needs them (e.g. export).
+        """
         query = select(Document).where(Document.space_id == space_id)
+        if not with_content:
+            query = query.options(*LIST_LOAD_OPTIONS)
 
         if status:
             query = query.where(Document.processing_status == status)
@@ -69,6 +93,13 @@ class CRUDDocument(CRUDBase[Document, DocumentCreate, DocumentUpdate]):
         result = await db.execute(query)
         return list(result.scalars().all())
 
+    async def get_without_content(self, db: AsyncSession, id: int) -> Document | None:
+        """Get a document without loading its content and meta_data columns."""
+        result = await db.execute(
+            select(Document).options(*LIST_LOAD_OPTIONS).where(Document.id == id)
+        )
+        return result.scalar_one_or_none()
+
     async def get_by_hash(
         self, db: AsyncSession, *, file_hash: str, space_id: int
     ) -> Document | None:
@@ -83,6 +114,23 @@ class CRUDDocument(CRUDBase[Document, DocumentCreate, DocumentUpdate]):
         )
         return result.scalar_one_or_none()
 
+    async def get_extracted_copy(
+        self, db: AsyncSession, *, document: Document
+    ) -> Document | None:
+        """Get another document already extracted from the same stored file."""
+        result = await db.execute(
+            select(Document)
+            .where(
+                Document.file_hash == document.file_hash,
+                Document.file_path == document.file_path,
+                Document.extraction_status == "completed",
+                Document.id != document.id,
+            )
+            .order_by(Document.id)
+            .limit(1)
+        )
+        return result.scalar_one_or_none()
+
     async def search(
         self,
         db: AsyncSession,
@@ -92,17 +140,15 @@ class CRUDDocument(CRUDBase[Document, DocumentCreate, DocumentUpdate]):
         skip: int = 0,
         limit: int = 20,
     ) -> list[Document]:
-        """Search documents by title or content."""
-        search_filter = or_(
-            Document.title.ilike(f"%{query}%"),
-            Document.content.ilike(f"%{query}%"),
-            Document.filename.ilike(f"%{query}%"),
-        )
+        """Search documents by title, filename or content, most relevant first."""
+        fts = FullTextQuery(db, Document, query)
 
         stmt = (
             select(Document)
-            .where(and_(Document.space_id == space_id, search_filter))
-            .order_by(Document.created_at.desc())
+            # Keep the content excerpt for result snippets, skip meta_data only
+            .options(defer(Document.meta_data, raiseload=True))
+            .where(and_(Document.space_id == space_id, fts.condition()))
+            .order_by(fts.rank().desc(), Document.created_at.desc())
             .offset(skip)
             .limit(limit)
         )
@@ -110,6 +156,60 @@ class CRUDDocument(CRUDBase[Document, DocumentCreate, DocumentUpdate]):
         result = await db.execute(stmt)
         return list(result.scalars().all())
 
+    async def search_accessible(
+        self,
+        db: AsyncSession,
+        *,
+        query: str,
+        user_id: int,
+        space_id: int | None = None,
+        skip: int = 0,
+        limit: int = 10,
+    ) -> tuple[list[Row[*tuple[Any, ...]]], int]:
+        """Rank documents the user can read, with per-field highlights.
+
+        Without space_id the search covers the user's own documents and every
+        space they can read; with it the caller has already checked access.
+        Each row carries the Document plus score, title/filename/content
+        headlines and whether each of those fields and the tags matched.
+        """
+        fts = FullTextQuery(db, Document, query)
+        tags_matched = json_array_any_contains(db, Document.tags, query)
+        score = fts.rank() + case((tags_matched, TAG_MATCH_SCORE), else_=cast(0.0, Float))
+        if space_id is not None:
+            scope = Document.space_id == space_id
+        else:
+            scope = or_(
+                Document.user_id == user_id,
+                Document.space_id.in_(crud_space.accessible_space_ids(user_id=user_id)),
+            )
+        search_filter = and_(scope, or_(fts.condition(), tags_matched))
+
+        total = (
+            await db.execute(select(func.count(Document.id)).where(search_filter))
+        ).scalar() or 0
+
+        stmt = (
+            select(
+                Document,
+                score.label("score"),
+                fts.matches(Document.title).label("title_matched"),
+                fts.headline(Document.title).label("title_headline"),
+                fts.matches(Document.filename).label("filename_matched"),
+                fts.headline(Document.filename).label("filename_headline"),
+                fts.matches(Document.search_text).label("content_matched"),
+                fts.headline(Document.search_text).label("content_headline"),
+                tags_matched.label("tags_matched"),
+            )
+            .options(*LIST_LOAD_OPTIONS)
+            .where(search_filter)
+            .order_by(score.desc(), Document.created_at.desc(), Document.id.desc())
+            .offset(skip)
+            .limit(limit)
+        )
+        result = await db.execute(stmt)
+        return list(result.all()), total
+
     async def update_processing_status(
         self,
         db: AsyncSession,
@@ -150,9 +250,10 @@ class CRUDDocument(CRUDBase[Document, DocumentCreate, DocumentUpdate]):
         skip: int = 0,
         limit: int = 100,
     ) -> list[Document]:
-        """Get all documents uploaded by a user."""
+        """Get all documents uploaded by a user (without heavy columns)."""
         result = await db.execute(
             select(Document)
+            .options(*LIST_LOAD_OPTIONS)
             .where(Document.user_id == user_id)
             .order_by(Document.created_at.desc())
             .offset(skip)
@@ -160,6 +261,44 @@ class CRUDDocument(CRUDBase[Document, DocumentCreate, DocumentUpdate]):
         )
         return list(result.scalars().all())
 
+    async def get_page(
+        self,
+        db: AsyncSession,
+        *,
+        user_id: int | None = None,
+        space_id: int | None = None,
+        search: str | None = None,
+        status: str | None = None,
+        skip: int = 0,
+        limit: int = 20,
+        cursor: str | None = None,
+    ) -> Page[Document]:
+        """Filter, count and page documents in SQL, newest first.
+
+        Lists a space when space_id is given (the caller checks access),
+        otherwise the documents the user uploaded. search filters on the
+        full-text index; ordering stays chronological so cursors remain valid.
+        """
+        query = select(Document).options(*LIST_LOAD_OPTIONS)
+        if space_id is not None:
+            query = query.where(Document.space_id == space_id)
+        else:
+            query = query.where(Document.user_id == user_id)
+        if search:
+            query = query.where(FullTextQuery(db, Document, search).condition())
+        if status:
+            query = query.where(Document.processing_status == status)
+
+        return await paginate(
+            db,
+            query,
+            order_column=Document.created_at,
+            id_column=Document.id,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+        )
+
 
 # Create single instance
 crud_document = CRUDDocument(Document)
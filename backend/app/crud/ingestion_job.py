@@ -0,0 +1,81 @@
+"""Ingestion job CRUD operations."""
+
+from datetime import UTC, datetime, timedelta
+from typing import Any, cast
+
+from sqlalchemy import CursorResult, and_, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.crud.base import CRUDBase
+from app.models.models import IngestionJob
+from app.schemas.documents import IngestionJobCreate
+
+
+class CRUDIngestionJob(CRUDBase[IngestionJob, IngestionJobCreate, IngestionJobCreate]):
+    """CRUD operations for IngestionJob model."""
+
+    async def get_latest_by_document(
+        self, db: AsyncSession, *, document_id: int
+    ) -> IngestionJob | None:
+        """获取文档最近一次入库任务."""
+        result = await db.execute(
+            select(IngestionJob)
+            .where(IngestionJob.document_id == document_id)
+            .order_by(IngestionJob.id.desc())
+            .limit(1)
+        )
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    def _claimable(now: datetime) -> ColumnElement[bool]:
+        """排队中的任务，或租约已过期（执行它的进程已退出）的任务."""
+        return or_(
+            IngestionJob.status == "queued",
+            and_(
+                IngestionJob.status == "running",
+                or_(
+                    IngestionJob.lease_expires_at.is_(None),
+                    IngestionJob.lease_expires_at < now,
+                ),
+            ),
+        )
+
+    async def get_unfinished(
+        self, db: AsyncSession, *, limit: int = 1000
+    ) -> list[IngestionJob]:
+        """获取可以重新入队的任务（排队中或租约过期的任务）."""
+        result = await db.execute(
+            select(IngestionJob)
+            .where(self._claimable(datetime.now(UTC)))
+            .order_by(IngestionJob.id)
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+
+    async def claim(self, db: AsyncSession, *, job_id: int, lease_seconds: int) -> bool:
+        """领取任务并标记为执行中.
+
+        条件 UPDATE 保证多个工作进程中只有一个能领取同一个任务。
+        调用方负责提交事务。
+
+        Returns:
+            是否领取成功
+        """
+        now = datetime.now(UTC)
+        result = await db.execute(
+            update(IngestionJob)
+            .where(IngestionJob.id == job_id, self._claimable(now))
+            .values(
+                status="running",
+                attempts=IngestionJob.attempts + 1,
+                started_at=now,
+                lease_expires_at=now + timedelta(seconds=lease_seconds),
+                error_message=None,
+            )
+        )
+        return bool(cast(CursorResult[Any], result).rowcount)
+
+
+# Create single instance
+crud_ingestion_job = CRUDIngestionJob(IngestionJob)
@@ -0,0 +1,156 @@
+"""SQL-side list queries: counting, offset and keyset pagination, tag filters.
+
+List endpoints build one filtered ``Select`` and hand it to :func:`paginate`,
+which counts the matches and fetches a single page in the database. Pages can
+be addressed by offset (``skip``) or by an opaque cursor holding the sort key
+of the last row returned, ``(sort value, id)``. Keyset pages read straight
+from the composite ``(..., sort column, id)`` indexes however deep the client
+scrolls, while offsets have to walk past every skipped row.
+"""
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Generic, TypeVar
+
+from sqlalchemy import (
+    Select,
+    case,
+    cast,
+    exists,
+    func,
+    literal,
+    literal_column,
+    select,
+    tuple_,
+)
+from sqlalchemy.dialects.postgresql import JSONB, array
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.core.full_text import is_postgres
+
+T = TypeVar("T")
+
+
+class InvalidCursorError(ValueError):
+    """The pagination cursor could not be decoded."""
+
+
+@dataclass
+class Page(Generic[T]):
+    """One page of a list query."""
+
+    items: list[T]
+    total: int
+    next_cursor: str | None = None  # None on the last page
+
+
+def encode_cursor(value: Any, id: int) -> str:
+    """Encode the sort key of the last row on a page."""
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([value, id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, order_column: Any) -> tuple[Any, int]:
+    """Decode a cursor back into a ``(sort value, id)`` pair for order_column."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        value, id = json.loads(raw)
+        if value is not None and order_column.type.python_type is datetime:
+            value = datetime.fromisoformat(value)
+        return value, int(id)
+    except (binascii.Error, ValueError, TypeError) as e:
+        raise InvalidCursorError("Invalid pagination cursor") from e
+
+
+async def paginate(
+    db: AsyncSession,
+    query: Select[Any],
+    *,
+    order_column: Any,
+    id_column: Any,
+    descending: bool = True,
+    skip: int = 0,
+    limit: int = 20,
+    cursor: str | None = None,
+) -> Page[Any]:
+    """Count the rows matching query and fetch one page ordered by (order_column, id).
+
+    With a cursor, rows after it are returned and ``skip`` is ignored. Every
+    page except the last carries a ``next_cursor``, so a client can start
+    with offsets and switch to cursors for deeper pages.
+
+    Raises:
+        InvalidCursorError: the cursor could not be decoded
+    """
+    after = decode_cursor(cursor, order_column) if cursor else None
+
+    count_query = select(func.count()).select_from(query.order_by(None).subquery())
+    total = (await db.execute(count_query)).scalar() or 0
+
+    sort_key = _sort_key(db, order_column)
+    if descending:
+        query = query.order_by(sort_key.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_key.asc(), id_column.asc())
+    if after is not None:
+        value, last_id = after
+        value_key = _sort_key(db, order_column, literal(value, order_column.type))
+        key, bound = tuple_(sort_key, id_column), tuple_(value_key, last_id)
+        query = query.where(key < bound if descending else key > bound)
+    else:
+        query = query.offset(skip)
+
+    # One extra row tells whether there is a next page
+    result = await db.execute(query.limit(limit + 1))
+    items = list(result.scalars().all())
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        next_cursor = encode_cursor(
+            getattr(last, order_column.key), getattr(last, id_column.key)
+        )
+    return Page(items=items, total=total, next_cursor=next_cursor)
+
+
+def _sort_key(db: AsyncSession, column: Any, expression: Any = None) -> Any:
+    """How column (or a cursor value bound as its type) is compared when sorting.
+
+    SQLite compares timestamps as text, and rows written by
+    ``server_default=func.now()`` carry no fractional seconds, so both sides
+    are normalized to one format there. PostgreSQL compares the raw columns,
+    which keeps the composite indexes usable.
+    """
+    target = column if expression is None else expression
+    if not is_postgres(db) and column.type.python_type is datetime:
+        return func.strftime("%Y-%m-%d %H:%M:%f", target)
+    return target
+
+
+def json_array_overlaps(
+    db: AsyncSession, column: Any, values: list[str]
+) -> ColumnElement[bool]:
+    """Whether a JSON array column shares at least one element with values."""
+    if is_postgres(db):
+        return cast(column, JSONB).op("?|")(array(values))
+    elements = func.json_each(column).table_valued("value")
+    return exists().where(elements.c.value.in_(values))
+
+
+def json_array_any_contains(db: AsyncSession, column: Any, text: str) -> ColumnElement[bool]:
+    """Whether any element of a JSON array column contains text, ignoring case."""
+    if is_postgres(db):
+        value = cast(column, JSONB)
+        # jsonb_array_elements_text fails on scalars such as a stored JSON null
+        elements = func.jsonb_array_elements_text(
+            case((func.jsonb_typeof(value) == "array", value), else_=literal_column("'[]'::jsonb"))
+        ).table_valued("value")
+    else:
+        elements = func.json_each(column).table_valued("value")
+    return exists().where(elements.c.value.ilike(f"%{text}%"))
@@ -2,13 +2,36 @@
 
 from typing import Any
 
-from sqlalchemy import func, or_, select
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer, with_expression
 
+from app.core.full_text import FullTextQuery
 from app.crud.base import CRUDBase
+from app.crud.listing import Page, json_array_overlaps, paginate
 from app.models.models import Note
 from app.schemas.note import NoteCreate, NoteUpdate
 
+# 列表预览字符数
+NOTE_PREVIEW_CHARS = 300
+
+# 列表查询不加载正文等大字段，只在数据库中截取正文前缀作为预览。
+# 使用 raiseload，误访问时直接报错而不是在异步会话中隐式查询。
+LIST_LOAD_OPTIONS = (
+    defer(Note.content, raiseload=True),
+    defer(Note.meta_data, raiseload=True),
+    defer(Note.ai_prompt, raiseload=True),
+    defer(Note.generation_params, raiseload=True),
+    with_expression(Note.preview, func.substr(Note.content, 1, NOTE_PREVIEW_CHARS)),
+)
+
+# 列表允许的排序字段（来自请求参数，不能按任意列名取属性）
+NOTE_SORT_COLUMNS = {
+    "created_at": Note.created_at,
+    "updated_at": Note.updated_at,
+    "title": Note.title,
+}
+
 
 class CRUDNote(CRUDBase[Note, NoteCreate, NoteUpdate]):
     """CRUD operations for Note model."""
@@ -44,12 +67,18 @@ class CRUDNote(CRUDBase[Note, NoteCreate, NoteUpdate]):
         limit: int = 100,
         sort_by: str = "created_at",
         sort_order: str = "desc",
+        with_content: bool = False,
     ) -> list[Note]:
-        """获取空间内的笔记列表."""
+        """获取空间内的笔记列表.
+
+        默认不加载正文，需要正文时（如导出）传入 with_content=True。
+        """
         stmt = select(self.model).where(
             self.model.space_id == space_id,
             self.model.user_id == user_id,
         )
+        if not with_content:
+            stmt = stmt.options(*LIST_LOAD_OPTIONS)
 
         # 排序
         order_column = getattr(self.model, sort_by, self.model.created_at)
@@ -63,6 +92,74 @@ class CRUDNote(CRUDBase[Note, NoteCreate, NoteUpdate]):
         result = await db.execute(stmt)
         return list(result.scalars().all())
 
+    async def get_by_user(
+        self,
+        db: AsyncSession,
+        *,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        note_type: str | None = None,
+        sort_by: str = "created_at",
+        sort_order: str = "desc",
+    ) -> tuple[list[Note], int]:
+        """获取用户的笔记列表（不含正文）及总数."""
+        page = await self.get_page(
+            db,
+            user_id=user_id,
+            note_type=note_type,
+            skip=skip,
+            limit=limit,
+            sort_by=sort_by,
+            sort_order=sort_order,
+        )
+        return page.items, page.total
+
+    async def get_page(
+        self,
+        db: AsyncSession,
+        *,
+        user_id: int,
+        space_id: int | None = None,
+        note_type: str | None = None,
+        tags: list[str] | None = None,
+        skip: int = 0,
+        limit: int = 20,
+        sort_by: str = "updated_at",
+        sort_order: str = "desc",
+        cursor: str | None = None,
+    ) -> Page[Note]:
+        """在数据库中筛选、计数并分页获取用户的笔记（不含正文）.
+
+        按 (sort_by, id) 排序；传入上一页的 next_cursor 代替 skip 即按游标翻页。
+        sort_by 只能是 NOTE_SORT_COLUMNS 中的字段，否则抛出 ValueError。
+        """
+        if sort_by not in NOTE_SORT_COLUMNS:
+            raise ValueError(f"不支持的排序字段: {sort_by}")
+
+        stmt = (
+            select(self.model)
+            .options(*LIST_LOAD_OPTIONS)
+            .where(self.model.user_id == user_id)
+        )
+        if space_id is not None:
+            stmt = stmt.where(self.model.space_id == space_id)
+        if note_type:
+            stmt = stmt.where(self.model.note_type == note_type)
+        if tags:
+            stmt = stmt.where(json_array_overlaps(db, self.model.tags, tags))
+
+        return await paginate(
+            db,
+            stmt,
+            order_column=NOTE_SORT_COLUMNS[sort_by],
+            id_column=self.model.id,
+            descending=sort_order == "desc",
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+        )
+
     async def search(
         self,
         db: AsyncSession,
@@ -76,20 +173,23 @@ class CRUDNote(CRUDBase[Note, NoteCreate, NoteUpdate]):
         skip: int = 0,
         limit: int = 20,
     ) -> tuple[list[Note], int]:
-        """搜索笔记."""
+        """搜索笔记（结果不含正文）."""
         # 基础查询
-        stmt = select(self.model).where(self.model.user_id == user_id)
+        stmt = (
+            select(self.model)
+            .options(*LIST_LOAD_OPTIONS)
+            .where(self.model.user_id == user_id)
+        )
         count_stmt = select(func.count(self.model.id)).where(
             self.model.user_id == user_id
         )
 
         # 文本搜索
         if query:
-            search_filter = or_(
-                self.model.title.ilike(f"%{query}%"),
-                self.model.content.ilike(f"%{query}%"),
-            )
-            stmt = stmt.where(search_filter)
+            fts = FullTextQuery(db, self.model, query)
+            search_filter = fts.condition()
+            # 相关度优先，后面的时间排序作为次序
+            stmt = stmt.where(search_filter).order_by(fts.rank().desc())
             count_stmt = count_stmt.where(search_filter)
 
         # Space过滤
@@ -189,8 +289,12 @@ class CRUDNote(CRUDBase[Note, NoteCreate, NoteUpdate]):
         limit: int = 10,
         note_type: str | None = None,
     ) -> list[Note]:
-        """获取最近的笔记."""
-        stmt = select(self.model).where(self.model.user_id == user_id)
+        """获取最近的笔记（不含正文）."""
+        stmt = (
+            select(self.model)
+            .options(*LIST_LOAD_OPTIONS)
+            .where(self.model.user_id == user_id)
+        )
 
         if note_type:
             stmt = stmt.where(self.model.note_type == note_type)
@@ -1,10 +1,11 @@
 """Space CRUD operations."""
 
 
-from sqlalchemy import and_, select
+from sqlalchemy import Select, and_, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.crud.base import CRUDBase
+from app.crud.listing import Page, json_array_overlaps, paginate
 from app.models.models import Space, SpaceCollaboration
 from app.schemas.spaces import SpaceCreate, SpaceUpdate
 
@@ -33,6 +34,62 @@ class CRUDSpace(CRUDBase[Space, SpaceCreate, SpaceUpdate]):
         result = await db.execute(query)
         return list(result.scalars().all())
 
+    async def get_page(
+        self,
+        db: AsyncSession,
+        *,
+        user_id: int,
+        include_public: bool = False,
+        search: str | None = None,
+        tags: list[str] | None = None,
+        is_public: bool | None = None,
+        skip: int = 0,
+        limit: int = 20,
+        cursor: str | None = None,
+    ) -> Page[Space]:
+        """Filter, count and page a user's spaces in SQL, newest first."""
+        owner = Space.user_id == user_id
+        query = select(Space).where(
+            or_(owner, Space.is_public.is_(True)) if include_public else owner
+        )
+        if search:
+            query = query.where(
+                or_(
+                    Space.name.icontains(search, autoescape=True),
+                    Space.description.icontains(search, autoescape=True),
+                )
+            )
+        if tags:
+            query = query.where(json_array_overlaps(db, Space.tags, tags))
+        if is_public is not None:
+            query = query.where(Space.is_public.is_(is_public))
+
+        return await paginate(
+            db,
+            query,
+            order_column=Space.created_at,
+            id_column=Space.id,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+        )
+
+    def accessible_space_ids(self, *, user_id: int) -> Select[int]:
+        """IDs of spaces the user can read: owned, public or shared with them.
+
+        Returned as a statement so callers can embed it as a subquery and
+        resolve permissions in the same round trip.
+        """
+        shared = select(SpaceCollaboration.space_id).where(
+            SpaceCollaboration.user_id == user_id,
+            SpaceCollaboration.status == "active",
+        )
+        return select(Space.id).where(
+            (Space.user_id == user_id)
+            | (Space.is_public.is_(True))
+            | Space.id.in_(shared)
+        )
+
     async def get_by_name(
         self, db: AsyncSession, *, name: str, user_id: int
     ) -> Space | None:
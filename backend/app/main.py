@@ -17,6 +17,11 @@ from starlette.exceptions import HTTPException as StarletteHTTPException
 from app.api.v1.api import api_router
 from app.core.config import settings
 from app.core.database import close_db, init_db
+from app.core.process_pool import extraction_pool
+from app.services import search_service
+from app.services.blob_service import blob_service
+from app.services.ingestion_service import ingestion_service
+from app.services.web_scraper_service import web_scraper_service
 
 # 配置日志
 logging.basicConfig(
@@ -46,17 +51,27 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         logger.error(f"数据库初始化失败: {e}")
         raise
 
+    # 启动后台文档入库任务和原始文件回收任务
+    await ingestion_service.start()
+    await blob_service.start()
+
     logger.info("Second Brain后端服务启动完成")
     yield
 
     # 关闭时清理资源
     logger.info("正在关闭Second Brain后端服务...")
+    await blob_service.stop()
+    await ingestion_service.stop()
+    await web_scraper_service.close()
+    await search_service.close()
     try:
         await close_db()
         logger.info("数据库连接已关闭")
     except Exception as e:
         logger.error(f"关闭数据库连接时出错: {e}")
 
+    extraction_pool.shutdown()
+
 
 # 创建FastAPI应用
 app = FastAPI(
@@ -177,6 +192,7 @@ async def health_check():
         "service": settings.APP_NAME,
         "version": settings.VERSION,
         "timestamp": asyncio.get_event_loop().time(),
+        "search_cache": search_service.stats(),
     }
 
 
@@ -10,11 +10,15 @@ from app.models.models import (
     AgentExecution,
     Annotation,
     APIKey,
+    Blob,
     Citation,
     # Conversation models
     Conversation,
     # Document models
     Document,
+    DocumentTextChunk,
+    ExtractionCache,
+    IngestionJob,
     Message,
     # Note models
     Note,
@@ -29,6 +33,7 @@ from app.models.models import (
     # User and authentication models
     User,
     UserCustomModel,
+    WebPageCache,
 )
 
 __all__ = [
@@ -40,6 +45,11 @@ __all__ = [
     "SpaceCollaboration",
     # Documents
     "Document",
+    "DocumentTextChunk",
+    "Blob",
+    "ExtractionCache",
+    "IngestionJob",
+    "WebPageCache",
     "Annotation",
     "Citation",
     # Notes
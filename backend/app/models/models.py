@@ -12,14 +12,16 @@ from sqlalchemy import (
     ForeignKey,
     Index,
     Integer,
+    LargeBinary,
     String,
     Text,
     UniqueConstraint,
     func,
 )
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.orm import Mapped, mapped_column, query_expression, relationship
 
 from app.core.database import Base
+from app.core.full_text import attach_full_text_indexes, attach_trigram_indexes
 
 
 class TimestampMixin:
@@ -143,6 +145,9 @@ class Space(Base, TimestampMixin):
         "SpaceCollaboration", back_populates="space", cascade="all, delete-orphan"
     )
 
+    # 索引：列表按 (created_at, id) 排序和游标翻页
+    __table_args__ = (Index("idx_space_user_created", "user_id", "created_at", "id"),)
+
     def __repr__(self):
         return f"<Space(id={self.id}, name='{self.name}')>"
 
@@ -196,7 +201,18 @@ class Document(Base, TimestampMixin):
 
     # 内容信息
     title: Mapped[str | None] = mapped_column(String(500))
-    content: Mapped[str | None] = mapped_column(Text)
+    content: Mapped[str | None] = mapped_column(Text)  # 正文前1000字符，全文见 content_hash
+    search_text: Mapped[str | None] = mapped_column(
+        Text, deferred=True, deferred_raiseload=True
+    )  # 全文检索的索引来源（全文前 MAX_INDEXED_CHARS 字符），默认不加载
+    preview: Mapped[str | None] = mapped_column(String(500))  # 列表展示用的短预览
+    content_hash: Mapped[str | None] = mapped_column(
+        String(64)
+    )  # 全文的SHA256，对应 document_text_chunks
+    content_length: Mapped[int | None] = mapped_column(Integer)  # 全文字符数
+    page_offsets: Mapped[bytes | None] = mapped_column(
+        LargeBinary
+    )  # 每页在全文中的起始字符位置（uint32小端数组），用于按页读取
     summary: Mapped[str | None] = mapped_column(Text)
     language: Mapped[str | None] = mapped_column(String(10))
 
@@ -225,18 +241,175 @@ class Document(Base, TimestampMixin):
     children: Mapped[list["Document"]] = relationship(
         "Document", backref="parent", remote_side=[id]
     )
+    ingestion_jobs: Mapped[list["IngestionJob"]] = relationship(
+        "IngestionJob", back_populates="document", cascade="all, delete-orphan"
+    )
 
     # 索引
     __table_args__ = (
         Index("idx_document_space_user", "space_id", "user_id"),
+        # 列表按 (created_at, id) 排序和游标翻页
+        Index("idx_document_user_created", "user_id", "created_at", "id"),
+        Index("idx_document_space_created", "space_id", "created_at", "id"),
         Index("idx_document_hash", "file_hash"),
         Index("idx_document_status", "processing_status"),
+        Index("idx_document_content_hash", "content_hash"),
     )
 
     def __repr__(self):
         return f"<Document(id={self.id}, filename='{self.filename}')>"
 
 
+class DocumentTextChunk(Base):
+    """文档全文分块表.
+
+    全文按内容哈希去重，切成固定字符数的块分别压缩，按范围读取时只解压相关的块。
+    """
+
+    __tablename__ = "document_text_chunks"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    content_hash: Mapped[str] = mapped_column(String(64))
+    seq: Mapped[int] = mapped_column(Integer)  # 块序号
+    char_offset: Mapped[int] = mapped_column(Integer)  # 块在全文中的起始字符位置
+    char_count: Mapped[int] = mapped_column(Integer)
+    data: Mapped[bytes] = mapped_column(LargeBinary)  # zlib压缩的UTF-8文本
+
+    # 索引
+    __table_args__ = (
+        UniqueConstraint("content_hash", "seq", name="uq_document_text_chunk"),
+        Index("idx_document_text_offset", "content_hash", "char_offset"),
+    )
+
+
+class Blob(Base, TimestampMixin):
+    """原始文件表.
+
+    按原始字节的SHA-256内容寻址，相同文件在所有用户和空间中只存一份。
+    file_path 等于 storage_key 的文档持有一个引用，引用归零超过保留期后回收。
+    """
+
+    __tablename__ = "blobs"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    sha256: Mapped[str] = mapped_column(String(64), unique=True)
+    storage_key: Mapped[str] = mapped_column(String(200))  # 存储后端中的对象键
+    size: Mapped[int] = mapped_column(BigInteger)
+    content_type: Mapped[str | None] = mapped_column(String(100))
+    ref_count: Mapped[int] = mapped_column(Integer, default=0)
+    unreferenced_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True)
+    )  # 引用归零的时间，回收据此判断
+
+    # 索引
+    __table_args__ = (Index("idx_blob_unreferenced", "ref_count", "unreferenced_at"),)
+
+    def __repr__(self):
+        return f"<Blob(sha256='{self.sha256[:12]}', ref_count={self.ref_count})>"
+
+
+class ExtractionCache(Base, TimestampMixin):
+    """提取结果缓存表.
+
+    按原始文件SHA-256缓存解析结果，全文存在 document_text_chunks 中。
+    extractor_version 与当前提取器版本不一致的条目视为过期，读取时忽略，
+    重新提取后覆盖。
+    """
+
+    __tablename__ = "extraction_cache"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    file_hash: Mapped[str] = mapped_column(String(64), unique=True)  # 原始文件SHA-256
+    extractor_version: Mapped[str] = mapped_column(String(50), index=True)
+    file_ext: Mapped[str | None] = mapped_column(String(20))  # 重新提取时按扩展名识别格式
+    content_hash: Mapped[str | None] = mapped_column(String(64), index=True)
+    content_length: Mapped[int] = mapped_column(Integer, default=0)
+    content_format: Mapped[str | None] = mapped_column(String(50))
+    extraction_method: Mapped[str | None] = mapped_column(String(50))
+    has_tables: Mapped[bool] = mapped_column(Boolean, default=False)
+    has_images: Mapped[bool] = mapped_column(Boolean, default=False)
+    has_formulas: Mapped[bool] = mapped_column(Boolean, default=False)
+    meta_data: Mapped[dict[str, Any] | None] = mapped_column(JSON, default=dict)
+
+    def __repr__(self):
+        return (
+            f"<ExtractionCache(file_hash='{self.file_hash[:12]}', "
+            f"version='{self.extractor_version}')>"
+        )
+
+
+class WebPageCache(Base, TimestampMixin):
+    """网页抓取缓存表.
+
+    按URL缓存解析后的正文、元数据和压缩的页面快照，同时记录响应的
+    ETag/Last-Modified。新鲜期内直接复用，过期后发送条件请求，服务器返回
+    304时继续复用已解析的结果。
+    """
+
+    __tablename__ = "web_page_cache"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    url_hash: Mapped[str] = mapped_column(String(64), unique=True)  # URL的SHA-256
+    url: Mapped[str] = mapped_column(Text)
+    etag: Mapped[str | None] = mapped_column(String(500))
+    last_modified: Mapped[str | None] = mapped_column(String(100))
+    content: Mapped[str | None] = mapped_column(Text)  # 提取的正文
+    meta_data: Mapped[dict[str, Any] | None] = mapped_column(JSON, default=dict)
+    snapshot: Mapped[bytes | None] = mapped_column(LargeBinary)  # zlib压缩的页面快照
+    size: Mapped[int] = mapped_column(Integer, default=0)  # 正文和快照占用的字节数
+    validated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True)
+    )  # 最近一次从服务器确认内容的时间，新鲜期据此计算
+    last_used_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), index=True
+    )  # 超过容量时按最近使用时间淘汰
+
+    def __repr__(self):
+        return f"<WebPageCache(url='{self.url[:50]}')>"
+
+
+class IngestionJob(Base, TimestampMixin):
+    """文档入库任务表."""
+
+    __tablename__ = "ingestion_jobs"
+
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    document_id: Mapped[int] = mapped_column(ForeignKey("documents.id"))
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+
+    # 任务状态
+    status: Mapped[str] = mapped_column(
+        String(20), default="queued"
+    )  # queued, running, completed, failed
+    stage: Mapped[str | None] = mapped_column(
+        String(20)
+    )  # extraction, summary, embedding
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    max_attempts: Mapped[int] = mapped_column(Integer, default=3)
+    error_message: Mapped[str | None] = mapped_column(Text)
+
+    # 执行时间
+    started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    lease_expires_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True)
+    )  # 执行中任务的租约，过期后其他工作进程可以重新领取
+
+    # 关系
+    document: Mapped["Document"] = relationship(
+        "Document", back_populates="ingestion_jobs"
+    )
+
+    # 索引
+    __table_args__ = (
+        Index("idx_ingestion_job_document", "document_id"),
+        Index("idx_ingestion_job_status", "status"),
+    )
+
+    def __repr__(self):
+        return f"<IngestionJob(id={self.id}, document_id={self.document_id}, status='{self.status}')>"
+
+
 class Annotation(Base, TimestampMixin):
     """文档标注表."""
 
@@ -295,6 +468,8 @@ class Note(Base, TimestampMixin):
     content_type: Mapped[str] = mapped_column(
         String(20), default="markdown"
     )  # markdown, html, plain
+    # 正文前若干字符，仅由列表查询通过 with_expression 填充
+    preview: Mapped[str | None] = query_expression()
 
     # 笔记类型和来源
     note_type: Mapped[str] = mapped_column(
@@ -334,6 +509,9 @@ class Note(Base, TimestampMixin):
         Index("idx_note_space_user", "space_id", "user_id"),
         Index("idx_note_type", "note_type"),
         Index("idx_note_created", "created_at"),
+        # 列表按 (updated_at, id) 排序和游标翻页
+        Index("idx_note_user_updated", "user_id", "updated_at", "id"),
+        Index("idx_note_space_updated", "space_id", "updated_at", "id"),
     )
 
     def __repr__(self):
@@ -375,6 +553,11 @@ class Conversation(Base, TimestampMixin):
         "Message", back_populates="conversation", cascade="all, delete-orphan"
     )
 
+    # 索引：列表按 (updated_at, id) 排序和游标翻页
+    __table_args__ = (
+        Index("idx_conversation_user_updated", "user_id", "updated_at", "id"),
+    )
+
     def __repr__(self):
         return f"<Conversation(id={self.id}, title='{self.title}')>"
 
@@ -688,3 +871,8 @@ class UserCustomModel(Base):
 
     def __repr__(self):
         return f"<UserCustomModel(id={self.id}, name={self.name}, provider={self.provider})>"
+
+
+# 全文检索生成列和GIN索引、输入联想的三元组索引（仅 PostgreSQL，见 app/core/full_text.py）
+attach_full_text_indexes(Base.metadata)
+attach_trigram_indexes(Base.metadata)
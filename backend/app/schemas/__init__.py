@@ -48,12 +48,18 @@ from app.schemas.documents import (
     AnnotationCreate,
     AnnotationResponse,
     AnnotationUpdate,
+    BatchUploadResponse,
     DocumentCreate,
     DocumentDetail,
     DocumentListResponse,
     DocumentResponse,
+    DocumentStatusResponse,
+    DocumentSummary,
     DocumentUpdate,
     DocumentUploadRequest,
+    DocumentUploadResponse,
+    IngestionJobCreate,
+    IngestionJobResponse,
 )
 
 # Space schemas
@@ -115,9 +121,15 @@ __all__ = [
     "DocumentCreate",
     "DocumentUpdate",
     "DocumentResponse",
+    "DocumentSummary",
     "DocumentDetail",
     "DocumentListResponse",
     "DocumentUploadRequest",
+    "DocumentUploadResponse",
+    "BatchUploadResponse",
+    "DocumentStatusResponse",
+    "IngestionJobCreate",
+    "IngestionJobResponse",
     "AnnotationCreate",
     "AnnotationUpdate",
     "AnnotationResponse",
@@ -62,12 +62,19 @@ class Choice(BaseModel):
     logprobs: dict[str, Any] | None = None
 
 
+class PromptTokensDetails(BaseModel):
+    """提示词令牌明细."""
+
+    cached_tokens: int = 0  # 命中提示词缓存的令牌数
+
+
 class Usage(BaseModel):
     """令牌使用情况."""
 
     prompt_tokens: int
     completion_tokens: int
     total_tokens: int
+    prompt_tokens_details: PromptTokensDetails | None = None
 
 
 class ChatCompletionResponse(BaseModel):
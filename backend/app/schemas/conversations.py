@@ -172,6 +172,7 @@ class SearchResponse(BaseModel):
     total_results: int
     search_time: float
     sources: list[str]
+    cached: bool = False  # 搜索结果来自缓存
 
 
 class ThinkRequest(BaseModel):
@@ -205,6 +206,7 @@ class ConversationListResponse(BaseModel):
     page: int
     page_size: int
     has_next: bool
+    next_cursor: str | None = None  # 传给下一次请求的 cursor 参数，按游标翻页
 
 
 class ConversationWithMessages(BaseModel):
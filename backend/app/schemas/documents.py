@@ -27,8 +27,8 @@ class DocumentUpdate(BaseModel):
     meta_data: dict[str, Any] | None = Field(default=None, description="元数据")
 
 
-class DocumentResponse(BaseModel):
-    """文档响应模式."""
+class DocumentSummary(BaseModel):
+    """文档列表项模式（不含正文和元数据）."""
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -41,11 +41,12 @@ class DocumentResponse(BaseModel):
     user_id: int
     file_url: str | None = None
     title: str | None = None
+    preview: str | None = Field(None, description="正文短预览")
+    content_length: int | None = Field(None, description="全文字符数")
     summary: str | None = None
     language: str | None = None
     description: str | None = None
     tags: list[str] | None = None
-    meta_data: dict[str, Any] | None = Field(None, description="元数据")
     processing_status: str | None = None
     extraction_status: str = "pending"
     embedding_status: str = "pending"
@@ -54,6 +55,12 @@ class DocumentResponse(BaseModel):
     updated_at: datetime | None = None
 
 
+class DocumentResponse(DocumentSummary):
+    """文档响应模式."""
+
+    meta_data: dict[str, Any] | None = Field(None, description="元数据")
+
+
 class DocumentDetail(DocumentResponse):
     """文档详细信息模式."""
 
@@ -66,11 +73,70 @@ class DocumentDetail(DocumentResponse):
 class DocumentListResponse(BaseModel):
     """文档列表响应模式."""
 
-    documents: list[DocumentResponse]
+    documents: list[DocumentSummary]
     total: int
     page: int
     page_size: int
     has_next: bool
+    next_cursor: str | None = None  # 传给下一次请求的 cursor 参数，按游标翻页
+
+
+class DocumentUploadResponse(DocumentResponse):
+    """文档上传受理响应模式（内容在后台处理）."""
+
+    job_id: int | None = Field(default=None, description="入库任务ID")
+    duplicate: bool = Field(default=False, description="是否为空间内已存在的相同文件")
+    status_url: str = Field(..., description="处理状态查询地址")
+
+
+class BatchUploadError(BaseModel):
+    """批量上传中单个文件的错误."""
+
+    filename: str | None = None
+    status_code: int
+    error: str
+
+
+class BatchUploadResponse(BaseModel):
+    """批量上传响应模式."""
+
+    accepted: list[DocumentUploadResponse]
+    failed: list[BatchUploadError]
+    total: int
+
+
+class IngestionJobCreate(BaseModel):
+    """创建入库任务模式."""
+
+    document_id: int = Field(..., description="文档ID")
+    max_attempts: int = Field(default=3, ge=1, description="最大尝试次数")
+
+
+class IngestionJobResponse(BaseModel):
+    """入库任务响应模式."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    document_id: int
+    status: str
+    stage: str | None = None
+    attempts: int
+    max_attempts: int
+    error_message: str | None = None
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    created_at: datetime
+
+
+class DocumentStatusResponse(BaseModel):
+    """文档处理状态响应模式."""
+
+    document_id: int
+    processing_status: str
+    extraction_status: str
+    embedding_status: str
+    job: IngestionJobResponse | None = None
 
 
 class DocumentUploadRequest(BaseModel):
@@ -271,6 +337,7 @@ class SearchRequest(BaseModel):
     query: str = Field(..., description="搜索查询")
     space_id: int | None = Field(None, description="限定空间ID")
     limit: int = Field(default=10, ge=1, le=50, description="结果数量")
+    offset: int = Field(default=0, ge=0, description="跳过的结果数")
     search_type: str = Field(default="keyword", description="搜索类型")
 
 
@@ -288,6 +355,6 @@ class SearchResponse(BaseModel):
     """搜索响应模式."""
 
     results: list[SearchResult]
-    total: int
+    total: int  # 全部匹配数（不受分页影响）
     query: str
     search_time: float | None = None
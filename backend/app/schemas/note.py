@@ -68,14 +68,39 @@ class NoteDetail(NoteResponse):
     last_edited_by: str | None = None
 
 
+class NoteSummary(BaseModel):
+    """笔记列表项模式（不含正文和元数据）."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    space_id: int
+    user_id: int
+    title: str
+    preview: str | None = Field(None, description="正文前若干字符")
+    content_type: str = "markdown"
+    note_type: str = "manual"
+    source_type: str | None = None
+    source_id: str | None = None
+    ai_model: str | None = None
+    tags: list[str] | None = None
+    linked_documents: list[int] | None = None
+    linked_notes: list[int] | None = None
+    version: int = 1
+    is_draft: bool = False
+    created_at: datetime
+    updated_at: datetime | None = None
+
+
 class NoteListResponse(BaseModel):
     """笔记列表响应模型."""
 
-    notes: list[NoteResponse]
+    notes: list[NoteSummary]
     total: int
     page: int
     page_size: int
     has_next: bool
+    next_cursor: str | None = None  # 传给下一次请求的 cursor 参数，按游标翻页
 
 
 class NoteAIGenerateRequest(BaseModel):
@@ -0,0 +1,67 @@
+"""Search schemas."""
+
+from typing import Annotated, Literal
+
+from pydantic import BaseModel, Field
+
+SuggestType = Literal["document", "note", "space"]
+SearchEntity = Literal["document", "note", "citation", "annotation", "conversation"]
+
+
+class SuggestItem(BaseModel):
+    """输入联想条目."""
+
+    type: SuggestType
+    id: int
+    title: str
+    subtitle: str | None = None  # 文档文件名
+    space_id: int | None = None
+    score: float  # 词相似度 [0, 1]
+
+
+class SuggestResponse(BaseModel):
+    """输入联想响应."""
+
+    query: str
+    items: list[SuggestItem]
+    cached: bool = False
+
+
+class UnifiedSearchRequest(BaseModel):
+    """统一搜索请求."""
+
+    query: str = Field(..., min_length=1, max_length=200, description="搜索查询")
+    types: list[SearchEntity] | None = Field(None, description="限定对象类型，默认全部")
+    quotas: dict[SearchEntity, Annotated[int, Field(ge=0, le=100)]] = Field(
+        default_factory=dict, description="每类对象最多参与排序的结果数（0表示不搜索）"
+    )
+    limit: int = Field(default=20, ge=1, le=100, description="每页结果数")
+    cursor: str | None = Field(None, description="上一页返回的 next_cursor")
+    time_budget_ms: int | None = Field(
+        None, ge=50, le=10000, description="等待各类对象结果的时间上限（毫秒）"
+    )
+
+
+class UnifiedSearchHit(BaseModel):
+    """统一搜索结果."""
+
+    type: SearchEntity
+    id: int
+    title: str
+    snippet: str | None = None
+    score: float  # 归一化后的得分 [0, 1]
+    space_id: int | None = None
+    document_id: int | None = None  # 标注和引用所属的文档
+
+
+class UnifiedSearchResponse(BaseModel):
+    """统一搜索响应."""
+
+    query: str
+    results: list[UnifiedSearchHit]
+    next_cursor: str | None = None
+    counts: dict[SearchEntity, int]  # 各类对象参与排序的结果数
+    partial: bool = False  # 有对象类型超时，结果不完整
+    timed_out: list[SearchEntity] = []
+    cached: bool = False
+    search_time: float
@@ -74,6 +74,7 @@ class SpaceListResponse(BaseModel):
     page: int
     page_size: int
     has_next: bool
+    next_cursor: str | None = None  # 传给下一次请求的 cursor 参数，按游标翻页
 
 
 class SpaceCollaborationCreate(BaseModel):
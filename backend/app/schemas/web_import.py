@@ -24,6 +24,7 @@ class BatchURLImportRequest(BaseModel):
     space_id: int = Field(..., description="目标空间ID")
     tags: list[str] | None = Field(None, description="标签列表")
     save_snapshot: bool = Field(True, description="是否保存网页快照")
+    stream: bool = Field(False, description="是否以SSE逐条返回导入结果")
 
 
 class WebPageMetadata(BaseModel):
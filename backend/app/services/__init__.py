@@ -12,11 +12,24 @@ Services are organized by functionality:
 # AI相关服务
 from app.services.ai_service import AIService, ai_service
 
+# 原始文件存储服务
+from app.services.blob_service import BlobService, blob_service
+
 # 业务逻辑服务
 from app.services.conversation_service import ConversationService
 
 # 文档处理服务
 from app.services.document_service import DocumentService, document_service
+from app.services.document_text_service import (
+    DocumentTextService,
+    document_text_service,
+)
+from app.services.extraction_cache_service import (
+    ExtractionCacheService,
+    extraction_cache_service,
+)
+from app.services.image_service import ImageService, image_service
+from app.services.ingestion_service import IngestionService, ingestion_service
 from app.services.multimodal_helper import MultimodalHelper, multimodal_helper
 from app.services.search_service import SearchService
 from app.services.space_service import SpaceService
@@ -88,11 +101,21 @@ __all__ = [
     # AI服务
     "AIService",
     "ai_service",
+    "ImageService",
+    "image_service",
     "MultimodalHelper",
     "multimodal_helper",
     # 文档服务
+    "BlobService",
+    "blob_service",
     "DocumentService",
     "document_service",
+    "DocumentTextService",
+    "document_text_service",
+    "ExtractionCacheService",
+    "extraction_cache_service",
+    "IngestionService",
+    "ingestion_service",
     # 向量服务
     "VectorService",
     "vector_service",
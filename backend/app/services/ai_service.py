@@ -12,6 +12,7 @@ from openai import AsyncOpenAI
 from app.core.config import settings
 from app.models.models import User
 from app.schemas.conversations import ChatMode
+from app.services.image_service import image_service
 
 logger = logging.getLogger(__name__)
 
@@ -327,6 +328,9 @@ class AIService:
         ],
     }
 
+    # 模拟LLM提供商名称（见 tools/mock_llm_server.py）
+    MOCK_PROVIDER_NAME = "mock"
+
     # PDF处理引擎
     PDF_ENGINES = {
         "pdf-text": "Free, best for clear text documents",
@@ -334,6 +338,13 @@ class AIService:
         "native": "Model-specific native processing",
     }
 
+    # 需要显式 cache_control 断点才能启用提示词缓存的模型前缀
+    # （OpenAI、DeepSeek、xAI 等由服务端自动缓存，无需标记）
+    PROMPT_CACHE_CONTROL_PREFIXES = ("anthropic/", "google/gemini")
+
+    # 稳定前缀低于该字符数时不标记缓存（约1024 tokens，Anthropic 的最小缓存长度）
+    PROMPT_CACHE_MIN_CHARS = 4096
+
     def __init__(self):
         self.openrouter_client = None
         self.ollama_provider = None
@@ -342,6 +353,12 @@ class AIService:
 
     def _init_providers(self):
         """初始化提供商."""
+        # 压测模式：只注册模拟提供商，所有请求都路由到本地模拟服务
+        if settings.MOCK_LLM_ENABLED:
+            self.add_custom_provider(self.MOCK_PROVIDER_NAME, settings.MOCK_LLM_BASE_URL)
+            logger.warning(f"模拟LLM已启用: {settings.MOCK_LLM_BASE_URL}")
+            return
+
         # 初始化 OpenRouter（如果有 API key）
         if settings.OPENROUTER_API_KEY:
             self.openrouter_client = AsyncOpenAI(
@@ -448,6 +465,79 @@ class AIService:
 
         return prepared_parts
 
+    def supports_prompt_cache_control(self, model: str) -> bool:
+        """检查模型是否需要显式的提示词缓存标记."""
+        return model.startswith(self.PROMPT_CACHE_CONTROL_PREFIXES)
+
+    def apply_prompt_cache_control(
+        self, messages: list[dict[str, Any]], model: str
+    ) -> list[dict[str, Any]]:
+        """为稳定前缀添加提示词缓存断点.
+
+        稳定前缀为消息开头连续的 system 消息（系统提示和文档上下文），
+        断点放在前缀的最后一个内容块上，服务端会缓存断点之前的全部内容。
+
+        Args:
+            messages: 已处理的消息列表
+            model: 目标模型
+
+        Returns:
+            添加缓存断点后的消息列表（不修改原列表）
+        """
+        if not self.supports_prompt_cache_control(model):
+            return messages
+
+        prefix_end = 0
+        prefix_chars = 0
+        for msg in messages:
+            if msg.get("role") != "system":
+                break
+            content = msg.get("content")
+            if isinstance(content, str):
+                prefix_chars += len(content)
+            elif isinstance(content, list):
+                prefix_chars += sum(
+                    len(part.get("text", "")) for part in content
+                )
+            prefix_end += 1
+
+        if prefix_end == 0 or prefix_chars < self.PROMPT_CACHE_MIN_CHARS:
+            return messages
+
+        marked = list(messages)
+        last = dict(marked[prefix_end - 1])
+        content = last.get("content")
+        parts: list[dict[str, Any]]
+        if isinstance(content, str):
+            parts = [{"type": "text", "text": content}]
+        elif isinstance(content, list) and content:
+            parts = [dict(part) for part in content]
+        else:
+            return messages
+        parts[-1]["cache_control"] = {"type": "ephemeral"}
+        last["content"] = parts
+        marked[prefix_end - 1] = last
+        return marked
+
+    @staticmethod
+    def _extract_usage(usage: Any) -> dict[str, int] | None:
+        """从响应中提取token用量，包括命中提示词缓存的token数."""
+        if usage is None:
+            return None
+
+        result = {}
+        for field in ("prompt_tokens", "completion_tokens", "total_tokens"):
+            value = getattr(usage, field, None)
+            if isinstance(value, int):
+                result[field] = value
+        if not result:
+            return None
+
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached_tokens = getattr(details, "cached_tokens", None)
+        result["cached_tokens"] = cached_tokens if isinstance(cached_tokens, int) else 0
+        return result
+
     async def auto_select_model(
         self,
         mode: ChatMode,
@@ -506,6 +596,7 @@ class AIService:
         pdf_engine: str = "native",
         search_context_size: str = "medium",
         auto_switch_vision: bool = True,
+        usage: dict[str, int] | None = None,
         **kwargs,
     ) -> str:
         """同步聊天接口.
@@ -520,6 +611,7 @@ class AIService:
             pdf_engine: PDF处理引擎 (native, pdf-text, mistral-ocr)
             search_context_size: 搜索上下文大小 (low, medium, high)
             auto_switch_vision: 是否自动切换到视觉模型
+            usage: 传入字典时写入本次请求的token用量（含 cached_tokens）
             **kwargs: 其他参数 (temperature, max_tokens等)
         """
         # 处理多模态内容
@@ -607,9 +699,13 @@ class AIService:
 
             response = await self.openrouter_client.chat.completions.create(
                 model=openrouter_model,
-                messages=processed_messages,  # type: ignore
+                messages=self.apply_prompt_cache_control(  # type: ignore
+                    processed_messages, openrouter_model
+                ),
                 **extra_params,
             )
+            if usage is not None:
+                usage.update(self._extract_usage(response.usage) or {})
             return response.choices[0].message.content or ""
 
     async def stream_chat(
@@ -623,6 +719,7 @@ class AIService:
         pdf_engine: str = "native",
         search_context_size: str = "medium",
         auto_switch_vision: bool = True,
+        usage: dict[str, int] | None = None,
         **kwargs,
     ) -> AsyncGenerator[str, None]:
         """流式聊天接口.
@@ -636,6 +733,7 @@ class AIService:
             web_search: 是否启用网页搜索
             pdf_engine: PDF处理引擎
             search_context_size: 搜索上下文大小 (low, medium, high)
+            usage: 传入字典时在流结束后写入token用量（含 cached_tokens）
             **kwargs: 其他参数
         """
         # 处理多模态内容
@@ -725,15 +823,25 @@ class AIService:
                 if search_context_size in self.SEARCH_CONTEXT_SIZES:
                     extra_params["search_context_size"] = search_context_size
 
+            # 请求在最后一个分块中返回用量
+            if usage is not None:
+                extra_params["stream_options"] = {"include_usage": True}
+
             stream = await self.openrouter_client.chat.completions.create(
                 model=openrouter_model,
-                messages=processed_messages,  # type: ignore
+                messages=self.apply_prompt_cache_control(  # type: ignore
+                    processed_messages, openrouter_model
+                ),
                 stream=True,
                 **extra_params,
             )
 
             async for chunk in stream:
-                if chunk.choices[0].delta.content:
+                if usage is not None:
+                    usage.update(
+                        self._extract_usage(getattr(chunk, "usage", None)) or {}
+                    )
+                if chunk.choices and chunk.choices[0].delta.content:
                     yield chunk.choices[0].delta.content
 
     async def get_embedding(
@@ -817,27 +925,19 @@ class AIService:
         }
 
     @staticmethod
-    def encode_image(image_path: str | Path) -> str:
+    def encode_image(image_path: str | Path, max_dimension: int | None = None) -> str:
         """将图像文件编码为base64字符串.
 
+        图片会先缩放到视觉模型的有效分辨率并重新编码，结果按内容哈希缓存。
+
         Args:
             image_path: 图像文件路径
+            max_dimension: 长边像素上限，默认使用 IMAGE_MAX_DIMENSION
 
         Returns:
             base64编码的图像数据URL
         """
-        image_path = Path(image_path)
-        with open(image_path, "rb") as image_file:
-            encoded = base64.b64encode(image_file.read()).decode("utf-8")
-
-        # 根据文件扩展名确定MIME类型
-        mime_type = "image/jpeg"
-        if image_path.suffix.lower() == ".png":
-            mime_type = "image/png"
-        elif image_path.suffix.lower() == ".webp":
-            mime_type = "image/webp"
-
-        return f"data:{mime_type};base64,{encoded}"
+        return image_service.encode_image(image_path, max_dimension)
 
     @staticmethod
     def encode_pdf(pdf_path: str | Path) -> str:
@@ -0,0 +1,256 @@
+"""Content-addressed raw file storage with reference counting."""
+
+import asyncio
+import hashlib
+import logging
+import shutil
+import tempfile
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any, cast
+
+from sqlalchemy import CursorResult, exists, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.blob_store import BlobBackend, blob_key, create_blob_backend
+from app.core.config import settings
+from app.core.database import async_session_factory
+from app.core.uploads import SpooledUpload
+from app.models.models import Blob, Document
+
+logger = logging.getLogger(__name__)
+
+
+class BlobService:
+    """原始文件存储服务.
+
+    文件按SHA-256存一份，文档通过 file_path 引用。写入和引用分两步：
+    store() 先保存对象并提交一条未引用的记录，创建文档时再调用
+    add_reference() 与文档在同一事务中提交。文档创建失败时对象保持未引用，
+    超过保留期后由 collect_garbage() 回收。
+    """
+
+    def __init__(
+        self,
+        backend: BlobBackend | None = None,
+        session_factory: Callable[[], AsyncSession] = async_session_factory,
+        gc_grace_seconds: int | None = None,
+        gc_interval_seconds: int | None = None,
+    ) -> None:
+        self._backend = backend
+        self.session_factory = session_factory
+        self.gc_grace_seconds = (
+            gc_grace_seconds
+            if gc_grace_seconds is not None
+            else settings.BLOB_GC_GRACE_SECONDS
+        )
+        self.gc_interval_seconds = (
+            gc_interval_seconds
+            if gc_interval_seconds is not None
+            else settings.BLOB_GC_INTERVAL_SECONDS
+        )
+        self._gc_task: asyncio.Task[None] | None = None
+
+    @property
+    def backend(self) -> BlobBackend:
+        """存储后端（首次使用时按配置创建）."""
+        if self._backend is None:
+            self._backend = create_blob_backend()
+        return self._backend
+
+    @staticmethod
+    def is_blob_key(file_path: str | None) -> bool:
+        """文档 file_path 是否指向内容寻址存储."""
+        return isinstance(file_path, str) and file_path.startswith("blobs/")
+
+    async def get(self, db: AsyncSession, sha256: str) -> Blob | None:
+        """按内容哈希获取记录."""
+        result = await db.execute(select(Blob).where(Blob.sha256 == sha256))
+        return result.scalar_one_or_none()
+
+    async def store(
+        self, db: AsyncSession, upload: SpooledUpload, content_type: str
+    ) -> Blob:
+        """保存上传文件，已存在相同内容时直接复用.
+
+        新记录会立即提交（未引用状态）。写入新对象时暂存文件会被移走，
+        调用方仍负责 cleanup()。
+        """
+        blob = await self.get(db, upload.sha256)
+        if blob is not None:
+            if blob.ref_count == 0:
+                # 刷新未引用时间，避免在引用前被回收
+                blob.unreferenced_at = datetime.now(UTC)
+                await db.commit()
+            return blob
+
+        key = blob_key(upload.sha256)
+        await asyncio.to_thread(self.backend.put_file, key, upload.path, content_type)
+
+        blob = Blob(
+            sha256=upload.sha256,
+            storage_key=key,
+            size=upload.size,
+            content_type=content_type,
+            ref_count=0,
+            unreferenced_at=datetime.now(UTC),
+        )
+        db.add(blob)
+        try:
+            await db.commit()
+        except IntegrityError:
+            # 并发上传了相同内容，对象键相同，使用先提交的记录
+            await db.rollback()
+            blob = await self.get(db, upload.sha256)
+            if blob is None:
+                raise
+        return blob
+
+    async def store_bytes(
+        self, db: AsyncSession, data: bytes, content_type: str
+    ) -> Blob:
+        """保存内存中的数据（如网页快照），语义同 store()."""
+        sha256 = hashlib.sha256(data).hexdigest()
+        fd, name = tempfile.mkstemp(dir=settings.UPLOAD_TMP_DIR)
+        upload = SpooledUpload(path=Path(name), size=len(data), sha256=sha256)
+        try:
+            with open(fd, "wb") as f:
+                f.write(data)
+            return await self.store(db, upload, content_type)
+        finally:
+            upload.cleanup()
+
+    async def add_reference(self, db: AsyncSession, blob: Blob) -> None:
+        """增加一个文档引用. 调用方负责提交事务.
+
+        Raises:
+            LookupError: 记录在此期间已被回收
+        """
+        result = await db.execute(
+            update(Blob)
+            .where(Blob.id == blob.id)
+            .values(ref_count=Blob.ref_count + 1, unreferenced_at=None)
+        )
+        if not cast(CursorResult[Any], result).rowcount:
+            raise LookupError(f"原始文件 {blob.sha256[:12]} 已被回收，请重新上传")
+
+    async def release(self, db: AsyncSession, file_path: str | None) -> None:
+        """文档删除时释放其引用. 调用方负责提交事务."""
+        if not self.is_blob_key(file_path):
+            return
+        await db.execute(
+            update(Blob)
+            .where(Blob.storage_key == file_path, Blob.ref_count > 0)
+            .values(ref_count=Blob.ref_count - 1)
+        )
+        await db.execute(
+            update(Blob)
+            .where(
+                Blob.storage_key == file_path,
+                Blob.ref_count == 0,
+                Blob.unreferenced_at.is_(None),
+            )
+            .values(unreferenced_at=datetime.now(UTC))
+        )
+
+    @asynccontextmanager
+    async def open_local(self, file_path: str, suffix: str = "") -> AsyncIterator[Path]:
+        """获取对象的本地文件路径（带指定扩展名）.
+
+        存储键不带扩展名，而解析器按扩展名识别格式：本地后端在临时目录中
+        创建带扩展名的符号链接（不支持时复制），对象存储下载到临时文件。
+        退出时删除临时文件。
+        """
+        local = self.backend.local_path(file_path)
+        if local is not None and not suffix:
+            yield local
+            return
+
+        with tempfile.TemporaryDirectory(dir=settings.UPLOAD_TMP_DIR) as tmp_dir:
+            tmp_path = Path(tmp_dir) / f"{Path(file_path).name}{suffix}"
+            if local is not None:
+                try:
+                    tmp_path.symlink_to(local.resolve())
+                except OSError:
+                    await asyncio.to_thread(shutil.copyfile, local, tmp_path)
+            else:
+                await asyncio.to_thread(self.backend.download, file_path, tmp_path)
+            yield tmp_path
+
+    async def collect_garbage(self, db: AsyncSession, limit: int = 500) -> int:
+        """回收引用归零超过保留期的对象.
+
+        Returns:
+            回收的对象数
+        """
+        cutoff = datetime.now(UTC) - timedelta(seconds=self.gc_grace_seconds)
+        # 引用计数之外再确认没有文档指向该内容，计数出错时宁可不回收
+        referenced = exists().where(Document.file_hash == Blob.sha256)
+        result = await db.execute(
+            select(Blob.id, Blob.storage_key)
+            .where(
+                Blob.ref_count == 0,
+                Blob.unreferenced_at < cutoff,
+                ~referenced,
+            )
+            .limit(limit)
+        )
+        collected = 0
+        for blob_id, key in result.all():
+            # 锁定记录后再删除对象：并发的 add_reference 会等待本事务结束，
+            # 记录删除后其更新行数为0，不会引用已删除的对象
+            locked = await db.execute(
+                select(Blob)
+                .where(
+                    Blob.id == blob_id,
+                    Blob.ref_count == 0,
+                    Blob.unreferenced_at < cutoff,
+                )
+                .with_for_update(skip_locked=True)
+            )
+            blob = locked.scalar_one_or_none()
+            if blob is None:
+                await db.rollback()
+                continue
+            try:
+                await asyncio.to_thread(self.backend.delete, key)
+            except Exception as e:
+                await db.rollback()
+                logger.error(f"删除存储对象 {key} 失败: {e}")
+                continue
+            await db.delete(blob)
+            await db.commit()
+            collected += 1
+        if collected:
+            logger.info(f"回收 {collected} 个未引用的原始文件")
+        return collected
+
+    async def start(self) -> None:
+        """启动定期回收任务."""
+        if self._gc_task is not None or self.gc_interval_seconds <= 0:
+            return
+        self._gc_task = asyncio.create_task(self._gc_loop(), name="blob-gc")
+
+    async def stop(self) -> None:
+        """停止定期回收任务."""
+        if self._gc_task is None:
+            return
+        self._gc_task.cancel()
+        await asyncio.gather(self._gc_task, return_exceptions=True)
+        self._gc_task = None
+
+    async def _gc_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.gc_interval_seconds)
+            try:
+                async with self.session_factory() as db:
+                    await self.collect_garbage(db)
+            except Exception as e:
+                logger.error(f"原始文件回收失败: {e}")
+
+
+# 创建全局实例
+blob_service = BlobService()
@@ -17,11 +17,13 @@ from app.schemas.chat import (
     ChatCompletionRequest,
     ChatCompletionResponse,
     Choice,
+    PromptTokensDetails,
     Role,
     Usage,
 )
 from app.schemas.conversations import ChatMode, MessageCreate
 from app.services.ai_service import ai_service
+from app.services.document_text_service import document_text_service
 from app.services.vector_service import vector_service
 
 logger = logging.getLogger(__name__)
@@ -110,9 +112,14 @@ class ChatService:
                             "role": "system",
                             "content": f"以下是Space中的相关内容：\n\n{context}"
                         }
-                        # 在用户消息前插入
+                        # 检索结果随每次提问变化，插入到最后一条用户消息前，
+                        # 保证系统提示、文档上下文和历史消息构成的前缀可被提示词缓存复用
                         user_msg_index = next(
-                            (i for i, msg in enumerate(messages) if msg.get("role") == "user"),
+                            (
+                                i
+                                for i in range(len(messages) - 1, -1, -1)
+                                if messages[i].get("role") == "user"
+                            ),
                             len(messages)
                         )
                         messages.insert(user_msg_index, context_message)
@@ -128,6 +135,7 @@ class ChatService:
                     messages, request, mode, user, db
                 )
             else:
+                usage: dict[str, int] = {}
                 response = await ai_service.chat(
                     messages=messages,
                     mode=mode,
@@ -135,6 +143,7 @@ class ChatService:
                     temperature=request.temperature,
                     max_tokens=request.max_tokens,
                     user=user,
+                    usage=usage,
                 )
 
                 # 保存消息到对话历史
@@ -166,11 +175,7 @@ class ChatService:
                         message=ChatMessage(role=Role.assistant, content=response),
                         finish_reason="stop"
                     )],
-                    usage=Usage(
-                        prompt_tokens=sum(len(m.get("content", "")) for m in messages) // 4,
-                        completion_tokens=len(response) // 4,
-                        total_tokens=(sum(len(m.get("content", "")) for m in messages) + len(response)) // 4
-                    )
+                    usage=self._build_usage(usage, messages, response)
                 )
 
         except Exception as e:
@@ -191,6 +196,7 @@ class ChatService:
         try:
             response_content = ""
             chunk_id = f"chatcmpl-{uuid4().hex[:8]}"
+            usage: dict[str, int] = {}
 
             async for chunk in ai_service.stream_chat(
                 messages=messages,
@@ -199,6 +205,7 @@ class ChatService:
                 temperature=request.temperature,
                 max_tokens=request.max_tokens,
                 user=user,
+                usage=usage,
             ):
                 response_content += chunk
 
@@ -229,6 +236,10 @@ class ChatService:
                     "finish_reason": "stop"
                 }]
             }
+            if usage:
+                final_chunk["usage"] = self._build_usage(
+                    usage, messages, response_content
+                ).model_dump()
             yield f"data: {json.dumps(final_chunk)}\n\n"
             yield "data: [DONE]\n\n"
 
@@ -273,11 +284,12 @@ class ChatService:
             logger.info(f"🔍 获取文档上下文: document_ids={document_ids}, user_id={user_id}")
             
             # 查询文档
+            # 固定文档顺序，使相同文档集合生成的上下文完全一致（利于提示词缓存）
             stmt = select(Document).where(
                 Document.id.in_(document_ids),
                 Document.user_id == user_id,
                 Document.content.isnot(None)
-            )
+            ).order_by(Document.id)
             result = await db.execute(stmt)
             documents = result.scalars().all()
             
@@ -303,10 +315,14 @@ class ChatService:
             total_length = 0
 
             for doc in documents:
-                logger.info(f"📄 处理文档 {doc.id}: filename={doc.filename}, content_length={len(doc.content) if doc.content else 0}")
-                
-                if doc.content:
-                    doc_context = f"### 文档：{doc.title or doc.filename}\n{doc.content}\n"
+                logger.info(f"📄 处理文档 {doc.id}: filename={doc.filename}, content_length={document_text_service.get_length(doc)}")
+
+                # 只读取上下文预算内的全文
+                text = await document_text_service.read_range(
+                    db, doc, 0, max(max_length - total_length, 0)
+                )
+                if text:
+                    doc_context = f"### 文档：{doc.title or doc.filename}\n{text}\n"
 
                     # 检查长度限制
                     if total_length + len(doc_context) > max_length:
@@ -421,6 +437,34 @@ class ChatService:
             logger.error(f"Error searching relevant documents: {str(e)}")
             return []
 
+    def _build_usage(
+        self,
+        usage: dict[str, int],
+        messages: list[dict[str, Any]],
+        response: str,
+    ) -> Usage:
+        """构建令牌用量，提供商未返回用量时按字符数估算."""
+        if "prompt_tokens" in usage and "completion_tokens" in usage:
+            return Usage(
+                prompt_tokens=usage["prompt_tokens"],
+                completion_tokens=usage["completion_tokens"],
+                total_tokens=usage.get(
+                    "total_tokens", usage["prompt_tokens"] + usage["completion_tokens"]
+                ),
+                prompt_tokens_details=PromptTokensDetails(
+                    cached_tokens=usage.get("cached_tokens", 0)
+                ),
+            )
+
+        prompt_chars = sum(
+            len(m["content"]) for m in messages if isinstance(m.get("content"), str)
+        )
+        return Usage(
+            prompt_tokens=prompt_chars // 4,
+            completion_tokens=len(response) // 4,
+            total_tokens=(prompt_chars + len(response)) // 4,
+        )
+
     def _format_documents_context(self, documents: list[Document]) -> str:
         """格式化文档内容为上下文."""
         contexts = []
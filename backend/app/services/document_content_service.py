@@ -1,17 +1,75 @@
 """Document content processing service."""
 
+import asyncio
 import logging
+import math
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
+
+from app.core.config import settings
+from app.core.process_pool import WorkerError, extraction_pool
+
+if TYPE_CHECKING:
+    from app.services.extraction_cache_service import ExtractionCacheService
 
 logger = logging.getLogger(__name__)
 
+# 提取器版本：解析逻辑或依赖库升级导致输出变化时递增，已缓存的提取结果随之失效
+EXTRACTOR_VERSION = "3"
+
+# 优先使用MarkItDown转换的格式
+MARKITDOWN_EXTENSIONS = {".pdf", ".docx", ".pptx", ".xlsx"}
+
+# 提取失败时代替正文返回的提示文本
+DOC_UNSUPPORTED_TEXT = "无法提取DOC文件内容，请转换为DOCX格式"
+DOC_FAILED_TEXT = "DOC文件提取失败"
+PPT_UNSUPPORTED_TEXT = "无法提取PPT文件内容，请转换为PPTX格式"
+PPT_FAILED_TEXT = "PPT文件提取失败"
+TEXTRACT_UNAVAILABLE_TEXT = "无法提取文档内容，请安装相应的处理库"
+TEXTRACT_FAILED_TEXT = "文档内容提取失败"
+# 正文为这些文本的结果标记为 extraction_failed，不写入提取缓存
+EXTRACTION_FAILED_TEXTS = frozenset(
+    {
+        DOC_UNSUPPORTED_TEXT,
+        DOC_FAILED_TEXT,
+        PPT_UNSUPPORTED_TEXT,
+        PPT_FAILED_TEXT,
+        TEXTRACT_UNAVAILABLE_TEXT,
+        TEXTRACT_FAILED_TEXT,
+    }
+)
+
+
+# 文本文件依次尝试的编码，latin-1 可以解码任意字节，作为兜底
+TEXT_ENCODINGS = ("utf-8", "gbk", "gb2312", "latin-1")
+
+
+def decode_text(data: bytes) -> str:
+    """解码文本文件（数据已读入内存，不重复读取文件）."""
+    for encoding in TEXT_ENCODINGS:
+        try:
+            return data.decode(encoding)
+        except UnicodeDecodeError:
+            logger.debug(f"{encoding} 解码失败，尝试下一种编码")
+    return data.decode("utf-8", errors="ignore")
+
 
 class DocumentContentService:
     """文档内容处理服务."""
 
-    def __init__(self) -> None:
-        """初始化文档服务."""
+    def __init__(
+        self,
+        use_process_pool: bool = False,
+        extraction_cache: "ExtractionCacheService | None" = None,
+    ) -> None:
+        """初始化文档服务.
+
+        Args:
+            use_process_pool: 是否在提取进程池中执行增强提取
+            extraction_cache: 提取结果缓存，传入文件哈希时先查缓存
+        """
+        self.use_process_pool = use_process_pool
+        self.extraction_cache = extraction_cache
         self.supported_types = {
             ".pdf": self._extract_pdf,
             ".docx": self._extract_docx,
@@ -35,7 +93,7 @@ class DocumentContentService:
         """提取文档内容."""
         try:
             # 如果markitdown可用且支持该格式，优先使用
-            if self.markitdown and file_ext in ['.pdf', '.docx', '.pptx', '.xlsx']:
+            if self.markitdown and file_ext in MARKITDOWN_EXTENSIONS:
                 try:
                     result = self.markitdown.convert(str(file_path))
                     if result and result.text_content:
@@ -59,35 +117,33 @@ class DocumentContentService:
 
     async def _extract_pdf(self, file_path: Path) -> str:
         """提取PDF内容."""
-        try:
-            import pdfplumber
-
-            content = []
-            with pdfplumber.open(file_path) as pdf:
-                for page in pdf.pages:
-                    text = page.extract_text()
-                    if text:
-                        content.append(text)
-
-                    # 提取表格
-                    tables = page.extract_tables()
-                    for table in tables:
-                        if table:
-                            # 将表格转换为文本
-                            for row in table:
-                                content.append(" | ".join(str(cell) if cell else "" for cell in row))
-
-            return "\n".join(content)
+        return (await self._parse_pdf(file_path))["text"]
 
+    async def _parse_pdf(self, file_path: Path) -> dict[str, Any]:
+        """一次打开PDF，提取文本、表格、页偏移和文档信息."""
+        try:
+            data = _extract_pdf_range(str(file_path), 0, None)
         except ImportError:
             logger.warning("pdfplumber 未安装，使用基础文本提取")
-            return await self._extract_with_textract(file_path)
+            return _parsed(await self._extract_with_textract(file_path))
         except Exception as e:
             logger.error(f"PDF提取失败: {str(e)}")
-            return await self._extract_with_textract(file_path)
+            return _parsed(await self._extract_with_textract(file_path))
+
+        text, page_offsets, has_tables = _assemble_pdf_pages(data["pages"])
+        metadata = {
+            **data["metadata"],
+            "page_count": data["page_count"],
+            "page_offsets": page_offsets,
+        }
+        return _parsed(text, metadata, has_tables)
 
     async def _extract_docx(self, file_path: Path) -> str:
         """提取DOCX内容."""
+        return (await self._parse_docx(file_path))["text"]
+
+    async def _parse_docx(self, file_path: Path) -> dict[str, Any]:
+        """一次打开DOCX，提取段落、表格和文档属性."""
         try:
             from docx import Document
 
@@ -108,14 +164,19 @@ class DocumentContentService:
                     if row_text:
                         content.append(" | ".join(row_text))
 
-            return "\n".join(content)
-
         except ImportError:
             logger.warning("python-docx 未安装，使用基础文本提取")
-            return await self._extract_with_textract(file_path)
+            return _parsed(await self._extract_with_textract(file_path))
         except Exception as e:
             logger.error(f"DOCX提取失败: {str(e)}")
-            return await self._extract_with_textract(file_path)
+            return _parsed(await self._extract_with_textract(file_path))
+
+        try:
+            metadata = _docx_metadata(doc)
+        except Exception as e:
+            logger.warning(f"获取Word元数据失败: {str(e)}")
+            metadata = {}
+        return _parsed("\n".join(content), metadata, bool(doc.tables))
 
     async def _extract_doc(self, file_path: Path) -> str:
         """提取DOC内容."""
@@ -128,27 +189,17 @@ class DocumentContentService:
 
         except ImportError:
             logger.warning("textract 未安装，无法处理DOC文件")
-            return "无法提取DOC文件内容，请转换为DOCX格式"
+            return DOC_UNSUPPORTED_TEXT
         except Exception as e:
             logger.error(f"DOC提取失败: {str(e)}")
-            return "DOC文件提取失败"
+            return DOC_FAILED_TEXT
 
     async def _extract_txt(self, file_path: Path) -> str:
-        """提取TXT内容."""
+        """提取TXT内容（只读取一次文件）."""
         try:
-            # 尝试多种编码
-            encodings = ["utf-8", "gbk", "gb2312", "latin-1"]
-
-            for encoding in encodings:
-                try:
-                    with open(file_path, encoding=encoding) as file:
-                        return file.read()
-                except UnicodeDecodeError:
-                    continue
-
-            # 如果所有编码都失败，使用错误处理
-            with open(file_path, encoding="utf-8", errors="ignore") as file:
-                return file.read()
+            with open(file_path, "rb") as file:
+                data = file.read()
+            return decode_text(data)
 
         except Exception as e:
             logger.error(f"TXT提取失败: {str(e)}")
@@ -160,6 +211,10 @@ class DocumentContentService:
 
     async def _extract_pptx(self, file_path: Path) -> str:
         """提取PPTX内容."""
+        return (await self._parse_pptx(file_path))["text"]
+
+    async def _parse_pptx(self, file_path: Path) -> dict[str, Any]:
+        """一次打开PPTX，提取幻灯片文本和文档属性."""
         try:
             from pptx import Presentation
 
@@ -179,14 +234,19 @@ class DocumentContentService:
                 if slide_content:
                     content.append("\n".join(slide_content))
 
-            return "\n\n---\n\n".join(content)
-
         except ImportError:
             logger.warning("python-pptx 未安装，使用基础文本提取")
-            return await self._extract_with_textract(file_path)
+            return _parsed(await self._extract_with_textract(file_path))
         except Exception as e:
             logger.error(f"PPTX提取失败: {str(e)}")
-            return await self._extract_with_textract(file_path)
+            return _parsed(await self._extract_with_textract(file_path))
+
+        try:
+            metadata = _pptx_metadata(prs)
+        except Exception as e:
+            logger.warning(f"获取PowerPoint元数据失败: {str(e)}")
+            metadata = {}
+        return _parsed("\n\n---\n\n".join(content), metadata)
 
     async def _extract_ppt(self, file_path: Path) -> str:
         """提取PPT内容."""
@@ -198,10 +258,10 @@ class DocumentContentService:
 
         except ImportError:
             logger.warning("textract 未安装，无法处理PPT文件")
-            return "无法提取PPT文件内容，请转换为PPTX格式"
+            return PPT_UNSUPPORTED_TEXT
         except Exception as e:
             logger.error(f"PPT提取失败: {str(e)}")
-            return "PPT文件提取失败"
+            return PPT_FAILED_TEXT
 
     async def _extract_with_textract(self, file_path: Path) -> str:
         """使用textract提取内容."""
@@ -213,25 +273,18 @@ class DocumentContentService:
 
         except ImportError:
             logger.warning("textract 未安装，无法提取文档内容")
-            return "无法提取文档内容，请安装相应的处理库"
+            return TEXTRACT_UNAVAILABLE_TEXT
         except Exception as e:
             logger.error(f"textract提取失败: {str(e)}")
-            return "文档内容提取失败"
+            return TEXTRACT_FAILED_TEXT
 
     async def get_document_metadata(self, file_path: Path) -> dict[str, Any]:
         """获取文档元数据."""
         try:
-            stat = file_path.stat()
-
-            metadata: dict[str, Any] = {
-                "file_size": stat.st_size,
-                "created_time": stat.st_ctime,
-                "modified_time": stat.st_mtime,
-                "file_extension": file_path.suffix.lower(),
-            }
+            file_ext = file_path.suffix.lower()
+            metadata = _file_metadata(file_path, file_ext)
 
             # 根据文件类型获取特定元数据
-            file_ext = file_path.suffix.lower()
 
             if file_ext == ".pdf":
                 metadata.update(await self._get_pdf_metadata(file_path))
@@ -252,25 +305,7 @@ class DocumentContentService:
             import pdfplumber
 
             with pdfplumber.open(file_path) as pdf:
-                metadata: dict[str, Any] = {
-                    "page_count": len(pdf.pages),
-                }
-
-                # pdfplumber的元数据访问方式
-                if pdf.metadata:
-                    metadata.update(
-                        {
-                            "title": pdf.metadata.get("Title", ""),
-                            "author": pdf.metadata.get("Author", ""),
-                            "subject": pdf.metadata.get("Subject", ""),
-                            "creator": pdf.metadata.get("Creator", ""),
-                            "producer": pdf.metadata.get("Producer", ""),
-                            "creation_date": str(pdf.metadata.get("CreationDate", "")),
-                            "modification_date": str(pdf.metadata.get("ModDate", "")),
-                        }
-                    )
-
-                return metadata
+                return _read_pdf_info(pdf)
 
         except Exception as e:
             logger.error(f"获取PDF元数据失败: {str(e)}")
@@ -282,29 +317,7 @@ class DocumentContentService:
             from docx import Document
 
             if file_path.suffix.lower() == ".docx":
-                doc = Document(str(file_path))
-
-                metadata: dict[str, Any] = {
-                    "paragraph_count": len(doc.paragraphs),
-                    "table_count": len(doc.tables),
-                }
-
-                if doc.core_properties:
-                    metadata.update(
-                        {
-                            "title": doc.core_properties.title or "",
-                            "author": doc.core_properties.author or "",
-                            "subject": doc.core_properties.subject or "",
-                            "created": str(doc.core_properties.created)
-                            if doc.core_properties.created
-                            else "",
-                            "modified": str(doc.core_properties.modified)
-                            if doc.core_properties.modified
-                            else "",
-                        }
-                    )
-
-                return metadata
+                return _docx_metadata(Document(str(file_path)))
 
             return {}
 
@@ -318,28 +331,7 @@ class DocumentContentService:
             from pptx import Presentation
 
             if file_path.suffix.lower() == ".pptx":
-                prs = Presentation(str(file_path))
-
-                metadata: dict[str, Any] = {
-                    "slide_count": len(prs.slides),
-                }
-
-                if prs.core_properties:
-                    metadata.update(
-                        {
-                            "title": prs.core_properties.title or "",
-                            "author": prs.core_properties.author or "",
-                            "subject": prs.core_properties.subject or "",
-                            "created": str(prs.core_properties.created)
-                            if prs.core_properties.created
-                            else "",
-                            "modified": str(prs.core_properties.modified)
-                            if prs.core_properties.modified
-                            else "",
-                        }
-                    )
-
-                return metadata
+                return _pptx_metadata(Presentation(str(file_path)))
 
             return {}
 
@@ -347,6 +339,66 @@ class DocumentContentService:
             logger.error(f"获取PowerPoint元数据失败: {str(e)}")
             return {}
 
+    async def _extract_pdf_parallel(self, file_path: Path) -> dict[str, Any] | None:
+        """按页范围并行提取PDF文本和表格.
+
+        第一个任务同时读取页数和文档元数据，其余页面按范围分配到多个工作进程，
+        结果按页序拼接并记录每页在全文中的起始偏移。
+
+        Returns:
+            与 extract_content_enhanced 相同结构的结果；pdfplumber 无法解析时返回None
+        """
+        path = str(file_path)
+        pages_per_job = max(1, settings.PDF_PAGES_PER_JOB)
+
+        try:
+            first = await extraction_pool.run(_extract_pdf_range, path, 0, pages_per_job)
+            page_count = first["page_count"]
+            pages = first["pages"]
+
+            if page_count > pages_per_job:
+                remaining = page_count - pages_per_job
+                span = max(
+                    pages_per_job, math.ceil(remaining / extraction_pool.max_workers)
+                )
+                ranges = [
+                    (start, min(start + span, page_count))
+                    for start in range(pages_per_job, page_count, span)
+                ]
+                chunks = await asyncio.gather(
+                    *(
+                        extraction_pool.run(_extract_pdf_range, path, start, end)
+                        for start, end in ranges
+                    )
+                )
+                for chunk in chunks:
+                    pages.extend(chunk["pages"])
+        except WorkerError:
+            raise
+        except Exception as e:
+            logger.warning(f"PDF并行提取失败，使用默认提取器: {e}")
+            return None
+
+        text, page_offsets, has_tables = _assemble_pdf_pages(pages)
+
+        metadata: dict[str, Any] = {
+            **_file_metadata(file_path, ".pdf"),
+            **first["metadata"],
+            "page_count": page_count,
+            "page_offsets": page_offsets,
+        }
+
+        return {
+            "text": text,
+            "format": "plain_text",
+            "extraction_method": "pdfplumber_parallel",
+            "metadata": metadata,
+            "has_tables": has_tables,
+            "has_images": False,
+            "has_formulas": False,
+            "extraction_failed": False,
+        }
+
     async def split_document(
         self, content: str, chunk_size: int = 1000, overlap: int = 100
     ) -> list[str]:
@@ -467,10 +519,18 @@ class DocumentContentService:
         return summary or content[:max_length] + "..."
 
     async def extract_content_enhanced(
-        self, file_path: Path, file_ext: str | None = None
+        self,
+        file_path: Path,
+        file_ext: str | None = None,
+        file_hash: str | None = None,
     ) -> dict[str, Any]:
         """增强的内容提取，返回结构化数据.
 
+        Args:
+            file_path: 文件路径
+            file_ext: 扩展名，默认取自文件路径
+            file_hash: 原始文件SHA-256，提供时先查提取缓存，提取后写入缓存
+
         Returns:
             包含以下字段的字典:
             - text: 提取的文本内容
@@ -480,46 +540,297 @@ class DocumentContentService:
             - has_tables: 是否包含表格
             - has_images: 是否包含图片（仅用于标记）
             - has_formulas: 是否包含公式（仅用于标记）
+            - extraction_failed: 是否提取失败（text 为提示文本，不写入提取缓存）
         """
         if not file_ext:
             file_ext = file_path.suffix.lower()
 
-        result: dict[str, Any] = {
-            "text": "",
-            "format": "plain_text",
-            "extraction_method": "default",
-            "metadata": {},
-            "has_tables": False,
-            "has_images": False,
-            "has_formulas": False,
-        }
+        if file_hash and self.extraction_cache is not None:
+            cached = await self.extraction_cache.get(file_hash)
+            if cached is not None:
+                return cached
+            result = await self.extract_content_enhanced(file_path, file_ext)
+            await self.extraction_cache.put(file_hash, file_ext, result)
+            return result
+
+        # 解析库都是CPU密集的同步调用，放到独立进程执行，超时或内存超限时进程被终止
+        if self.use_process_pool:
+            if file_ext == ".pdf":
+                # 与进程内提取一致，优先MarkItDown，失败后再按页并行提取
+                if self.markitdown:
+                    converted = await extraction_pool.run(
+                        _convert_with_markitdown_in_worker, str(file_path), file_ext
+                    )
+                    if converted is not None:
+                        return converted
+                pdf_result = await self._extract_pdf_parallel(file_path)
+                if pdf_result is not None:
+                    return pdf_result
+            return await extraction_pool.run(
+                _extract_enhanced_in_worker, str(file_path), file_ext
+            )
 
         # 如果markitdown可用且支持该格式，优先使用
-        if self.markitdown and file_ext in ['.pdf', '.docx', '.pptx', '.xlsx']:
-            try:
-                markitdown_result = self.markitdown.convert(str(file_path))
-                if markitdown_result and markitdown_result.text_content:
-                    result["text"] = markitdown_result.text_content
-                    result["format"] = "markdown"
-                    result["extraction_method"] = "markitdown"
-
-                    # 简单检测内容特征
-                    content_lower = result["text"].lower()
-                    result["has_tables"] = "|" in result["text"] or "table" in content_lower
-                    result["has_images"] = "![" in result["text"] or "image" in content_lower
-                    result["has_formulas"] = "$$" in result["text"] or "\\begin{" in result["text"]
-
-                    return result
-            except Exception as e:
-                logger.warning(f"MarkItDown extraction failed: {e}")
-
-        # 使用默认提取器
-        result["text"] = await self.extract_content(file_path, file_ext)
-
-        # 获取元数据
+        converted = self.convert_with_markitdown(file_path, file_ext)
+        if converted is not None:
+            return converted
+
+        # 使用默认解析器：文件只打开一次，同时得到文本、元数据和表格标记，
+        # 不再重复尝试MarkItDown
+        parsed = await self.parse_document(file_path, file_ext)
+        result = _enhanced_result(parsed["text"])
+        result["metadata"] = parsed["metadata"]
+        result["has_tables"] = parsed["has_tables"]
+        return result
+
+    def convert_with_markitdown(
+        self, file_path: Path, file_ext: str
+    ) -> dict[str, Any] | None:
+        """用MarkItDown转换为Markdown.
+
+        Returns:
+            与 extract_content_enhanced 相同结构的结果；MarkItDown不可用、
+            不支持该格式或转换失败时返回None
+        """
+        if not self.markitdown or file_ext not in MARKITDOWN_EXTENSIONS:
+            return None
         try:
-            result["metadata"] = await self.get_document_metadata(file_path)
+            markitdown_result = self.markitdown.convert(str(file_path))
         except Exception as e:
-            logger.warning(f"Failed to extract metadata: {e}")
-
+            logger.warning(f"MarkItDown extraction failed: {e}")
+            return None
+        if not markitdown_result or not markitdown_result.text_content:
+            return None
+
+        result = _enhanced_result(markitdown_result.text_content)
+        result["format"] = "markdown"
+        result["extraction_method"] = "markitdown"
+
+        # 简单检测内容特征
+        content_lower = result["text"].lower()
+        result["has_tables"] = "|" in result["text"] or "table" in content_lower
+        result["has_images"] = "![" in result["text"] or "image" in content_lower
+        result["has_formulas"] = "$$" in result["text"] or "\\begin{" in result["text"]
+
+        if file_ext == ".pdf":
+            page_offsets = _form_feed_offsets(result["text"])
+            if page_offsets:
+                result["metadata"] = {
+                    "page_count": len(page_offsets),
+                    "page_offsets": page_offsets,
+                }
         return result
+
+    async def parse_document(
+        self, file_path: Path, file_ext: str | None = None
+    ) -> dict[str, Any]:
+        """用默认解析器单次解析文件.
+
+        Returns:
+            text、metadata（含文件信息）和 has_tables
+
+        Raises:
+            ValueError: 不支持的文件类型
+        """
+        if not file_ext:
+            file_ext = file_path.suffix.lower()
+
+        parsers = {
+            ".pdf": self._parse_pdf,
+            ".docx": self._parse_docx,
+            ".pptx": self._parse_pptx,
+        }
+        if file_ext in parsers:
+            parsed = await parsers[file_ext](file_path)
+        elif file_ext in self.supported_types:
+            parsed = _parsed(await self.supported_types[file_ext](file_path) or "")
+        else:
+            raise ValueError(f"不支持的文件类型: {file_ext}")
+
+        try:
+            parsed["metadata"] = {
+                **_file_metadata(file_path, file_ext),
+                **parsed["metadata"],
+            }
+        except Exception as e:
+            logger.warning(f"Failed to extract metadata: {e}")
+        return parsed
+
+
+# 提取进程内复用的服务实例（避免每个任务重复初始化MarkItDown）
+_worker_service: DocumentContentService | None = None
+
+
+def _get_worker_service() -> DocumentContentService:
+    global _worker_service
+    if _worker_service is None:
+        _worker_service = DocumentContentService()
+    return _worker_service
+
+
+def _extract_enhanced_in_worker(file_path: str, file_ext: str) -> dict[str, Any]:
+    """在提取进程中执行增强提取."""
+    return asyncio.run(
+        _get_worker_service().extract_content_enhanced(Path(file_path), file_ext)
+    )
+
+
+def _convert_with_markitdown_in_worker(
+    file_path: str, file_ext: str
+) -> dict[str, Any] | None:
+    """在提取进程中执行MarkItDown转换."""
+    return _get_worker_service().convert_with_markitdown(Path(file_path), file_ext)
+
+
+def _enhanced_result(text: str) -> dict[str, Any]:
+    """增强提取结果的默认字段."""
+    return {
+        "text": text,
+        "format": "plain_text",
+        "extraction_method": "default",
+        "metadata": {},
+        "has_tables": False,
+        "has_images": False,
+        "has_formulas": False,
+        "extraction_failed": text in EXTRACTION_FAILED_TEXTS,
+    }
+
+
+def _parsed(
+    text: str, metadata: dict[str, Any] | None = None, has_tables: bool = False
+) -> dict[str, Any]:
+    """默认解析器的单次解析结果."""
+    return {"text": text, "metadata": metadata or {}, "has_tables": has_tables}
+
+
+def _file_metadata(file_path: Path, file_ext: str) -> dict[str, Any]:
+    """文件系统信息（不打开文件）."""
+    stat = file_path.stat()
+    return {
+        "file_size": stat.st_size,
+        "created_time": stat.st_ctime,
+        "modified_time": stat.st_mtime,
+        "file_extension": file_ext,
+    }
+
+
+def _core_properties(properties: Any) -> dict[str, Any]:
+    """Office文档的核心属性."""
+    if not properties:
+        return {}
+    return {
+        "title": properties.title or "",
+        "author": properties.author or "",
+        "subject": properties.subject or "",
+        "created": str(properties.created) if properties.created else "",
+        "modified": str(properties.modified) if properties.modified else "",
+    }
+
+
+def _docx_metadata(doc: Any) -> dict[str, Any]:
+    """读取已打开的Word文档的元数据."""
+    return {
+        "paragraph_count": len(doc.paragraphs),
+        "table_count": len(doc.tables),
+        **_core_properties(doc.core_properties),
+    }
+
+
+def _pptx_metadata(prs: Any) -> dict[str, Any]:
+    """读取已打开的PowerPoint文档的元数据."""
+    return {
+        "slide_count": len(prs.slides),
+        **_core_properties(prs.core_properties),
+    }
+
+
+def _read_pdf_info(pdf: Any) -> dict[str, Any]:
+    """读取PDF页数和文档信息."""
+    metadata: dict[str, Any] = {
+        "page_count": len(pdf.pages),
+    }
+
+    # pdfplumber的元数据访问方式
+    if pdf.metadata:
+        metadata.update(
+            {
+                "title": pdf.metadata.get("Title", ""),
+                "author": pdf.metadata.get("Author", ""),
+                "subject": pdf.metadata.get("Subject", ""),
+                "creator": pdf.metadata.get("Creator", ""),
+                "producer": pdf.metadata.get("Producer", ""),
+                "creation_date": str(pdf.metadata.get("CreationDate", "")),
+                "modification_date": str(pdf.metadata.get("ModDate", "")),
+            }
+        )
+
+    return metadata
+
+
+def _extract_pdf_range(file_path: str, start: int, end: int | None) -> dict[str, Any]:
+    """提取PDF指定页范围的文本和表格（end 为 None 时到最后一页）.
+
+    Returns:
+        page_count、metadata（文档信息）和 pages（每页的文本块列表）
+    """
+    import pdfplumber
+
+    with pdfplumber.open(file_path) as pdf:
+        info = _read_pdf_info(pdf)
+        pages = []
+        for page in pdf.pages[start:end]:
+            parts = []
+            text = page.extract_text()
+            if text:
+                parts.append(text)
+
+            table_rows = []
+            for table in page.extract_tables():
+                if table:
+                    for row in table:
+                        table_rows.append(
+                            " | ".join(str(cell) if cell else "" for cell in row)
+                        )
+            parts.extend(table_rows)
+            pages.append({"parts": parts, "has_tables": bool(table_rows)})
+            # 释放页面缓存的解析对象，控制大文件的内存占用
+            page.close()
+
+    return {"page_count": info.pop("page_count"), "metadata": info, "pages": pages}
+
+
+def _form_feed_offsets(text: str) -> list[int]:
+    """按换页符得到每页起始偏移，没有换页符时返回空列表."""
+    if "\f" not in text:
+        return []
+    offsets = [0]
+    position = text.find("\f")
+    while position != -1:
+        offsets.append(position + 1)
+        position = text.find("\f", position + 1)
+    if offsets[-1] == len(text):
+        # 末尾的换页符不产生新页
+        offsets.pop()
+    return offsets
+
+
+def _assemble_pdf_pages(
+    pages: list[dict[str, Any]],
+) -> tuple[str, list[int], bool]:
+    """按页序拼接文本，返回（全文, 每页起始偏移, 是否包含表格）."""
+    blocks: list[str] = []
+    offsets: list[int] = []
+    cursor = 0
+    for page in pages:
+        block = "\n".join(page["parts"])
+        if block:
+            if blocks:
+                cursor += 1  # 页间换行符
+            offsets.append(cursor)
+            blocks.append(block)
+            cursor += len(block)
+        else:
+            offsets.append(cursor)
+
+    has_tables = any(page["has_tables"] for page in pages)
+    return "\n".join(blocks), offsets, has_tables
@@ -2,6 +2,7 @@
 
 import hashlib
 import logging
+from collections.abc import AsyncIterator
 from datetime import datetime
 from pathlib import Path
 from typing import Any
@@ -9,10 +10,16 @@ from typing import Any
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud
+from app.core.config import settings
+from app.core.process_pool import WorkerError
 from app.models.models import Document, User
 from app.schemas.documents import DocumentCreate
+from app.services.blob_service import blob_service
 from app.services.document_content_service import DocumentContentService
+from app.services.document_text_service import document_text_service
+from app.services.extraction_cache_service import extraction_cache_service
 from app.services.web_scraper_service import web_scraper_service
+from app.services.web_snapshot_service import SNAPSHOT_KEYS, web_snapshot_service
 
 
 class DocumentService:
@@ -21,7 +28,10 @@ class DocumentService:
     def __init__(self) -> None:
         self.logger = logging.getLogger(__name__)
         """初始化文档服务."""
-        self.content_service = DocumentContentService()
+        self.content_service = DocumentContentService(
+            use_process_pool=settings.EXTRACTION_POOL_ENABLED,
+            extraction_cache=extraction_cache_service,
+        )
 
     async def create_document(
         self,
@@ -32,15 +42,20 @@ class DocumentService:
         content_type: str,
         file_size: int,
         user: User,
+        file_hash: str | None = None,
     ) -> Document:
-        """创建文档记录."""
+        """创建文档记录.
+
+        file_hash 为原始文件字节的SHA-256；未提供时按内容（或文件信息）生成。
+        """
         # 生成文件hash - 处理content可能为None的情况
-        if content is not None:
-            file_hash = hashlib.sha256(content.encode()).hexdigest()
-        else:
-            # 对于二进制文件或无内容的文件，使用文件名和大小生成hash
-            hash_source = f"{filename}_{file_size}_{content_type}"
-            file_hash = hashlib.sha256(hash_source.encode()).hexdigest()
+        if file_hash is None:
+            if content is not None:
+                file_hash = hashlib.sha256(content.encode()).hexdigest()
+            else:
+                # 对于二进制文件或无内容的文件，使用文件名和大小生成hash
+                hash_source = f"{filename}_{file_size}_{content_type}"
+                file_hash = hashlib.sha256(hash_source.encode()).hexdigest()
 
         # 检查文档是否已存在
         existing = await crud.crud_document.get_by_hash(
@@ -57,6 +72,9 @@ class DocumentService:
             space_id=space_id,
         )
 
+        # 全文存入独立的分块表，文档行只保留前缀和预览
+        text_fields = await document_text_service.store_text(db, content or "")
+
         # 创建文档
         document = await crud.crud_document.create(
             db,
@@ -65,7 +83,7 @@ class DocumentService:
             file_path=f"spaces/{space_id}/documents/{file_hash}",
             file_hash=file_hash,
             original_filename=filename,
-            content=content[:1000] if content is not None else "",  # 存储前1000字符作为预览，若为None则存储空字符串
+            **text_fields,
             processing_status="completed",
             extraction_status="completed",
             embedding_status="pending",
@@ -126,6 +144,15 @@ class DocumentService:
 
         # 删除文档
         await crud.crud_document.remove(db, id=document.id)
+
+        # 释放原始文件引用（引用归零后由回收任务删除）；没有其他文档引用时删除全文
+        await blob_service.release(db, document.file_path)
+        await document_text_service.release(db, document.content_hash)
+        meta_data = document.meta_data or {}
+        await web_snapshot_service.release(
+            db, *(meta_data.get(key) for key in SNAPSHOT_KEYS)
+        )
+        await db.commit()
         return True
 
     async def search_documents(
@@ -172,7 +199,29 @@ class DocumentService:
         try:
             # 抓取网页
             web_data = await web_scraper_service.fetch_webpage(url)
+        except Exception as e:
+            return {
+                "status": "error",
+                "error": str(e),
+                "url": url
+            }
+        return await self._save_web_page(
+            db, url, web_data, space_id, user, title, tags, save_snapshot
+        )
 
+    async def _save_web_page(
+        self,
+        db: AsyncSession,
+        url: str,
+        web_data: dict[str, Any],
+        space_id: int,
+        user: User,
+        title: str | None = None,
+        tags: list[str] | None = None,
+        save_snapshot: bool = True,
+    ) -> dict[str, Any]:
+        """把抓取结果保存为文档."""
+        try:
             if web_data["status"] != "success":
                 return {
                     "status": "error",
@@ -209,9 +258,13 @@ class DocumentService:
                 "has_snapshot": save_snapshot
             }
 
-            # 如果保存快照，将其存储在meta_data中
+            # 快照压缩后存入原始文件存储，meta_data只保存对象键
             if snapshot_html:
-                meta_data["snapshot_html"] = snapshot_html
+                meta_data.update(
+                    await web_snapshot_service.save(
+                        db, snapshot_html, web_data.get("snapshot_markdown")
+                    )
+                )
 
             # 创建文档schema
             document_in = DocumentCreate(
@@ -223,6 +276,9 @@ class DocumentService:
                 meta_data=meta_data,
             )
 
+            # 全文存入独立的分块表，文档行只保留前缀和预览
+            text_fields = await document_text_service.store_text(db, content or "")
+
             # 创建文档记录
             document = await crud.crud_document.create(
                 db,
@@ -232,10 +288,10 @@ class DocumentService:
                 file_hash=file_hash,
                 original_filename=doc_title,
                 title=doc_title,
-                content=content,
+                **text_fields,
                 processing_status="completed",
                 extraction_status="completed",
-                url=url,  # 保存原始URL
+                file_url=url,  # 保存原始URL
             )
 
             # 更新空间统计
@@ -255,6 +311,9 @@ class DocumentService:
             }
 
         except Exception as e:
+            # 撤销未提交的快照引用，批量导入时会话可以继续使用
+            await db.rollback()
+            await db.refresh(user)
             return {
                 "status": "error",
                 "error": str(e),
@@ -270,17 +329,40 @@ class DocumentService:
         tags: list[str] | None = None,
         save_snapshot: bool = True,
     ) -> list[dict[str, Any]]:
-        """批量导入多个URL."""
-        results = []
-
-        for url in urls:
-            result = await self.import_from_url(
-                db, url, space_id, user, tags=tags, save_snapshot=save_snapshot
+        """批量导入多个URL，结果按输入顺序返回."""
+        results = [
+            result
+            async for result in self.iter_import_urls(
+                db, urls, space_id, user, tags=tags, save_snapshot=save_snapshot
             )
-            results.append(result)
-
+        ]
+        results.sort(key=lambda result: urls.index(result["url"]))
         return results
 
+    async def iter_import_urls(
+        self,
+        db: AsyncSession,
+        urls: list[str],
+        space_id: int,
+        user: User,
+        tags: list[str] | None = None,
+        save_snapshot: bool = True,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """批量导入多个URL，按抓取完成顺序逐个返回结果.
+
+        网页并发抓取，写入数据库仍在同一会话中依次执行。
+        """
+        async for web_data in web_scraper_service.iter_webpages(urls):
+            yield await self._save_web_page(
+                db,
+                web_data["url"],
+                web_data,
+                space_id,
+                user,
+                tags=tags,
+                save_snapshot=save_snapshot,
+            )
+
     async def get_web_snapshot(
         self,
         db: AsyncSession,
@@ -305,13 +387,10 @@ class DocumentService:
             "created_at": document.created_at,
         }
 
-        # 获取快照HTML
-        if "snapshot_html" in document.meta_data:
-            snapshot_data["snapshot_html"] = document.meta_data["snapshot_html"]
-            # 转换为Markdown
-            snapshot_data["snapshot_markdown"] = web_scraper_service.convert_to_markdown(
-                document.meta_data["snapshot_html"]
-            )
+        # 获取快照HTML和导入时生成的Markdown
+        snapshot = await web_snapshot_service.load(document.meta_data)
+        if snapshot:
+            snapshot_data.update(snapshot)
 
         return snapshot_data
 
@@ -337,10 +416,12 @@ class DocumentService:
             # 分析内容
             word_count = len(content.split())
 
-            # 提取链接
-            links = web_scraper_service.extract_links(
-                web_data.get("snapshot_html", ""), url
-            )
+            # 提取链接（抓取时已解析；缓存命中的结果没有链接，重新提取）
+            links = web_data.get("links")
+            if links is None:
+                links = web_scraper_service.extract_links(
+                    web_data.get("snapshot_html", ""), url
+                )
 
             # 简单的标签建议（基于标题和描述）
             suggested_tags = []
@@ -381,15 +462,42 @@ class DocumentService:
         user: User,
         title: str | None = None,
         original_filename: str | None = None,
+        file_hash: str | None = None,
     ) -> Document:
-        """从文件创建文档记录，包含内容提取."""
+        """从文件创建文档记录，包含内容提取.
+
+        提供原始文件字节的 file_hash 时先按哈希去重，重复文件不会再解析。
+        """
         try:
             # 获取文件信息
             file_ext = file_path.suffix.lower()
             file_size = file_path.stat().st_size
 
+            if file_hash is not None:
+                existing = await crud.crud_document.get_by_hash(
+                    db, file_hash=file_hash, space_id=space_id
+                )
+                if existing:
+                    return existing
+
             # 使用增强的内容提取
-            extraction_result = await self.content_service.extract_content_enhanced(file_path, file_ext)
+            try:
+                extraction_result = await self.content_service.extract_content_enhanced(
+                    file_path, file_ext, file_hash=file_hash
+                )
+            except WorkerError as e:
+                # 超时或内存超限的文件记为提取失败，不阻塞上传
+                self.logger.error(f"文档提取失败 {original_filename or file_path.name}: {e}")
+                return await self._create_failed_document(
+                    db,
+                    space_id=space_id,
+                    file_path=file_path,
+                    user=user,
+                    title=title,
+                    original_filename=original_filename,
+                    file_hash=file_hash,
+                    error=str(e),
+                )
             content = extraction_result["text"]
             metadata = extraction_result["metadata"]
 
@@ -400,24 +508,30 @@ class DocumentService:
             metadata["has_images"] = extraction_result["has_images"]
             metadata["has_formulas"] = extraction_result["has_formulas"]
 
-            # 生成文件hash - 处理content可能为None的情况
-            if content is not None:
-                file_hash = hashlib.sha256(content.encode()).hexdigest()
-            else:
-                # 如果内容提取失败，使用文件信息生成hash
-                hash_source = f"{original_filename or title or file_path.name}_{file_size}_{file_ext}"
-                file_hash = hashlib.sha256(hash_source.encode()).hexdigest()
-                self.logger.warning(f"Content extraction returned None for {original_filename or title or file_path.name}, using fallback hash")
-
-            # 检查文档是否已存在
-            existing = await crud.crud_document.get_by_hash(
-                db, file_hash=file_hash, space_id=space_id
-            )
-            if existing:
-                return existing
+            # 未提供原始字节哈希时，按内容生成hash并去重
+            if file_hash is None:
+                if content is not None:
+                    file_hash = hashlib.sha256(content.encode()).hexdigest()
+                else:
+                    # 如果内容提取失败，使用文件信息生成hash
+                    hash_source = f"{original_filename or title or file_path.name}_{file_size}_{file_ext}"
+                    file_hash = hashlib.sha256(hash_source.encode()).hexdigest()
+                    self.logger.warning(f"Content extraction returned None for {original_filename or title or file_path.name}, using fallback hash")
+
+                # 检查文档是否已存在
+                existing = await crud.crud_document.get_by_hash(
+                    db, file_hash=file_hash, space_id=space_id
+                )
+                if existing:
+                    return existing
 
             # 统一使用original_filename
             final_filename = original_filename or title or file_path.name
+
+            # 全文存入独立的分块表，文档行只保留前缀、预览和页索引
+            text_fields = await document_text_service.store_text(
+                db, content or "", metadata.pop("page_offsets", None)
+            )
             
             # 创建文档schema
             document_in = DocumentCreate(
@@ -437,7 +551,7 @@ class DocumentService:
                 file_hash=file_hash,
                 original_filename=final_filename,  # 使用正确的原始文件名
                 title=title or metadata.get("title", final_filename),
-                content=content[:1000],  # 存储前1000字符作为预览
+                **text_fields,
                 processing_status="completed",
                 extraction_status="completed",
                 embedding_status="pending",
@@ -453,6 +567,53 @@ class DocumentService:
         except Exception as e:
             raise Exception(f"创建文档失败: {str(e)}") from e
 
+    async def _create_failed_document(
+        self,
+        db: AsyncSession,
+        space_id: int,
+        file_path: Path,
+        user: User,
+        title: str | None,
+        original_filename: str | None,
+        file_hash: str | None,
+        error: str,
+    ) -> Document:
+        """创建提取失败的文档记录."""
+        file_ext = file_path.suffix.lower()
+        file_size = file_path.stat().st_size
+        final_filename = original_filename or title or file_path.name
+
+        if file_hash is None:
+            hash_source = f"{final_filename}_{file_size}_{file_ext}"
+            file_hash = hashlib.sha256(hash_source.encode()).hexdigest()
+
+        document_in = DocumentCreate(
+            filename=final_filename,
+            content_type=self._get_content_type(file_ext),
+            size=file_size,
+            space_id=space_id,
+            meta_data={"extraction_error": error},
+        )
+        document = await crud.crud_document.create(
+            db,
+            obj_in=document_in,
+            user_id=user.id,
+            file_path=f"spaces/{space_id}/documents/{file_hash}",
+            file_hash=file_hash,
+            original_filename=final_filename,
+            title=title or final_filename,
+            content="",
+            processing_status="failed",
+            extraction_status="failed",
+            embedding_status="pending",
+        )
+
+        await crud.crud_space.update_stats(
+            db, space_id=space_id, document_delta=1, size_delta=file_size
+        )
+
+        return document
+
     async def extract_document_content(
         self,
         file_path: Path,
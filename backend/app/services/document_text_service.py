@@ -0,0 +1,289 @@
+"""Out-of-row storage for full extracted document text."""
+
+import asyncio
+import bisect
+import hashlib
+import logging
+import sys
+import zlib
+from array import array
+from typing import Any
+
+from sqlalchemy import delete, func, select
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.exc import IntegrityError, NoInspectionAvailable
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.full_text import MAX_INDEXED_CHARS
+from app.models.models import Document, DocumentTextChunk, ExtractionCache
+
+logger = logging.getLogger(__name__)
+
+# Document.content 保存的正文前缀长度
+CONTENT_EXCERPT_CHARS = 1000
+
+# 超过该大小的压缩/解压放到线程中执行，避免阻塞事件循环
+_OFFLOAD_THRESHOLD = 256 * 1024
+
+
+def encode_page_offsets(offsets: list[int] | None) -> bytes | None:
+    """把每页起始偏移编码为紧凑的 uint32 小端数组."""
+    if not offsets:
+        return None
+    packed = array("I", offsets)
+    if sys.byteorder != "little":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def decode_page_offsets(data: bytes | None) -> list[int]:
+    """解码 encode_page_offsets 的结果."""
+    if not data:
+        return []
+    packed = array("I")
+    packed.frombytes(data)
+    if sys.byteorder != "little":
+        packed.byteswap()
+    return packed.tolist()
+
+
+class DocumentTextService:
+    """文档全文存储服务.
+
+    全文按内容哈希去重，切块压缩后存入 document_text_chunks，文档行只保存
+    正文前缀、哈希、长度和短预览。需要全文的地方按需加载，也可以只读取某个
+    字符范围。全文检索的索引来源单独存于默认不加载的 Document.search_text。
+    没有 content_hash 的旧文档回退到 Document.content。
+    PDF 等分页文档额外记录每页的起始偏移，单页文本可以按范围读取。
+    """
+
+    def __init__(
+        self, chunk_chars: int | None = None, preview_chars: int | None = None
+    ) -> None:
+        self.chunk_chars = chunk_chars or settings.DOCUMENT_TEXT_CHUNK_CHARS
+        self.preview_chars = min(preview_chars or settings.DOCUMENT_PREVIEW_CHARS, 500)
+
+    @staticmethod
+    def make_search_text(text: str) -> str | None:
+        """全文检索的索引来源（只索引全文开头的一段）."""
+        return text[:MAX_INDEXED_CHARS] or None
+
+    def make_preview(self, text: str) -> str:
+        """生成列表预览（压缩空白后截断）."""
+        preview = " ".join(text[: self.preview_chars * 2].split())
+        return preview[: self.preview_chars]
+
+    def _compress(self, text: str) -> list[tuple[int, int, bytes]]:
+        return [
+            (
+                offset,
+                len(text[offset : offset + self.chunk_chars]),
+                zlib.compress(text[offset : offset + self.chunk_chars].encode("utf-8")),
+            )
+            for offset in range(0, len(text), self.chunk_chars)
+        ]
+
+    @staticmethod
+    def _decompress(blobs: list[bytes]) -> str:
+        return "".join(zlib.decompress(blob).decode("utf-8") for blob in blobs)
+
+    async def store_text(
+        self, db: AsyncSession, text: str, page_offsets: list[int] | None = None
+    ) -> dict[str, Any]:
+        """存储全文，返回需要写入文档行的字段.
+
+        相同内容只存一份。调用方负责提交事务。
+
+        Args:
+            page_offsets: 每页在全文中的起始字符位置（提取时记录）
+        """
+        if not text:
+            return {
+                "content": text,
+                "search_text": None,
+                "preview": text,
+                "content_hash": None,
+                "content_length": 0,
+                "page_offsets": None,
+            }
+
+        content_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        if not await self._exists(db, content_hash):
+            if len(text) > _OFFLOAD_THRESHOLD:
+                chunks = await asyncio.to_thread(self._compress, text)
+            else:
+                chunks = self._compress(text)
+            try:
+                # 并发写入相同内容时只保留先提交的一份
+                async with db.begin_nested():
+                    db.add_all(
+                        DocumentTextChunk(
+                            content_hash=content_hash,
+                            seq=seq,
+                            char_offset=offset,
+                            char_count=count,
+                            data=data,
+                        )
+                        for seq, (offset, count, data) in enumerate(chunks)
+                    )
+            except IntegrityError:
+                logger.info(f"全文 {content_hash[:12]} 已由其他请求写入")
+
+        return {
+            "content": text[:CONTENT_EXCERPT_CHARS],
+            "search_text": self.make_search_text(text),
+            "preview": self.make_preview(text),
+            "content_hash": content_hash,
+            "content_length": len(text),
+            "page_offsets": encode_page_offsets(page_offsets),
+        }
+
+    async def _exists(self, db: AsyncSession, content_hash: str) -> bool:
+        result = await db.execute(
+            select(DocumentTextChunk.id)
+            .where(DocumentTextChunk.content_hash == content_hash)
+            .limit(1)
+        )
+        return result.scalar() is not None
+
+    async def get_text(self, db: AsyncSession, document: Document) -> str | None:
+        """加载文档全文."""
+        if not document.content_hash:
+            return document.content
+
+        text = await self.get_text_by_hash(db, document.content_hash)
+        if text is None:
+            logger.warning(f"文档 {document.id} 的全文缺失，使用正文前缀")
+            return document.content
+        return text
+
+    async def get_text_by_hash(self, db: AsyncSession, content_hash: str) -> str | None:
+        """按内容哈希加载全文，不存在时返回 None."""
+        result = await db.execute(
+            select(DocumentTextChunk.data)
+            .where(DocumentTextChunk.content_hash == content_hash)
+            .order_by(DocumentTextChunk.seq)
+        )
+        blobs = list(result.scalars().all())
+        if not blobs:
+            return None
+        if sum(len(blob) for blob in blobs) > _OFFLOAD_THRESHOLD:
+            return await asyncio.to_thread(self._decompress, blobs)
+        return self._decompress(blobs)
+
+    async def read_range(
+        self,
+        db: AsyncSession,
+        document: Document,
+        start: int = 0,
+        end: int | None = None,
+    ) -> str:
+        """读取全文的 [start, end) 字符范围，只解压涉及的块."""
+        if not document.content_hash:
+            if self._content_loaded(document):
+                return (document.content or "")[start:end]
+            # 正文未加载时由数据库截取，不把整列读进内存
+            if end is not None and start >= end:
+                return ""
+            length = (end - start) if end is not None else None
+            substr = (
+                func.substr(Document.content, start + 1, length)
+                if length is not None
+                else func.substr(Document.content, start + 1)
+            )
+            result = await db.execute(select(substr).where(Document.id == document.id))
+            return result.scalar() or ""
+
+        total = document.content_length or 0
+        end = total if end is None else min(end, total)
+        if start >= end:
+            return ""
+
+        result = await db.execute(
+            select(DocumentTextChunk.char_offset, DocumentTextChunk.data)
+            .where(
+                DocumentTextChunk.content_hash == document.content_hash,
+                DocumentTextChunk.char_offset < end,
+                DocumentTextChunk.char_offset + DocumentTextChunk.char_count > start,
+            )
+            .order_by(DocumentTextChunk.seq)
+        )
+        rows = result.all()
+        if not rows:
+            logger.warning(f"文档 {document.id} 的全文缺失，使用正文前缀")
+            return (document.content or "")[start:end]
+
+        first_offset = rows[0].char_offset
+        text = self._decompress([row.data for row in rows])
+        return text[start - first_offset : end - first_offset]
+
+    async def read_page(
+        self, db: AsyncSession, document: Document, page: int
+    ) -> str | None:
+        """读取第 page 页（从1开始）的文本.
+
+        按页偏移只读取该页涉及的块；没有页索引或页码超出范围时返回 None。
+        """
+        offsets = decode_page_offsets(document.page_offsets)
+        if not 1 <= page <= len(offsets):
+            return None
+        start = offsets[page - 1]
+        end = offsets[page] if page < len(offsets) else None
+        text = await self.read_range(db, document, start, end)
+        # 去掉页间分隔符
+        return text.rstrip("\n\f")
+
+    @staticmethod
+    def page_of(document: Document, char_offset: int) -> int | None:
+        """全文字符位置所在的页码（从1开始），没有页索引时返回 None."""
+        offsets = decode_page_offsets(document.page_offsets)
+        if not offsets:
+            return None
+        return max(bisect.bisect_right(offsets, char_offset), 1)
+
+    def get_length(self, document: Document) -> int:
+        """全文字符数."""
+        if document.content_hash and document.content_length is not None:
+            return document.content_length
+        return len(document.content or "")
+
+    async def load_length(self, db: AsyncSession, document: Document) -> int:
+        """全文字符数，旧文档正文未加载时由数据库计算."""
+        if document.content_hash and document.content_length is not None:
+            return document.content_length
+        if self._content_loaded(document):
+            return len(document.content or "")
+        result = await db.execute(
+            select(func.length(Document.content)).where(Document.id == document.id)
+        )
+        return result.scalar() or 0
+
+    @staticmethod
+    def _content_loaded(document: Document) -> bool:
+        """文档的正文列是否已加载（按需读取的查询会延迟加载正文）."""
+        try:
+            return "content" not in sa_inspect(document).unloaded
+        except NoInspectionAvailable:
+            return True
+
+    async def release(self, db: AsyncSession, content_hash: str | None) -> bool:
+        """没有文档和提取缓存再引用时删除全文. 调用方负责提交事务."""
+        if not content_hash:
+            return False
+        for model in (Document, ExtractionCache):
+            result = await db.execute(
+                select(func.count())
+                .select_from(model)
+                .where(model.content_hash == content_hash)
+            )
+            if result.scalar():
+                return False
+        await db.execute(
+            delete(DocumentTextChunk).where(DocumentTextChunk.content_hash == content_hash)
+        )
+        return True
+
+
+# 创建全局实例
+document_text_service = DocumentTextService()
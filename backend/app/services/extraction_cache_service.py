@@ -0,0 +1,187 @@
+"""Persistent cache of document extraction results keyed by raw file hash."""
+
+import logging
+from collections.abc import Callable
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import async_session_factory
+from app.models.models import Blob, ExtractionCache
+from app.services.blob_service import BlobService, blob_service
+from app.services.document_content_service import (
+    EXTRACTOR_VERSION,
+    DocumentContentService,
+)
+from app.services.document_text_service import document_text_service
+
+logger = logging.getLogger(__name__)
+
+
+class ExtractionCacheService:
+    """提取结果缓存服务.
+
+    相同文件（多人上传的同一篇论文、删除后重新上传的文件）只解析一次。
+    条目按原始文件SHA-256存储并记录提取器版本，版本变化后旧条目在读取时
+    视为未命中，重新提取后覆盖；也可以用 refresh_stale() 批量重新提取。
+    缓存读写失败只记录日志，不影响提取本身。
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = async_session_factory,
+        version: str = EXTRACTOR_VERSION,
+        blobs: BlobService | None = None,
+    ) -> None:
+        self.session_factory = session_factory
+        self.version = version
+        self.blobs = blobs or blob_service
+
+    async def get(self, file_hash: str) -> dict[str, Any] | None:
+        """读取当前版本的提取结果，结构同 extract_content_enhanced."""
+        try:
+            async with self.session_factory() as db:
+                entry = await self._get_entry(db, file_hash)
+                if entry is None or entry.extractor_version != self.version:
+                    return None
+                text = ""
+                if entry.content_hash:
+                    stored = await document_text_service.get_text_by_hash(
+                        db, entry.content_hash
+                    )
+                    if stored is None:
+                        return None
+                    text = stored
+        except Exception as e:
+            logger.warning(f"读取提取缓存失败 {file_hash[:12]}: {e}")
+            return None
+
+        logger.debug(f"提取缓存命中: {file_hash[:12]}")
+        return {
+            "text": text,
+            "format": entry.content_format,
+            "extraction_method": entry.extraction_method,
+            "metadata": dict(entry.meta_data or {}),
+            "has_tables": entry.has_tables,
+            "has_images": entry.has_images,
+            "has_formulas": entry.has_formulas,
+            "extraction_failed": False,
+        }
+
+    async def put(
+        self, file_hash: str, file_ext: str | None, result: dict[str, Any]
+    ) -> bool:
+        """写入或覆盖提取结果.
+
+        Returns:
+            是否写入。提取失败的结果（extraction_failed）不缓存，
+            下次上传相同文件时重新提取。
+        """
+        if result.get("extraction_failed"):
+            logger.info(f"提取失败，不写入缓存: {file_hash[:12]}")
+            return False
+        try:
+            async with self.session_factory() as db:
+                fields = await document_text_service.store_text(
+                    db, result.get("text") or ""
+                )
+                values = {
+                    "extractor_version": self.version,
+                    "file_ext": file_ext,
+                    "content_hash": fields["content_hash"],
+                    "content_length": fields["content_length"],
+                    "content_format": result.get("format"),
+                    "extraction_method": result.get("extraction_method"),
+                    "has_tables": bool(result.get("has_tables")),
+                    "has_images": bool(result.get("has_images")),
+                    "has_formulas": bool(result.get("has_formulas")),
+                    "meta_data": result.get("metadata") or {},
+                }
+                entry = await self._get_entry(db, file_hash)
+                if entry is None:
+                    db.add(ExtractionCache(file_hash=file_hash, **values))
+                else:
+                    old_hash = entry.content_hash
+                    for field, value in values.items():
+                        setattr(entry, field, value)
+                    if old_hash and old_hash != entry.content_hash:
+                        # 旧版本的全文不再被缓存引用
+                        await db.flush()
+                        await document_text_service.release(db, old_hash)
+                try:
+                    await db.commit()
+                except IntegrityError:
+                    # 并发提取了相同文件，保留先提交的结果
+                    await db.rollback()
+                    return False
+        except Exception as e:
+            logger.warning(f"写入提取缓存失败 {file_hash[:12]}: {e}")
+            return False
+        return True
+
+    async def get_stale(self, limit: int = 100) -> list[ExtractionCache]:
+        """提取器版本已过期的条目."""
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(ExtractionCache)
+                .where(ExtractionCache.extractor_version != self.version)
+                .order_by(ExtractionCache.id)
+                .limit(limit)
+            )
+            return list(result.scalars().all())
+
+    async def refresh_stale(
+        self,
+        limit: int = 100,
+        content_service: DocumentContentService | None = None,
+    ) -> int:
+        """用当前提取器重新提取过期条目.
+
+        只处理原始文件仍在存储中的条目；原始文件已回收的条目保留，
+        再次上传时按版本判断未命中并重新提取。
+
+        Returns:
+            重新提取的条目数
+        """
+        content_service = content_service or DocumentContentService(
+            use_process_pool=settings.EXTRACTION_POOL_ENABLED
+        )
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(ExtractionCache.file_hash, ExtractionCache.file_ext, Blob.storage_key)
+                .join(Blob, Blob.sha256 == ExtractionCache.file_hash)
+                .where(ExtractionCache.extractor_version != self.version)
+                .order_by(ExtractionCache.id)
+                .limit(limit)
+            )
+            stale = result.all()
+
+        refreshed = 0
+        for file_hash, file_ext, storage_key in stale:
+            try:
+                async with self.blobs.open_local(storage_key, file_ext or "") as file_path:
+                    extraction = await content_service.extract_content_enhanced(
+                        file_path, file_ext
+                    )
+            except Exception as e:
+                logger.error(f"重新提取 {file_hash[:12]} 失败: {e}")
+                continue
+            if await self.put(file_hash, file_ext, extraction):
+                refreshed += 1
+        if refreshed:
+            logger.info(f"重新提取 {refreshed} 个过期的缓存条目")
+        return refreshed
+
+    @staticmethod
+    async def _get_entry(db: AsyncSession, file_hash: str) -> ExtractionCache | None:
+        result = await db.execute(
+            select(ExtractionCache).where(ExtractionCache.file_hash == file_hash)
+        )
+        return result.scalar_one_or_none()
+
+
+# 创建全局实例
+extraction_cache_service = ExtractionCacheService()
@@ -0,0 +1,279 @@
+"""Single-pass HTML extraction engines for the web scraper."""
+
+import logging
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any
+from urllib.parse import urlparse
+
+from bs4 import BeautifulSoup
+from bs4.element import Tag
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+MAX_CONTENT_CHARS = 50000  # 正文最多50k字符
+
+# 按 name 属性读取的 meta 字段
+NAME_META = ("description", "keywords", "author")
+# 按 property 属性读取的 meta 字段（Open Graph 和发布时间）
+PROPERTY_META = {
+    "og:title": "og_title",
+    "og:description": "og_description",
+    "og:image": "og_image",
+    "article:published_time": "published_time",
+}
+
+MARKDOWN_TAGS = ("h1", "h2", "h3", "h4", "h5", "h6", "p", "ul", "ol", "blockquote")
+
+
+@dataclass
+class ExtractedPage:
+    """一次解析得到的页面内容."""
+
+    title: str | None  # <title> 文本，页面没有标题时为 None
+    meta: dict[str, str] = field(default_factory=dict)  # 描述、关键词、Open Graph等
+    content: str = ""  # 清理后的正文
+    links: list[str] = field(default_factory=list)  # 绝对链接（去重）
+    markdown: str = ""
+    snapshot_html: str = ""  # 移除脚本和样式后的页面
+
+
+def clean_text(text: str) -> str:
+    """清理文本内容：去掉空行，段落之间空一行，超长截断."""
+    lines = [line.strip() for line in text.splitlines()]
+    cleaned = "\n\n".join(line for line in lines if line)
+    if len(cleaned) > MAX_CONTENT_CHARS:
+        cleaned = cleaned[:MAX_CONTENT_CHARS] + "..."
+    return cleaned
+
+
+def absolute_link(href: Any, base_url: str) -> str | None:
+    """把 href 转换为绝对URL，无法识别的形式返回 None."""
+    if not href or not isinstance(href, str):
+        return None
+    if href.startswith("http"):
+        return href
+    if href.startswith("/"):
+        parsed = urlparse(base_url)
+        return f"{parsed.scheme}://{parsed.netloc}{href}"
+    return None
+
+
+def _markdown_lines(name: str, text: str, items: list[str]) -> list[str]:
+    """单个块级元素对应的Markdown行."""
+    if name.startswith("h"):
+        return [f"{'#' * int(name[1])} {text.strip()}", ""]
+    if name == "p":
+        stripped = text.strip()
+        return [stripped, ""] if stripped else [""]
+    if name in ("ul", "ol"):
+        prefix = "-" if name == "ul" else "1."
+        return [f"{prefix} {item.strip()}" for item in items] + [""]
+    # blockquote
+    quoted = [f"> {line.strip()}" for line in text.strip().split("\n") if line.strip()]
+    return quoted + [""]
+
+
+class HtmlExtractor(ABC):
+    """HTML解析引擎：解析一次，同时得到正文、元数据、链接和Markdown."""
+
+    name = "base"
+
+    @abstractmethod
+    def extract(self, html: str, url: str) -> ExtractedPage:
+        """解析页面."""
+
+
+class SoupExtractor(HtmlExtractor):
+    """BeautifulSoup 引擎（默认 html.parser，纯Python实现）."""
+
+    def __init__(self, parser: str = "html.parser") -> None:
+        self.parser = parser
+        self.name = parser
+
+    def extract(self, html: str, url: str) -> ExtractedPage:
+        soup = BeautifulSoup(html, self.parser)
+        title, meta = self.metadata(soup)
+        content = self.content(soup)
+        return ExtractedPage(
+            title=title,
+            meta=meta,
+            content=content,
+            links=self.links(soup, url),
+            markdown=self.markdown(soup),
+            snapshot_html=str(soup),
+        )
+
+    @staticmethod
+    def metadata(soup: BeautifulSoup) -> tuple[str | None, dict[str, str]]:
+        """页面标题和 meta 字段."""
+        title_tag = soup.find("title")
+        title = title_tag.text.strip() if title_tag else None
+
+        meta: dict[str, str] = {}
+        candidates = [(key, soup.find("meta", attrs={"name": key})) for key in NAME_META]
+        candidates += [
+            (key, soup.find("meta", property=prop)) for prop, key in PROPERTY_META.items()
+        ]
+        for key, tag in candidates:
+            if isinstance(tag, Tag):
+                value = tag.get("content")
+                if value:
+                    meta[key] = str(value).strip()
+        return title, meta
+
+    @staticmethod
+    def content(soup: BeautifulSoup) -> str:
+        """提取主要内容（会移除脚本和样式）."""
+        for script in soup(["script", "style"]):
+            script.decompose()
+
+        # 尝试查找主要内容区域
+        content_areas = [
+            soup.find("main"),
+            soup.find("article"),
+            soup.find("div", class_="content"),
+            soup.find("div", class_="main"),
+            soup.find("div", id="content"),
+            soup.find("div", id="main"),
+        ]
+        for area in content_areas:
+            if area:
+                return clean_text(area.get_text())
+
+        # 如果找不到特定区域，提取body内容
+        body = soup.find("body")
+        if body:
+            return clean_text(body.get_text())
+
+        # 最后尝试提取所有文本
+        return clean_text(soup.get_text())
+
+    @staticmethod
+    def links(soup: BeautifulSoup, base_url: str) -> list[str]:
+        """页面中的所有链接."""
+        links = {
+            absolute_link(tag.get("href"), base_url)
+            for tag in soup.find_all("a", href=True)
+            if isinstance(tag, Tag)
+        }
+        return list(links - {None})  # type: ignore[arg-type]
+
+    @staticmethod
+    def markdown(soup: BeautifulSoup) -> str:
+        """简单的HTML到Markdown转换."""
+        lines: list[str] = []
+        for element in soup.find_all(list(MARKDOWN_TAGS)):
+            if isinstance(element, Tag) and element.name:
+                name = str(element.name)
+                items = (
+                    [li.get_text() for li in element.find_all("li")]
+                    if name in ("ul", "ol")
+                    else []
+                )
+                lines.extend(_markdown_lines(name, element.get_text(), items))
+        return "\n".join(lines)
+
+
+class LxmlExtractor(HtmlExtractor):
+    """lxml 引擎（libxml2 实现，比 html.parser 快一个数量级）."""
+
+    name = "lxml"
+
+    _CONTENT_AREAS = (
+        ".//main",
+        ".//article",
+        ".//div[contains(concat(' ', normalize-space(@class), ' '), ' content ')]",
+        ".//div[contains(concat(' ', normalize-space(@class), ' '), ' main ')]",
+        ".//div[@id='content']",
+        ".//div[@id='main']",
+    )
+
+    def extract(self, html: str, url: str) -> ExtractedPage:
+        from lxml import etree
+        from lxml import html as lxml_html
+
+        if not html.strip():
+            return ExtractedPage(title=None)
+        # 传入字节，避免带编码声明的页面被拒绝
+        parser = lxml_html.HTMLParser(encoding="utf-8")
+        doc = lxml_html.document_fromstring(html.encode("utf-8"), parser=parser)
+
+        title_tag = doc.find(".//title")
+        title = title_tag.text_content().strip() if title_tag is not None else None
+        meta = self._metadata(doc)
+
+        etree.strip_elements(doc, "script", "style", with_tail=False)
+
+        area = next(
+            (
+                found[0]
+                for path in self._CONTENT_AREAS
+                if (found := doc.xpath(path))
+            ),
+            None,
+        )
+        if area is None:
+            area = doc.find("body")
+        content = clean_text((area if area is not None else doc).text_content())
+
+        links = {absolute_link(tag.get("href"), url) for tag in doc.iter("a")}
+
+        lines: list[str] = []
+        for element in doc.iter(*MARKDOWN_TAGS):
+            items = (
+                [li.text_content() for li in element.iter("li")]
+                if element.tag in ("ul", "ol")
+                else []
+            )
+            lines.extend(_markdown_lines(element.tag, element.text_content(), items))
+
+        return ExtractedPage(
+            title=title,
+            meta=meta,
+            content=content,
+            links=list(links - {None}),  # type: ignore[arg-type]
+            markdown="\n".join(lines),
+            snapshot_html=lxml_html.tostring(doc, encoding="unicode"),
+        )
+
+    @staticmethod
+    def _metadata(doc: Any) -> dict[str, str]:
+        # 每个字段只看第一个匹配的 meta 标签
+        found: dict[str, Any] = {}
+        for tag in doc.iter("meta"):
+            name = tag.get("name")
+            if name in NAME_META:
+                found.setdefault(name, tag)
+            prop = tag.get("property")
+            if prop in PROPERTY_META:
+                found.setdefault(PROPERTY_META[prop], tag)
+
+        meta = {}
+        for key in (*NAME_META, *PROPERTY_META.values()):
+            tag = found.get(key)
+            if tag is not None and tag.get("content"):
+                meta[key] = tag.get("content").strip()
+        return meta
+
+
+def create_html_extractor(engine: str | None = None) -> HtmlExtractor:
+    """按配置创建解析引擎.
+
+    auto 在安装了 lxml 时使用 lxml 引擎，否则使用 html.parser。
+    """
+    engine = engine or settings.HTML_EXTRACTOR
+    if engine in ("auto", "lxml"):
+        try:
+            import lxml.html  # noqa: F401
+
+            return LxmlExtractor()
+        except ImportError:
+            if engine == "lxml":
+                raise
+            logger.info("lxml 未安装，网页解析使用 html.parser")
+    elif engine != "html.parser":
+        raise ValueError(f"未知的HTML解析引擎: {engine}")
+    return SoupExtractor()
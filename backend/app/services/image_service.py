@@ -0,0 +1,158 @@
+"""Image preprocessing for multimodal chat requests."""
+
+import base64
+import hashlib
+import io
+import logging
+from pathlib import Path
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ImageService:
+    """图片预处理服务 - 缩放并重新编码图片以减小多模态请求体积."""
+
+    # 扩展名到MIME类型的映射（无法重新编码时使用原始数据）
+    MIME_TYPES = {
+        ".jpg": "image/jpeg",
+        ".jpeg": "image/jpeg",
+        ".png": "image/png",
+        ".gif": "image/gif",
+        ".webp": "image/webp",
+        ".bmp": "image/bmp",
+    }
+
+    # 支持的输出格式
+    OUTPUT_FORMATS = {
+        "JPEG": "image/jpeg",
+        "WEBP": "image/webp",
+    }
+
+    def __init__(
+        self,
+        max_dimension: int | None = None,
+        output_format: str | None = None,
+        quality: int | None = None,
+        cache_max_bytes: int | None = None,
+    ) -> None:
+        """初始化图片预处理服务."""
+        self.max_dimension = max_dimension or settings.IMAGE_MAX_DIMENSION
+        self.output_format = (output_format or settings.IMAGE_OUTPUT_FORMAT).upper()
+        if self.output_format not in self.OUTPUT_FORMATS:
+            logger.warning(
+                f"不支持的图片输出格式 {self.output_format}，使用JPEG"
+            )
+            self.output_format = "JPEG"
+        self.quality = quality or settings.IMAGE_QUALITY
+        self.cache: LRUCache[str] = LRUCache(
+            max_entries=512,
+            max_bytes=cache_max_bytes or settings.IMAGE_CACHE_MAX_MB * 1024 * 1024,
+        )
+
+    def optimize_image(
+        self, data: bytes, max_dimension: int | None = None
+    ) -> tuple[bytes, str] | None:
+        """缩放并重新编码图片.
+
+        Args:
+            data: 原始图片字节
+            max_dimension: 长边像素上限，默认使用配置值
+
+        Returns:
+            (图片字节, MIME类型)；无法处理或处理后不更小时返回None
+        """
+        try:
+            from PIL import Image, ImageOps
+        except ImportError:
+            logger.debug("Pillow 未安装，跳过图片预处理")
+            return None
+
+        max_dimension = max_dimension or self.max_dimension
+
+        try:
+            with Image.open(io.BytesIO(data)) as source:
+                image = ImageOps.exif_transpose(source)
+                original_size = image.size
+                image.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+                resized = image.size != original_size
+                image = self._convert_mode(image)
+
+                buffer = io.BytesIO()
+                image.save(
+                    buffer, format=self.output_format, quality=self.quality, optimize=True
+                )
+        except Exception as e:
+            logger.debug(f"图片预处理失败，使用原始数据: {e}")
+            return None
+
+        optimized = buffer.getvalue()
+        if not resized and len(optimized) >= len(data):
+            # 未缩放且重新编码没有变小，保留原图
+            return None
+
+        return optimized, self.OUTPUT_FORMATS[self.output_format]
+
+    def encode_image(
+        self, image_path: str | Path, max_dimension: int | None = None
+    ) -> str:
+        """将图片预处理后编码为base64数据URL，结果按内容哈希缓存.
+
+        Args:
+            image_path: 图片文件路径
+            max_dimension: 长边像素上限，默认使用配置值
+
+        Returns:
+            base64编码的图像数据URL
+        """
+        image_path = Path(image_path)
+        data = image_path.read_bytes()
+        max_dimension = max_dimension or self.max_dimension
+
+        digest = hashlib.sha256(data).hexdigest()
+        cache_key = (digest, max_dimension, self.output_format, self.quality)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        optimized = self.optimize_image(data, max_dimension)
+        if optimized:
+            encoded_bytes, mime_type = optimized
+            logger.info(
+                f"图片预处理: {image_path.name} {len(data)} -> {len(encoded_bytes)} bytes"
+            )
+        else:
+            encoded_bytes = data
+            mime_type = self.MIME_TYPES.get(image_path.suffix.lower(), "image/jpeg")
+
+        encoded = base64.b64encode(encoded_bytes).decode("utf-8")
+        data_url = f"data:{mime_type};base64,{encoded}"
+        self.cache.set(cache_key, data_url)
+        return data_url
+
+    def _convert_mode(self, image):  # type: ignore[no-untyped-def]
+        """将图片转换为输出格式支持的颜色模式."""
+        from PIL import Image
+
+        has_alpha = image.mode in ("RGBA", "LA") or (
+            image.mode == "P" and "transparency" in image.info
+        )
+
+        if self.output_format == "WEBP":
+            if has_alpha:
+                return image.convert("RGBA")
+            return image.convert("RGB") if image.mode != "RGB" else image
+
+        # JPEG 不支持透明通道，合成到白色背景
+        if has_alpha:
+            rgba = image.convert("RGBA")
+            background = Image.new("RGB", rgba.size, (255, 255, 255))
+            background.paste(rgba, mask=rgba.getchannel("A"))
+            return background
+        return image.convert("RGB") if image.mode != "RGB" else image
+
+
+# 创建全局实例
+image_service = ImageService()
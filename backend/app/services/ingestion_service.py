@@ -0,0 +1,396 @@
+"""Background document ingestion jobs: extraction, summary and embedding."""
+
+import asyncio
+import logging
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud
+from app.core.config import settings
+from app.core.database import async_session_factory
+from app.core.process_pool import WorkerError
+from app.core.uploads import SpooledUpload
+from app.models.models import Document, IngestionJob, User
+from app.schemas.documents import DocumentCreate, IngestionJobCreate
+from app.services.blob_service import BlobService, blob_service
+from app.services.document_content_service import DocumentContentService, decode_text
+from app.services.document_text_service import document_text_service
+from app.services.extraction_cache_service import (
+    ExtractionCacheService,
+    extraction_cache_service,
+)
+from app.services.vector_service import vector_service
+
+logger = logging.getLogger(__name__)
+
+# 需要解析内容的文件类型
+EXTRACTION_CONTENT_TYPES = {
+    "application/pdf",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "application/vnd.openxmlformats-officedocument.presentationml.presentation",
+    "application/msword",
+    "application/vnd.ms-powerpoint",
+}
+
+
+class IngestionService:
+    """文档入库服务.
+
+    上传接口只把原始文件存入内容寻址存储并创建待处理的文档和任务记录，
+    随即返回；内容提取、摘要和向量化由后台工作协程完成。任务状态保存在
+    数据库中，失败按指数退避重试，服务重启后未完成的任务重新入队。
+    任务用条件更新领取并持有租约，多个进程或实例同时入队同一任务时只执行一次；
+    执行中的任务只有租约过期后才会被重新领取。
+    其他空间已提取过的相同文件直接复用提取结果。
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = async_session_factory,
+        blobs: BlobService | None = None,
+        extraction_cache: ExtractionCacheService | None = None,
+        workers: int | None = None,
+        max_attempts: int | None = None,
+        retry_backoff: float | None = None,
+        lease_seconds: int | None = None,
+    ) -> None:
+        """初始化入库服务.
+
+        Args:
+            session_factory: 数据库会话工厂（工作协程独立于请求会话）
+            blobs: 原始文件存储服务
+            extraction_cache: 提取结果缓存
+            workers: 工作协程数
+            max_attempts: 单个任务最大尝试次数
+            retry_backoff: 重试退避基数（秒）
+            lease_seconds: 执行中任务的租约（秒）
+        """
+        self.session_factory = session_factory
+        self.blobs = blobs or blob_service
+        self.workers = workers or settings.INGESTION_WORKERS
+        self.max_attempts = max_attempts or settings.INGESTION_MAX_ATTEMPTS
+        self.retry_backoff = (
+            retry_backoff if retry_backoff is not None else settings.INGESTION_RETRY_BACKOFF
+        )
+        self.lease_seconds = lease_seconds or settings.INGESTION_LEASE_SECONDS
+        self.extraction_cache = extraction_cache or extraction_cache_service
+        self.content_service = DocumentContentService(
+            use_process_pool=settings.EXTRACTION_POOL_ENABLED
+        )
+        self._queue: asyncio.Queue[int] | None = None
+        self._tasks: list[asyncio.Task[None]] = []
+        self._scheduled: set[int] = set()
+        self._retry_handles: set[asyncio.TimerHandle] = set()
+
+    async def submit_upload(
+        self,
+        db: AsyncSession,
+        *,
+        upload: SpooledUpload,
+        space_id: int,
+        user: User,
+        filename: str,
+        content_type: str,
+        title: str | None = None,
+        tags: list[str] | None = None,
+    ) -> tuple[Document, IngestionJob | None, bool]:
+        """保存上传文件并创建入库任务.
+
+        Returns:
+            (文档, 入库任务, 是否重复)。空间内已有相同文件时返回已有文档及其最近的任务。
+        """
+        existing = await crud.crud_document.get_by_hash(
+            db, file_hash=upload.sha256, space_id=space_id
+        )
+        if existing:
+            job = await crud.crud_ingestion_job.get_latest_by_document(
+                db, document_id=existing.id
+            )
+            return existing, job, True
+
+        # 相同内容在所有空间只存一份，文档持有一个引用
+        blob = await self.blobs.store(db, upload, content_type)
+        await self.blobs.add_reference(db, blob)
+
+        document_in = DocumentCreate(
+            filename=filename,
+            content_type=content_type,
+            size=upload.size,
+            space_id=space_id,
+            tags=tags,
+        )
+        document = await crud.crud_document.create(
+            db,
+            obj_in=document_in,
+            user_id=user.id,
+            file_path=blob.storage_key,
+            file_hash=upload.sha256,
+            original_filename=filename,
+            title=title or filename,
+            content="",
+            processing_status="pending",
+            extraction_status="pending",
+            embedding_status="pending",
+        )
+
+        await crud.crud_space.update_stats(
+            db, space_id=space_id, document_delta=1, size_delta=upload.size
+        )
+
+        job = await crud.crud_ingestion_job.create(
+            db,
+            obj_in=IngestionJobCreate(
+                document_id=document.id, max_attempts=self.max_attempts
+            ),
+            user_id=user.id,
+        )
+        self.enqueue(job.id)
+        return document, job, False
+
+    def enqueue(self, job_id: int) -> None:
+        """将任务加入处理队列（已在队列中的任务不重复加入）."""
+        if job_id in self._scheduled:
+            return
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        self._scheduled.add(job_id)
+        self._queue.put_nowait(job_id)
+
+    async def start(self) -> None:
+        """启动工作协程，并重新入队排队中和租约过期的任务."""
+        if self._tasks:
+            return
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"ingestion-worker-{i}")
+            for i in range(self.workers)
+        ]
+
+        try:
+            async with self.session_factory() as db:
+                jobs = await crud.crud_ingestion_job.get_unfinished(db)
+            for job in jobs:
+                self.enqueue(job.id)
+            if jobs:
+                logger.info(f"恢复 {len(jobs)} 个未完成的入库任务")
+        except Exception as e:
+            logger.error(f"恢复入库任务失败: {e}")
+
+    async def stop(self) -> None:
+        """停止工作协程（执行中的任务保持 running 状态，下次启动时恢复）."""
+        for handle in self._retry_handles:
+            handle.cancel()
+        self._retry_handles.clear()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        self._scheduled.clear()
+
+    async def _worker(self) -> None:
+        assert self._queue is not None
+        queue = self._queue
+        while True:
+            job_id = await queue.get()
+            try:
+                await self.process_job(job_id)
+            except Exception as e:
+                logger.error(f"入库任务 {job_id} 处理异常: {e}", exc_info=True)
+            finally:
+                self._scheduled.discard(job_id)
+                queue.task_done()
+
+    def _schedule_retry(self, job_id: int, delay: float) -> None:
+        loop = asyncio.get_running_loop()
+
+        def _fire() -> None:
+            self._retry_handles.discard(handle)
+            self.enqueue(job_id)
+
+        handle = loop.call_later(delay, _fire)
+        self._retry_handles.add(handle)
+
+    async def process_job(self, job_id: int) -> str | None:
+        """执行一个入库任务.
+
+        Returns:
+            任务执行后的状态，任务不存在、已结束或已被其他工作进程领取时返回 None
+        """
+        async with self.session_factory() as db:
+            claimed = await crud.crud_ingestion_job.claim(
+                db, job_id=job_id, lease_seconds=self.lease_seconds
+            )
+            await db.commit()
+            job = await crud.crud_ingestion_job.get(db, job_id) if claimed else None
+            if job is None:
+                return None
+
+            document = await crud.crud_document.get(db, job.document_id)
+            if document is None:
+                job.status = "failed"
+                job.error_message = "文档不存在"
+                job.finished_at = datetime.now(UTC)
+                await db.commit()
+                return job.status
+
+            document.processing_status = "processing"
+            await db.commit()
+
+            try:
+                await self._run_pipeline(db, job, document)
+            except Exception as e:
+                await db.rollback()
+                await db.refresh(job)
+                await db.refresh(document)
+                await self._handle_failure(db, job, document, e)
+            return job.status
+
+    async def _run_pipeline(
+        self, db: AsyncSession, job: IngestionJob, document: Document
+    ) -> None:
+        # 内容提取
+        job.stage = "extraction"
+        self._renew_lease(job)
+        document.extraction_status = "processing"
+        await db.commit()
+
+        source = await crud.crud_document.get_extracted_copy(db, document=document)
+        if source is not None:
+            # 其他空间已提取过相同文件：全文按哈希共享，直接复用提取结果和摘要
+            text = await document_text_service.get_text(db, source) or ""
+            document.search_text = document_text_service.make_search_text(text)
+            for field in (
+                "content",
+                "preview",
+                "content_hash",
+                "content_length",
+                "page_offsets",
+            ):
+                setattr(document, field, getattr(source, field))
+            metadata = {
+                key: value
+                for key, value in (source.meta_data or {}).items()
+                if key != "extraction_error"
+            }
+            summary = source.summary
+        else:
+            text, metadata = await self._extract(document)
+            # 全文存入独立的分块表，文档行只保留前缀、预览和页索引
+            page_offsets = metadata.pop("page_offsets", None)
+            for field, value in (
+                await document_text_service.store_text(db, text, page_offsets)
+            ).items():
+                setattr(document, field, value)
+            summary = None
+        if metadata:
+            document.meta_data = {**(document.meta_data or {}), **metadata}
+        document.extraction_status = "completed"
+
+        # 摘要
+        job.stage = "summary"
+        self._renew_lease(job)
+        if summary is None and text:
+            summary = await self.content_service.summarize_content(text)
+        document.summary = summary
+        await db.commit()
+
+        # 向量化（向量服务未初始化时保持 pending）
+        job.stage = "embedding"
+        if text and vector_service.client is not None:
+            self._renew_lease(job)
+            document.embedding_status = "processing"
+            await db.commit()
+            added = await vector_service.add_document(
+                document.id,
+                text,
+                {"space_id": document.space_id, "title": document.title},
+            )
+            # 向量化失败不影响文档可用，单独记录状态
+            document.embedding_status = "completed" if added else "failed"
+
+        job.status = "completed"
+        job.finished_at = datetime.now(UTC)
+        document.processing_status = "completed"
+        await db.commit()
+
+    def _renew_lease(self, job: IngestionJob) -> None:
+        """续约执行中的任务（随下一次提交写入）."""
+        job.lease_expires_at = datetime.now(UTC) + timedelta(seconds=self.lease_seconds)
+
+    async def _extract(self, document: Document) -> tuple[str, dict[str, Any]]:
+        """按文件类型提取文本和元数据."""
+        content_type = document.content_type
+        if content_type not in EXTRACTION_CONTENT_TYPES and not content_type.startswith(
+            "text/"
+        ):
+            # 图片等二进制文件不提取内容
+            return "", {}
+
+        # 存储键不带扩展名，解析器按原文件名的扩展名识别格式
+        suffix = Path(document.filename).suffix.lower()
+        if content_type.startswith("text/"):
+            async with self.blobs.open_local(document.file_path) as file_path:
+                data = await asyncio.to_thread(file_path.read_bytes)
+            return decode_text(data), {}
+
+        # 相同文件解析过时直接使用缓存，无需取回原始文件
+        result = await self.extraction_cache.get(document.file_hash)
+        if result is None:
+            async with self.blobs.open_local(document.file_path, suffix) as file_path:
+                result = await self.content_service.extract_content_enhanced(
+                    file_path, suffix
+                )
+            await self.extraction_cache.put(document.file_hash, suffix, result)
+        metadata = dict(result["metadata"])
+        metadata["extraction_method"] = result["extraction_method"]
+        metadata["content_format"] = result["format"]
+        metadata["has_tables"] = result["has_tables"]
+        metadata["has_images"] = result["has_images"]
+        metadata["has_formulas"] = result["has_formulas"]
+        return result["text"] or "", metadata
+
+    async def _handle_failure(
+        self,
+        db: AsyncSession,
+        job: IngestionJob,
+        document: Document,
+        error: Exception,
+    ) -> None:
+        job.error_message = str(error)
+        # 超时或内存超限的文件重试也会失败
+        retryable = not isinstance(error, WorkerError)
+
+        if retryable and job.attempts < job.max_attempts:
+            job.status = "queued"
+            document.processing_status = "pending"
+            if job.stage == "extraction":
+                document.extraction_status = "pending"
+            await db.commit()
+            delay = self.retry_backoff * 2 ** (job.attempts - 1)
+            logger.warning(
+                f"入库任务 {job.id} 第 {job.attempts} 次失败，{delay:.1f}秒后重试: {error}"
+            )
+            self._schedule_retry(job.id, delay)
+            return
+
+        logger.error(f"入库任务 {job.id} 失败（文档 {document.id}）: {error}")
+        job.status = "failed"
+        job.finished_at = datetime.now(UTC)
+        document.processing_status = "failed"
+        if job.stage == "extraction":
+            document.extraction_status = "failed"
+            document.meta_data = {
+                **(document.meta_data or {}),
+                "extraction_error": str(error),
+            }
+        await db.commit()
+
+
+# 创建全局实例
+ingestion_service = IngestionService()
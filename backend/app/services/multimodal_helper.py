@@ -1,11 +1,16 @@
 """Multimodal helper functions for handling attachments in chat."""
 
+import copy
+import hashlib
 import logging
 from pathlib import Path
 from typing import Any
 
+from app.core.cache import LRUCache
+from app.core.config import settings
 from app.services.ai_service import AIService
 from app.services.document_content_service import DocumentContentService
+from app.services.extraction_cache_service import extraction_cache_service
 
 logger = logging.getLogger(__name__)
 
@@ -15,7 +20,16 @@ class MultimodalHelper:
 
     def __init__(self) -> None:
         self.ai_service = AIService()
-        self.content_service = DocumentContentService()
+        self.content_service = DocumentContentService(
+            use_process_pool=settings.EXTRACTION_POOL_ENABLED,
+            extraction_cache=extraction_cache_service,
+        )
+        # 附件预处理结果缓存，键为 (文件SHA-256, 附件类型, 处理模式)
+        self.cache: LRUCache[dict[str, Any]] = LRUCache(
+            max_entries=settings.ATTACHMENT_CACHE_MAX_ENTRIES,
+            max_bytes=settings.ATTACHMENT_CACHE_MAX_MB * 1024 * 1024,
+            sizeof=self._result_size,
+        )
 
     @staticmethod
     def is_image_file(filename: str) -> bool:
@@ -34,28 +48,83 @@ class MultimodalHelper:
         doc_extensions = {'.docx', '.doc', '.pptx', '.ppt', '.xlsx', '.xls'}
         return Path(filename).suffix.lower() in doc_extensions
 
+    @staticmethod
+    def hash_file(file_path: Path) -> str | None:
+        """计算文件的SHA-256，文件不可读时返回None."""
+        sha256 = hashlib.sha256()
+        try:
+            with open(file_path, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    sha256.update(chunk)
+        except OSError:
+            return None
+        return sha256.hexdigest()
+
+    @staticmethod
+    def _result_size(result: dict[str, Any]) -> int:
+        """估算缓存条目大小."""
+        return (
+            len(result.get("content") or "")
+            + len(result.get("extracted_text") or "")
+            + 512
+        )
+
+    def _cache_key(
+        self, file_hash: str, filename: str, prefer_vision: bool
+    ) -> tuple[str, str, str]:
+        """构建缓存键；文档类附件总是提取文本，与处理模式无关."""
+        if self.is_image_file(filename):
+            kind = "image"
+        elif self.is_pdf_file(filename):
+            kind = "pdf"
+        elif self.is_document_file(filename):
+            kind = "document"
+        else:
+            kind = "unknown"
+
+        mode = "vision" if prefer_vision and kind in ("image", "pdf") else "text"
+        return file_hash, kind, mode
+
     async def prepare_attachment_for_chat(
         self,
         file_path: Path,
         filename: str,
-        prefer_vision: bool = True
+        prefer_vision: bool = True,
+        file_hash: str | None = None,
     ) -> dict[str, Any]:
         """准备附件用于聊天.
 
+        结果按文件内容哈希和处理模式缓存，重复附件跳过编码和内容提取。
+
         Args:
             file_path: 文件路径
             filename: 文件名
             prefer_vision: 是否优先使用视觉模型
+            file_hash: 文件SHA-256（调用方已计算时传入，避免重复读取）
 
         Returns:
             包含附件信息的字典
         """
+        if file_hash is None:
+            file_hash = self.hash_file(file_path)
+
+        cache_key = (
+            self._cache_key(file_hash, filename, prefer_vision) if file_hash else None
+        )
+        if cache_key:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.debug(f"Attachment cache hit: {filename} ({cache_key[1]}/{cache_key[2]})")
+                return copy.deepcopy(cached)
+
         result: dict[str, Any] = {
             "type": "unknown",
             "content": None,
             "needs_vision": False,
             "extracted_text": None,
         }
+        # 仅缓存实际完成编码或提取的结果（失败和占位文本不缓存）
+        cacheable = False
 
         if self.is_image_file(filename):
             # 图片文件
@@ -65,6 +134,7 @@ class MultimodalHelper:
             if prefer_vision:
                 # 编码为base64用于视觉模型
                 result["content"] = self.ai_service.encode_image(file_path)
+                cacheable = True
             else:
                 # 仅标记存在图片
                 result["extracted_text"] = f"[图片文件: {filename}]"
@@ -77,16 +147,20 @@ class MultimodalHelper:
             if prefer_vision:
                 # 编码为base64用于视觉模型
                 result["content"] = self.ai_service.encode_pdf(file_path)
+                cacheable = True
             else:
                 # 提取文本内容
                 try:
-                    extraction = await self.content_service.extract_content_enhanced(file_path)
+                    extraction = await self.content_service.extract_content_enhanced(
+                        file_path, file_hash=file_hash
+                    )
                     result["extracted_text"] = extraction["text"]
                     result["extraction_metadata"] = {
                         "method": extraction["extraction_method"],
                         "has_tables": extraction["has_tables"],
                         "has_formulas": extraction["has_formulas"],
                     }
+                    cacheable = True
                 except Exception as e:
                     logger.error(f"Failed to extract PDF content: {e}")
                     result["extracted_text"] = f"[PDF文件: {filename} - 内容提取失败]"
@@ -98,16 +172,22 @@ class MultimodalHelper:
 
             # 总是提取文本内容
             try:
-                extraction = await self.content_service.extract_content_enhanced(file_path)
+                extraction = await self.content_service.extract_content_enhanced(
+                    file_path, file_hash=file_hash
+                )
                 result["extracted_text"] = extraction["text"]
                 result["extraction_metadata"] = {
                     "method": extraction["extraction_method"],
                     "format": extraction["format"],
                 }
+                cacheable = True
             except Exception as e:
                 logger.error(f"Failed to extract document content: {e}")
                 result["extracted_text"] = f"[文档文件: {filename} - 内容提取失败]"
 
+        if cache_key and cacheable:
+            self.cache.set(cache_key, copy.deepcopy(result))
+
         return result
 
     async def create_multimodal_message(
@@ -18,6 +18,7 @@ from app.schemas.note import (
 )
 from app.schemas.note_version import NoteVersionDiff, NoteVersionResponse
 from app.services.ai_service import ChatMode, ai_service
+from app.services.document_text_service import document_text_service
 
 logger = logging.getLogger(__name__)
 
@@ -262,8 +263,12 @@ class NoteService:
             total_length = 0
 
             for doc in documents:
-                if doc.content:
-                    content = f"## {doc.title or doc.filename}\n\n{doc.content}\n\n"
+                # 只读取长度预算内的全文
+                text = await document_text_service.read_range(
+                    db, doc, 0, max(max_length - total_length, 0)
+                )
+                if text:
+                    content = f"## {doc.title or doc.filename}\n\n{text}\n\n"
                     if total_length + len(content) > max_length:
                         # 截断内容
                         remaining = max_length - total_length
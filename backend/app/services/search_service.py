@@ -1,22 +1,65 @@
 """Search service."""
 
+import asyncio
 import time
 from datetime import datetime
 from typing import Any
 
 import httpx
 
+from app.core.cache import LRUCache
 from app.core.config import settings
 from app.models.models import User
 from app.schemas.conversations import SearchResponse, SearchResult
 
 
 class SearchService:
-    """搜索服务."""
+    """搜索服务.
 
-    def __init__(self) -> None:
+    联网搜索结果按（范围, 规范化查询, 结果数）短时缓存；
+    同一查询的并发请求合并为一次上游调用，共享结果。
+    """
+
+    def __init__(self, cache_ttl: float | None = None) -> None:
         self.perplexity_api_key = settings.PERPLEXITY_API_KEY
         self.perplexity_url = "https://api.perplexity.ai/chat/completions"
+        self.cache: LRUCache[list[SearchResult]] = LRUCache(
+            max_entries=settings.WEB_SEARCH_CACHE_MAX_ENTRIES,
+            ttl=settings.WEB_SEARCH_CACHE_TTL_SECONDS if cache_ttl is None else cache_ttl,
+        )
+        self._client: httpx.AsyncClient | None = None
+        # 缓存键 -> 正在进行的上游搜索
+        self._inflight: dict[tuple[str, str, int], asyncio.Task[list[SearchResult]]] = {}
+        self.upstream_calls = 0
+        self.coalesced = 0
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """共享的HTTP客户端（首次使用时创建）."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=30.0,
+                limits=httpx.Limits(
+                    max_connections=settings.WEB_SEARCH_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.WEB_SEARCH_MAX_CONNECTIONS,
+                ),
+            )
+        return self._client
+
+    async def close(self) -> None:
+        """关闭共享客户端."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self) -> dict[str, Any]:
+        """缓存命中率和上游调用统计."""
+        return {
+            **self.cache.stats(),
+            "upstream_calls": self.upstream_calls,
+            "coalesced": self.coalesced,
+            "inflight": len(self._inflight),
+        }
 
     async def search(
         self,
@@ -32,7 +75,7 @@ class SearchService:
 
         try:
             # 使用Perplexity进行搜索
-            results = await self._perplexity_search(
+            results, cached = await self._cached_search(
                 query=query,
                 search_scope=search_scope,
                 max_results=max_results,
@@ -52,6 +95,7 @@ class SearchService:
                 total_results=len(results),
                 search_time=search_time,
                 sources=[result.source for result in results],
+                cached=cached,
             )
 
         except Exception as e:
@@ -65,6 +109,50 @@ class SearchService:
                 sources=[],
             )
 
+    async def _cached_search(
+        self,
+        query: str,
+        search_scope: str,
+        max_results: int,
+    ) -> tuple[list[SearchResult], bool]:
+        """带缓存和请求合并的搜索，返回结果和是否命中缓存."""
+        if not self.perplexity_api_key:
+            return self._mock_search_results(query, max_results), False
+
+        key = (search_scope, " ".join(query.lower().split()), max_results)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return list(cached), True
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch(key, query, search_scope, max_results))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+
+        # 某个等待者被取消时不影响共享的上游调用
+        results = await asyncio.shield(task)
+        return list(results), False
+
+    async def _fetch(
+        self,
+        key: tuple[str, str, int],
+        query: str,
+        search_scope: str,
+        max_results: int,
+    ) -> list[SearchResult]:
+        """执行一次上游搜索，成功的结果写入缓存."""
+        self.upstream_calls += 1
+        results = await self._perplexity_search(
+            query=query, search_scope=search_scope, max_results=max_results
+        )
+        # 失败时的模拟结果不缓存，下次重新请求
+        if results and all(result.source != "mock" for result in results):
+            self.cache.set(key, results, size=1)
+        return results
+
     async def _perplexity_search(
         self,
         query: str,
@@ -86,36 +174,35 @@ class SearchService:
 
             model = model_map.get(search_scope, "llama-3.1-sonar-small-128k-online")
 
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    self.perplexity_url,
-                    headers={
-                        "Authorization": f"Bearer {self.perplexity_api_key}",
-                        "Content-Type": "application/json",
-                    },
-                    json={
-                        "model": model,
-                        "messages": [
-                            {
-                                "role": "system",
-                                "content": f"You are a helpful search assistant. Please search for information about: {query}. Return structured results with sources.",
-                            },
-                            {"role": "user", "content": query},
-                        ],
-                        "max_tokens": 2000,
-                        "temperature": 0.1,
-                        "return_citations": True,
-                        "return_images": False,
-                    },
-                    timeout=30.0,
-                )
+            response = await self.client.post(
+                self.perplexity_url,
+                headers={
+                    "Authorization": f"Bearer {self.perplexity_api_key}",
+                    "Content-Type": "application/json",
+                },
+                json={
+                    "model": model,
+                    "messages": [
+                        {
+                            "role": "system",
+                            "content": f"You are a helpful search assistant. Please search for information about: {query}. Return structured results with sources.",
+                        },
+                        {"role": "user", "content": query},
+                    ],
+                    "max_tokens": 2000,
+                    "temperature": 0.1,
+                    "return_citations": True,
+                    "return_images": False,
+                },
+                timeout=30.0,
+            )
 
-                if response.status_code == 200:
-                    data = response.json()
-                    return self._parse_perplexity_response(data, query)
-                else:
-                    # 如果API调用失败，返回模拟结果
-                    return self._mock_search_results(query, max_results)
+            if response.status_code == 200:
+                data = response.json()
+                return self._parse_perplexity_response(data, query)
+            else:
+                # 如果API调用失败，返回模拟结果
+                return self._mock_search_results(query, max_results)
 
         except Exception:
             # 如果出错，返回模拟结果
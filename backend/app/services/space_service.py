@@ -1,11 +1,15 @@
 """Space management service."""
 
 
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud
-from app.models.models import Space, User
+from app.models.models import Document, Space, User
 from app.schemas.spaces import SpaceCreate, SpaceUpdate
+from app.services.blob_service import blob_service
+from app.services.document_text_service import document_text_service
+from app.services.web_snapshot_service import SNAPSHOT_KEYS, web_snapshot_service
 
 
 class SpaceService:
@@ -69,8 +73,24 @@ class SpaceService:
 
     @staticmethod
     async def delete_space(db: AsyncSession, space: Space) -> bool:
-        """删除空间."""
+        """删除空间，并释放其中文档的原始文件、全文和网页快照."""
+        result = await db.execute(
+            select(
+                Document.file_path,
+                Document.content_hash,
+                *(Document.meta_data[key].as_string() for key in SNAPSHOT_KEYS),
+            ).where(Document.space_id == space.id)
+        )
+        stored = result.all()
+
         await crud.crud_space.remove(db, id=space.id)
+
+        for file_path, content_hash, *snapshot_keys in stored:
+            await blob_service.release(db, file_path)
+            await document_text_service.release(db, content_hash)
+            await web_snapshot_service.release(db, *snapshot_keys)
+        if stored:
+            await db.commit()
         return True
 
     @staticmethod
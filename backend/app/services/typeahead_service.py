@@ -0,0 +1,181 @@
+"""Search-as-you-type over document, note and space names."""
+
+import re
+from collections.abc import Sequence
+from typing import Any
+
+from sqlalchemy import (
+    Float,
+    func,
+    literal,
+    literal_column,
+    null,
+    or_,
+    select,
+    union_all,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.full_text import is_postgres
+from app.crud.space import crud_space
+from app.models.models import Document, Note, Space, User
+from app.schemas.search import SuggestItem, SuggestType
+
+SUGGEST_TYPES: tuple[SuggestType, ...] = ("document", "note", "space")
+
+# 回退实现每类最多取出的候选数，再在内存中排序
+FALLBACK_CANDIDATES = 200
+
+
+def _trigrams(text: str) -> set[str]:
+    """pg_trgm 风格的三元组：按词切分，小写，词首补两个空格、词尾补一个."""
+    grams: set[str] = set()
+    for word in re.findall(r"\w+", text.lower()):
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def word_similarity(query: str, text: str) -> float:
+    """查询与文本中最相近的连续词片段的三元组相似度（近似 pg_trgm 的 word_similarity）."""
+    query_grams = _trigrams(query)
+    if not query_grams:
+        return 0.0
+    words = re.findall(r"\w+", text.lower())
+    span = max(1, len(re.findall(r"\w+", query)))
+    best = 0.0
+    for start in range(max(1, len(words) - span + 1)):
+        grams = _trigrams(" ".join(words[start : start + span]))
+        union = query_grams | grams
+        if union:
+            best = max(best, len(query_grams & grams) / len(union))
+    return best
+
+
+class TypeaheadService:
+    """输入联想服务.
+
+    PostgreSQL 上由 pg_trgm GIN 索引同时支撑子串匹配和模糊匹配（词相似度），
+    三类对象合并为一条 UNION ALL 查询，按相似度排序并严格限制行数。
+    其他数据库按子串取候选，在内存中计算相似度排序。
+    结果按用户短时缓存，连续按键时重复的前缀不再查询数据库。
+    """
+
+    def __init__(
+        self, cache_ttl: float | None = None, max_entries: int | None = None
+    ) -> None:
+        self.cache: LRUCache[list[SuggestItem]] = LRUCache(
+            max_entries=max_entries or settings.TYPEAHEAD_CACHE_MAX_ENTRIES,
+            ttl=settings.TYPEAHEAD_CACHE_TTL_SECONDS if cache_ttl is None else cache_ttl,
+        )
+
+    async def suggest(
+        self,
+        db: AsyncSession,
+        user: User,
+        query: str,
+        limit: int = 8,
+        types: Sequence[SuggestType] | None = None,
+    ) -> tuple[list[SuggestItem], bool]:
+        """返回联想条目和是否命中缓存."""
+        normalized = " ".join(query.lower().split())
+        kinds = tuple(t for t in SUGGEST_TYPES if not types or t in types)
+        if not normalized or not kinds:
+            return [], False
+
+        key = (user.id, normalized, kinds, limit)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached, True
+
+        postgres = is_postgres(db)
+        statements = [
+            self._source(kind, user.id, normalized, postgres, limit) for kind in kinds
+        ]
+        stmt = union_all(*statements)
+        if postgres:
+            stmt = stmt.order_by(literal_column("score").desc()).limit(limit)
+        rows = (await db.execute(stmt)).all()
+
+        items = [
+            SuggestItem(
+                type=row.type,
+                id=row.id,
+                title=row.title,
+                subtitle=row.subtitle,
+                space_id=row.space_id,
+                score=row.score if postgres else self._score(normalized, row),
+            )
+            for row in rows
+        ]
+        if not postgres:
+            items.sort(key=lambda item: (-item.score, item.type, -item.id))
+            items = items[:limit]
+
+        self.cache.set(key, items, size=1)
+        return items, False
+
+    @staticmethod
+    def _score(query: str, row: Any) -> float:
+        return max(
+            word_similarity(query, text) for text in (row.title, row.subtitle) if text
+        )
+
+    def _source(
+        self, kind: SuggestType, user_id: int, query: str, postgres: bool, limit: int
+    ) -> Any:
+        """单类对象的候选查询，列统一为 type/id/title/subtitle/space_id/score."""
+        if kind == "document":
+            columns: tuple[Any, ...] = (Document.title, Document.filename)
+            title: Any = func.coalesce(Document.title, Document.filename)
+            subtitle: Any = Document.filename
+            space_id: Any = Document.space_id
+            id_column: Any = Document.id
+            scope: Any = or_(
+                Document.user_id == user_id,
+                Document.space_id.in_(crud_space.accessible_space_ids(user_id=user_id)),
+            )
+        elif kind == "note":
+            columns = (Note.title,)
+            title, subtitle, space_id, id_column = Note.title, null(), Note.space_id, Note.id
+            scope = Note.user_id == user_id
+        else:
+            columns = (Space.name,)
+            title, subtitle, space_id, id_column = Space.name, null(), Space.id, Space.id
+            scope = Space.id.in_(crud_space.accessible_space_ids(user_id=user_id))
+
+        if postgres:
+            # ILIKE 子串和 <% 词相似度都能使用 gin_trgm_ops 索引
+            match = or_(
+                *(column.icontains(query, autoescape=True) for column in columns),
+                *(literal(query).op("<%")(column) for column in columns),
+            )
+            scores = [func.word_similarity(query, column) for column in columns]
+            score: Any = scores[0] if len(scores) == 1 else func.greatest(*scores)
+            order: Any = score.desc()
+        else:
+            match = or_(*(column.icontains(query, autoescape=True) for column in columns))
+            score = literal(0.0, Float)
+            order = id_column.desc()
+
+        stmt = (
+            select(
+                literal(kind).label("type"),
+                id_column.label("id"),
+                title.label("title"),
+                subtitle.label("subtitle"),
+                space_id.label("space_id"),
+                score.label("score"),
+            )
+            .where(scope, match)
+            .order_by(order)
+            .limit(limit if postgres else FALLBACK_CANDIDATES)
+        )
+        # 带 ORDER BY/LIMIT 的分支需要包一层才能参与 UNION
+        return select(stmt.subquery())
+
+
+# 创建全局实例
+typeahead_service = TypeaheadService()
@@ -0,0 +1,300 @@
+"""Federated search across documents, notes, citations, annotations and conversations."""
+
+import asyncio
+import base64
+import binascii
+import json
+import logging
+import time
+from collections.abc import Callable, Mapping, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import func, null, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.database import async_session_factory
+from app.core.full_text import FullTextQuery
+from app.crud.space import crud_space
+from app.models.models import Annotation, Citation, Conversation, Document, Note
+from app.schemas.search import SearchEntity, UnifiedSearchHit
+from app.services.typeahead_service import word_similarity
+
+logger = logging.getLogger(__name__)
+
+SEARCH_ENTITIES: tuple[SearchEntity, ...] = (
+    "document",
+    "note",
+    "citation",
+    "annotation",
+    "conversation",
+)
+
+# 归一化后的得分再乘以类型权重，同分时按 SEARCH_ENTITIES 顺序
+ENTITY_WEIGHTS: dict[SearchEntity, float] = {
+    "document": 1.0,
+    "note": 1.0,
+    "citation": 0.9,
+    "annotation": 0.8,
+    "conversation": 0.7,
+}
+
+
+class InvalidCursorError(ValueError):
+    """分页游标无法解析."""
+
+
+@dataclass
+class UnifiedSearchResult:
+    """一页统一搜索结果."""
+
+    hits: list[UnifiedSearchHit]
+    next_cursor: str | None
+    counts: dict[SearchEntity, int]
+    timed_out: list[SearchEntity]
+    cached: bool
+
+
+def _sort_key(hit: UnifiedSearchHit) -> tuple[float, int, int]:
+    return (-hit.score, SEARCH_ENTITIES.index(hit.type), -hit.id)
+
+
+def encode_cursor(hit: UnifiedSearchHit) -> str:
+    """游标记录上一页最后一条的排序键."""
+    raw = json.dumps([hit.score, hit.type, hit.id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[float, int, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        score, entity, hit_id = json.loads(raw)
+        return (-float(score), SEARCH_ENTITIES.index(entity), -int(hit_id))
+    except (binascii.Error, ValueError, TypeError) as e:
+        raise InvalidCursorError("无效的分页游标") from e
+
+
+class UnifiedSearchService:
+    """统一搜索服务.
+
+    每类对象使用独立的数据库会话并发查询（全文索引匹配和排序），
+    各类得分按本类最高分归一化后乘以类型权重，合并为稳定排序。
+    超过时间预算仍未返回的类型被取消，返回部分结果。
+    完整的合并结果按用户和查询短时缓存，游标翻页直接读取缓存。
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = async_session_factory,
+        cache_ttl: float | None = None,
+    ) -> None:
+        self.session_factory = session_factory
+        self.cache: LRUCache[tuple[list[UnifiedSearchHit], dict[SearchEntity, int]]] = (
+            LRUCache(
+                max_entries=settings.UNIFIED_SEARCH_CACHE_MAX_ENTRIES,
+                ttl=settings.UNIFIED_SEARCH_CACHE_TTL_SECONDS
+                if cache_ttl is None
+                else cache_ttl,
+            )
+        )
+
+    async def search(
+        self,
+        user_id: int,
+        query: str,
+        types: Sequence[SearchEntity] | None = None,
+        quotas: Mapping[SearchEntity, int] | None = None,
+        limit: int = 20,
+        cursor: str | None = None,
+        time_budget_ms: int | None = None,
+    ) -> UnifiedSearchResult:
+        """搜索并返回一页结果.
+
+        Raises:
+            InvalidCursorError: 游标无法解析
+        """
+        after = decode_cursor(cursor) if cursor else None
+        quotas = quotas or {}
+        plan = {
+            entity: quotas.get(entity, settings.UNIFIED_SEARCH_DEFAULT_QUOTA)
+            for entity in SEARCH_ENTITIES
+            if (not types or entity in types)
+        }
+        plan = {entity: quota for entity, quota in plan.items() if quota > 0}
+        normalized = " ".join(query.split())
+
+        key = (user_id, normalized.lower(), tuple(sorted(plan.items())))
+        cached = self.cache.get(key)
+        timed_out: list[SearchEntity] = []
+        if cached is not None:
+            ranked, counts = cached
+        else:
+            ranked, counts, timed_out = await self._gather(
+                user_id, normalized, plan, time_budget_ms
+            )
+            if not timed_out:
+                # 部分结果不缓存
+                self.cache.set(key, (ranked, counts), size=1)
+
+        if after is not None:
+            ranked = [hit for hit in ranked if _sort_key(hit) > after]
+        page = ranked[:limit]
+        next_cursor = encode_cursor(page[-1]) if len(ranked) > limit else None
+        return UnifiedSearchResult(
+            hits=page,
+            next_cursor=next_cursor,
+            counts=counts,
+            timed_out=timed_out,
+            cached=cached is not None,
+        )
+
+    async def _gather(
+        self,
+        user_id: int,
+        query: str,
+        plan: dict[SearchEntity, int],
+        time_budget_ms: int | None,
+    ) -> tuple[list[UnifiedSearchHit], dict[SearchEntity, int], list[SearchEntity]]:
+        """并发查询各类对象，超时的类型取消."""
+        tasks = {
+            entity: asyncio.create_task(self._search_entity(entity, user_id, query, quota))
+            for entity, quota in plan.items()
+        }
+        budget = (time_budget_ms or settings.UNIFIED_SEARCH_TIME_BUDGET_MS) / 1000
+        start = time.perf_counter()
+        if tasks:
+            await asyncio.wait(tasks.values(), timeout=budget)
+
+        ranked: list[UnifiedSearchHit] = []
+        counts: dict[SearchEntity, int] = {}
+        timed_out: list[SearchEntity] = []
+        for entity, task in tasks.items():
+            if not task.done():
+                task.cancel()
+                timed_out.append(entity)
+                continue
+            try:
+                hits = task.result()
+            except Exception as e:
+                # 单个类型失败不影响其他结果
+                logger.error(f"统一搜索 {entity} 失败: {e}")
+                timed_out.append(entity)
+                continue
+            counts[entity] = len(hits)
+            ranked.extend(self._normalize(entity, hits))
+
+        if timed_out:
+            logger.warning(
+                f"统一搜索在 {time.perf_counter() - start:.2f}s 内未完成: {timed_out}"
+            )
+        ranked.sort(key=_sort_key)
+        return ranked, counts, timed_out
+
+    @staticmethod
+    def _normalize(
+        entity: SearchEntity, hits: list[UnifiedSearchHit]
+    ) -> list[UnifiedSearchHit]:
+        """本类最高分归一化为1，再乘以类型权重."""
+        top = max((hit.score for hit in hits), default=0.0)
+        weight = ENTITY_WEIGHTS[entity]
+        for hit in hits:
+            hit.score = round(hit.score / top * weight, 6) if top > 0 else 0.0
+        return hits
+
+    async def _search_entity(
+        self, entity: SearchEntity, user_id: int, query: str, quota: int
+    ) -> list[UnifiedSearchHit]:
+        async with self.session_factory() as db:
+            if entity == "conversation":
+                return await self._search_conversations(db, user_id, query, quota)
+            stmt = self._statement(db, entity, user_id, query).limit(quota)
+            rows = (await db.execute(stmt)).all()
+        return [
+            UnifiedSearchHit(
+                type=entity,
+                id=row.id,
+                title=row.title or "",
+                snippet=row.snippet or None,
+                score=float(row.score or 0.0),
+                space_id=row.space_id,
+                document_id=row.document_id,
+            )
+            for row in rows
+        ]
+
+    @staticmethod
+    def _statement(
+        db: AsyncSession, entity: SearchEntity, user_id: int, query: str
+    ) -> Any:
+        """全文索引覆盖的类型，列统一为 id/title/snippet/score/space_id/document_id."""
+        if entity == "document":
+            model: Any = Document
+            title: Any = func.coalesce(Document.title, Document.filename)
+            snippet_column: Any = Document.search_text
+            space_id: Any = Document.space_id
+            document_id: Any = null()
+            scope: Any = or_(
+                Document.user_id == user_id,
+                Document.space_id.in_(crud_space.accessible_space_ids(user_id=user_id)),
+            )
+        elif entity == "note":
+            model, title, snippet_column = Note, Note.title, Note.content
+            space_id, document_id = Note.space_id, null()
+            scope = Note.user_id == user_id
+        elif entity == "citation":
+            model, title, snippet_column = Citation, Citation.title, Citation.abstract
+            space_id, document_id = Citation.space_id, Citation.document_id
+            scope = Citation.user_id == user_id
+        else:
+            model = Annotation
+            title = func.coalesce(Annotation.selected_text, Annotation.content)
+            snippet_column = Annotation.content
+            space_id, document_id = null(), Annotation.document_id
+            scope = Annotation.user_id == user_id
+
+        fts = FullTextQuery(db, model, query)
+        return (
+            select(
+                model.id.label("id"),
+                title.label("title"),
+                fts.headline(snippet_column).label("snippet"),
+                fts.rank().label("score"),
+                space_id.label("space_id"),
+                document_id.label("document_id"),
+            )
+            .where(scope, fts.condition())
+            .order_by(fts.rank().desc(), model.id.desc())
+        )
+
+    @staticmethod
+    async def _search_conversations(
+        db: AsyncSession, user_id: int, query: str, quota: int
+    ) -> list[UnifiedSearchHit]:
+        """对话只有标题可搜，按标题子串匹配，得分为词相似度."""
+        rows = (
+            await db.execute(
+                select(Conversation.id, Conversation.title, Conversation.space_id)
+                .where(
+                    Conversation.user_id == user_id,
+                    Conversation.title.icontains(query, autoescape=True),
+                )
+                .order_by(Conversation.updated_at.desc(), Conversation.id.desc())
+                .limit(quota)
+            )
+        ).all()
+        return [
+            UnifiedSearchHit(
+                type="conversation",
+                id=row.id,
+                title=row.title,
+                score=word_similarity(query, row.title),
+                space_id=row.space_id,
+            )
+            for row in rows
+        ]
+
+
+# 创建全局实例
+unified_search_service = UnifiedSearchService()
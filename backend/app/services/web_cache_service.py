@@ -0,0 +1,180 @@
+"""HTTP cache of fetched web pages with conditional revalidation."""
+
+import hashlib
+import logging
+import zlib
+from collections.abc import Callable, Mapping
+from datetime import UTC, datetime, timedelta
+from typing import Any, cast
+
+from sqlalchemy import CursorResult, delete, func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import async_session_factory
+from app.models.models import WebPageCache
+
+logger = logging.getLogger(__name__)
+
+
+def url_hash(url: str) -> str:
+    """缓存键：URL的SHA-256."""
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+class WebCacheService:
+    """网页抓取缓存服务.
+
+    新鲜期内的条目直接复用，不访问源站；过期条目带 If-None-Match /
+    If-Modified-Since 重新请求，源站返回304时继续复用已解析的正文和元数据，
+    只刷新确认时间。条目数超过上限时淘汰最久未使用的。
+    缓存读写失败只记录日志，不影响抓取本身。
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = async_session_factory,
+        ttl_seconds: int | None = None,
+        max_entries: int | None = None,
+    ) -> None:
+        self.session_factory = session_factory
+        self.ttl = timedelta(
+            seconds=settings.WEB_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        )
+        self.max_entries = max_entries or settings.WEB_CACHE_MAX_ENTRIES
+
+    async def get(self, url: str) -> WebPageCache | None:
+        """读取URL的缓存条目."""
+        try:
+            async with self.session_factory() as db:
+                result = await db.execute(
+                    select(WebPageCache).where(WebPageCache.url_hash == url_hash(url))
+                )
+                return result.scalar_one_or_none()
+        except Exception as e:
+            logger.warning(f"读取网页缓存失败 {url}: {e}")
+            return None
+
+    def is_fresh(self, entry: WebPageCache) -> bool:
+        """条目是否仍在新鲜期内."""
+        validated_at = entry.validated_at
+        if validated_at.tzinfo is None:
+            validated_at = validated_at.replace(tzinfo=UTC)
+        return datetime.now(UTC) - validated_at < self.ttl
+
+    @staticmethod
+    def conditional_headers(entry: WebPageCache) -> dict[str, str]:
+        """重新验证条目的条件请求头."""
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    @staticmethod
+    def to_result(entry: WebPageCache) -> dict[str, Any]:
+        """转换为 fetch_webpage 的返回结构."""
+        metadata = dict(entry.meta_data or {})
+        return {
+            "url": entry.url,
+            "title": metadata.get("title", ""),
+            "content": entry.content or "",
+            "metadata": metadata,
+            "snapshot_html": zlib.decompress(entry.snapshot).decode("utf-8")
+            if entry.snapshot
+            else "",
+            "fetched_at": entry.validated_at.isoformat(),
+            "status": "success",
+        }
+
+    async def put(
+        self, url: str, result: dict[str, Any], headers: Mapping[str, str]
+    ) -> None:
+        """写入或覆盖抓取结果，响应禁止缓存时跳过."""
+        if "no-store" in headers.get("Cache-Control", "").lower():
+            return
+
+        content = result.get("content") or ""
+        snapshot = zlib.compress((result.get("snapshot_html") or "").encode("utf-8"))
+        now = datetime.now(UTC)
+        values = {
+            "url": url,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "content": content,
+            "meta_data": result.get("metadata") or {},
+            "snapshot": snapshot,
+            "size": len(content.encode("utf-8")) + len(snapshot),
+            "validated_at": now,
+            "last_used_at": now,
+        }
+        try:
+            async with self.session_factory() as db:
+                key = url_hash(url)
+                updated = await db.execute(
+                    update(WebPageCache)
+                    .where(WebPageCache.url_hash == key)
+                    .values(**values)
+                )
+                if not cast(CursorResult[Any], updated).rowcount:
+                    db.add(WebPageCache(url_hash=key, **values))
+                try:
+                    await db.commit()
+                except IntegrityError:
+                    # 并发抓取了相同URL，保留先提交的结果
+                    await db.rollback()
+                    return
+                await self._evict(db)
+        except Exception as e:
+            logger.warning(f"写入网页缓存失败 {url}: {e}")
+
+    async def revalidated(self, url: str, headers: Mapping[str, str]) -> None:
+        """源站确认内容未变化（304），刷新确认时间和验证器."""
+        now = datetime.now(UTC)
+        values: dict[str, Any] = {"validated_at": now, "last_used_at": now}
+        # 304 响应可能带有新的验证器
+        if headers.get("ETag"):
+            values["etag"] = headers["ETag"]
+        if headers.get("Last-Modified"):
+            values["last_modified"] = headers["Last-Modified"]
+        await self._update(url, values)
+
+    async def touch(self, url: str) -> None:
+        """记录一次缓存命中，用于淘汰."""
+        await self._update(url, {"last_used_at": datetime.now(UTC)})
+
+    async def _update(self, url: str, values: dict[str, Any]) -> None:
+        try:
+            async with self.session_factory() as db:
+                await db.execute(
+                    update(WebPageCache)
+                    .where(WebPageCache.url_hash == url_hash(url))
+                    .values(**values)
+                )
+                await db.commit()
+        except Exception as e:
+            logger.warning(f"更新网页缓存失败 {url}: {e}")
+
+    async def _evict(self, db: AsyncSession) -> int:
+        """超过条目上限时删除最久未使用的条目."""
+        total = (
+            await db.execute(select(func.count()).select_from(WebPageCache))
+        ).scalar() or 0
+        excess = total - self.max_entries
+        if excess <= 0:
+            return 0
+        oldest = (
+            select(WebPageCache.id)
+            .order_by(WebPageCache.last_used_at, WebPageCache.id)
+            .limit(excess)
+        )
+        await db.execute(delete(WebPageCache).where(WebPageCache.id.in_(oldest)))
+        await db.commit()
+        logger.info(f"网页缓存超过上限，淘汰 {excess} 个条目")
+        return excess
+
+
+# 创建全局实例
+web_cache_service = WebCacheService()
@@ -1,66 +1,199 @@
 """Web scraping service for URL import and webpage snapshots."""
 
+import asyncio
 import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
 from datetime import datetime
 from typing import Any
 from urllib.parse import urlparse
 
 import httpx
 from bs4 import BeautifulSoup
-from bs4.element import Tag
+
+from app.core.config import settings
+from app.services.html_extractor import (
+    ExtractedPage,
+    HtmlExtractor,
+    SoupExtractor,
+    clean_text,
+    create_html_extractor,
+)
+from app.services.web_cache_service import WebCacheService, web_cache_service
 
 logger = logging.getLogger(__name__)
 
 
-class WebScraperService:
-    """网页抓取服务."""
+class PageTooLargeError(Exception):
+    """网页超过允许下载的大小."""
+
+
+@dataclass
+class _Download:
+    status_code: int
+    headers: httpx.Headers
+    html: str
+
 
-    def __init__(self) -> None:
+class WebScraperService:
+    """网页抓取服务.
+
+    所有请求共用一个带连接池的客户端。批量抓取时限制全局并发数和单个主机的
+    并发数，页面边下载边计数，超过大小上限立即中止；HTML由可替换的解析引擎
+    （默认安装了lxml时使用lxml）一次解析，放到线程池执行，不阻塞事件循环。配置缓存后，重复抓取的页面在新鲜期内直接复用，
+    过期后发送条件请求，304时不再下载和解析。
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int | None = None,
+        per_host_concurrency: int | None = None,
+        max_bytes: int | None = None,
+        cache: WebCacheService | None = None,
+        extractor: HtmlExtractor | None = None,
+    ) -> None:
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
         }
-        self.timeout = 30.0
+        self.timeout = settings.WEB_FETCH_TIMEOUT
+        self.max_concurrency = max(1, max_concurrency or settings.WEB_FETCH_CONCURRENCY)
+        self.per_host_concurrency = max(
+            1, per_host_concurrency or settings.WEB_FETCH_PER_HOST
+        )
+        self.max_bytes = max_bytes or settings.WEB_FETCH_MAX_BYTES
+        self.cache = cache
+        self.extractor = extractor or create_html_extractor()
+
+        self._client: httpx.AsyncClient | None = None
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        # 主机 -> (信号量, 正在使用或等待的请求数)，无人使用时移除
+        self._host_slots: dict[str, tuple[asyncio.Semaphore, int]] = {}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """共享的HTTP客户端（首次使用时创建）."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                headers=self.headers,
+                timeout=self.timeout,
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                ),
+            )
+        return self._client
+
+    async def close(self) -> None:
+        """关闭共享客户端."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @asynccontextmanager
+    async def _slot(self, url: str) -> AsyncIterator[None]:
+        """占用抓取名额：先按主机排队，再占全局名额."""
+        host = urlparse(url).netloc.lower()
+        semaphore, users = self._host_slots.get(
+            host, (asyncio.Semaphore(self.per_host_concurrency), 0)
+        )
+        self._host_slots[host] = (semaphore, users + 1)
+        try:
+            async with semaphore, self._slots:
+                yield
+        finally:
+            semaphore, users = self._host_slots[host]
+            if users > 1:
+                self._host_slots[host] = (semaphore, users - 1)
+            else:
+                del self._host_slots[host]
+
+    async def _download(
+        self, url: str, headers: dict[str, str] | None = None
+    ) -> _Download:
+        """流式下载页面，超过大小上限时中止."""
+        async with self.client.stream("GET", url, headers=headers) as response:
+            if response.status_code == 304:
+                return _Download(304, response.headers, "")
+            response.raise_for_status()
+
+            declared = response.headers.get("Content-Length")
+            if declared and declared.isdigit() and int(declared) > self.max_bytes:
+                raise PageTooLargeError(f"页面大小 {declared} 字节超过上限 {self.max_bytes}")
+
+            body = bytearray()
+            async for chunk in response.aiter_bytes():
+                body.extend(chunk)
+                if len(body) > self.max_bytes:
+                    raise PageTooLargeError(f"页面超过大小上限 {self.max_bytes} 字节")
+
+            return _Download(
+                response.status_code,
+                response.headers,
+                body.decode(response.encoding or "utf-8", errors="replace"),
+            )
+
+    def _parse_page(self, url: str, html: str) -> dict[str, Any]:
+        """解析HTML（同步执行，在线程池中调用）.
+
+        页面只解析一次，同时得到正文、元数据、链接、Markdown和快照。
+        """
+        page = self.extractor.extract(html, url)
+        metadata = self._page_metadata(page, url)
+
+        return {
+            "url": url,
+            "title": metadata["title"],
+            "content": page.content,
+            "metadata": metadata,
+            "snapshot_html": page.snapshot_html,
+            "snapshot_markdown": page.markdown,
+            "links": page.links,
+            "fetched_at": datetime.now().isoformat(),
+            "status": "success"
+        }
+
+    @staticmethod
+    def _page_metadata(page: ExtractedPage, url: str) -> dict[str, Any]:
+        domain = urlparse(url).netloc
+        return {
+            "url": url,
+            "domain": domain,
+            "fetched_at": datetime.now().isoformat(),
+            "title": page.title if page.title is not None else domain,
+            **page.meta,
+        }
 
     async def fetch_webpage(self, url: str) -> dict[str, Any]:
         """抓取网页内容."""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    url,
-                    headers=self.headers,
-                    timeout=self.timeout,
-                    follow_redirects=True
-                )
-                response.raise_for_status()
-
-                # 解析HTML
-                soup = BeautifulSoup(response.text, "html.parser")
-
-                # 提取元数据
-                metadata = self._extract_metadata(soup, url)
-
-                # 提取主要内容
-                content = self._extract_content(soup)
-
-                # 获取页面快照
-                snapshot_html = str(soup)
-
-                return {
-                    "url": url,
-                    "title": metadata["title"],
-                    "content": content,
-                    "metadata": metadata,
-                    "snapshot_html": snapshot_html,
-                    "fetched_at": datetime.now().isoformat(),
-                    "status": "success"
-                }
+            cache = self.cache
+            cached = await cache.get(url) if cache else None
+            if cache and cached is not None and cache.is_fresh(cached):
+                await cache.touch(url)
+                return cache.to_result(cached)
+
+            conditional = cache.conditional_headers(cached) if cache and cached else None
+            async with self._slot(url):
+                page = await self._download(url, conditional)
+
+            if page.status_code == 304 and cache and cached is not None:
+                # 内容未变化，复用已解析的结果
+                await cache.revalidated(url, page.headers)
+                return cache.to_result(cached)
+
+            result = await asyncio.to_thread(self._parse_page, url, page.html)
+            if cache:
+                await cache.put(url, result, page.headers)
+            return result
 
         except httpx.HTTPStatusError as e:
             logger.error(f"HTTP error fetching {url}: {e}")
             return {
                 "url": url,
                 "status": "error",
-                "error": f"HTTP {e.response.status_code}: {e.response.text[:200]}",
+                "error": f"HTTP {e.response.status_code}: {e.response.reason_phrase}",
                 "fetched_at": datetime.now().isoformat()
             }
         except Exception as e:
@@ -74,171 +207,42 @@ class WebScraperService:
 
     def _extract_metadata(self, soup: BeautifulSoup, url: str) -> dict[str, Any]:
         """提取网页元数据."""
-        metadata = {
-            "url": url,
-            "domain": urlparse(url).netloc,
-            "fetched_at": datetime.now().isoformat()
-        }
-
-        # 标题
-        title_tag = soup.find("title")
-        metadata["title"] = title_tag.text.strip() if title_tag else urlparse(url).netloc
-
-        # 描述
-        description_tag = soup.find("meta", attrs={"name": "description"})
-        if isinstance(description_tag, Tag):
-            content = description_tag.get("content")
-            if content:
-                metadata["description"] = str(content).strip()
-
-        # 关键词
-        keywords_tag = soup.find("meta", attrs={"name": "keywords"})
-        if isinstance(keywords_tag, Tag):
-            content = keywords_tag.get("content")
-            if content:
-                metadata["keywords"] = str(content).strip()
-
-        # 作者
-        author_tag = soup.find("meta", attrs={"name": "author"})
-        if isinstance(author_tag, Tag):
-            content = author_tag.get("content")
-            if content:
-                metadata["author"] = str(content).strip()
-
-        # Open Graph 数据
-        og_title = soup.find("meta", property="og:title")
-        if isinstance(og_title, Tag):
-            content = og_title.get("content")
-            if content:
-                metadata["og_title"] = str(content).strip()
-
-        og_description = soup.find("meta", property="og:description")
-        if isinstance(og_description, Tag):
-            content = og_description.get("content")
-            if content:
-                metadata["og_description"] = str(content).strip()
-
-        og_image = soup.find("meta", property="og:image")
-        if isinstance(og_image, Tag):
-            content = og_image.get("content")
-            if content:
-                metadata["og_image"] = str(content).strip()
-
-        # 发布时间
-        published_time = soup.find("meta", property="article:published_time")
-        if isinstance(published_time, Tag):
-            content = published_time.get("content")
-            if content:
-                metadata["published_time"] = str(content).strip()
-
-        return metadata
+        title, meta = SoupExtractor.metadata(soup)
+        return self._page_metadata(ExtractedPage(title=title, meta=meta), url)
 
     def _extract_content(self, soup: BeautifulSoup) -> str:
         """提取网页主要内容."""
-        # 移除脚本和样式
-        for script in soup(["script", "style"]):
-            script.decompose()
-
-        # 尝试查找主要内容区域
-        content_areas = [
-            soup.find("main"),
-            soup.find("article"),
-            soup.find("div", class_="content"),
-            soup.find("div", class_="main"),
-            soup.find("div", id="content"),
-            soup.find("div", id="main"),
-        ]
-
-        for area in content_areas:
-            if area:
-                return self._clean_text(area.get_text())
-
-        # 如果找不到特定区域，提取body内容
-        body = soup.find("body")
-        if body:
-            return self._clean_text(body.get_text())
-
-        # 最后尝试提取所有文本
-        return self._clean_text(soup.get_text())
+        return SoupExtractor.content(soup)
 
     def _clean_text(self, text: str) -> str:
         """清理文本内容."""
-        # 移除多余的空白
-        lines = [line.strip() for line in text.splitlines()]
-        lines = [line for line in lines if line]
-
-        # 合并段落
-        cleaned = "\n\n".join(lines)
-
-        # 限制长度
-        max_length = 50000  # 最多50k字符
-        if len(cleaned) > max_length:
-            cleaned = cleaned[:max_length] + "..."
-
-        return cleaned
+        return clean_text(text)
 
     async def fetch_multiple_urls(self, urls: list[str]) -> list[dict[str, Any]]:
-        """批量抓取多个URL."""
-        results = []
-        for url in urls:
-            result = await self.fetch_webpage(url)
-            results.append(result)
-        return results
+        """批量并发抓取多个URL，结果按输入顺序返回."""
+        return list(await asyncio.gather(*(self.fetch_webpage(url) for url in urls)))
+
+    async def iter_webpages(self, urls: list[str]) -> AsyncIterator[dict[str, Any]]:
+        """批量并发抓取多个URL，按完成顺序逐个返回结果."""
+        tasks = [asyncio.ensure_future(self.fetch_webpage(url)) for url in urls]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # 调用方提前停止迭代时取消未完成的抓取
+            for task in tasks:
+                task.cancel()
 
     def extract_links(self, html_content: str, base_url: str) -> list[str]:
         """从HTML中提取所有链接."""
-        soup = BeautifulSoup(html_content, "html.parser")
-        links = []
-
-        for link in soup.find_all("a", href=True):
-            if isinstance(link, Tag):
-                href = link.get("href")
-                if href and isinstance(href, str):
-                    # 转换相对URL为绝对URL
-                    if href.startswith("http"):
-                        links.append(href)
-                    elif href.startswith("/"):
-                        parsed = urlparse(base_url)
-                        links.append(f"{parsed.scheme}://{parsed.netloc}{href}")
-
-        # 去重并过滤空字符串
-        return list({link for link in links if link})
+        return self.extractor.extract(html_content, base_url).links
 
     def convert_to_markdown(self, html_content: str) -> str:
         """将HTML转换为Markdown格式."""
-        soup = BeautifulSoup(html_content, "html.parser")
-
-        # 简单的HTML到Markdown转换
-        markdown_lines = []
-
-        for element in soup.find_all(["h1", "h2", "h3", "h4", "h5", "h6", "p", "ul", "ol", "blockquote"]):
-            if isinstance(element, Tag) and element.name:
-                element_name = str(element.name)
-                if element_name.startswith("h") and len(element_name) > 1:
-                    try:
-                        level = int(element_name[1])
-                        markdown_lines.append(f"{'#' * level} {element.get_text().strip()}")
-                    except (ValueError, IndexError):
-                        pass
-                elif element_name == "p":
-                    text = element.get_text().strip()
-                    if text:
-                        markdown_lines.append(text)
-                elif element_name in ["ul", "ol"]:
-                    for li in element.find_all("li"):
-                        prefix = "-" if element_name == "ul" else "1."
-                        markdown_lines.append(f"{prefix} {li.get_text().strip()}")
-                elif element_name == "blockquote":
-                    quote_text = element.get_text().strip()
-                    for line in quote_text.split("\n"):
-                        line = line.strip()
-                        if line:
-                            markdown_lines.append(f"> {line}")
-
-                markdown_lines.append("")  # 添加空行
-
-        return "\n".join(markdown_lines)
+        return self.extractor.extract(html_content, "").markdown
 
 
 # 创建全局实例
-web_scraper_service = WebScraperService()
+web_scraper_service = WebScraperService(
+    cache=web_cache_service if settings.WEB_CACHE_ENABLED else None
+)
@@ -0,0 +1,96 @@
+"""Compressed storage of web page snapshots in the blob store."""
+
+import asyncio
+import gzip
+import logging
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.blob_service import BlobService, blob_service
+from app.services.web_scraper_service import web_scraper_service
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_CONTENT_TYPE = "application/gzip"
+
+# meta_data 中引用快照对象的字段
+SNAPSHOT_KEYS = ("snapshot_key", "snapshot_markdown_key")
+
+
+def _compress(text: str) -> bytes:
+    # 固定 mtime，相同内容得到相同字节，按哈希去重
+    return gzip.compress(text.encode("utf-8"), mtime=0)
+
+
+def _read_compressed(path: Path) -> str:
+    return gzip.decompress(path.read_bytes()).decode("utf-8")
+
+
+class WebSnapshotService:
+    """网页快照存储服务.
+
+    快照HTML和导入时生成的Markdown分别gzip压缩后存入内容寻址的原始文件存储，
+    文档 meta_data 只保存对象键。读取快照不再解析HTML；旧文档的快照仍内联在
+    meta_data 中，读取时回退并现场转换。
+    """
+
+    def __init__(self, blobs: BlobService | None = None) -> None:
+        self.blobs = blobs or blob_service
+
+    async def save(
+        self, db: AsyncSession, html: str, markdown: str | None = None
+    ) -> dict[str, Any]:
+        """保存快照并增加引用，返回写入 meta_data 的字段.
+
+        抓取时已生成Markdown的直接使用，否则现场转换。
+        调用方负责在创建文档的事务中提交，失败时回滚。
+        """
+        if markdown is None:
+            markdown = await asyncio.to_thread(
+                web_scraper_service.convert_to_markdown, html
+            )
+        fields: dict[str, Any] = {"snapshot_size": len(html.encode("utf-8"))}
+        blobs = []
+        for field, text in (("snapshot_key", html), ("snapshot_markdown_key", markdown)):
+            data = await asyncio.to_thread(_compress, text)
+            # store_bytes 会提交未引用的记录，全部写完后再增加引用，
+            # 引用只随调用方的事务提交，回滚后对象由垃圾回收清理
+            blob = await self.blobs.store_bytes(db, data, SNAPSHOT_CONTENT_TYPE)
+            blobs.append(blob)
+            fields[field] = blob.storage_key
+        for blob in blobs:
+            await self.blobs.add_reference(db, blob)
+        return fields
+
+    async def load(self, meta_data: dict[str, Any]) -> dict[str, str] | None:
+        """读取快照HTML和Markdown，文档没有快照时返回 None."""
+        if meta_data.get("snapshot_key"):
+            return {
+                "snapshot_html": await self._read(meta_data["snapshot_key"]),
+                "snapshot_markdown": await self._read(meta_data["snapshot_markdown_key"]),
+            }
+        if "snapshot_html" in meta_data:
+            # 旧文档：快照内联在 meta_data 中
+            html = meta_data["snapshot_html"]
+            return {
+                "snapshot_html": html,
+                "snapshot_markdown": await asyncio.to_thread(
+                    web_scraper_service.convert_to_markdown, html
+                ),
+            }
+        return None
+
+    async def _read(self, key: str) -> str:
+        async with self.blobs.open_local(key) as path:
+            return await asyncio.to_thread(_read_compressed, path)
+
+    async def release(self, db: AsyncSession, *keys: str | None) -> None:
+        """文档删除时释放快照引用. 调用方负责提交事务."""
+        for key in keys:
+            await self.blobs.release(db, key)
+
+
+# 创建全局实例
+web_snapshot_service = WebSnapshotService()
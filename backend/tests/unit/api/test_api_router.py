@@ -36,6 +36,9 @@ class TestAPIRouter:
         assert data["service"] == settings.APP_NAME
         assert data["version"] == settings.VERSION
         assert "timestamp" in data
+        assert {"hits", "misses", "upstream_calls", "coalesced", "inflight"} <= set(
+            data["search_cache"]
+        )
 
     def test_openapi_available(self, client):
         """Test that OpenAPI schema is available."""
@@ -79,6 +82,7 @@ class TestAPIRouter:
             f"{settings.API_V1_STR}/citations",
             f"{settings.API_V1_STR}/export",
             f"{settings.API_V1_STR}/ollama",
+            f"{settings.API_V1_STR}/search",
         ]
 
         for prefix in expected_prefixes:
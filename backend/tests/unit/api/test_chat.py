@@ -26,6 +26,7 @@ from app.api.v1.endpoints.chat import (
     switch_conversation_branch,
     update_conversation,
 )
+from app.crud.listing import Page
 from app.models.models import Conversation, Space, User
 from app.models.models import Message as DBMessage
 from app.schemas.chat import (
@@ -359,24 +360,36 @@ class TestConversationManagement:
             create_mock_conversation(2, "Conv 2"),
         ]
 
-        with patch("app.api.v1.endpoints.chat.ConversationService") as mock_service:
-            mock_service.get_user_conversations = AsyncMock(
-                return_value=mock_conversations
+        with patch("app.api.v1.endpoints.chat.crud") as mock_crud:
+            mock_crud.crud_conversation.get_page = AsyncMock(
+                return_value=Page(items=mock_conversations, total=12, next_cursor="c2")
             )
 
             result = await get_conversations(
                 space_id=None,
                 mode=None,
                 skip=0,
-                limit=20,
+                limit=2,
+                cursor=None,
                 db=mock_db,
                 current_user=mock_user,
             )
 
-            assert result.total == 2
+            assert result.total == 12
             assert len(result.conversations) == 2
             assert result.page == 1
-            assert result.page_size == 20
+            assert result.page_size == 2
+            assert result.has_next
+            assert result.next_cursor == "c2"
+            mock_crud.crud_conversation.get_page.assert_awaited_once_with(
+                mock_db,
+                user_id=mock_user.id,
+                space_id=None,
+                mode=None,
+                skip=0,
+                limit=2,
+                cursor=None,
+            )
 
     @pytest.mark.asyncio
     async def test_get_conversation_detail(self):
@@ -1,11 +1,12 @@
 """documents.py 的完整单元测试"""
 
+import hashlib
 from datetime import UTC, datetime
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from fastapi import HTTPException, UploadFile, status
-from fastapi.responses import FileResponse
 from pydantic import HttpUrl
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -17,17 +18,25 @@ from app.api.v1.endpoints.documents import (
     get_document,
     get_document_content,
     get_document_preview,
+    get_document_status,
     get_documents,
     get_web_snapshot,
     import_url,
+    search_documents,
     update_document,
     upload_document,
+    upload_documents_batch,
 )
+from app.crud.listing import Page
 from app.models.models import Document, Space, User
 from app.schemas.documents import (
+    BatchUploadResponse,
     DocumentListResponse,
     DocumentResponse,
+    DocumentStatusResponse,
     DocumentUpdate,
+    DocumentUploadResponse,
+    SearchRequest,
 )
 from app.schemas.web_import import (
     BatchURLImportRequest,
@@ -37,6 +46,7 @@ from app.schemas.web_import import (
     URLImportResponse,
     WebSnapshotResponse,
 )
+from app.services.document_text_service import encode_page_offsets
 
 
 def create_mock_document(
@@ -55,6 +65,10 @@ def create_mock_document(
     mock_doc.filename = filename
     mock_doc.title = title
     mock_doc.content = content
+    mock_doc.preview = kwargs.get("preview", content[:300] if content else None)
+    mock_doc.content_hash = kwargs.get("content_hash", None)
+    mock_doc.content_length = kwargs.get("content_length", None)
+    mock_doc.page_offsets = kwargs.get("page_offsets", None)
     mock_doc.content_type = kwargs.get("content_type", "text/plain")
     mock_doc.file_size = kwargs.get("file_size", len(content) if content else 0)
     mock_doc.processing_status = kwargs.get("processing_status", "completed")
@@ -78,7 +92,7 @@ class TestUploadDocument:
 
     @pytest.mark.asyncio
     async def test_upload_document_success(self):
-        """测试成功上传文档"""
+        """测试上传文档后立即受理，内容在后台处理"""
         mock_db = AsyncMock(spec=AsyncSession)
         mock_user = MagicMock(spec=User)
         mock_user.id = 1
@@ -91,26 +105,30 @@ class TestUploadDocument:
         mock_file = MagicMock(spec=UploadFile)
         mock_file.filename = "test.txt"
         mock_file.content_type = "text/plain"
-        mock_file.read = AsyncMock(return_value=b"Test content")
+        mock_file.read = AsyncMock(side_effect=[b"Test content", b""])
 
         mock_document = create_mock_document(
             id=1,
             space_id=1,
             filename="test.txt",
             title="Test Document",
-            content="Test content",
+            content="",
             user_id=1,
             tags=["test"],
+            processing_status="pending",
         )
+        mock_job = MagicMock()
+        mock_job.id = 7
 
         with patch("app.api.v1.endpoints.documents.crud") as mock_crud:
             mock_crud.crud_space.get = AsyncMock(return_value=mock_space)
-            mock_crud.crud_document.update = AsyncMock(return_value=mock_document)
 
             with patch(
-                "app.api.v1.endpoints.documents.document_service"
-            ) as mock_service:
-                mock_service.create_document = AsyncMock(return_value=mock_document)
+                "app.api.v1.endpoints.documents.ingestion_service"
+            ) as mock_ingestion:
+                mock_ingestion.submit_upload = AsyncMock(
+                    return_value=(mock_document, mock_job, False)
+                )
 
                 result = await upload_document(
                     space_id=1,
@@ -121,10 +139,65 @@ class TestUploadDocument:
                     current_user=mock_user,
                 )
 
-                assert isinstance(result, DocumentResponse)
+                assert isinstance(result, DocumentUploadResponse)
+                # 保留文档字段，前端按 id、content_type、file_size 读取上传结果
                 assert result.id == 1
-                assert result.filename == "test.txt"
-                assert result.title == "Test Document"
+                assert result.content_type == "text/plain"
+                assert result.created_at == mock_document.created_at
+                assert result.job_id == 7
+                assert result.processing_status == "pending"
+                assert result.duplicate is False
+                assert result.status_url.endswith("/documents/1/status")
+
+                # 按原始字节哈希去重，标题和标签随文档一起创建
+                call_kwargs = mock_ingestion.submit_upload.call_args[1]
+                assert call_kwargs["upload"].sha256 == hashlib.sha256(b"Test content").hexdigest()
+                assert call_kwargs["upload"].size == len(b"Test content")
+                assert call_kwargs["content_type"] == "text/plain"
+                assert call_kwargs["title"] == "Test Document"
+                assert call_kwargs["tags"] == ["test"]
+
+    @pytest.mark.asyncio
+    async def test_upload_document_duplicate(self):
+        """测试重复文件返回已有文档"""
+        mock_db = AsyncMock(spec=AsyncSession)
+        mock_user = MagicMock(spec=User)
+        mock_user.id = 1
+
+        mock_space = MagicMock(spec=Space)
+        mock_space.id = 1
+        mock_space.user_id = 1
+
+        mock_file = MagicMock(spec=UploadFile)
+        mock_file.filename = "test.txt"
+        mock_file.content_type = "text/plain"
+        mock_file.read = AsyncMock(side_effect=[b"Test content", b""])
+
+        mock_document = create_mock_document(id=3, processing_status="completed")
+
+        with patch("app.api.v1.endpoints.documents.crud") as mock_crud:
+            mock_crud.crud_space.get = AsyncMock(return_value=mock_space)
+
+            with patch(
+                "app.api.v1.endpoints.documents.ingestion_service"
+            ) as mock_ingestion:
+                mock_ingestion.submit_upload = AsyncMock(
+                    return_value=(mock_document, None, True)
+                )
+
+                result = await upload_document(
+                    space_id=1,
+                    file=mock_file,
+                    title=None,
+                    tags=None,
+                    db=mock_db,
+                    current_user=mock_user,
+                )
+
+                assert result.id == 3
+                assert result.job_id is None
+                assert result.duplicate is True
+                assert result.processing_status == "completed"
 
     @pytest.mark.asyncio
     async def test_upload_document_space_not_found(self):
@@ -251,6 +324,44 @@ class TestUploadDocument:
             )
             assert "文件大小超过限制" in str(exc_info.value.detail)
 
+    @pytest.mark.asyncio
+    async def test_upload_document_too_large_stops_reading(self):
+        """测试累计大小超限时立即停止读取"""
+        mock_db = AsyncMock(spec=AsyncSession)
+        mock_user = MagicMock(spec=User)
+        mock_user.id = 1
+
+        mock_space = MagicMock(spec=Space)
+        mock_space.id = 1
+        mock_space.user_id = 1
+
+        chunk = b"x" * (1024 * 1024)
+        mock_file = MagicMock(spec=UploadFile)
+        mock_file.filename = "large.pdf"
+        mock_file.content_type = "application/pdf"
+        mock_file.size = None
+        mock_file.read = AsyncMock(return_value=chunk)  # 无限数据流
+
+        with patch("app.api.v1.endpoints.documents.crud") as mock_crud:
+            mock_crud.crud_space.get = AsyncMock(return_value=mock_space)
+
+            with patch(
+                "app.api.v1.endpoints.documents.document_service"
+            ) as mock_service:
+                with pytest.raises(HTTPException) as exc_info:
+                    await upload_document(
+                        space_id=1,
+                        file=mock_file,
+                        title=None,
+                        tags=None,
+                        db=mock_db,
+                        current_user=mock_user,
+                    )
+
+                assert exc_info.value.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+                assert mock_file.read.await_count == 101
+                mock_service.create_document_from_file.assert_not_called()
+
     @pytest.mark.asyncio
     async def test_upload_document_empty_file(self):
         """测试上传空文件"""
@@ -284,6 +395,146 @@ class TestUploadDocument:
             assert "文件为空" in str(exc_info.value.detail)
 
 
+class TestUploadDocumentsBatch:
+    """测试批量上传文档"""
+
+    @pytest.mark.asyncio
+    async def test_batch_upload_partial_failure(self):
+        """测试单个文件失败不影响其他文件"""
+        mock_db = AsyncMock(spec=AsyncSession)
+        mock_user = MagicMock(spec=User)
+        mock_user.id = 1
+
+        mock_space = MagicMock(spec=Space)
+        mock_space.id = 1
+        mock_space.user_id = 1
+
+        good_file = MagicMock(spec=UploadFile)
+        good_file.filename = "notes.md"
+        good_file.content_type = "text/markdown"
+        good_file.read = AsyncMock(side_effect=[b"# Notes", b""])
+
+        bad_file = MagicMock(spec=UploadFile)
+        bad_file.filename = "app.exe"
+        bad_file.content_type = "application/x-msdownload"
+
+        mock_document = create_mock_document(
+            id=5, filename="notes.md", processing_status="pending"
+        )
+        mock_job = MagicMock()
+        mock_job.id = 9
+
+        with patch("app.api.v1.endpoints.documents.crud") as mock_crud:
+            mock_crud.crud_space.get = AsyncMock(return_value=mock_space)
+
+            with patch(
+                "app.api.v1.endpoints.documents.ingestion_service"
+            ) as mock_ingestion:
+                mock_ingestion.submit_upload = AsyncMock(
+                    return_value=(mock_document, mock_job, False)
+                )
+
+                result = await upload_documents_batch(
+                    space_id=1,
+                    files=[good_file, bad_file],
+                    tags="a, b",
+                    db=mock_db,
+                    current_user=mock_user,
+                )
+
+        assert isinstance(result, BatchUploadResponse)
+        assert result.total == 2
+        assert [r.job_id for r in result.accepted] == [9]
+        assert len(result.failed) == 1
+        assert result.failed[0].filename == "app.exe"
+        assert result.failed[0].status_code == status.HTTP_400_BAD_REQUEST
+        assert mock_ingestion.submit_upload.call_args[1]["tags"] == ["a", "b"]
+
+    @pytest.mark.asyncio
+    async def test_batch_upload_too_many_files(self):
+        """测试超过单次文件数上限"""
+        mock_db = AsyncMock(spec=AsyncSession)
+        mock_user = MagicMock(spec=User)
+        mock_user.id = 1
+
+        with patch("app.api.v1.endpoints.documents.settings") as mock_settings:
+            mock_settings.INGESTION_BATCH_MAX_FILES = 1
+
+            with pytest.raises(HTTPException) as exc_info:
+                await upload_documents_batch(
+                    space_id=1,
+                    files=[MagicMock(spec=UploadFile), MagicMock(spec=UploadFile)],
+                    tags=None,
+                    db=mock_db,
+                    current_user=mock_user,
+                )
+
+        assert exc_info.value.status_code == status.HTTP_400_BAD_REQUEST
+
+
+class TestGetDocumentStatus:
+    """测试文档处理状态查询"""
+
+    @pytest.mark.asyncio
+    async def test_get_status_with_job(self):
+        """测试返回文档状态和最近的入库任务"""
+        mock_db = AsyncMock(spec=AsyncSession)
+        mock_user = MagicMock(spec=User)
+        mock_user.id = 1
+
+        mock_document = create_mock_document(
+            id=1,
+            processing_status="processing",
+            extraction_status="completed",
+            embedding_status="pending",
+        )
+        mock_job = MagicMock()
+        mock_job.id = 3
+        mock_job.document_id = 1
+        mock_job.status = "running"
+        mock_job.stage = "embedding"
+        mock_job.attempts = 1
+        mock_job.max_attempts = 3
+        mock_job.error_message = None
+        mock_job.started_at = datetime.now(UTC)
+        mock_job.finished_at = None
+        mock_job.created_at = datetime.now(UTC)
+
+        with patch("app.api.v1.endpoints.documents.document_service") as mock_service:
+            mock_service.get_document_by_id = AsyncMock(return_value=mock_document)
+            with patch("app.api.v1.endpoints.documents.crud") as mock_crud:
+                mock_crud.crud_ingestion_job.get_latest_by_document = AsyncMock(
+                    return_value=mock_job
+                )
+
+                result = await get_document_status(
+                    document_id=1, db=mock_db, current_user=mock_user
+                )
+
+        assert isinstance(result, DocumentStatusResponse)
+        assert result.processing_status == "processing"
+        assert result.extraction_status == "completed"
+        assert result.job is not None
+        assert result.job.stage == "embedding"
+        assert result.job.attempts == 1
+
+    @pytest.mark.asyncio
+    async def test_get_status_not_found(self):
+        """测试文档不存在"""
+        mock_db = AsyncMock(spec=AsyncSession)
+        mock_user = MagicMock(spec=User)
+
+        with patch("app.api.v1.endpoints.documents.document_service") as mock_service:
+            mock_service.get_document_by_id = AsyncMock(return_value=None)
+
+            with pytest.raises(HTTPException) as exc_info:
+                await get_document_status(
+                    document_id=99, db=mock_db, current_user=mock_user
+                )
+
+        assert exc_info.value.status_code == status.HTTP_404_NOT_FOUND
+
+
 class TestGetDocuments:
     """测试获取文档列表功能"""
 
@@ -314,8 +565,8 @@ class TestGetDocuments:
 
         with patch("app.api.v1.endpoints.documents.crud") as mock_crud:
             mock_crud.crud_space.get = AsyncMock(return_value=mock_space)
-            mock_crud.crud_document.get_by_space = AsyncMock(
-                return_value=mock_documents
+            mock_crud.crud_document.get_page = AsyncMock(
+                return_value=Page(items=mock_documents, total=3)
             )
 
             result = await get_documents(
@@ -323,6 +574,8 @@ class TestGetDocuments:
                 skip=0,
                 limit=20,
                 search=None,
+                processing_status=None,
+                cursor=None,
                 db=mock_db,
                 current_user=mock_user,
             )
@@ -331,6 +584,7 @@ class TestGetDocuments:
             assert result.total == 3
             assert len(result.documents) == 3
             assert result.page == 1
+            assert mock_crud.crud_document.get_page.call_args.kwargs["space_id"] == 1
 
     @pytest.mark.asyncio
     async def test_get_documents_all_user_documents(self):
@@ -353,8 +607,8 @@ class TestGetDocuments:
             mock_documents.append(mock_doc)
 
         with patch("app.api.v1.endpoints.documents.crud") as mock_crud:
-            mock_crud.crud_document.get_user_documents = AsyncMock(
-                return_value=mock_documents
+            mock_crud.crud_document.get_page = AsyncMock(
+                return_value=Page(items=mock_documents, total=5)
             )
 
             result = await get_documents(
@@ -363,6 +617,7 @@ class TestGetDocuments:
                 limit=20,
                 search=None,
                 processing_status=None,
+                cursor=None,
                 db=mock_db,
                 current_user=mock_user,
             )
@@ -372,6 +627,9 @@ class TestGetDocuments:
             assert len(result.documents) == 5
             assert result.page == 1
             assert result.page_size == 20
+            kwargs = mock_crud.crud_document.get_page.call_args.kwargs
+            assert kwargs["user_id"] == 1
+            assert kwargs["space_id"] is None
 
     @pytest.mark.asyncio
     async def test_get_documents_with_search(self):
@@ -399,19 +657,24 @@ class TestGetDocuments:
 
         with patch("app.api.v1.endpoints.documents.crud") as mock_crud:
             mock_crud.crud_space.get = AsyncMock(return_value=mock_space)
-            mock_crud.crud_document.search = AsyncMock(return_value=mock_documents)
+            mock_crud.crud_document.get_page = AsyncMock(
+                return_value=Page(items=mock_documents, total=1)
+            )
 
             result = await get_documents(
                 space_id=1,
                 skip=0,
                 limit=20,
                 search="important",
+                processing_status=None,
+                cursor=None,
                 db=mock_db,
                 current_user=mock_user,
             )
 
             assert result.total == 1
             assert result.documents[0].title == "Important Document"
+            assert mock_crud.crud_document.get_page.call_args.kwargs["search"] == "important"
 
     @pytest.mark.asyncio
     async def test_get_documents_no_access(self):
@@ -659,7 +922,7 @@ class TestDownloadDocument:
 
     @pytest.mark.asyncio
     async def test_download_document_success(self):
-        """测试成功下载文档"""
+        """测试没有原始文件的旧文档下载提取的文本"""
         mock_db = AsyncMock(spec=AsyncSession)
         mock_user = MagicMock(spec=User)
         mock_user.id = 1
@@ -670,24 +933,85 @@ class TestDownloadDocument:
             content="Test content",
             content_type="text/plain",
         )
+        mock_document.file_path = "spaces/1/documents/test.txt"
 
         with patch("app.api.v1.endpoints.documents.document_service") as mock_service:
             mock_service.get_document_by_id = AsyncMock(return_value=mock_document)
 
-            with patch("tempfile.NamedTemporaryFile") as mock_temp:
-                mock_file = MagicMock()
-                mock_file.name = "/tmp/test_test.txt"
-                mock_file.__enter__ = MagicMock(return_value=mock_file)
-                mock_file.__exit__ = MagicMock(return_value=None)
-                mock_temp.return_value = mock_file
+            result = await download_document(
+                document_id=1, db=mock_db, current_user=mock_user
+            )
 
-                result = await download_document(
-                    document_id=1, db=mock_db, current_user=mock_user
-                )
+        assert result.status_code == 200
+        assert result.body == b"Test content"
+        assert result.media_type == "text/plain; charset=utf-8"
+        assert result.headers["etag"]
+        assert "test.txt" in result.headers["content-disposition"]
+
+    @pytest.mark.asyncio
+    async def test_download_blob_streams_range(self, tmp_path):
+        """测试原始文件按Range流式返回"""
+        from app.core.blob_store import LocalBlobBackend
+        from app.services.blob_service import BlobService
+
+        mock_db = AsyncMock(spec=AsyncSession)
+        mock_user = MagicMock(spec=User)
+        mock_user.id = 1
+        data = b"0123456789" * 100
+        backend = LocalBlobBackend(tmp_path)
+        source = tmp_path / "upload"
+        source.write_bytes(data)
+        backend.put_file("blobs/ab/abc", source, "application/pdf")
+
+        mock_document = create_mock_document(
+            id=1, filename="paper.pdf", content_type="application/pdf", file_size=len(data)
+        )
+        mock_document.file_path = "blobs/ab/abc"
+        mock_document.file_hash = "abc"
+
+        with (
+            patch("app.api.v1.endpoints.documents.document_service") as mock_service,
+            patch(
+                "app.api.v1.endpoints.documents.blob_service",
+                BlobService(backend=backend),
+            ),
+        ):
+            mock_service.get_document_by_id = AsyncMock(return_value=mock_document)
+
+            result = await download_document(
+                document_id=1,
+                range_header="bytes=10-19",
+                if_none_match=None,
+                db=mock_db,
+                current_user=mock_user,
+            )
+            body = b"".join([chunk async for chunk in result.body_iterator])
 
-                assert isinstance(result, FileResponse)
-                assert result.filename == "test.txt"
-                assert result.media_type == "text/plain"
+            assert result.status_code == 206
+            assert body == data[10:20]
+            assert result.headers["content-range"] == "bytes 10-19/1000"
+            assert result.headers["content-length"] == "10"
+            assert result.headers["etag"] == '"abc"'
+            assert result.media_type == "application/pdf"
+
+            not_modified = await download_document(
+                document_id=1,
+                range_header=None,
+                if_none_match='"abc"',
+                db=mock_db,
+                current_user=mock_user,
+            )
+            assert not_modified.status_code == 304
+
+            unsatisfiable = await download_document(
+                document_id=1,
+                range_header="bytes=5000-",
+                if_none_match=None,
+                db=mock_db,
+                current_user=mock_user,
+            )
+            assert unsatisfiable.status_code == 416
+            assert unsatisfiable.headers["content-range"] == "bytes */1000"
 
     @pytest.mark.asyncio
     async def test_download_document_no_content(self):
@@ -752,6 +1076,46 @@ class TestGetDocumentPreview:
             assert result["page_count"] == 10
             assert result["current_page"] == 1
 
+    @pytest.mark.asyncio
+    async def test_preview_pdf_page_from_index(self):
+        """测试有页索引时按页读取文本"""
+        mock_db = AsyncMock(spec=AsyncSession)
+        mock_user = MagicMock(spec=User)
+        mock_user.id = 1
+
+        mock_document = create_mock_document(
+            id=1,
+            user_id=1,
+            space_id=0,
+            filename="test.pdf",
+            content_type="application/pdf",
+            content_hash="hash",
+            page_offsets=encode_page_offsets([0, 10, 25]),
+            meta_data={"page_count": 3},
+        )
+
+        with (
+            patch("app.api.v1.endpoints.documents.crud") as mock_crud,
+            patch(
+                "app.api.v1.endpoints.documents.document_text_service"
+            ) as mock_text_service,
+        ):
+            mock_crud.crud_document.get = AsyncMock(return_value=mock_document)
+            mock_text_service.read_page = AsyncMock(return_value="第二页")
+
+            result = await get_document_preview(
+                document_id=1,
+                page=2,
+                format="html",
+                db=mock_db,
+                current_user=mock_user,
+            )
+
+        assert result["content"] == "第二页"
+        assert result["current_page"] == 2
+        mock_text_service.read_page.assert_awaited_once_with(mock_db, mock_document, 2)
+        mock_text_service.get_text.assert_not_called()
+
     @pytest.mark.asyncio
     async def test_preview_image_document(self):
         """测试预览图片文档"""
@@ -875,7 +1239,9 @@ class TestGetDocumentContent:
         )
 
         with patch("app.api.v1.endpoints.documents.crud") as mock_crud:
-            mock_crud.crud_document.get = AsyncMock(return_value=mock_document)
+            mock_crud.crud_document.get_without_content = AsyncMock(
+                return_value=mock_document
+            )
 
             result = await get_document_content(
                 document_id=1,
@@ -905,7 +1271,9 @@ class TestGetDocumentContent:
         )
 
         with patch("app.api.v1.endpoints.documents.crud") as mock_crud:
-            mock_crud.crud_document.get = AsyncMock(return_value=mock_document)
+            mock_crud.crud_document.get_without_content = AsyncMock(
+                return_value=mock_document
+            )
 
             with pytest.raises(HTTPException) as exc_info:
                 await get_document_content(
@@ -1097,6 +1465,56 @@ class TestBatchImportURLs:
                 assert results[0].title == "Article 1"
                 assert results[1].title == "Article 2"
 
+    @pytest.mark.asyncio
+    async def test_batch_import_urls_stream(self):
+        """测试流式返回每个URL的导入结果"""
+        mock_db = AsyncMock(spec=AsyncSession)
+        mock_user = MagicMock(spec=User)
+        mock_user.id = 1
+
+        mock_space = MagicMock(spec=Space)
+        mock_space.id = 1
+        mock_space.user_id = 1
+
+        batch_request = BatchURLImportRequest(
+            urls=[
+                HttpUrl("https://example.com/ok"),
+                HttpUrl("https://example.com/broken"),
+            ],
+            space_id=1,
+            stream=True,
+        )
+
+        async def iter_results(*args, **kwargs):
+            yield {"status": "error", "url": "https://example.com/broken", "error": "HTTP 404"}
+            yield {"status": "success", "url": "https://example.com/ok", "document_id": 1}
+
+        with (
+            patch("app.api.v1.endpoints.documents.crud") as mock_crud,
+            patch("app.api.v1.endpoints.documents.document_service") as mock_service,
+        ):
+            mock_crud.crud_space.get = AsyncMock(return_value=mock_space)
+            mock_crud.crud_document.get = AsyncMock(
+                return_value=create_mock_document(id=1, title="OK")
+            )
+            mock_service.iter_import_urls = iter_results
+
+            response = await batch_import_urls(
+                import_data=batch_request,
+                db=mock_db,
+                current_user=mock_user,
+            )
+            events = [chunk async for chunk in response.body_iterator]
+
+        assert response.media_type == "text/event-stream"
+        assert len(events) == 3
+        first = URLImportResponse.model_validate_json(events[0].removeprefix("data: "))
+        second = URLImportResponse.model_validate_json(events[1].removeprefix("data: "))
+        assert (first.status, first.error) == ("error", "HTTP 404")
+        assert (second.status, second.title) == ("success", "OK")
+        assert events[2] == "data: [DONE]\n\n"
+        mock_service.batch_import_urls.assert_not_called()
+
     @pytest.mark.asyncio
     async def test_batch_import_urls_partial_failure(self):
         """测试批量导入部分失败"""
@@ -1281,6 +1699,95 @@ class TestAnalyzeURL:
             assert "Access denied" in str(exc_info.value.detail)
 
 
+class TestSearchDocuments:
+    """测试文档搜索"""
+
+    @staticmethod
+    def _row(doc, score, tags_matched=False, **matched):
+        fields = ("title", "filename", "content")
+        return SimpleNamespace(
+            Document=doc,
+            score=score,
+            tags_matched=tags_matched,
+            **{f"{f}_matched": f in matched for f in fields},
+            **{f"{f}_headline": matched.get(f, "") for f in fields},
+        )
+
+    @pytest.mark.asyncio
+    async def test_search_documents(self):
+        """测试搜索在数据库中完成，返回数据库生成的高亮"""
+        mock_db = AsyncMock(spec=AsyncSession)
+        mock_user = MagicMock(spec=User)
+        mock_user.id = 1
+        rows = [
+            self._row(
+                create_mock_document(id=1, title="Kafka Guide"),
+                0.6,
+                title="<mark>Kafka</mark> Guide",
+                content="using <mark>Kafka</mark> streams",
+            ),
+            self._row(
+                create_mock_document(
+                    id=2, title=None, filename="kafka.pdf", summary="摘要", tags=["kafka", "mq"]
+                ),
+                0.2,
+                tags_matched=True,
+                filename="<mark>kafka</mark>.pdf",
+            ),
+        ]
+
+        with patch("app.api.v1.endpoints.documents.crud") as mock_crud:
+            mock_crud.crud_document.search_accessible = AsyncMock(return_value=(rows, 12))
+
+            result = await search_documents(
+                search_request=SearchRequest(query="kafka", limit=2, offset=4),
+                db=mock_db,
+                current_user=mock_user,
+            )
+
+        mock_crud.crud_document.search_accessible.assert_awaited_once_with(
+            mock_db, query="kafka", user_id=1, space_id=None, skip=4, limit=2
+        )
+        mock_crud.crud_document.get_multi.assert_not_called()
+        assert result.total == 12
+        first, second = result.results
+        assert first.snippet == "using <mark>Kafka</mark> streams"
+        assert first.highlight == {
+            "title": ["<mark>Kafka</mark> Guide"],
+            "content": ["using <mark>Kafka</mark> streams"],
+        }
+        assert second.title == "kafka.pdf"
+        assert second.snippet == "摘要"
+        assert second.highlight == {
+            "filename": ["<mark>kafka</mark>.pdf"],
+            "tags": ["kafka", "mq"],
+        }
+
+    @pytest.mark.asyncio
+    async def test_search_documents_space_forbidden(self):
+        """测试指定无权访问的空间"""
+        mock_db = AsyncMock(spec=AsyncSession)
+        mock_user = MagicMock(spec=User)
+        mock_user.id = 2
+        mock_space = MagicMock(spec=Space)
+        mock_space.user_id = 1
+        mock_space.is_public = False
+
+        with patch("app.api.v1.endpoints.documents.crud") as mock_crud:
+            mock_crud.crud_space.get = AsyncMock(return_value=mock_space)
+            mock_crud.crud_space.get_user_access = AsyncMock(return_value=None)
+
+            with pytest.raises(HTTPException) as exc_info:
+                await search_documents(
+                    search_request=SearchRequest(query="kafka", space_id=1),
+                    db=mock_db,
+                    current_user=mock_user,
+                )
+
+        assert exc_info.value.status_code == status.HTTP_403_FORBIDDEN
+        mock_crud.crud_document.search_accessible.assert_not_called()
+
+
 class TestAdditionalCoverage:
     """Additional tests to improve code coverage"""
 
@@ -1329,15 +1836,15 @@ class TestAdditionalCoverage:
         mock_file = MagicMock(spec=UploadFile)
         mock_file.filename = "test.txt"
         mock_file.content_type = "text/plain"
-        mock_file.read = AsyncMock(return_value=b"Test content")
+        mock_file.read = AsyncMock(side_effect=[b"Test content", b""])
 
         with patch("app.api.v1.endpoints.documents.crud") as mock_crud:
             mock_crud.crud_space.get = AsyncMock(return_value=mock_space)
 
             with patch(
-                "app.api.v1.endpoints.documents.document_service"
-            ) as mock_service:
-                mock_service.create_document = AsyncMock(
+                "app.api.v1.endpoints.documents.ingestion_service"
+            ) as mock_ingestion:
+                mock_ingestion.submit_upload = AsyncMock(
                     side_effect=Exception("Service error")
                 )
 
@@ -1395,8 +1902,8 @@ class TestAdditionalCoverage:
         ]
 
         with patch("app.api.v1.endpoints.documents.crud") as mock_crud:
-            mock_crud.crud_document.get_user_documents = AsyncMock(
-                return_value=mock_documents
+            mock_crud.crud_document.get_page = AsyncMock(
+                return_value=Page(items=mock_documents[:1], total=1)
             )
 
             result = await get_documents(
@@ -1405,12 +1912,14 @@ class TestAdditionalCoverage:
                 limit=20,
                 search="Important",
                 processing_status=None,
+                cursor=None,
                 db=mock_db,
                 current_user=mock_user,
             )
 
             assert result.total == 1
             assert result.documents[0].title == "Important Document"
+            assert mock_crud.crud_document.get_page.call_args.kwargs["search"] == "Important"
 
     @pytest.mark.asyncio
     async def test_get_documents_all_with_processing_status(self):
@@ -1425,8 +1934,8 @@ class TestAdditionalCoverage:
         ]
 
         with patch("app.api.v1.endpoints.documents.crud") as mock_crud:
-            mock_crud.crud_document.get_user_documents = AsyncMock(
-                return_value=mock_documents
+            mock_crud.crud_document.get_page = AsyncMock(
+                return_value=Page(items=mock_documents[1:], total=1)
             )
 
             result = await get_documents(
@@ -1435,12 +1944,16 @@ class TestAdditionalCoverage:
                 limit=20,
                 search=None,
                 processing_status="processing",
+                cursor=None,
                 db=mock_db,
                 current_user=mock_user,
             )
 
             assert result.total == 1
             assert result.documents[0].processing_status == "processing"
+            assert (
+                mock_crud.crud_document.get_page.call_args.kwargs["status"] == "processing"
+            )
 
     @pytest.mark.asyncio
     async def test_update_document_not_found(self):
@@ -1604,7 +2117,7 @@ class TestAdditionalCoverage:
         mock_user.id = 1
 
         with patch("app.api.v1.endpoints.documents.crud") as mock_crud:
-            mock_crud.crud_document.get = AsyncMock(return_value=None)
+            mock_crud.crud_document.get_without_content = AsyncMock(return_value=None)
 
             with pytest.raises(HTTPException) as exc_info:
                 await get_document_content(
@@ -59,6 +59,7 @@ def mock_document():
     document.title = "Test Document"
     document.filename = "test.pdf"
     document.content = "Test document content"
+    document.content_hash = None  # 无分块全文，使用正文列
     document.content_type = "application/pdf"
     document.created_at = datetime.now(UTC)
     document.file_size = 1024
@@ -470,6 +471,7 @@ class TestExportDocuments:
         mock_document2.title = "Test Document 2"
         mock_document2.filename = "test2.pdf"
         mock_document2.content = "Test document content 2"
+        mock_document2.content_hash = None  # 无分块全文，使用正文列
         mock_document2.content_type = "application/pdf"
         mock_document2.created_at = datetime.now(UTC)
         mock_document2.file_size = 2048
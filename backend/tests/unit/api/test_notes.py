@@ -28,6 +28,7 @@ from app.api.v1.endpoints.notes import (
     search_notes,
     update_note,
 )
+from app.crud.listing import InvalidCursorError, Page
 from app.models.models import Note, Space, User
 from app.schemas.note import (
     NoteAIGenerateRequest,
@@ -70,6 +71,7 @@ def mock_note():
     note.space_id = 1
     note.title = "Test Note"
     note.content = "Test content"
+    note.preview = "Test content"
     note.content_html = "<p>Test content</p>"
     note.content_type = "markdown"
     note.note_type = "manual"
@@ -101,8 +103,8 @@ class TestGetNotes:
     @pytest.mark.asyncio
     async def test_get_notes_with_space_id(self, mock_db, mock_user, mock_note):
         """Test getting notes with space_id filter."""
-        with patch("app.crud.note.crud_note.get_by_space") as mock_get_by_space:
-            mock_get_by_space.return_value = [mock_note]
+        with patch("app.crud.note.crud_note.get_page") as mock_get_page:
+            mock_get_page.return_value = Page(items=[mock_note], total=1)
 
             result = await get_notes(
                 space_id=1,
@@ -112,6 +114,7 @@ class TestGetNotes:
                 limit=20,
                 sort_by="created_at",
                 sort_order="desc",
+                cursor=None,
                 db=mock_db,
                 current_user=mock_user,
             )
@@ -121,12 +124,15 @@ class TestGetNotes:
             assert result.page == 1
             assert result.page_size == 20
             assert not result.has_next
+            assert result.next_cursor is None
+            assert mock_get_page.call_args.kwargs["space_id"] == 1
+            assert mock_get_page.call_args.kwargs["user_id"] == mock_user.id
 
     @pytest.mark.asyncio
     async def test_get_notes_without_space_id(self, mock_db, mock_user, mock_note):
         """Test getting all user notes."""
-        with patch("app.crud.note.crud_note.get_multi") as mock_get_multi:
-            mock_get_multi.return_value = [mock_note]
+        with patch("app.crud.note.crud_note.get_page") as mock_get_page:
+            mock_get_page.return_value = Page(items=[mock_note], total=1)
 
             result = await get_notes(
                 space_id=None,
@@ -136,34 +142,39 @@ class TestGetNotes:
                 limit=20,
                 sort_by="created_at",
                 sort_order="desc",
+                cursor=None,
                 db=mock_db,
                 current_user=mock_user,
             )
 
             assert len(result.notes) == 1
             assert result.total == 1
+            assert mock_get_page.call_args.kwargs["space_id"] is None
 
     @pytest.mark.asyncio
     async def test_get_notes_with_filters(self, mock_db, mock_user, mock_note):
-        """Test getting notes with type filter."""
+        """Test type and tag filters are passed to the database query."""
         mock_note.note_type = "markdown"
-        with patch("app.crud.note.crud_note.get_multi") as mock_get_multi:
-            mock_get_multi.return_value = [mock_note]
+        with patch("app.crud.note.crud_note.get_page") as mock_get_page:
+            mock_get_page.return_value = Page(items=[mock_note], total=1)
 
             result = await get_notes(
                 space_id=None,
                 note_type="markdown",
-                tags=None,
+                tags=["kafka"],
                 skip=0,
                 limit=20,
                 sort_by="created_at",
                 sort_order="desc",
+                cursor=None,
                 db=mock_db,
                 current_user=mock_user,
             )
 
             assert len(result.notes) == 1
             assert result.notes[0].note_type == "markdown"
+            assert mock_get_page.call_args.kwargs["note_type"] == "markdown"
+            assert mock_get_page.call_args.kwargs["tags"] == ["kafka"]
 
     @pytest.mark.asyncio
     async def test_get_notes_pagination(self, mock_db, mock_user):
@@ -176,6 +187,7 @@ class TestGetNotes:
             note.space_id = 1
             note.title = f"Note {i + 1}"
             note.content = f"Content {i + 1}"
+            note.preview = f"Content {i + 1}"
             note.content_type = "markdown"
             note.note_type = "manual"
             note.source_type = None
@@ -191,8 +203,10 @@ class TestGetNotes:
             note.updated_at = datetime.now()
             notes.append(note)
 
-        with patch("app.crud.note.crud_note.get_multi") as mock_get_multi:
-            mock_get_multi.return_value = notes
+        with patch("app.crud.note.crud_note.get_page") as mock_get_page:
+            mock_get_page.return_value = Page(
+                items=notes[2:4], total=len(notes), next_cursor="next"
+            )
 
             result = await get_notes(
                 space_id=None,
@@ -202,6 +216,7 @@ class TestGetNotes:
                 limit=2,
                 sort_by="created_at",
                 sort_order="desc",
+                cursor=None,
                 db=mock_db,
                 current_user=mock_user,
             )
@@ -209,6 +224,51 @@ class TestGetNotes:
             assert len(result.notes) == 2
             assert result.page == 2
             assert result.has_next
+            assert result.next_cursor == "next"
+            assert mock_get_page.call_args.kwargs["skip"] == 2
+
+    @pytest.mark.asyncio
+    async def test_get_notes_invalid_cursor(self, mock_db, mock_user):
+        """Test a malformed cursor is rejected with 400."""
+        with patch("app.crud.note.crud_note.get_page") as mock_get_page:
+            mock_get_page.side_effect = InvalidCursorError("Invalid pagination cursor")
+
+            with pytest.raises(HTTPException) as exc_info:
+                await get_notes(
+                    space_id=None,
+                    note_type=None,
+                    tags=None,
+                    skip=0,
+                    limit=20,
+                    sort_by="updated_at",
+                    sort_order="desc",
+                    cursor="bogus",
+                    db=mock_db,
+                    current_user=mock_user,
+                )
+
+            assert exc_info.value.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_get_notes_invalid_sort_by(self, mock_db, mock_user):
+        """Test sorting by a column outside the whitelist is rejected with 400."""
+        with patch("app.crud.note.crud_note.get_page") as mock_get_page:
+            with pytest.raises(HTTPException) as exc_info:
+                await get_notes(
+                    space_id=None,
+                    note_type=None,
+                    tags=None,
+                    skip=0,
+                    limit=20,
+                    sort_by="content",
+                    sort_order="desc",
+                    cursor=None,
+                    db=mock_db,
+                    current_user=mock_user,
+                )
+
+            assert exc_info.value.status_code == 400
+            mock_get_page.assert_not_called()
 
 
 class TestGetRecentNotes:
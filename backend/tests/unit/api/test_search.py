@@ -0,0 +1,90 @@
+"""search.py 的单元测试"""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1.endpoints.search import suggest, unified_search
+from app.models.models import User
+from app.schemas.search import SuggestItem, UnifiedSearchHit, UnifiedSearchRequest
+from app.services.unified_search_service import InvalidCursorError, UnifiedSearchResult
+
+
+class TestSuggest:
+    """测试输入联想"""
+
+    @pytest.mark.asyncio
+    async def test_suggest(self):
+        mock_db = AsyncMock(spec=AsyncSession)
+        mock_user = MagicMock(spec=User)
+        mock_user.id = 1
+        items = [SuggestItem(type="space", id=3, title="Kafka", space_id=3, score=1.0)]
+
+        with patch("app.api.v1.endpoints.search.typeahead_service") as mock_service:
+            mock_service.suggest = AsyncMock(return_value=(items, True))
+
+            result = await suggest(
+                q="kaf", types=["space"], limit=5, db=mock_db, current_user=mock_user
+            )
+
+        mock_service.suggest.assert_awaited_once_with(
+            mock_db, mock_user, "kaf", limit=5, types=["space"]
+        )
+        assert result.query == "kaf"
+        assert result.items == items
+        assert result.cached
+
+
+class TestUnifiedSearch:
+    """测试统一搜索"""
+
+    @pytest.mark.asyncio
+    async def test_unified_search(self):
+        mock_user = MagicMock(spec=User)
+        mock_user.id = 1
+        hits = [UnifiedSearchHit(type="note", id=2, title="Kafka", score=1.0)]
+        result = UnifiedSearchResult(
+            hits=hits,
+            next_cursor="abc",
+            counts={"note": 1},
+            timed_out=["citation"],
+            cached=False,
+        )
+
+        with patch("app.api.v1.endpoints.search.unified_search_service") as mock_service:
+            mock_service.search = AsyncMock(return_value=result)
+
+            response = await unified_search(
+                UnifiedSearchRequest(query="kafka", limit=1), current_user=mock_user
+            )
+
+        mock_service.search.assert_awaited_once_with(
+            1,
+            "kafka",
+            types=None,
+            quotas={},
+            limit=1,
+            cursor=None,
+            time_budget_ms=None,
+        )
+        assert response.results == hits
+        assert response.next_cursor == "abc"
+        assert response.partial
+        assert response.timed_out == ["citation"]
+
+    @pytest.mark.asyncio
+    async def test_invalid_cursor(self):
+        mock_user = MagicMock(spec=User)
+        mock_user.id = 1
+
+        with patch("app.api.v1.endpoints.search.unified_search_service") as mock_service:
+            mock_service.search = AsyncMock(side_effect=InvalidCursorError("无效的分页游标"))
+
+            with pytest.raises(HTTPException) as exc_info:
+                await unified_search(
+                    UnifiedSearchRequest(query="kafka", cursor="x"), current_user=mock_user
+                )
+
+        assert exc_info.value.status_code == 400
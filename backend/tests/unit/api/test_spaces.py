@@ -14,6 +14,7 @@ from app.api.v1.endpoints.spaces import (
     get_spaces,
     update_space,
 )
+from app.crud.listing import InvalidCursorError, Page
 from app.models.models import Document, Space, User
 from app.schemas.spaces import (
     SpaceCreate,
@@ -217,6 +218,29 @@ class TestCreateSpace:
             assert "创建空间失败" in str(exc_info.value.detail)
 
 
+def _mock_spaces(count: int) -> list[MagicMock]:
+    mock_spaces = []
+    for i in range(count):
+        mock_space = MagicMock(spec=Space)
+        mock_space.id = i + 1
+        mock_space.name = f"Space {i + 1}"
+        mock_space.description = f"Description {i + 1}"
+        mock_space.color = None
+        mock_space.icon = None
+        mock_space.is_public = False
+        mock_space.allow_collaboration = False
+        mock_space.tags = [f"tag{i + 1}"]
+        mock_space.meta_data = None
+        mock_space.user_id = 1
+        mock_space.document_count = 0
+        mock_space.note_count = 0
+        mock_space.total_size = 0
+        mock_space.created_at = datetime.now(UTC)
+        mock_space.updated_at = None
+        mock_spaces.append(mock_space)
+    return mock_spaces
+
+
 class TestGetSpaces:
     """测试获取空间列表功能"""
 
@@ -227,28 +251,10 @@ class TestGetSpaces:
         mock_user = MagicMock(spec=User)
         mock_user.id = 1
 
-        mock_spaces = []
-        for i in range(3):
-            mock_space = MagicMock(spec=Space)
-            mock_space.id = i + 1
-            mock_space.name = f"Space {i + 1}"
-            mock_space.description = f"Description {i + 1}"
-            mock_space.color = None
-            mock_space.icon = None
-            mock_space.is_public = False
-            mock_space.allow_collaboration = False
-            mock_space.tags = [f"tag{i + 1}"]
-            mock_space.meta_data = None
-            mock_space.user_id = 1
-            mock_space.document_count = 0
-            mock_space.note_count = 0
-            mock_space.total_size = 0
-            mock_space.created_at = datetime.now(UTC)
-            mock_space.updated_at = None
-            mock_spaces.append(mock_space)
-
-        with patch("app.api.v1.endpoints.spaces.SpaceService") as mock_service:
-            mock_service.get_user_spaces = AsyncMock(return_value=mock_spaces)
+        with patch("app.api.v1.endpoints.spaces.crud") as mock_crud:
+            mock_crud.crud_space.get_page = AsyncMock(
+                return_value=Page(items=_mock_spaces(3), total=3)
+            )
 
             result = await get_spaces(
                 skip=0,
@@ -257,6 +263,7 @@ class TestGetSpaces:
                 tags=None,
                 is_public=None,
                 include_public=False,
+                cursor=None,
                 db=mock_db,
                 current_user=mock_user,
             )
@@ -266,183 +273,100 @@ class TestGetSpaces:
             assert len(result.spaces) == 3
             assert result.page == 1
             assert result.has_next is False
+            assert result.next_cursor is None
 
     @pytest.mark.asyncio
-    async def test_get_spaces_with_search(self):
-        """测试带搜索条件的空间列表"""
+    async def test_get_spaces_filters_in_database(self):
+        """测试搜索、标签和公开筛选都交给数据库查询"""
         mock_db = AsyncMock(spec=AsyncSession)
         mock_user = MagicMock(spec=User)
         mock_user.id = 1
 
-        mock_spaces = []
-        for i in range(3):
-            mock_space = MagicMock(spec=Space)
-            mock_space.id = i + 1
-            mock_space.name = f"Space {i + 1}" if i != 1 else "Test Space"
-            mock_space.description = f"Description {i + 1}"
-            mock_space.color = None
-            mock_space.icon = None
-            mock_space.is_public = False
-            mock_space.allow_collaboration = False
-            mock_space.tags = None
-            mock_space.meta_data = None
-            mock_space.user_id = 1
-            mock_space.document_count = 0
-            mock_space.note_count = 0
-            mock_space.total_size = 0
-            mock_space.created_at = datetime.now(UTC)
-            mock_space.updated_at = None
-            mock_spaces.append(mock_space)
-
-        with patch("app.api.v1.endpoints.spaces.SpaceService") as mock_service:
-            mock_service.get_user_spaces = AsyncMock(return_value=mock_spaces)
+        with patch("app.api.v1.endpoints.spaces.crud") as mock_crud:
+            mock_crud.crud_space.get_page = AsyncMock(
+                return_value=Page(items=_mock_spaces(1), total=1)
+            )
 
             result = await get_spaces(
                 skip=0,
                 limit=20,
                 search="Test",
-                tags=None,
-                is_public=None,
-                include_public=False,
+                tags=["common"],
+                is_public=True,
+                include_public=True,
+                cursor=None,
                 db=mock_db,
                 current_user=mock_user,
             )
 
-            assert result.total == 1
-            assert len(result.spaces) == 1
-            assert result.spaces[0].name == "Test Space"
-
-    @pytest.mark.asyncio
-    async def test_get_spaces_with_tags_filter(self):
-        """测试带标签过滤的空间列表"""
-        mock_db = AsyncMock(spec=AsyncSession)
-        mock_user = MagicMock(spec=User)
-        mock_user.id = 1
-
-        mock_spaces = []
-        for i in range(3):
-            mock_space = MagicMock(spec=Space)
-            mock_space.id = i + 1
-            mock_space.name = f"Space {i + 1}"
-            mock_space.description = f"Description {i + 1}"
-            mock_space.color = None
-            mock_space.icon = None
-            mock_space.is_public = False
-            mock_space.allow_collaboration = False
-            mock_space.tags = ["common", f"tag{i + 1}"] if i < 2 else ["other"]
-            mock_space.meta_data = None
-            mock_space.user_id = 1
-            mock_space.document_count = 0
-            mock_space.note_count = 0
-            mock_space.total_size = 0
-            mock_space.created_at = datetime.now(UTC)
-            mock_space.updated_at = None
-            mock_spaces.append(mock_space)
-
-        with patch("app.api.v1.endpoints.spaces.SpaceService") as mock_service:
-            mock_service.get_user_spaces = AsyncMock(return_value=mock_spaces)
-
-            result = await get_spaces(
+            mock_crud.crud_space.get_page.assert_awaited_once_with(
+                mock_db,
+                user_id=1,
+                include_public=True,
+                search="Test",
+                tags=["common"],
+                is_public=True,
                 skip=0,
                 limit=20,
-                search=None,
-                tags=["common"],
-                is_public=None,
-                include_public=False,
-                db=mock_db,
-                current_user=mock_user,
+                cursor=None,
             )
-
-            assert result.total == 2
-            assert len(result.spaces) == 2
+            assert result.total == 1
 
     @pytest.mark.asyncio
-    async def test_get_spaces_include_public(self):
-        """测试包含公开空间的列表"""
+    async def test_get_spaces_pagination(self):
+        """测试空间列表分页"""
         mock_db = AsyncMock(spec=AsyncSession)
         mock_user = MagicMock(spec=User)
         mock_user.id = 1
 
-        mock_spaces = []
-        for i in range(5):
-            mock_space = MagicMock(spec=Space)
-            mock_space.id = i + 1
-            mock_space.name = f"Space {i + 1}"
-            mock_space.description = f"Description {i + 1}"
-            mock_space.color = None
-            mock_space.icon = None
-            mock_space.is_public = i % 2 == 0  # 偶数为公开
-            mock_space.allow_collaboration = False
-            mock_space.tags = None
-            mock_space.meta_data = None
-            mock_space.user_id = 1 if i < 3 else 2  # 前3个是当前用户的
-            mock_space.document_count = 0
-            mock_space.note_count = 0
-            mock_space.total_size = 0
-            mock_space.created_at = datetime.now(UTC)
-            mock_space.updated_at = None
-            mock_spaces.append(mock_space)
-
         with patch("app.api.v1.endpoints.spaces.crud") as mock_crud:
-            mock_crud.crud_space.get_user_spaces = AsyncMock(return_value=mock_spaces)
+            mock_crud.crud_space.get_page = AsyncMock(
+                return_value=Page(items=_mock_spaces(10), total=25, next_cursor="c2")
+            )
 
             result = await get_spaces(
-                skip=0,
-                limit=20,
+                skip=10,
+                limit=10,
                 search=None,
                 tags=None,
-                is_public=True,  # 只要公开的
-                include_public=True,
+                is_public=None,
+                include_public=False,
+                cursor=None,
                 db=mock_db,
                 current_user=mock_user,
             )
 
-            assert len([s for s in result.spaces if s.is_public]) == len(result.spaces)
+            assert result.total == 25
+            assert result.page == 2
+            assert result.has_next is True
+            assert result.next_cursor == "c2"
 
     @pytest.mark.asyncio
-    async def test_get_spaces_pagination(self):
-        """测试空间列表分页"""
+    async def test_get_spaces_invalid_cursor(self):
+        """测试无效游标返回400"""
         mock_db = AsyncMock(spec=AsyncSession)
         mock_user = MagicMock(spec=User)
         mock_user.id = 1
 
-        mock_spaces = []
-        for i in range(25):  # 创建25个空间
-            mock_space = MagicMock(spec=Space)
-            mock_space.id = i + 1
-            mock_space.name = f"Space {i + 1}"
-            mock_space.description = f"Description {i + 1}"
-            mock_space.color = None
-            mock_space.icon = None
-            mock_space.is_public = False
-            mock_space.allow_collaboration = False
-            mock_space.tags = None
-            mock_space.meta_data = None
-            mock_space.user_id = 1
-            mock_space.document_count = 0
-            mock_space.note_count = 0
-            mock_space.total_size = 0
-            mock_space.created_at = datetime.now(UTC)
-            mock_space.updated_at = None
-            mock_spaces.append(mock_space)
-
-        with patch("app.api.v1.endpoints.spaces.SpaceService") as mock_service:
-            mock_service.get_user_spaces = AsyncMock(return_value=mock_spaces)
-
-            result = await get_spaces(
-                skip=20,
-                limit=10,
-                search=None,
-                tags=None,
-                is_public=None,
-                include_public=False,
-                db=mock_db,
-                current_user=mock_user,
+        with patch("app.api.v1.endpoints.spaces.crud") as mock_crud:
+            mock_crud.crud_space.get_page = AsyncMock(
+                side_effect=InvalidCursorError("Invalid pagination cursor")
             )
 
-            assert result.total == 25
-            assert result.page == 3  # skip=20, limit=10, 所以是第3页
-            assert result.has_next is False  # 25个总共，跳过20个，只剩5个
+            with pytest.raises(HTTPException) as exc_info:
+                await get_spaces(
+                    skip=0,
+                    limit=20,
+                    search=None,
+                    tags=None,
+                    is_public=None,
+                    include_public=False,
+                    cursor="bogus",
+                    db=mock_db,
+                    current_user=mock_user,
+                )
+
+            assert exc_info.value.status_code == status.HTTP_400_BAD_REQUEST
 
 
 class TestGetSpace:
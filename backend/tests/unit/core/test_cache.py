@@ -0,0 +1,109 @@
+"""Test in-process LRU cache."""
+
+from unittest.mock import patch
+
+from app.core.cache import LRUCache
+
+
+class TestLRUCacheBasics:
+    """Test basic get/set behaviour."""
+
+    def test_get_missing_returns_none(self):
+        """Test cache miss."""
+        cache: LRUCache[str] = LRUCache()
+        assert cache.get("missing") is None
+        assert cache.stats()["misses"] == 1
+
+    def test_set_and_get(self):
+        """Test cache hit."""
+        cache: LRUCache[str] = LRUCache()
+        cache.set("key", "value")
+
+        assert cache.get("key") == "value"
+        assert "key" in cache
+        assert len(cache) == 1
+        assert cache.stats()["hits"] == 1
+
+    def test_overwrite_updates_size(self):
+        """Test overwriting an entry replaces its size."""
+        cache: LRUCache[str] = LRUCache()
+        cache.set("key", "a" * 10)
+        cache.set("key", "b" * 4)
+
+        assert cache.get("key") == "bbbb"
+        assert cache.stats()["bytes"] == 4
+
+    def test_delete_and_clear(self):
+        """Test deleting and clearing entries."""
+        cache: LRUCache[str] = LRUCache()
+        cache.set("a", "1")
+        cache.set("b", "2")
+
+        assert cache.delete("a") is True
+        assert cache.delete("a") is False
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.stats()["bytes"] == 0
+
+
+class TestLRUCacheEviction:
+    """Test size-bounded eviction."""
+
+    def test_evicts_least_recently_used_by_count(self):
+        """Test eviction when max_entries is exceeded."""
+        cache: LRUCache[str] = LRUCache(max_entries=2)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.get("a")  # a becomes most recently used
+        cache.set("c", "3")
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert "c" in cache
+        assert cache.stats()["evictions"] == 1
+
+    def test_evicts_by_total_bytes(self):
+        """Test eviction when max_bytes is exceeded."""
+        cache: LRUCache[bytes] = LRUCache(max_bytes=10)
+        cache.set("a", b"x" * 6)
+        cache.set("b", b"y" * 6)
+
+        assert "a" not in cache
+        assert cache.get("b") == b"y" * 6
+        assert cache.stats()["bytes"] == 6
+
+    def test_skips_oversized_entry(self):
+        """Test entries larger than max_bytes are not cached."""
+        cache: LRUCache[bytes] = LRUCache(max_bytes=4)
+        cache.set("big", b"x" * 5)
+
+        assert "big" not in cache
+
+    def test_explicit_size(self):
+        """Test explicit size overrides sizeof."""
+        cache: LRUCache[dict] = LRUCache(max_bytes=100)
+        cache.set("a", {"k": "v"}, size=60)
+        cache.set("b", {"k": "v"}, size=60)
+
+        assert "a" not in cache
+        assert "b" in cache
+
+
+class TestLRUCacheTTL:
+    """Test time-based expiry."""
+
+    def test_expired_entry_is_miss(self):
+        """Test entries expire after ttl."""
+        cache: LRUCache[str] = LRUCache(ttl=10)
+        with patch("app.core.cache.time.monotonic", return_value=100.0):
+            cache.set("key", "value")
+        with patch("app.core.cache.time.monotonic", return_value=105.0):
+            assert cache.get("key") == "value"
+        with patch("app.core.cache.time.monotonic", return_value=111.0):
+            assert cache.get("key") is None
+            assert "key" not in cache
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
@@ -0,0 +1,198 @@
+"""Unit tests for full-text search helpers."""
+
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_mock_engine, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.schema import CreateTable
+
+from app.core.database import Base
+from app.core.full_text import (
+    FULL_TEXT_INDEXES,
+    TRIGRAM_COLUMNS,
+    TRIGRAM_EXTENSION_SQL,
+    FullTextQuery,
+    search_config,
+    trigram_create_sql,
+)
+from app.models.models import Note, Space, User
+
+
+def _session(dialect: str) -> SimpleNamespace:
+    """只提供方言信息的会话替身."""
+    return SimpleNamespace(
+        get_bind=lambda: SimpleNamespace(dialect=SimpleNamespace(name=dialect))
+    )
+
+
+def _compile(stmt) -> str:
+    return str(
+        stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    )
+
+
+@pytest.fixture
+async def session_factory():
+    """共享连接的内存SQLite会话工厂."""
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:", poolclass=StaticPool
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+class TestIndexDefinitions:
+    """测试生成列和索引DDL."""
+
+    def test_create_sql(self):
+        """测试生成列按权重拼接各字段，并建GIN索引."""
+        statements = FULL_TEXT_INDEXES["documents"].create_sql("english")
+
+        assert statements[0].startswith(
+            "ALTER TABLE documents ADD COLUMN IF NOT EXISTS search_vector tsvector "
+            "GENERATED ALWAYS AS (setweight(to_tsvector('english'::regconfig, "
+            "left(coalesce(title, ''), 500000)), 'A') || "
+        )
+        assert statements[0].endswith(") STORED")
+        assert statements[1] == (
+            "CREATE INDEX IF NOT EXISTS ix_documents_search_vector "
+            "ON documents USING gin (search_vector)"
+        )
+
+    def test_columns_exist_on_models(self):
+        """测试索引定义中的字段都存在于对应的表."""
+        for name, index in FULL_TEXT_INDEXES.items():
+            table = Base.metadata.tables[name]
+            assert all(column in table.c for column, _ in index.columns)
+            # 生成列不映射到模型，SQLite 建表不受影响
+            assert "search_vector" not in str(CreateTable(table))
+
+    def test_created_with_postgres_tables(self):
+        """测试 PostgreSQL 上 create_all 之后追加生成列和索引."""
+        statements: list[str] = []
+        engine = create_mock_engine(
+            "postgresql://", lambda sql, *args, **kwargs: statements.append(str(sql))
+        )
+
+        Base.metadata.create_all(engine, checkfirst=False)
+
+        for index in FULL_TEXT_INDEXES.values():
+            created = next(
+                i for i, sql in enumerate(statements) if f"CREATE TABLE {index.table} " in sql
+            )
+            alter, create_index = index.create_sql("english")
+            position = statements.index(alter)
+            assert position > created
+            assert statements[position + 1] == create_index
+
+    def test_trigram_indexes_created_with_postgres_tables(self):
+        """测试先启用 pg_trgm，建表后追加三元组索引."""
+        statements: list[str] = []
+        engine = create_mock_engine(
+            "postgresql://", lambda sql, *args, **kwargs: statements.append(str(sql))
+        )
+
+        Base.metadata.create_all(engine, checkfirst=False)
+
+        assert statements[0] == TRIGRAM_EXTENSION_SQL
+        for table, column in TRIGRAM_COLUMNS:
+            assert trigram_create_sql(table, column) in statements
+        assert trigram_create_sql("notes", "title") == (
+            "CREATE INDEX IF NOT EXISTS ix_notes_title_trgm ON notes USING gin (title gin_trgm_ops)"
+        )
+
+    def test_invalid_config_rejected(self):
+        with patch("app.core.full_text.settings.FULL_TEXT_SEARCH_CONFIG", "english'; --"):
+            with pytest.raises(ValueError):
+                search_config()
+
+
+class TestPostgresQuery:
+    """测试 PostgreSQL 查询表达式."""
+
+    def test_condition_rank_headline(self):
+        fts = FullTextQuery(_session("postgresql"), Note, '"vector search" -draft')
+        stmt = (
+            select(Note.id, fts.headline(Note.content))
+            .where(fts.condition())
+            .order_by(fts.rank().desc())
+        )
+
+        sql = _compile(stmt)
+
+        tsquery = "websearch_to_tsquery('english'::regconfig, '\"vector search\" -draft')"
+        assert f"notes.search_vector @@ {tsquery}" in sql
+        assert f"ts_rank_cd(notes.search_vector, {tsquery}, 32) DESC" in sql
+        assert "ts_headline('english'::regconfig, left(coalesce(notes.content, ''), 100000)" in sql
+        assert "ilike" not in sql.lower()
+
+    def test_matches_truncates_column(self):
+        """测试字段命中判断与索引一样截断正文."""
+        fts = FullTextQuery(_session("postgresql"), Note, "vector")
+
+        sql = _compile(select(fts.matches(Note.content)))
+
+        assert (
+            "to_tsvector('english'::regconfig, left(coalesce(notes.content, ''), 500000)) @@"
+            in sql
+        )
+
+    def test_cjk_query_uses_substring_match(self):
+        """测试包含中文的查询不走分词，按子串匹配."""
+        fts = FullTextQuery(_session("postgresql"), Note, "向量检索")
+        stmt = (
+            select(Note.id, fts.headline(Note.content))
+            .where(fts.condition())
+            .order_by(fts.rank().desc())
+        )
+
+        sql = _compile(stmt)
+
+        assert "notes.content ILIKE '%%向量检索%%'" in sql
+        assert "strpos(lower(notes.content), '向量检索')" in sql
+        assert "greatest(" in sql
+        assert "websearch_to_tsquery" not in sql
+        assert "search_vector" not in sql
+
+
+class TestFallbackQuery:
+    """测试 SQLite 回退实现."""
+
+    async def test_rank_and_headline(self, session_factory):
+        """测试标题命中排在正文命中之前，片段截取匹配位置附近."""
+        async with session_factory() as db:
+            user = User(username="u", email="u@example.com", hashed_password="x")
+            db.add(user)
+            await db.flush()
+            space = Space(name="S", user_id=user.id)
+            db.add(space)
+            await db.flush()
+            body = "x" * 500 + " Python tips " + "y" * 500
+            db.add_all(
+                [
+                    Note(space_id=space.id, user_id=user.id, title="Other", content=body),
+                    Note(space_id=space.id, user_id=user.id, title="Python", content="intro"),
+                    Note(space_id=space.id, user_id=user.id, title="None", content="nothing"),
+                ]
+            )
+            await db.commit()
+
+            fts = FullTextQuery(db, Note, "python")
+            result = await db.execute(
+                select(Note.title, fts.rank(), fts.headline(Note.content))
+                .where(fts.condition())
+                .order_by(fts.rank().desc())
+            )
+            rows = result.all()
+
+        assert [row[0] for row in rows] == ["Python", "Other"]
+        assert rows[0][1] > rows[1][1] > 0
+        assert rows[0][1] < 1
+        assert "Python tips" in rows[1][2]
+        assert len(rows[1][2]) == 200
@@ -0,0 +1,56 @@
+"""Unit tests for HTTP range helpers."""
+
+import pytest
+
+from app.core.http_ranges import (
+    RangeNotSatisfiableError,
+    content_disposition,
+    etag_matches,
+    parse_range,
+)
+
+
+class TestParseRange:
+    """测试Range解析."""
+
+    @pytest.mark.parametrize(
+        ("header", "expected"),
+        [
+            (None, None),
+            ("bytes=0-99", (0, 100)),
+            ("bytes=100-", (100, 1000)),
+            ("bytes=-100", (900, 1000)),
+            ("bytes=-5000", (0, 1000)),
+            ("bytes=990-5000", (990, 1000)),
+            ("bytes=0-1,5-9", None),
+            ("items=0-1", None),
+            ("bytes=abc", None),
+            ("bytes=9-1", None),
+        ],
+    )
+    def test_parse(self, header, expected):
+        assert parse_range(header, 1000) == expected
+
+    @pytest.mark.parametrize("header", ["bytes=1000-", "bytes=-0"])
+    def test_not_satisfiable(self, header):
+        with pytest.raises(RangeNotSatisfiableError):
+            parse_range(header, 1000)
+
+
+class TestEtagMatches:
+    """测试If-None-Match比较."""
+
+    def test_matches(self):
+        assert etag_matches('"a"', '"a"')
+        assert etag_matches('"b", W/"a"', '"a"')
+        assert etag_matches("*", '"a"')
+
+    def test_no_match(self):
+        assert not etag_matches(None, '"a"')
+        assert not etag_matches('"b"', '"a"')
+
+
+def test_content_disposition_encodes_unicode():
+    assert content_disposition("论文.pdf") == (
+        "attachment; filename*=UTF-8''%E8%AE%BA%E6%96%87.pdf"
+    )
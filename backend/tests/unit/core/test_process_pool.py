@@ -0,0 +1,71 @@
+"""Test bounded process pool."""
+
+import os
+import time
+
+import pytest
+
+from app.core.process_pool import ProcessPool, WorkerError, WorkerTimeoutError
+
+
+def _square(value: int) -> int:
+    return value * value
+
+
+def _sleep(seconds: float) -> int:
+    time.sleep(seconds)
+    return os.getpid()
+
+
+def _crash() -> None:
+    os._exit(1)
+
+
+def _allocate(megabytes: int) -> int:
+    return len(bytearray(megabytes * 1024 * 1024))
+
+
+@pytest.fixture
+def pool():
+    """Create a small process pool."""
+    pool = ProcessPool(max_workers=2, max_tasks_per_child=10, timeout=10)
+    yield pool
+    pool.shutdown()
+
+
+class TestProcessPool:
+    """Test running jobs in worker processes."""
+
+    @pytest.mark.asyncio
+    async def test_run_returns_result(self, pool):
+        """Test results are returned from the worker."""
+        assert await pool.run(_square, 7) == 49
+
+    @pytest.mark.asyncio
+    async def test_timeout_kills_worker(self, pool):
+        """Test a job over the timeout is terminated and the pool recovers."""
+        start = time.monotonic()
+        with pytest.raises(WorkerTimeoutError):
+            await pool.run(_sleep, 30, timeout=0.5)
+        assert time.monotonic() - start < 10
+
+        assert await pool.run(_square, 3) == 9
+
+    @pytest.mark.asyncio
+    async def test_crashed_worker_raises(self, pool):
+        """Test a worker that dies is reported as WorkerError."""
+        with pytest.raises(WorkerError):
+            await pool.run(_crash)
+
+        assert await pool.run(_square, 4) == 16
+
+    @pytest.mark.asyncio
+    @pytest.mark.skipif(os.name != "posix", reason="RLIMIT_AS is POSIX only")
+    async def test_memory_limit(self):
+        """Test allocations over the memory limit fail the job."""
+        pool = ProcessPool(max_workers=1, memory_limit_mb=512, timeout=30)
+        try:
+            with pytest.raises(WorkerError):
+                await pool.run(_allocate, 1024)
+        finally:
+            pool.shutdown()
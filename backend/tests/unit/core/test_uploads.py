@@ -0,0 +1,60 @@
+"""Test streaming upload spooling."""
+
+import hashlib
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi import UploadFile
+
+from app.core.uploads import UploadTooLargeError, spool_upload
+
+
+def _mock_upload(chunks: list[bytes], size: int | None = None) -> MagicMock:
+    upload = MagicMock(spec=UploadFile)
+    upload.size = size
+    upload.read = AsyncMock(side_effect=[*chunks, b""])
+    return upload
+
+
+class TestSpoolUpload:
+    """Test spooling uploads to disk."""
+
+    @pytest.mark.asyncio
+    async def test_spool_hashes_and_writes_chunks(self, tmp_path, monkeypatch):
+        """Test chunks are written to disk and hashed incrementally."""
+        monkeypatch.setattr("app.core.uploads.settings.UPLOAD_TMP_DIR", str(tmp_path))
+        upload = _mock_upload([b"hello ", b"world"])
+
+        spooled = await spool_upload(upload, max_bytes=100, suffix=".txt", chunk_size=6)
+
+        assert spooled.size == 11
+        assert spooled.sha256 == hashlib.sha256(b"hello world").hexdigest()
+        assert spooled.path.suffix == ".txt"
+        assert spooled.path.parent == tmp_path
+        assert spooled.read_bytes() == b"hello world"
+        upload.read.assert_awaited_with(6)
+
+        spooled.cleanup()
+        assert not spooled.path.exists()
+
+    @pytest.mark.asyncio
+    async def test_rejects_oversized_stream_early(self, tmp_path, monkeypatch):
+        """Test reading stops as soon as the limit is exceeded."""
+        monkeypatch.setattr("app.core.uploads.settings.UPLOAD_TMP_DIR", str(tmp_path))
+        upload = _mock_upload([b"x" * 4, b"x" * 4, b"x" * 4, b"x" * 4])
+
+        with pytest.raises(UploadTooLargeError):
+            await spool_upload(upload, max_bytes=10, chunk_size=4)
+
+        assert upload.read.await_count == 3
+        assert list(tmp_path.iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_rejects_declared_size_without_reading(self):
+        """Test declared size over the limit is rejected before reading."""
+        upload = _mock_upload([b"data"], size=1000)
+
+        with pytest.raises(UploadTooLargeError):
+            await spool_upload(upload, max_bytes=10)
+
+        upload.read.assert_not_awaited()
@@ -155,6 +155,37 @@ class TestCRUDConversation:
         second_ids = {c.id for c in second_page}
         assert len(first_ids.intersection(second_ids)) == 0
 
+    async def test_get_page(self, async_test_db: AsyncSession, test_user, test_space):
+        """Test counting and keyset pagination of conversations in SQL."""
+        for i in range(5):
+            conv_in = ConversationCreate(
+                title=f"Conversation {i}",
+                mode="search" if i % 2 else "chat",
+                space_id=test_space.id if i < 2 else None,
+            )  # type: ignore
+            await crud_conversation.create(
+                async_test_db, obj_in=conv_in, user_id=test_user.id
+            )
+
+        first = await crud_conversation.get_page(
+            async_test_db, user_id=test_user.id, limit=2
+        )
+        second = await crud_conversation.get_page(
+            async_test_db, user_id=test_user.id, limit=2, cursor=first.next_cursor
+        )
+        by_offset = await crud_conversation.get_page(
+            async_test_db, user_id=test_user.id, skip=2, limit=2
+        )
+        assert first.total == second.total == 5
+        assert [c.id for c in second.items] == [c.id for c in by_offset.items]
+        assert not {c.id for c in first.items} & {c.id for c in second.items}
+
+        filtered = await crud_conversation.get_page(
+            async_test_db, user_id=test_user.id, space_id=test_space.id, mode="chat"
+        )
+        assert filtered.total == 1
+        assert filtered.items[0].title == "Conversation 0"
+
     async def test_get_with_messages(self, async_test_db: AsyncSession, test_user):
         """Test getting conversation with messages."""
         # Create conversation
@@ -7,6 +7,8 @@ To run these tests:
 import hashlib
 
 import pytest
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.exc import InvalidRequestError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.crud.document import crud_document
@@ -15,6 +17,7 @@ from app.crud.user import crud_user
 from app.schemas.documents import DocumentCreate, DocumentUpdate
 from app.schemas.spaces import SpaceCreate
 from app.schemas.users import UserCreate
+from app.services.document_text_service import document_text_service
 
 
 def create_doc_schema(filename: str, space_id: int, **kwargs):
@@ -153,6 +156,47 @@ class TestCRUDDocument:
         )
         assert len(second_page) == 2
 
+    async def test_get_by_space_defers_heavy_columns(
+        self, async_test_db: AsyncSession, test_user, test_space
+    ):
+        """Test list queries skip content and meta_data unless requested."""
+        doc_in = create_doc_schema(
+            "web.html", test_space.id, meta_data={"snapshot_html": "<html>...</html>"}
+        )
+        await crud_document.create(
+            async_test_db,
+            obj_in=doc_in,
+            user_id=test_user.id,
+            file_path="spaces/1/documents/web.html",
+            file_hash=hashlib.sha256(b"web").hexdigest(),
+            content="Full page text",
+            preview="Full page text",
+        )
+        async_test_db.expunge_all()
+
+        documents = await crud_document.get_by_space(
+            async_test_db, space_id=test_space.id
+        )
+        assert documents[0].preview == "Full page text"
+        with pytest.raises(InvalidRequestError):
+            _ = documents[0].meta_data
+        with pytest.raises(InvalidRequestError):
+            _ = documents[0].content
+
+        async_test_db.expunge_all()
+        user_documents = await crud_document.get_user_documents(
+            async_test_db, user_id=test_user.id
+        )
+        with pytest.raises(InvalidRequestError):
+            _ = user_documents[0].meta_data
+
+        async_test_db.expunge_all()
+        documents = await crud_document.get_by_space(
+            async_test_db, space_id=test_space.id, with_content=True
+        )
+        assert documents[0].content == "Full page text"
+        assert documents[0].meta_data["snapshot_html"] == "<html>...</html>"
+
     async def test_get_by_space_with_status_filter(self, async_test_db: AsyncSession, test_user, test_space):
         """Test filtering documents by processing status."""
         # Create documents with different statuses
@@ -268,7 +312,7 @@ class TestCRUDDocument:
                 file_hash=hashlib.sha256(data["filename"].encode()).hexdigest(),
                 original_filename=data["filename"],
                 title=data["title"],
-                content=data["content"]
+                **await document_text_service.store_text(async_test_db, data["content"]),
             )
 
         # Search for Python
@@ -292,6 +336,131 @@ class TestCRUDDocument:
         assert analysis_results[0].content is not None
         assert "data analysis" in analysis_results[0].content
 
+    async def test_search_full_stored_text(self, async_test_db: AsyncSession, test_user, test_space):
+        """Test terms past the preview are still found after the text is stored out-of-row."""
+        text = "intro " * 500 + "kubernetes operators"
+        fields = await document_text_service.store_text(async_test_db, text)
+        await crud_document.create(
+            async_test_db,
+            obj_in=create_doc_schema("long.pdf", test_space.id),
+            user_id=test_user.id,
+            file_path=f"spaces/{test_space.id}/documents/long.pdf",
+            file_hash=hashlib.sha256(b"long").hexdigest(),
+            **fields,
+        )
+
+        results = await crud_document.search(
+            async_test_db, space_id=test_space.id, query="kubernetes"
+        )
+        rows, total = await crud_document.search_accessible(
+            async_test_db, query="kubernetes", user_id=test_user.id
+        )
+
+        assert [doc.filename for doc in results] == ["long.pdf"]
+        assert len(results[0].content) == 1000
+        assert "search_text" in sa_inspect(results[0]).unloaded
+        assert total == 1
+        assert rows[0].content_matched
+        assert "kubernetes" in rows[0].content_headline
+
+    async def test_search_accessible(self, async_test_db: AsyncSession, test_user, test_space):
+        """Test searching every readable space with ranking and highlights."""
+        other = await crud_user.create(
+            async_test_db,
+            obj_in=UserCreate(
+                username="otheruser",
+                email="otheruser@example.com",
+                password="password123",
+                full_name="Other User",
+            ),
+        )
+        spaces = {}
+        for name, is_public in (("Private", False), ("Public", True), ("Shared", False)):
+            spaces[name] = await crud_space.create(
+                async_test_db,
+                obj_in=SpaceCreate(name=name, is_public=is_public),  # type: ignore
+                user_id=other.id,
+            )
+        await crud_space.add_collaborator(
+            async_test_db,
+            space_id=spaces["Shared"].id,
+            user_id=test_user.id,
+            invited_by=other.id,
+        )
+
+        docs = [
+            (test_space, test_user, "mine.pdf", "Kafka notes", "intro"),
+            (spaces["Public"], other, "public.pdf", "Public", "all about Kafka streams"),
+            (spaces["Shared"], other, "kafka_shared.pdf", "Shared", "nothing"),
+            (spaces["Private"], other, "private.pdf", "Kafka secret", "Kafka"),
+        ]
+        for space, owner, filename, title, content in docs:
+            await crud_document.create(
+                async_test_db,
+                obj_in=create_doc_schema(filename, space.id),
+                user_id=owner.id,
+                file_path=f"spaces/{space.id}/documents/{filename}",
+                file_hash=hashlib.sha256(filename.encode()).hexdigest(),
+                title=title,
+                **await document_text_service.store_text(async_test_db, content),
+            )
+
+        rows, total = await crud_document.search_accessible(
+            async_test_db, query="kafka", user_id=test_user.id
+        )
+
+        assert total == 3
+        # Title matches rank above filename, filename above content
+        assert [row.Document.filename for row in rows] == [
+            "mine.pdf",
+            "kafka_shared.pdf",
+            "public.pdf",
+        ]
+        assert rows[0].title_matched and not rows[0].content_matched
+        assert rows[2].content_matched
+        assert "Kafka streams" in rows[2].content_headline
+
+        page, total = await crud_document.search_accessible(
+            async_test_db, query="kafka", user_id=test_user.id, skip=1, limit=1
+        )
+        assert total == 3
+        assert [row.Document.filename for row in page] == ["kafka_shared.pdf"]
+
+        in_space, total = await crud_document.search_accessible(
+            async_test_db, query="kafka", user_id=test_user.id, space_id=spaces["Public"].id
+        )
+        assert total == 1
+        assert in_space[0].Document.filename == "public.pdf"
+
+    async def test_search_accessible_matches_tags(
+        self, async_test_db: AsyncSession, test_user, test_space
+    ):
+        """Test documents whose tags contain the query are found and rank below text matches."""
+        for filename, title, tags in (
+            ("tagged.pdf", "Untitled", ["Distributed-Systems", "notes"]),
+            ("titled.pdf", "Distributed systems", None),
+            ("other.pdf", "Other", ["misc"]),
+        ):
+            await crud_document.create(
+                async_test_db,
+                obj_in=create_doc_schema(filename, test_space.id),
+                user_id=test_user.id,
+                file_path=f"spaces/{test_space.id}/documents/{filename}",
+                file_hash=hashlib.sha256(filename.encode()).hexdigest(),
+                title=title,
+                tags=tags,
+            )
+
+        rows, total = await crud_document.search_accessible(
+            async_test_db, query="distributed", user_id=test_user.id
+        )
+
+        assert total == 2
+        assert [row.Document.filename for row in rows] == ["titled.pdf", "tagged.pdf"]
+        assert rows[1].tags_matched and not rows[1].title_matched
+        assert rows[1].score > 0
+        assert not rows[0].tags_matched
+
     async def test_update_processing_status(self, async_test_db: AsyncSession, test_user, test_space):
         """Test updating document processing status."""
         # Create a document
@@ -456,6 +625,46 @@ class TestCRUDDocument:
         assert len(other_docs) == 2
         assert all(doc.user_id == other_user.id for doc in other_docs)
 
+    async def test_get_page(self, async_test_db: AsyncSession, test_user, test_space):
+        """Test status and search filters, counts and cursors for document lists."""
+        for i in range(4):
+            doc = await crud_document.create(
+                async_test_db,
+                obj_in=create_doc_schema(
+                    f"report_{i}.pdf" if i < 3 else "notes.pdf", test_space.id
+                ),
+                user_id=test_user.id,
+                file_path=f"spaces/{test_space.id}/documents/page_{i}.pdf",
+                file_hash=hashlib.sha256(f"page_{i}".encode()).hexdigest(),
+                original_filename=f"page_{i}.pdf",
+            )
+            if i == 0:
+                await crud_document.update_processing_status(
+                    async_test_db, document_id=doc.id, processing_status="completed"
+                )
+
+        first = await crud_document.get_page(async_test_db, user_id=test_user.id, limit=3)
+        assert first.total == 4
+        rest = await crud_document.get_page(
+            async_test_db, user_id=test_user.id, limit=3, cursor=first.next_cursor
+        )
+        assert len(rest.items) == 1
+        assert rest.next_cursor is None
+
+        in_space = await crud_document.get_page(
+            async_test_db, space_id=test_space.id, search="report"
+        )
+        assert in_space.total == 3
+        assert all("report" in doc.filename for doc in in_space.items)
+
+        completed = await crud_document.get_page(
+            async_test_db, user_id=test_user.id, status="completed"
+        )
+        assert [doc.filename for doc in completed.items] == ["report_0.pdf"]
+
+        other_user = await crud_document.get_page(async_test_db, user_id=test_user.id + 1)
+        assert other_user.total == 0
+
     async def test_update_document(self, async_test_db: AsyncSession, test_user, test_space):
         """Test updating a document."""
         # Create a document
@@ -0,0 +1,97 @@
+"""Unit tests for ingestion job CRUD operations.
+
+To run these tests:
+    uv run pytest tests/unit/crud/test_ingestion_job.py -v
+"""
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.document import crud_document
+from app.crud.ingestion_job import crud_ingestion_job
+from app.crud.space import crud_space
+from app.crud.user import crud_user
+from app.schemas.documents import DocumentCreate, IngestionJobCreate
+from app.schemas.spaces import SpaceCreate
+from app.schemas.users import UserCreate
+
+
+@pytest.fixture
+async def test_document(async_test_db: AsyncSession):
+    """Create a user, space and pending document."""
+    user = await crud_user.create(
+        async_test_db,
+        obj_in=UserCreate(
+            username="jobuser", email="jobuser@example.com", password="password123"
+        ),
+    )
+    space = await crud_space.create(
+        async_test_db, obj_in=SpaceCreate(name="Jobs"), user_id=user.id  # type: ignore[call-arg]
+    )
+    return await crud_document.create(
+        async_test_db,
+        obj_in=DocumentCreate(
+            filename="a.pdf", content_type="application/pdf", size=10, space_id=space.id
+        ),
+        user_id=user.id,
+        file_path="spaces/1/documents/abc.pdf",
+        file_hash="abc",
+        processing_status="pending",
+    )
+
+
+class TestCRUDIngestionJob:
+    """Test suite for IngestionJob CRUD operations."""
+
+    async def test_create_job(self, async_test_db: AsyncSession, test_document):
+        """Test creating a queued job."""
+        job = await crud_ingestion_job.create(
+            async_test_db,
+            obj_in=IngestionJobCreate(document_id=test_document.id, max_attempts=5),
+            user_id=test_document.user_id,
+        )
+
+        assert job.id is not None
+        assert job.status == "queued"
+        assert job.attempts == 0
+        assert job.max_attempts == 5
+
+    async def test_get_latest_by_document(
+        self, async_test_db: AsyncSession, test_document
+    ):
+        """Test getting the most recent job of a document."""
+        obj_in = IngestionJobCreate(document_id=test_document.id)
+        await crud_ingestion_job.create(
+            async_test_db, obj_in=obj_in, user_id=test_document.user_id, status="failed"
+        )
+        latest = await crud_ingestion_job.create(
+            async_test_db, obj_in=obj_in, user_id=test_document.user_id
+        )
+
+        result = await crud_ingestion_job.get_latest_by_document(
+            async_test_db, document_id=test_document.id
+        )
+        assert result.id == latest.id
+        assert (
+            await crud_ingestion_job.get_latest_by_document(async_test_db, document_id=999)
+            is None
+        )
+
+    async def test_get_unfinished(self, async_test_db: AsyncSession, test_document):
+        """Test listing queued and interrupted jobs."""
+        obj_in = IngestionJobCreate(document_id=test_document.id)
+        user_id = test_document.user_id
+        queued = await crud_ingestion_job.create(async_test_db, obj_in=obj_in, user_id=user_id)
+        running = await crud_ingestion_job.create(
+            async_test_db, obj_in=obj_in, user_id=user_id, status="running"
+        )
+        await crud_ingestion_job.create(
+            async_test_db, obj_in=obj_in, user_id=user_id, status="completed"
+        )
+        await crud_ingestion_job.create(
+            async_test_db, obj_in=obj_in, user_id=user_id, status="failed"
+        )
+
+        jobs = await crud_ingestion_job.get_unfinished(async_test_db)
+
+        assert [job.id for job in jobs] == [queued.id, running.id]
@@ -0,0 +1,97 @@
+"""Unit tests for SQL-side list query helpers."""
+
+from datetime import UTC, datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import asyncpg
+
+from app.crud.listing import (
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor,
+    json_array_any_contains,
+    json_array_overlaps,
+    paginate,
+)
+from app.models.models import Note
+
+
+def _postgres_session(*results) -> SimpleNamespace:
+    """A session stand-in reporting PostgreSQL and recording executed statements."""
+    return SimpleNamespace(
+        get_bind=lambda: SimpleNamespace(dialect=SimpleNamespace(name="postgresql")),
+        execute=AsyncMock(side_effect=results),
+    )
+
+
+def _compile(stmt) -> str:
+    return str(
+        stmt.compile(dialect=asyncpg.dialect(), compile_kwargs={"literal_binds": True})
+    )
+
+
+class TestCursor:
+    """Test cursor encoding."""
+
+    def test_round_trip(self):
+        updated_at = datetime(2026, 10, 19, 8, 30, 15, 123456, tzinfo=UTC)
+
+        cursor = encode_cursor(updated_at, 42)
+
+        assert "=" not in cursor
+        assert decode_cursor(cursor, Note.updated_at) == (updated_at, 42)
+        assert decode_cursor(encode_cursor("Alpha", 7), Note.title) == ("Alpha", 7)
+
+    @pytest.mark.parametrize(
+        "cursor",
+        ["bogus", encode_cursor("not a date", 1), encode_cursor(None, "x") + "!"],
+    )
+    def test_invalid(self, cursor):
+        with pytest.raises(InvalidCursorError):
+            decode_cursor(cursor, Note.updated_at)
+
+
+class TestPostgresQueries:
+    """Test the statements issued on PostgreSQL."""
+
+    async def test_keyset_page_uses_raw_columns(self):
+        """Test the keyset filter compares (updated_at, id) rows directly."""
+        rows = MagicMock()
+        rows.scalars.return_value.all.return_value = []
+        db = _postgres_session(MagicMock(scalar=lambda: 0), rows)
+        cursor = encode_cursor(datetime(2026, 10, 19, tzinfo=UTC), 42)
+
+        page = await paginate(
+            db,
+            select(Note).where(Note.user_id == 1),
+            order_column=Note.updated_at,
+            id_column=Note.id,
+            limit=20,
+            cursor=cursor,
+        )
+
+        sql = _compile(db.execute.await_args_list[1].args[0])
+        assert "(notes.updated_at, notes.id) < ('2026-10-19 00:00:00+00:00', 42)" in sql
+        assert "ORDER BY notes.updated_at DESC, notes.id DESC" in sql
+        assert "LIMIT 21" in sql
+        assert "OFFSET" not in sql
+        assert "strftime" not in sql
+        assert page.items == [] and page.next_cursor is None
+
+    def test_tag_overlap(self):
+        db = _postgres_session()
+
+        sql = _compile(select(Note.id).where(json_array_overlaps(db, Note.tags, ["a", "b"])))
+
+        assert "CAST(notes.tags AS JSONB) ?| ARRAY['a', 'b']" in sql
+
+    def test_tag_substring(self):
+        db = _postgres_session()
+
+        sql = _compile(select(Note.id).where(json_array_any_contains(db, Note.tags, "py")))
+
+        assert "jsonb_array_elements_text(CASE WHEN (jsonb_typeof(CAST(notes.tags AS JSONB))" in sql
+        assert "anon_1.value ILIKE '%py%'" in sql
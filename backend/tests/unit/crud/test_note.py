@@ -5,8 +5,10 @@ To run these tests:
 """
 
 import pytest
+from sqlalchemy.exc import InvalidRequestError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.crud.listing import InvalidCursorError
 from app.crud.note import crud_note
 from app.crud.space import crud_space
 from app.crud.user import crud_user
@@ -115,6 +117,125 @@ class TestCRUDNote:
         )
         assert len(second_page) == 2
 
+    async def test_list_queries_return_preview_only(
+        self, async_test_db: AsyncSession, test_user, test_space
+    ):
+        """Test list queries load a content preview instead of the full content."""
+        long_content = "x" * 1000
+        note_in = NoteCreate(
+            title="Long", content=long_content, space_id=test_space.id, note_type="ai"
+        )  # type: ignore
+        await crud_note.create(async_test_db, obj_in=note_in, user_id=test_user.id)
+        async_test_db.expunge_all()
+
+        notes = await crud_note.get_by_space(
+            async_test_db, space_id=test_space.id, user_id=test_user.id
+        )
+        assert notes[0].preview == long_content[:300]
+        with pytest.raises(InvalidRequestError):
+            _ = notes[0].content
+
+        async_test_db.expunge_all()
+        recent = await crud_note.get_recent_notes(async_test_db, user_id=test_user.id)
+        assert recent[0].preview == long_content[:300]
+
+        async_test_db.expunge_all()
+        notes = await crud_note.get_by_space(
+            async_test_db,
+            space_id=test_space.id,
+            user_id=test_user.id,
+            with_content=True,
+        )
+        assert notes[0].content == long_content
+
+    async def test_get_by_user(self, async_test_db: AsyncSession, test_user, test_space):
+        """Test listing a user's notes with type filter and total count."""
+        for i in range(4):
+            note_in = NoteCreate(
+                title=f"Note {i}",
+                content=f"Content {i}",
+                space_id=test_space.id,
+                note_type="ai" if i % 2 else "manual",
+            )  # type: ignore
+            await crud_note.create(async_test_db, obj_in=note_in, user_id=test_user.id)
+
+        notes, total = await crud_note.get_by_user(
+            async_test_db, user_id=test_user.id, skip=0, limit=3
+        )
+        assert len(notes) == 3
+        assert total == 4
+
+        notes, total = await crud_note.get_by_user(
+            async_test_db, user_id=test_user.id, note_type="ai"
+        )
+        assert total == 2
+        assert all(note.note_type == "ai" for note in notes)
+
+        _, total = await crud_note.get_by_user(async_test_db, user_id=999)
+        assert total == 0
+
+    async def test_get_page(self, async_test_db: AsyncSession, test_user, test_space):
+        """Test filtering and counting notes in SQL, by offset and by cursor."""
+        for i in range(7):
+            note_in = NoteCreate(
+                title=f"Note {i}",
+                content=f"Content {i}",
+                space_id=test_space.id,
+                note_type="ai" if i % 2 else "manual",
+                tags=["kafka"] if i < 3 else ["other"],
+            )  # type: ignore
+            await crud_note.create(async_test_db, obj_in=note_in, user_id=test_user.id)
+
+        first = await crud_note.get_page(async_test_db, user_id=test_user.id, limit=3)
+        assert first.total == 7
+        assert len(first.items) == 3
+        assert first.next_cursor is not None
+
+        # 游标翻页与偏移翻页的结果一致，即使 updated_at 相同也按 id 稳定排序
+        by_cursor = list(first.items)
+        page = first
+        for _ in range(3):
+            page = await crud_note.get_page(
+                async_test_db, user_id=test_user.id, limit=3, cursor=page.next_cursor
+            )
+            assert page.total == 7
+            by_cursor.extend(page.items)
+            if page.next_cursor is None:
+                break
+        by_offset = await crud_note.get_page(async_test_db, user_id=test_user.id, limit=10)
+        assert [n.id for n in by_cursor] == [n.id for n in by_offset.items]
+        assert by_offset.next_cursor is None
+
+        tagged = await crud_note.get_page(
+            async_test_db, user_id=test_user.id, tags=["kafka", "missing"]
+        )
+        assert tagged.total == 3
+        assert {n.title for n in tagged.items} == {"Note 0", "Note 1", "Note 2"}
+
+        typed = await crud_note.get_page(
+            async_test_db, user_id=test_user.id, space_id=test_space.id, note_type="ai"
+        )
+        assert typed.total == 3
+
+        ascending = await crud_note.get_page(
+            async_test_db, user_id=test_user.id, sort_by="title", sort_order="asc", limit=2
+        )
+        rest = await crud_note.get_page(
+            async_test_db,
+            user_id=test_user.id,
+            sort_by="title",
+            sort_order="asc",
+            cursor=ascending.next_cursor,
+        )
+        assert [n.title for n in ascending.items + rest.items] == [
+            f"Note {i}" for i in range(7)
+        ]
+
+        with pytest.raises(InvalidCursorError):
+            await crud_note.get_page(async_test_db, user_id=test_user.id, cursor="bogus")
+        with pytest.raises(ValueError):
+            await crud_note.get_page(async_test_db, user_id=test_user.id, sort_by="user_id")
+
     async def test_get_by_space_sorting(self, async_test_db: AsyncSession, test_user, test_space):
         """Test sorting notes by different fields."""
         # Create notes with different titles
@@ -133,6 +133,44 @@ class TestCRUDSpace:
         )
         assert len(spaces_with_public) == 2
 
+    async def test_get_page(
+        self, async_test_db: AsyncSession, test_user, test_collaborator, test_space_data
+    ):
+        """Test search, tag and visibility filters and counts run in SQL."""
+        for i, tags in enumerate([["research"], ["science", "ml"], None]):
+            data = {**test_space_data, "name": f"Space {i}", "tags": tags}
+            await crud_space.create(
+                async_test_db, obj_in=SpaceCreate(**data), user_id=test_user.id
+            )
+        public_data = {**test_space_data, "name": "Shared Physics", "is_public": True}
+        await crud_space.create(
+            async_test_db, obj_in=SpaceCreate(**public_data), user_id=test_collaborator.id
+        )
+
+        page = await crud_space.get_page(async_test_db, user_id=test_user.id, limit=2)
+        assert page.total == 3
+        assert len(page.items) == 2
+        rest = await crud_space.get_page(
+            async_test_db, user_id=test_user.id, limit=2, cursor=page.next_cursor
+        )
+        assert [s.name for s in page.items + rest.items] == ["Space 2", "Space 1", "Space 0"]
+        assert rest.next_cursor is None
+
+        tagged = await crud_space.get_page(
+            async_test_db, user_id=test_user.id, tags=["ml", "other"]
+        )
+        assert [s.name for s in tagged.items] == ["Space 1"]
+
+        with_public = await crud_space.get_page(
+            async_test_db, user_id=test_user.id, include_public=True, search="physics"
+        )
+        assert [s.name for s in with_public.items] == ["Shared Physics"]
+
+        public_only = await crud_space.get_page(
+            async_test_db, user_id=test_user.id, include_public=True, is_public=True
+        )
+        assert public_only.total == 1
+
     async def test_get_by_name(
         self, async_test_db: AsyncSession, test_user, test_space_data
     ):
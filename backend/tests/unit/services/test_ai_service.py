@@ -20,6 +20,7 @@ class TestAIServiceBasics:
             mock_settings.OPENROUTER_SITE_URL = "http://test.com"
             mock_settings.OPENROUTER_APP_NAME = "TestApp"
             mock_settings.OLLAMA_ENABLED = False
+            mock_settings.MOCK_LLM_ENABLED = False
 
             with patch("app.services.ai_service.AsyncOpenAI"):
                 service = AIService()
@@ -156,6 +157,7 @@ class TestAutoModelSelection:
         with patch("app.services.ai_service.settings") as mock_settings:
             mock_settings.OPENROUTER_API_KEY = "test_key"
             mock_settings.OLLAMA_ENABLED = False
+            mock_settings.MOCK_LLM_ENABLED = False
 
             with patch("app.services.ai_service.AsyncOpenAI"):
                 service = AIService()
@@ -221,6 +223,7 @@ class TestChatFunctions:
         with patch("app.services.ai_service.settings") as mock_settings:
             mock_settings.OPENROUTER_API_KEY = "test_key"
             mock_settings.OLLAMA_ENABLED = False
+            mock_settings.MOCK_LLM_ENABLED = False
 
             with patch("app.services.ai_service.AsyncOpenAI"):
                 service = AIService()
@@ -337,6 +340,7 @@ class TestStreamChat:
         with patch("app.services.ai_service.settings") as mock_settings:
             mock_settings.OPENROUTER_API_KEY = "test_key"
             mock_settings.OLLAMA_ENABLED = False
+            mock_settings.MOCK_LLM_ENABLED = False
 
             with patch("app.services.ai_service.AsyncOpenAI"):
                 service = AIService()
@@ -376,6 +380,7 @@ class TestEmbeddings:
         with patch("app.services.ai_service.settings") as mock_settings:
             mock_settings.OPENROUTER_API_KEY = "test_key"
             mock_settings.OLLAMA_ENABLED = False
+            mock_settings.MOCK_LLM_ENABLED = False
 
             with patch("app.services.ai_service.AsyncOpenAI"):
                 service = AIService()
@@ -424,6 +429,7 @@ class TestHandleAttachments:
         with patch("app.services.ai_service.settings") as mock_settings:
             mock_settings.OPENROUTER_API_KEY = "test_key"
             mock_settings.OLLAMA_ENABLED = False
+            mock_settings.MOCK_LLM_ENABLED = False
 
             with patch("app.services.ai_service.AsyncOpenAI"):
                 service = AIService()
@@ -493,6 +499,7 @@ class TestModelInfo:
         with patch("app.services.ai_service.settings") as mock_settings:
             mock_settings.OPENROUTER_API_KEY = "test_key"
             mock_settings.OLLAMA_ENABLED = False
+            mock_settings.MOCK_LLM_ENABLED = False
 
             with patch("app.services.ai_service.AsyncOpenAI"):
                 service = AIService()
@@ -538,6 +545,7 @@ class TestCustomProviders:
         with patch("app.services.ai_service.settings") as mock_settings:
             mock_settings.OPENROUTER_API_KEY = None
             mock_settings.OLLAMA_ENABLED = False
+            mock_settings.MOCK_LLM_ENABLED = False
 
             service = AIService()
             return service
@@ -639,3 +647,176 @@ class TestCustomProviders:
 
         assert result == "Custom response"
         ai_service.custom_providers["test-llm"].chat.assert_called_once()
+
+
+class TestMockProvider:
+    """测试压测用模拟提供商."""
+
+    def test_mock_provider_replaces_real_providers(self):
+        """测试启用模拟LLM时只注册模拟提供商."""
+        with patch("app.services.ai_service.settings") as mock_settings:
+            mock_settings.MOCK_LLM_ENABLED = True
+            mock_settings.MOCK_LLM_BASE_URL = "http://localhost:8100/v1"
+            mock_settings.OPENROUTER_API_KEY = "test_key"
+            mock_settings.OLLAMA_ENABLED = True
+
+            with patch("app.services.ai_service.AsyncOpenAI"):
+                service = AIService()
+
+        assert service.openrouter_client is None
+        assert service.ollama_provider is None
+        assert list(service.custom_providers) == ["mock"]
+        assert service.custom_providers["mock"].endpoint == "http://localhost:8100/v1"
+
+    @pytest.mark.asyncio
+    async def test_auto_select_routes_to_mock(self):
+        """测试自动选择模型时路由到模拟提供商."""
+        with patch("app.services.ai_service.settings") as mock_settings:
+            mock_settings.MOCK_LLM_ENABLED = True
+            mock_settings.MOCK_LLM_BASE_URL = "http://localhost:8100/v1"
+
+            with patch("app.services.ai_service.AsyncOpenAI"):
+                service = AIService()
+
+        service.custom_providers["mock"].list_models = AsyncMock(
+            return_value=["mock/echo"]
+        )
+
+        provider, model = await service.auto_select_model(ChatMode.CHAT, 100, None)
+
+        assert provider == "custom:mock"
+        assert model == "mock/echo"
+
+
+class TestPromptCache:
+    """测试提示词缓存支持."""
+
+    @pytest.fixture
+    def ai_service(self):
+        """创建测试用的 AI Service."""
+        with patch("app.services.ai_service.settings") as mock_settings:
+            mock_settings.OPENROUTER_API_KEY = "test_key"
+            mock_settings.OLLAMA_ENABLED = False
+            mock_settings.MOCK_LLM_ENABLED = False
+
+            with patch("app.services.ai_service.AsyncOpenAI"):
+                service = AIService()
+                service.openrouter_client = Mock()
+                return service
+
+    def _messages(self, system_length: int = 5000):
+        return [
+            {"role": "system", "content": "You are helpful."},
+            {"role": "system", "content": "x" * system_length},
+            {"role": "user", "content": "Question"},
+        ]
+
+    def test_marks_last_system_message(self, ai_service):
+        """测试在稳定前缀末尾添加缓存断点."""
+        messages = self._messages()
+
+        result = ai_service.apply_prompt_cache_control(
+            messages, "anthropic/claude-sonnet-4"
+        )
+
+        assert result[0] == messages[0]
+        assert result[1]["content"] == [
+            {
+                "type": "text",
+                "text": "x" * 5000,
+                "cache_control": {"type": "ephemeral"},
+            }
+        ]
+        assert result[2] == messages[2]
+        # 原消息列表不被修改
+        assert isinstance(messages[1]["content"], str)
+
+    def test_short_prefix_not_marked(self, ai_service):
+        """测试前缀过短时不添加缓存断点."""
+        messages = self._messages(system_length=100)
+
+        result = ai_service.apply_prompt_cache_control(
+            messages, "anthropic/claude-sonnet-4"
+        )
+
+        assert result is messages
+
+    def test_automatic_cache_models_not_marked(self, ai_service):
+        """测试自动缓存的模型不添加标记."""
+        messages = self._messages()
+
+        assert ai_service.apply_prompt_cache_control(messages, "openai/gpt-4.1") is messages
+        assert ai_service.apply_prompt_cache_control(messages, "openrouter/auto") is messages
+
+    @pytest.mark.asyncio
+    async def test_chat_reports_cached_tokens(self, ai_service):
+        """测试非流式聊天返回缓存命中的token数."""
+        mock_response = Mock()
+        mock_response.choices = [Mock()]
+        mock_response.choices[0].message.content = "Answer"
+        mock_response.usage = Mock(
+            prompt_tokens=1500,
+            completion_tokens=20,
+            total_tokens=1520,
+            prompt_tokens_details=Mock(cached_tokens=1200),
+        )
+        ai_service.openrouter_client.chat.completions.create = AsyncMock(
+            return_value=mock_response
+        )
+
+        usage: dict[str, int] = {}
+        result = await ai_service.chat(
+            self._messages(),
+            model="anthropic/claude-sonnet-4",
+            provider="openrouter",
+            usage=usage,
+        )
+
+        assert result == "Answer"
+        assert usage == {
+            "prompt_tokens": 1500,
+            "completion_tokens": 20,
+            "total_tokens": 1520,
+            "cached_tokens": 1200,
+        }
+        sent = ai_service.openrouter_client.chat.completions.create.call_args[1]
+        assert sent["messages"][1]["content"][-1]["cache_control"] == {
+            "type": "ephemeral"
+        }
+
+    @pytest.mark.asyncio
+    async def test_stream_chat_reports_usage(self, ai_service):
+        """测试流式聊天从最后一个分块读取用量."""
+
+        async def mock_stream():
+            yield Mock(choices=[Mock(delta=Mock(content="Hi"))], usage=None)
+            yield Mock(
+                choices=[],
+                usage=Mock(
+                    prompt_tokens=100,
+                    completion_tokens=1,
+                    total_tokens=101,
+                    prompt_tokens_details=None,
+                ),
+            )
+
+        ai_service.openrouter_client.chat.completions.create = AsyncMock(
+            return_value=mock_stream()
+        )
+
+        usage: dict[str, int] = {}
+        result = [
+            chunk
+            async for chunk in ai_service.stream_chat(
+                [{"role": "user", "content": "Hello"}],
+                model="openai/gpt-4.1",
+                provider="openrouter",
+                usage=usage,
+            )
+        ]
+
+        assert result == ["Hi"]
+        assert usage["prompt_tokens"] == 100
+        assert usage["cached_tokens"] == 0
+        sent = ai_service.openrouter_client.chat.completions.create.call_args[1]
+        assert sent["stream_options"] == {"include_usage": True}
@@ -0,0 +1,194 @@
+"""Unit tests for Blob Service."""
+
+import hashlib
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.core.blob_store import LocalBlobBackend, blob_key
+from app.core.database import Base
+from app.core.uploads import SpooledUpload
+from app.models.models import Document, Space, User
+from app.services.blob_service import BlobService
+
+
+@pytest.fixture
+async def session_factory():
+    """共享连接的内存SQLite会话工厂."""
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:", poolclass=StaticPool
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest.fixture
+def service(session_factory, tmp_path):
+    """使用临时目录本地后端的存储服务."""
+    return BlobService(
+        backend=LocalBlobBackend(tmp_path / "blobs"),
+        session_factory=session_factory,
+        gc_grace_seconds=60,
+        gc_interval_seconds=0,
+    )
+
+
+def _spool(tmp_path, data: bytes, name: str = "upload.tmp") -> SpooledUpload:
+    path = tmp_path / name
+    path.write_bytes(data)
+    return SpooledUpload(path=path, size=len(data), sha256=hashlib.sha256(data).hexdigest())
+
+
+async def _expire(db, blob, seconds: int = 3600) -> None:
+    """把未引用时间提前到保留期之外."""
+    blob.unreferenced_at = datetime.now(UTC) - timedelta(seconds=seconds)
+    await db.commit()
+
+
+class TestLocalBlobBackend:
+    """测试本地存储后端."""
+
+    def test_put_exists_delete(self, tmp_path):
+        backend = LocalBlobBackend(tmp_path / "blobs")
+        source = tmp_path / "source"
+        source.write_bytes(b"data")
+
+        backend.put_file("blobs/ab/abc", source, "text/plain")
+
+        assert backend.exists("blobs/ab/abc")
+        assert backend.local_path("blobs/ab/abc").read_bytes() == b"data"
+        assert not source.exists()
+        backend.delete("blobs/ab/abc")
+        backend.delete("blobs/ab/abc")
+        assert not backend.exists("blobs/ab/abc")
+
+
+class TestStore:
+    """测试写入和去重."""
+
+    async def test_store_new_blob_unreferenced(self, service, session_factory, tmp_path):
+        """测试新文件写入后处于未引用状态."""
+        upload = _spool(tmp_path, b"paper")
+        async with session_factory() as db:
+            blob = await service.store(db, upload, "application/pdf")
+
+        assert blob.storage_key == blob_key(upload.sha256)
+        assert blob.ref_count == 0
+        assert blob.unreferenced_at is not None
+        assert service.backend.exists(blob.storage_key)
+
+    async def test_store_same_content_once(self, service, session_factory, tmp_path):
+        """测试相同内容复用已有记录，不再写入对象."""
+        async with session_factory() as db:
+            first = await service.store(db, _spool(tmp_path, b"paper", "a"), "application/pdf")
+            upload = _spool(tmp_path, b"paper", "b")
+            second = await service.store(db, upload, "application/pdf")
+
+        assert second.id == first.id
+        # 未写入对象时暂存文件保留，由调用方清理
+        assert upload.path.exists()
+
+    async def test_references(self, service, session_factory, tmp_path):
+        """测试引用计数增减和未引用时间."""
+        async with session_factory() as db:
+            blob = await service.store(db, _spool(tmp_path, b"paper"), "application/pdf")
+            await service.add_reference(db, blob)
+            await service.add_reference(db, blob)
+            await db.commit()
+            await db.refresh(blob)
+            assert blob.ref_count == 2
+            assert blob.unreferenced_at is None
+
+            await service.release(db, blob.storage_key)
+            await service.release(db, blob.storage_key)
+            await service.release(db, blob.storage_key)
+            await db.commit()
+            await db.refresh(blob)
+            assert blob.ref_count == 0
+            assert blob.unreferenced_at is not None
+
+            # 旧格式路径不处理
+            await service.release(db, "spaces/1/documents/abc")
+
+    async def test_add_reference_after_collection(
+        self, service, session_factory, tmp_path
+    ):
+        """测试记录已被回收时拒绝引用."""
+        async with session_factory() as db:
+            blob = await service.store(db, _spool(tmp_path, b"paper"), "application/pdf")
+            await _expire(db, blob)
+            assert await service.collect_garbage(db) == 1
+
+            with pytest.raises(LookupError):
+                await service.add_reference(db, blob)
+
+
+class TestCollectGarbage:
+    """测试回收."""
+
+    async def test_collects_only_expired_unreferenced(
+        self, service, session_factory, tmp_path
+    ):
+        """测试只回收超过保留期且未被引用的对象."""
+        async with session_factory() as db:
+            expired = await service.store(db, _spool(tmp_path, b"old", "a"), "text/plain")
+            recent = await service.store(db, _spool(tmp_path, b"new", "b"), "text/plain")
+            referenced = await service.store(db, _spool(tmp_path, b"ref", "c"), "text/plain")
+            await service.add_reference(db, referenced)
+            await _expire(db, expired)
+
+            assert await service.collect_garbage(db) == 1
+
+            assert await service.get(db, expired.sha256) is None
+            assert not service.backend.exists(expired.storage_key)
+            assert await service.get(db, recent.sha256) is not None
+            assert service.backend.exists(referenced.storage_key)
+
+    async def test_keeps_blob_still_used_by_document(
+        self, service, session_factory, tmp_path
+    ):
+        """测试计数为0但仍有文档指向时不回收."""
+        async with session_factory() as db:
+            blob = await service.store(db, _spool(tmp_path, b"paper"), "application/pdf")
+            user = User(username="u", email="u@example.com", hashed_password="x")
+            db.add(user)
+            await db.flush()
+            space = Space(name="S", user_id=user.id)
+            db.add(space)
+            await db.flush()
+            db.add(
+                Document(
+                    space_id=space.id,
+                    user_id=user.id,
+                    filename="a.pdf",
+                    original_filename="a.pdf",
+                    file_path=blob.storage_key,
+                    content_type="application/pdf",
+                    file_size=5,
+                    file_hash=blob.sha256,
+                )
+            )
+            await _expire(db, blob)
+
+            assert await service.collect_garbage(db) == 0
+            assert service.backend.exists(blob.storage_key)
+
+
+class TestOpenLocal:
+    """测试本地路径."""
+
+    async def test_open_local_with_suffix(self, service, session_factory, tmp_path):
+        """测试按扩展名暴露本地文件，退出后清理临时路径."""
+        async with session_factory() as db:
+            blob = await service.store(db, _spool(tmp_path, b"%PDF"), "application/pdf")
+
+        async with service.open_local(blob.storage_key, ".pdf") as path:
+            assert path.suffix == ".pdf"
+            assert path.read_bytes() == b"%PDF"
+
+        assert not path.exists()
+        assert service.backend.exists(blob.storage_key)
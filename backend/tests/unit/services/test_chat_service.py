@@ -86,12 +86,14 @@ class TestCreateCompletion:
         mock_doc1.id = 1
         mock_doc1.title = "Document 1"
         mock_doc1.content = "This is document 1 content"
+        mock_doc1.content_hash = None  # 无分块全文，使用正文列
         mock_doc1.filename = "doc1.pdf"
 
         mock_doc2 = Mock(spec=Document)
         mock_doc2.id = 2
         mock_doc2.title = "Document 2"
         mock_doc2.content = "This is document 2 content"
+        mock_doc2.content_hash = None  # 无分块全文，使用正文列
         mock_doc2.filename = "doc2.pdf"
 
         # Mock数据库查询
@@ -177,6 +179,34 @@ class TestCreateCompletion:
                     # 验证消息被保存
                     assert mock_crud_msg.create.call_count == 2  # 用户消息和AI响应
 
+    @pytest.mark.asyncio
+    async def test_completion_reports_provider_usage(
+        self, chat_service, mock_db, mock_user, sample_request
+    ):
+        """测试使用提供商返回的用量（含缓存命中token）."""
+
+        async def fake_chat(**kwargs):
+            kwargs["usage"].update({
+                "prompt_tokens": 1200,
+                "completion_tokens": 30,
+                "total_tokens": 1230,
+                "cached_tokens": 1024,
+            })
+            return "Cached answer"
+
+        with patch('app.services.chat_service.ai_service') as mock_ai_service:
+            mock_ai_service.chat = AsyncMock(side_effect=fake_chat)
+
+            response = await chat_service.create_completion_with_documents(
+                db=mock_db,
+                request=sample_request,
+                user=mock_user
+            )
+
+            assert response.usage.prompt_tokens == 1200
+            assert response.usage.total_tokens == 1230
+            assert response.usage.prompt_tokens_details.cached_tokens == 1024
+
 
 class TestStreamCompletion:
     """测试流式响应功能."""
@@ -244,6 +274,7 @@ class TestSpaceVectorSearch:
         mock_doc1.id = 1
         mock_doc1.title = "Related Doc 1"
         mock_doc1.content = "Related content 1" * 100  # 长内容
+        mock_doc1.content_hash = None  # 无分块全文，使用正文列
         mock_doc1.filename = "related1.pdf"
 
         # Mock数据库查询
@@ -270,6 +301,49 @@ class TestSpaceVectorSearch:
                     filter_conditions={"space_id": 456, "user_id": 1}
                 )
 
+    @pytest.mark.asyncio
+    async def test_space_context_before_latest_user_message(
+        self, chat_service, mock_db, mock_user
+    ):
+        """测试检索上下文插入在最新用户消息前，不打断可缓存的前缀."""
+        request = ChatCompletionRequest.model_validate({
+            "model": "openrouter/auto",
+            "messages": [
+                {"role": "system", "content": "You are helpful."},
+                {"role": "user", "content": "First question"},
+                {"role": "assistant", "content": "First answer"},
+                {"role": "user", "content": "Follow up"},
+            ],
+            "space_id": 456,
+            "stream": False
+        })
+
+        mock_doc = Mock(spec=Document)
+        mock_doc.id = 1
+        mock_doc.title = "Related Doc"
+        mock_doc.content = "Related content"
+        mock_doc.content_hash = None  # 无分块全文，使用正文列
+        mock_doc.filename = "related.pdf"
+
+        with patch.object(
+            chat_service, "_search_relevant_documents",
+            AsyncMock(return_value=[mock_doc])
+        ):
+            with patch('app.services.chat_service.ai_service') as mock_ai_service:
+                mock_ai_service.chat = AsyncMock(return_value="Answer")
+
+                await chat_service.create_completion_with_documents(
+                    db=mock_db,
+                    request=request,
+                    user=mock_user
+                )
+
+                messages = mock_ai_service.chat.call_args[1]["messages"]
+                assert [m["role"] for m in messages] == [
+                    "system", "user", "assistant", "system", "user"
+                ]
+                assert "Space中的相关内容" in messages[3]["content"]
+
 
 class TestRegenerateMessage:
     """测试重新生成消息功能."""
@@ -352,11 +426,13 @@ class TestHelperMethods:
         doc1.title = "Test Doc 1"
         doc1.filename = "test1.pdf"
         doc1.content = "Short content"
+        doc1.content_hash = None  # 无分块全文，使用正文列
 
         doc2 = Mock()
         doc2.title = None
         doc2.filename = "test2.pdf"
         doc2.content = "Very long content " * 200  # 超过1500字符
+        doc2.content_hash = None  # 无分块全文，使用正文列
 
         context = chat_service._format_documents_context([doc1, doc2])
 
@@ -1,5 +1,6 @@
 """Unit tests for document service."""
 
+import asyncio
 from datetime import datetime
 from pathlib import Path
 from unittest.mock import AsyncMock, Mock, patch
@@ -7,6 +8,7 @@ from unittest.mock import AsyncMock, Mock, patch
 import pytest
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.process_pool import WorkerTimeoutError
 from app.models.models import Document, Space, User
 from app.services.document_service import DocumentService
 
@@ -300,7 +302,10 @@ class TestDocumentService:
     @pytest.mark.asyncio
     async def test_import_from_url_success(self, document_service, mock_db, mock_user):
         """Test importing from URL successfully."""
-        with patch("app.services.document_service.web_scraper_service.fetch_webpage") as mock_fetch:
+        with (
+            patch("app.services.document_service.web_scraper_service.fetch_webpage") as mock_fetch,
+            patch("app.services.document_service.web_snapshot_service.save") as mock_save_snapshot,
+        ):
             with patch("app.crud.crud_document.create") as mock_create:
                 with patch("app.crud.crud_space.update_stats") as mock_update_stats:
                     # Setup mocks
@@ -308,8 +313,10 @@ class TestDocumentService:
                         "status": "success",
                         "content": "Web content",
                         "metadata": {"title": "Web Page", "description": "Test page"},
-                        "snapshot_html": "<html>Test</html>"
+                        "snapshot_html": "<html>Test</html>",
+                        "snapshot_markdown": "Test",
                     }
+                    mock_save_snapshot.return_value = {"snapshot_key": "blobs/ab/abc"}
                     mock_create.return_value = Mock(
                         id=1,
                         title="Web Page",
@@ -332,6 +339,13 @@ class TestDocumentService:
                     assert result["title"] == "Web Page"
                     mock_fetch.assert_called_once_with("https://example.com")
                     mock_create.assert_called_once()
+                    # 快照只以对象键保存在元数据中，直接使用抓取时生成的Markdown
+                    mock_save_snapshot.assert_awaited_once_with(
+                        mock_db, "<html>Test</html>", "Test"
+                    )
+                    meta_data = mock_create.call_args.kwargs["obj_in"].meta_data
+                    assert meta_data["snapshot_key"] == "blobs/ab/abc"
+                    assert "snapshot_html" not in meta_data
                     mock_update_stats.assert_called_once()
 
     @pytest.mark.asyncio
@@ -378,22 +392,36 @@ class TestDocumentService:
 
     @pytest.mark.asyncio
     async def test_batch_import_urls(self, document_service, mock_db, mock_user):
-        """Test batch importing URLs."""
-        # Mock import_from_url
-        async def mock_import(db, url, space_id, user, tags=None, save_snapshot=True):
+        """Test batch importing URLs fetches concurrently and keeps input order."""
+        async def mock_fetch(url):
+            # The first URL finishes last
+            await asyncio.sleep(0.02 if url.endswith("1.com") else 0)
+            return {"status": "success", "url": url}
+
+        async def mock_save(db, url, web_data, space_id, user, title=None, tags=None, save_snapshot=True):
             return {"status": "success", "url": url, "document_id": 1}
 
-        document_service.import_from_url = mock_import
+        document_service._save_web_page = AsyncMock(side_effect=mock_save)
 
-        # Call method
-        urls = ["https://example1.com", "https://example2.com"]
-        results = await document_service.batch_import_urls(
-            mock_db, urls, space_id=1, user=mock_user
-        )
+        with patch(
+            "app.services.document_service.web_scraper_service.fetch_webpage",
+            side_effect=mock_fetch,
+        ):
+            urls = ["https://example1.com", "https://example2.com"]
+            results = await document_service.batch_import_urls(
+                mock_db, urls, space_id=1, user=mock_user
+            )
+            streamed = [
+                result["url"]
+                async for result in document_service.iter_import_urls(
+                    mock_db, urls, space_id=1, user=mock_user
+                )
+            ]
 
         # Assertions
-        assert len(results) == 2
+        assert [r["url"] for r in results] == urls
         assert all(r["status"] == "success" for r in results)
+        assert streamed == ["https://example2.com", "https://example1.com"]
 
     @pytest.mark.asyncio
     async def test_get_web_snapshot(self, document_service, mock_db, mock_user, mock_document):
@@ -568,6 +596,64 @@ class TestDocumentService:
             # Should return existing document
             assert result == mock_document
 
+    @pytest.mark.asyncio
+    async def test_create_document_from_file_dedup_by_raw_hash(self, document_service, mock_db, mock_user, mock_document):
+        """Test duplicate raw files are returned before parsing."""
+        with patch("app.crud.crud_document.get_by_hash") as mock_get_by_hash:
+            mock_get_by_hash.return_value = mock_document
+            document_service.content_service.extract_content_enhanced = AsyncMock()
+
+            mock_path = Mock(spec=Path)
+            mock_path.suffix = ".pdf"
+            mock_path.stat.return_value = Mock(st_size=1024)
+            mock_path.name = "test.pdf"
+
+            result = await document_service.create_document_from_file(
+                mock_db,
+                space_id=1,
+                file_path=mock_path,
+                user=mock_user,
+                file_hash="rawhash",
+            )
+
+            assert result == mock_document
+            mock_get_by_hash.assert_called_once_with(
+                mock_db, file_hash="rawhash", space_id=1
+            )
+            document_service.content_service.extract_content_enhanced.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_create_document_from_file_extraction_failed(self, document_service, mock_db, mock_user):
+        """Test extraction timeout marks the document as failed."""
+        with patch("app.crud.crud_document.get_by_hash") as mock_get_by_hash:
+            with patch("app.crud.crud_document.create") as mock_create:
+                with patch("app.crud.crud_space.update_stats"):
+                    mock_get_by_hash.return_value = None
+                    mock_create.return_value = Mock(id=1, extraction_status="failed")
+                    document_service.content_service.extract_content_enhanced = AsyncMock(
+                        side_effect=WorkerTimeoutError("任务执行超过 120 秒，已终止")
+                    )
+
+                    mock_path = Mock(spec=Path)
+                    mock_path.suffix = ".pdf"
+                    mock_path.stat.return_value = Mock(st_size=1024)
+                    mock_path.name = "huge.pdf"
+
+                    result = await document_service.create_document_from_file(
+                        mock_db,
+                        space_id=1,
+                        file_path=mock_path,
+                        user=mock_user,
+                        file_hash="rawhash",
+                    )
+
+                    assert result.extraction_status == "failed"
+                    create_kwargs = mock_create.call_args[1]
+                    assert create_kwargs["file_hash"] == "rawhash"
+                    assert create_kwargs["extraction_status"] == "failed"
+                    assert create_kwargs["processing_status"] == "failed"
+                    assert "extraction_error" in create_kwargs["obj_in"].meta_data
+
     @pytest.mark.asyncio
     async def test_extract_document_content(self, document_service):
         """Test extracting document content."""
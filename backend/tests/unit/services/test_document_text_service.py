@@ -0,0 +1,211 @@
+"""Unit tests for Document Text Service."""
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.document import crud_document
+from app.crud.space import crud_space
+from app.crud.user import crud_user
+from app.models.models import DocumentTextChunk
+from app.schemas.documents import DocumentCreate
+from app.schemas.spaces import SpaceCreate
+from app.schemas.users import UserCreate
+from app.services.document_text_service import (
+    DocumentTextService,
+    decode_page_offsets,
+    encode_page_offsets,
+)
+
+TEXT = "".join(f"第{i}段内容。" for i in range(40))
+
+
+@pytest.fixture
+def service():
+    """使用很小的分块，便于测试跨块读取."""
+    return DocumentTextService(chunk_chars=16, preview_chars=20)
+
+
+@pytest.fixture
+async def space(async_test_db: AsyncSession):
+    """创建用户和空间."""
+    user = await crud_user.create(
+        async_test_db,
+        obj_in=UserCreate(
+            username="textuser", email="textuser@example.com", password="password123"
+        ),
+    )
+    return await crud_space.create(
+        async_test_db, obj_in=SpaceCreate(name="Texts"), user_id=user.id  # type: ignore[call-arg]
+    )
+
+
+async def _create_document(db: AsyncSession, space, filename: str, **fields):
+    return await crud_document.create(
+        db,
+        obj_in=DocumentCreate(
+            filename=filename, content_type="text/plain", size=1, space_id=space.id
+        ),
+        user_id=space.user_id,
+        file_path=f"spaces/{space.id}/documents/{filename}",
+        file_hash=filename,
+        **fields,
+    )
+
+
+async def _chunk_count(db: AsyncSession) -> int:
+    result = await db.execute(select(func.count()).select_from(DocumentTextChunk))
+    return result.scalar()
+
+
+class TestStoreText:
+    """测试全文存储."""
+
+    async def test_store_and_dedup(self, service, async_test_db: AsyncSession):
+        """测试全文分块存储，相同内容只存一份."""
+        fields = await service.store_text(async_test_db, TEXT)
+        await async_test_db.commit()
+        chunks = await _chunk_count(async_test_db)
+
+        assert fields["content_length"] == len(TEXT)
+        assert fields["content"] == TEXT[:1000]
+        assert fields["search_text"] == TEXT  # 检索来源单独存放，默认不加载
+        assert len(fields["preview"]) <= 20
+        assert chunks == -(-len(TEXT) // 16)
+
+        again = await service.store_text(async_test_db, TEXT)
+        await async_test_db.commit()
+        assert again["content_hash"] == fields["content_hash"]
+        assert await _chunk_count(async_test_db) == chunks
+
+    async def test_empty_text(self, service, async_test_db: AsyncSession):
+        """测试空文本不写入分块."""
+        fields = await service.store_text(async_test_db, "")
+
+        assert fields["content_hash"] is None
+        assert fields["content_length"] == 0
+        assert await _chunk_count(async_test_db) == 0
+
+    def test_make_preview_collapses_whitespace(self, service):
+        """测试预览压缩空白."""
+        assert service.make_preview("a\n\n  b\tc") == "a b c"
+
+
+class TestReadText:
+    """测试全文读取."""
+
+    async def test_get_text_round_trip(
+        self, service, async_test_db: AsyncSession, space
+    ):
+        """测试完整读取全文."""
+        fields = await service.store_text(async_test_db, TEXT)
+        document = await _create_document(async_test_db, space, "a.txt", **fields)
+
+        assert await service.get_text(async_test_db, document) == TEXT
+        assert service.get_length(document) == len(TEXT)
+
+    async def test_read_range_across_chunks(
+        self, service, async_test_db: AsyncSession, space
+    ):
+        """测试跨块范围读取."""
+        fields = await service.store_text(async_test_db, TEXT)
+        document = await _create_document(async_test_db, space, "a.txt", **fields)
+
+        for start, end in [(0, 5), (10, 40), (16, 32), (100, 10_000)]:
+            assert await service.read_range(async_test_db, document, start, end) == (
+                TEXT[start:end]
+            )
+        assert await service.read_range(async_test_db, document, 50, 50) == ""
+
+    async def test_legacy_document_uses_content(
+        self, service, async_test_db: AsyncSession, space
+    ):
+        """测试没有分块全文的旧文档回退到正文列."""
+        document = await _create_document(
+            async_test_db, space, "old.txt", content="旧文档正文"
+        )
+
+        assert await service.get_text(async_test_db, document) == "旧文档正文"
+        assert await service.read_range(async_test_db, document, 1, 3) == "文档"
+        assert service.get_length(document) == 5
+
+    async def test_legacy_range_read_in_database(
+        self, service, async_test_db: AsyncSession, space
+    ):
+        """测试旧文档正文未加载时由数据库截取范围."""
+        created = await _create_document(
+            async_test_db, space, "old.txt", content="旧文档正文"
+        )
+        async_test_db.expunge(created)
+        document = await crud_document.get_without_content(async_test_db, created.id)
+
+        assert await service.load_length(async_test_db, document) == 5
+        assert await service.read_range(async_test_db, document, 1, 3) == "文档"
+        assert await service.read_range(async_test_db, document, 3) == "正文"
+        assert await service.read_range(async_test_db, document, 3, 3) == ""
+
+
+class TestPageIndex:
+    """测试按页读取."""
+
+    def test_offsets_round_trip(self):
+        """测试页偏移编码为紧凑数组."""
+        offsets = [0, 120, 70_000, 2**31]
+
+        data = encode_page_offsets(offsets)
+
+        assert len(data) == 4 * len(offsets)
+        assert decode_page_offsets(data) == offsets
+        assert encode_page_offsets([]) is None
+        assert decode_page_offsets(None) == []
+
+    async def test_read_page(self, service, async_test_db: AsyncSession, space):
+        """测试按页偏移只读取该页文本."""
+        pages = ["第一页内容", "第二页的内容比较长，跨过了多个分块的边界", "", "末页"]
+        text = "\n".join(pages)
+        offsets = [0]
+        for page in pages[:-1]:
+            offsets.append(offsets[-1] + len(page) + 1)
+        fields = await service.store_text(async_test_db, text, offsets)
+        document = await _create_document(async_test_db, space, "a.pdf", **fields)
+
+        for number, page in enumerate(pages, start=1):
+            assert await service.read_page(async_test_db, document, number) == page
+        assert await service.read_page(async_test_db, document, 5) is None
+        assert service.page_of(document, 0) == 1
+        assert service.page_of(document, offsets[1] + 3) == 2
+        assert service.page_of(document, len(text) - 1) == 4
+
+    async def test_no_page_index(self, service, async_test_db: AsyncSession, space):
+        """测试没有页索引时不按页读取."""
+        fields = await service.store_text(async_test_db, TEXT)
+        document = await _create_document(async_test_db, space, "a.txt", **fields)
+
+        assert document.page_offsets is None
+        assert await service.read_page(async_test_db, document, 1) is None
+        assert service.page_of(document, 10) is None
+
+
+class TestRelease:
+    """测试全文释放."""
+
+    async def test_release_only_when_unreferenced(
+        self, service, async_test_db: AsyncSession, space
+    ):
+        """测试仍有文档引用时保留全文."""
+        fields = await service.store_text(async_test_db, TEXT)
+        first = await _create_document(async_test_db, space, "a.txt", **fields)
+        second = await _create_document(async_test_db, space, "b.txt", **fields)
+
+        await async_test_db.delete(first)
+        await async_test_db.flush()
+        assert await service.release(async_test_db, fields["content_hash"]) is False
+        assert await _chunk_count(async_test_db) > 0
+
+        await async_test_db.delete(second)
+        await async_test_db.flush()
+        assert await service.release(async_test_db, fields["content_hash"]) is True
+        await async_test_db.commit()
+        assert await _chunk_count(async_test_db) == 0
+
+        assert await service.release(async_test_db, None) is False
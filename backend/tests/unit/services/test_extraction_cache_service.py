@@ -0,0 +1,183 @@
+"""Unit tests for Extraction Cache Service."""
+
+import hashlib
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.core.blob_store import LocalBlobBackend
+from app.core.database import Base
+from app.core.uploads import SpooledUpload
+from app.models.models import DocumentTextChunk
+from app.services.blob_service import BlobService
+from app.services.document_content_service import (
+    DOC_FAILED_TEXT,
+    DocumentContentService,
+)
+from app.services.extraction_cache_service import ExtractionCacheService
+
+FILE_HASH = "a" * 64
+
+EXTRACTION = {
+    "text": "提取的正文",
+    "format": "markdown",
+    "extraction_method": "markitdown",
+    "metadata": {"page_count": 2},
+    "has_tables": True,
+    "has_images": False,
+    "has_formulas": False,
+    "extraction_failed": False,
+}
+
+
+@pytest.fixture
+async def session_factory():
+    """共享连接的内存SQLite会话工厂."""
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:", poolclass=StaticPool
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest.fixture
+def blobs(session_factory, tmp_path):
+    return BlobService(
+        backend=LocalBlobBackend(tmp_path / "blobs"), session_factory=session_factory
+    )
+
+
+def _cache(session_factory, blobs, version: str = "1") -> ExtractionCacheService:
+    return ExtractionCacheService(
+        session_factory=session_factory, version=version, blobs=blobs
+    )
+
+
+async def _chunk_count(session_factory) -> int:
+    async with session_factory() as db:
+        result = await db.execute(select(func.count()).select_from(DocumentTextChunk))
+        return result.scalar()
+
+
+class TestGetPut:
+    """测试缓存读写."""
+
+    async def test_round_trip(self, session_factory, blobs):
+        """测试写入后按文件哈希读出相同结构."""
+        cache = _cache(session_factory, blobs)
+        assert await cache.get(FILE_HASH) is None
+
+        await cache.put(FILE_HASH, ".pdf", EXTRACTION)
+
+        assert await cache.get(FILE_HASH) == EXTRACTION
+
+    async def test_version_bump_invalidates(self, session_factory, blobs):
+        """测试提取器版本变化后旧条目不再命中，重新写入时覆盖."""
+        await _cache(session_factory, blobs, "1").put(FILE_HASH, ".pdf", EXTRACTION)
+        cache = _cache(session_factory, blobs, "2")
+
+        assert await cache.get(FILE_HASH) is None
+        assert [entry.file_hash for entry in await cache.get_stale()] == [FILE_HASH]
+
+        await cache.put(FILE_HASH, ".pdf", {**EXTRACTION, "text": "新版本正文"})
+
+        assert (await cache.get(FILE_HASH))["text"] == "新版本正文"
+        assert await cache.get_stale() == []
+        # 旧版本的全文已释放
+        assert await _chunk_count(session_factory) == 1
+
+    async def test_empty_text_cached(self, session_factory, blobs):
+        """测试没有文本的结果也缓存."""
+        cache = _cache(session_factory, blobs)
+        await cache.put(FILE_HASH, ".pdf", {**EXTRACTION, "text": ""})
+
+        assert (await cache.get(FILE_HASH))["text"] == ""
+
+    async def test_failed_extraction_not_cached(self, session_factory, blobs):
+        """测试提取失败的结果不缓存，下次重新提取."""
+        cache = _cache(session_factory, blobs)
+
+        written = await cache.put(
+            FILE_HASH, ".doc", {**EXTRACTION, "text": "DOC文件提取失败", "extraction_failed": True}
+        )
+
+        assert written is False
+        assert await cache.get(FILE_HASH) is None
+        assert await _chunk_count(session_factory) == 0
+
+    async def test_errors_are_swallowed(self):
+        """测试数据库不可用时视为未命中."""
+        cache = ExtractionCacheService(session_factory=Mock(side_effect=OSError("down")))
+
+        assert await cache.get(FILE_HASH) is None
+        await cache.put(FILE_HASH, ".pdf", EXTRACTION)
+
+
+class TestContentServiceIntegration:
+    """测试内容服务使用缓存."""
+
+    async def test_extract_with_hash_uses_cache(self, session_factory, blobs, tmp_path):
+        """测试传入文件哈希时只解析一次."""
+        service = DocumentContentService(extraction_cache=_cache(session_factory, blobs))
+        path = tmp_path / "a.docx"
+        path.write_bytes(b"docx")
+
+        first = await service.extract_content_enhanced(path, file_hash=FILE_HASH)
+        service.markitdown = None
+        service.supported_types[".docx"] = AsyncMock(side_effect=AssertionError)
+        second = await service.extract_content_enhanced(path, file_hash=FILE_HASH)
+
+        assert second == first
+
+
+    async def test_failure_placeholder_not_cached(self, session_factory, blobs, tmp_path):
+        """测试提取器返回失败提示文本时标记失败，不写入缓存."""
+        service = DocumentContentService(extraction_cache=_cache(session_factory, blobs))
+        service.supported_types[".doc"] = AsyncMock(return_value=DOC_FAILED_TEXT)
+        path = tmp_path / "a.doc"
+        path.write_bytes(b"doc")
+
+        first = await service.extract_content_enhanced(path, file_hash=FILE_HASH)
+        await service.extract_content_enhanced(path, file_hash=FILE_HASH)
+
+        assert first["text"] == DOC_FAILED_TEXT
+        assert first["extraction_failed"] is True
+        assert service.supported_types[".doc"].await_count == 2
+
+
+class TestRefreshStale:
+    """测试批量重新提取."""
+
+    async def test_refresh_only_available_blobs(self, session_factory, blobs, tmp_path):
+        """测试只重新提取原始文件仍在存储中的过期条目."""
+        data = b"%PDF-stored"
+        sha = hashlib.sha256(data).hexdigest()
+        source = tmp_path / "upload"
+        source.write_bytes(data)
+        async with session_factory() as db:
+            await blobs.store(
+                db, SpooledUpload(path=source, size=len(data), sha256=sha), "application/pdf"
+            )
+
+        old = _cache(session_factory, blobs, "1")
+        await old.put(sha, ".pdf", EXTRACTION)
+        await old.put(FILE_HASH, ".pdf", EXTRACTION)
+
+        cache = _cache(session_factory, blobs, "2")
+        content_service = Mock()
+        content_service.extract_content_enhanced = AsyncMock(
+            return_value={**EXTRACTION, "text": "重新提取"}
+        )
+
+        assert await cache.refresh_stale(content_service=content_service) == 1
+
+        path, ext = content_service.extract_content_enhanced.call_args[0]
+        assert path.suffix == ".pdf"
+        assert ext == ".pdf"
+        assert (await cache.get(sha))["text"] == "重新提取"
+        assert [entry.file_hash for entry in await cache.get_stale()] == [FILE_HASH]
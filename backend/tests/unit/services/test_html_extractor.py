@@ -0,0 +1,105 @@
+"""Unit tests for HTML extraction engines."""
+
+from unittest.mock import patch
+
+import pytest
+
+from app.services.html_extractor import (
+    LxmlExtractor,
+    SoupExtractor,
+    create_html_extractor,
+)
+
+URL = "https://example.com/posts/1"
+
+ARTICLE = """<!DOCTYPE html>
+<html><head>
+<meta charset="utf-8">
+<title> 测试文章 </title>
+<meta name="description" content="文章描述">
+<meta name="author" content="作者">
+<meta property="og:title" content="OG标题">
+<meta property="article:published_time" content="2026-10-01">
+<style>p { color: red; }</style>
+<script>var tracking = 1;</script>
+</head><body>
+<nav><a href="/home">首页</a><a href="#top">顶部</a></nav>
+<article>
+<h1>主标题</h1>
+<p>第一段<a href="https://other.org/ref">引用</a>内容。</p>
+<ul><li>要点一</li><li>要点二</li></ul>
+<blockquote>引用第一行
+引用第二行</blockquote>
+<script>alert("x")</script>
+</article>
+<a href="/about">关于</a>
+</body></html>
+"""
+
+PAGES = [
+    ARTICLE,
+    '<html><body><div class="post main"><h2>区域</h2><p>div内容</p></div></body></html>',
+    "<html><body><p>只有body</p><ol><li>一</li></ol></body></html>",
+    "<p>片段</p>",
+    "",
+]
+
+
+class TestEngines:
+    """测试各引擎输出一致."""
+
+    @pytest.mark.parametrize("html", PAGES)
+    def test_lxml_matches_html_parser(self, html):
+        """测试lxml引擎与原有html.parser实现输出相同."""
+        expected = SoupExtractor().extract(html, URL)
+        page = LxmlExtractor().extract(html, URL)
+
+        assert page.title == expected.title
+        assert page.meta == expected.meta
+        assert page.content == expected.content
+        assert page.markdown == expected.markdown
+        assert set(page.links) == set(expected.links)
+
+    def test_single_pass_fields(self):
+        """测试一次解析得到全部字段."""
+        page = LxmlExtractor().extract(ARTICLE, URL)
+
+        assert page.title == "测试文章"
+        assert page.meta == {
+            "description": "文章描述",
+            "author": "作者",
+            "og_title": "OG标题",
+            "published_time": "2026-10-01",
+        }
+        assert page.content.startswith("主标题\n\n第一段引用内容。")
+        assert "alert" not in page.content
+        assert set(page.links) == {
+            "https://example.com/home",
+            "https://other.org/ref",
+            "https://example.com/about",
+        }
+        assert page.markdown.startswith("# 主标题\n\n第一段引用内容。\n\n- 要点一\n- 要点二")
+        assert "> 引用第二行" in page.markdown
+        assert "<script" not in page.snapshot_html
+        assert "主标题" in page.snapshot_html
+
+
+class TestFactory:
+    """测试引擎选择."""
+
+    def test_auto_prefers_lxml(self):
+        assert isinstance(create_html_extractor("auto"), LxmlExtractor)
+
+    def test_html_parser(self):
+        assert isinstance(create_html_extractor("html.parser"), SoupExtractor)
+
+    def test_auto_falls_back_without_lxml(self):
+        """测试未安装lxml时auto回退到html.parser，显式指定lxml则报错."""
+        with patch.dict("sys.modules", {"lxml.html": None}):
+            assert isinstance(create_html_extractor("auto"), SoupExtractor)
+            with pytest.raises(ImportError):
+                create_html_extractor("lxml")
+
+    def test_unknown_engine(self):
+        with pytest.raises(ValueError):
+            create_html_extractor("selectolax")
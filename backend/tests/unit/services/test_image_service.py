@@ -0,0 +1,137 @@
+"""Unit tests for Image Service."""
+
+import base64
+import io
+
+import pytest
+
+from app.services.image_service import ImageService
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def _make_image(mode: str, size: tuple[int, int], fmt: str) -> bytes:
+    """生成测试图片."""
+    color = (255, 0, 0, 128) if mode == "RGBA" else (255, 0, 0)
+    buffer = io.BytesIO()
+    Image.new(mode, size, color).save(buffer, format=fmt)
+    return buffer.getvalue()
+
+
+def _decode_data_url(data_url: str) -> tuple[str, bytes]:
+    header, encoded = data_url.split(",", 1)
+    return header, base64.b64decode(encoded)
+
+
+@pytest.fixture
+def image_service():
+    """创建图片服务实例."""
+    return ImageService(max_dimension=512, output_format="JPEG", quality=80)
+
+
+class TestOptimizeImage:
+    """测试图片缩放与重新编码."""
+
+    def test_downscale_large_image(self, image_service):
+        """测试大图缩放到长边上限."""
+        data = _make_image("RGB", (2000, 1000), "PNG")
+
+        result = image_service.optimize_image(data)
+
+        assert result is not None
+        optimized, mime_type = result
+        assert mime_type == "image/jpeg"
+        with Image.open(io.BytesIO(optimized)) as img:
+            assert img.size == (512, 256)
+            assert img.format == "JPEG"
+
+    def test_transparent_png_to_jpeg(self, image_service):
+        """测试透明PNG合成到白色背景."""
+        data = _make_image("RGBA", (1024, 1024), "PNG")
+
+        result = image_service.optimize_image(data)
+
+        assert result is not None
+        with Image.open(io.BytesIO(result[0])) as img:
+            assert img.mode == "RGB"
+
+    def test_webp_keeps_alpha(self):
+        """测试WebP输出保留透明通道."""
+        service = ImageService(max_dimension=256, output_format="webp")
+        data = _make_image("RGBA", (1024, 1024), "PNG")
+
+        result = service.optimize_image(data)
+
+        assert result is not None
+        assert result[1] == "image/webp"
+        with Image.open(io.BytesIO(result[0])) as img:
+            assert img.mode == "RGBA"
+
+    def test_small_image_not_enlarged(self, image_service):
+        """测试小图重新编码不变小时保留原图."""
+        data = _make_image("RGB", (8, 8), "PNG")
+
+        assert image_service.optimize_image(data) is None
+
+    def test_invalid_image_returns_none(self, image_service):
+        """测试无法解码的数据."""
+        assert image_service.optimize_image(b"not an image") is None
+
+    def test_unsupported_output_format_falls_back(self):
+        """测试不支持的输出格式回退到JPEG."""
+        service = ImageService(output_format="bmp")
+        assert service.output_format == "JPEG"
+
+
+class TestEncodeImage:
+    """测试图片编码与缓存."""
+
+    def test_encode_optimized_image(self, image_service, tmp_path):
+        """测试编码后的数据URL为缩放后的图片."""
+        image_path = tmp_path / "photo.png"
+        image_path.write_bytes(_make_image("RGB", (3000, 2000), "PNG"))
+
+        result = image_service.encode_image(image_path)
+
+        header, decoded = _decode_data_url(result)
+        assert header == "data:image/jpeg;base64"
+        with Image.open(io.BytesIO(decoded)) as img:
+            assert max(img.size) == 512
+
+    def test_encode_falls_back_to_original(self, image_service, tmp_path):
+        """测试无法处理时使用原始数据和扩展名MIME类型."""
+        image_path = tmp_path / "test.gif"
+        image_path.write_bytes(b"fake gif content")
+
+        result = image_service.encode_image(image_path)
+
+        header, decoded = _decode_data_url(result)
+        assert header == "data:image/gif;base64"
+        assert decoded == b"fake gif content"
+
+    def test_encode_uses_content_hash_cache(self, image_service, tmp_path):
+        """测试相同内容的图片命中缓存."""
+        data = _make_image("RGB", (1200, 800), "PNG")
+        first = tmp_path / "a.png"
+        second = tmp_path / "b.png"
+        first.write_bytes(data)
+        second.write_bytes(data)
+
+        result_a = image_service.encode_image(first)
+        result_b = image_service.encode_image(second)
+
+        assert result_a == result_b
+        stats = image_service.cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+    def test_cache_key_includes_dimension(self, image_service, tmp_path):
+        """测试不同尺寸上限分别缓存."""
+        image_path = tmp_path / "photo.png"
+        image_path.write_bytes(_make_image("RGB", (1200, 800), "PNG"))
+
+        small = image_service.encode_image(image_path, max_dimension=128)
+        large = image_service.encode_image(image_path, max_dimension=256)
+
+        assert small != large
+        assert len(image_service.cache) == 2
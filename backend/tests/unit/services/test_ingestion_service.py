@@ -0,0 +1,468 @@
+"""Unit tests for Ingestion Service."""
+
+import asyncio
+import hashlib
+from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app import crud
+from app.core.blob_store import LocalBlobBackend, blob_key
+from app.core.database import Base
+from app.core.process_pool import WorkerTimeoutError
+from app.core.uploads import SpooledUpload
+from app.schemas.spaces import SpaceCreate
+from app.schemas.users import UserCreate
+from app.services.blob_service import BlobService
+from app.services.document_text_service import decode_page_offsets
+from app.services.extraction_cache_service import ExtractionCacheService
+from app.services.ingestion_service import IngestionService, decode_text
+from app.services.vector_service import vector_service
+
+
+@pytest.fixture(autouse=True)
+def _pristine_singletons(monkeypatch):
+    """部分测试直接替换了CRUD单例的方法，这里恢复真实实现并关闭向量服务."""
+    for obj in (crud.crud_user, crud.crud_space, crud.crud_document, crud.crud_ingestion_job):
+        for name in [key for key in vars(obj) if key != "model"]:
+            monkeypatch.delattr(obj, name)
+    monkeypatch.setattr(vector_service, "client", None)
+
+
+@pytest.fixture
+async def session_factory():
+    """共享连接的内存SQLite会话工厂（工作协程与测试看到同一个库）."""
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:", poolclass=StaticPool
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest.fixture
+async def owner(session_factory):
+    """创建用户和空间."""
+    async with session_factory() as db:
+        user = await crud.crud_user.create(
+            db,
+            obj_in=UserCreate(
+                username="ingest", email="ingest@example.com", password="password123"
+            ),
+        )
+        space = await crud.crud_space.create(
+            db, obj_in=SpaceCreate(name="Inbox"), user_id=user.id  # type: ignore[call-arg]
+        )
+    return user, space
+
+
+@pytest.fixture
+def service(session_factory, tmp_path):
+    """创建入库服务实例（不使用进程池）."""
+    blobs = BlobService(
+        backend=LocalBlobBackend(tmp_path / "blobs"), session_factory=session_factory
+    )
+    service = IngestionService(
+        session_factory=session_factory,
+        blobs=blobs,
+        extraction_cache=ExtractionCacheService(
+            session_factory=session_factory, blobs=blobs
+        ),
+        workers=1,
+        max_attempts=2,
+        retry_backoff=0,
+    )
+    service.content_service.use_process_pool = False
+    return service
+
+
+def _spool(tmp_path, data: bytes, name: str = "upload.tmp") -> SpooledUpload:
+    path = tmp_path / name
+    path.write_bytes(data)
+    return SpooledUpload(path=path, size=len(data), sha256=hashlib.sha256(data).hexdigest())
+
+
+async def _submit(
+    service, session_factory, owner, tmp_path, data, filename, content_type, space=None
+):
+    user, default_space = owner
+    async with session_factory() as db:
+        return await service.submit_upload(
+            db,
+            upload=_spool(tmp_path, data),
+            space_id=(space or default_space).id,
+            user=user,
+            filename=filename,
+            content_type=content_type,
+        )
+
+
+class TestDecodeText:
+    """测试文本解码."""
+
+    def test_utf8(self):
+        assert decode_text("笔记".encode()) == "笔记"
+
+    def test_gbk(self):
+        """测试不依赖编码检测库也能解码GBK文本."""
+        assert decode_text("中文笔记".encode("gbk")) == "中文笔记"
+
+    def test_fallback_never_raises(self):
+        assert isinstance(decode_text(b"\xff\xfe\x00abc"), str)
+
+
+class TestSubmitUpload:
+    """测试上传受理."""
+
+    async def test_creates_pending_document_and_job(
+        self, service, session_factory, owner, tmp_path
+    ):
+        """测试保存原始文件并创建待处理文档和任务."""
+        document, job, duplicate = await _submit(
+            service, session_factory, owner, tmp_path, b"hello", "Notes.TXT", "text/plain"
+        )
+
+        assert duplicate is False
+        assert document.processing_status == "pending"
+        assert document.extraction_status == "pending"
+        assert document.file_path == blob_key(hashlib.sha256(b"hello").hexdigest())
+        stored = service.blobs.backend.local_path(document.file_path)
+        assert stored.read_bytes() == b"hello"
+        assert not (tmp_path / "upload.tmp").exists()
+        assert job.status == "queued"
+        assert job.max_attempts == 2
+        assert job.id in service._scheduled
+
+    async def test_duplicate_returns_existing(
+        self, service, session_factory, owner, tmp_path
+    ):
+        """测试空间内重复文件不再创建任务."""
+        first, first_job, _ = await _submit(
+            service, session_factory, owner, tmp_path, b"same", "a.txt", "text/plain"
+        )
+        second, job, duplicate = await _submit(
+            service, session_factory, owner, tmp_path, b"same", "b.txt", "text/plain"
+        )
+
+        assert duplicate is True
+        assert second.id == first.id
+        assert job.id == first_job.id
+
+
+class TestCrossSpaceDedup:
+    """测试跨空间共享原始文件."""
+
+    async def test_same_file_stored_once(
+        self, service, session_factory, owner, tmp_path
+    ):
+        """测试不同空间上传相同文件只存一份，引用计数累加."""
+        user, _ = owner
+        async with session_factory() as db:
+            other = await crud.crud_space.create(
+                db, obj_in=SpaceCreate(name="Other"), user_id=user.id  # type: ignore[call-arg]
+            )
+
+        first, _, _ = await _submit(
+            service, session_factory, owner, tmp_path, b"paper", "a.pdf", "application/pdf"
+        )
+        second, _, duplicate = await _submit(
+            service,
+            session_factory,
+            owner,
+            tmp_path,
+            b"paper",
+            "b.pdf",
+            "application/pdf",
+            space=other,
+        )
+
+        assert duplicate is False
+        assert second.id != first.id
+        assert second.file_path == first.file_path
+        async with session_factory() as db:
+            blob = await service.blobs.get(db, first.file_hash)
+        assert blob.ref_count == 2
+
+    async def test_extraction_reused_across_spaces(
+        self, service, session_factory, owner, tmp_path
+    ):
+        """测试相同文件只提取一次，其他空间复用全文和摘要."""
+        user, _ = owner
+        async with session_factory() as db:
+            other = await crud.crud_space.create(
+                db, obj_in=SpaceCreate(name="Other"), user_id=user.id  # type: ignore[call-arg]
+            )
+        _, first_job, _ = await _submit(
+            service, session_factory, owner, tmp_path, "共享内容。".encode(), "a.txt", "text/plain"
+        )
+        await service.process_job(first_job.id)
+
+        second, job, _ = await _submit(
+            service,
+            session_factory,
+            owner,
+            tmp_path,
+            "共享内容。".encode(),
+            "b.txt",
+            "text/plain",
+            space=other,
+        )
+        with patch.object(service, "_extract", AsyncMock()) as mock_extract:
+            assert await service.process_job(job.id) == "completed"
+
+        mock_extract.assert_not_called()
+        async with session_factory() as db:
+            second = await crud.crud_document.get(db, second.id)
+        assert second.content == "共享内容。"
+        assert second.content_hash is not None
+        assert second.summary
+
+
+class TestProcessJob:
+    """测试后台任务执行."""
+
+    async def test_text_document_completed(
+        self, service, session_factory, owner, tmp_path
+    ):
+        """测试文本文件提取、摘要后完成."""
+        document, job, _ = await _submit(
+            service,
+            session_factory,
+            owner,
+            tmp_path,
+            "第一句。第二句。".encode(),
+            "note.md",
+            "text/markdown",
+        )
+
+        assert await service.process_job(job.id) == "completed"
+
+        async with session_factory() as db:
+            document = await crud.crud_document.get(db, document.id)
+            job = await crud.crud_ingestion_job.get(db, job.id)
+        assert document.processing_status == "completed"
+        assert document.extraction_status == "completed"
+        assert document.content == "第一句。第二句。"
+        assert document.summary
+        # 向量服务未初始化时保持待处理
+        assert document.embedding_status == "pending"
+        assert job.attempts == 1
+        assert job.finished_at is not None
+
+    async def test_extracted_document_metadata(
+        self, service, session_factory, owner, tmp_path
+    ):
+        """测试解析类文档合并提取元数据."""
+        document, job, _ = await _submit(
+            service, session_factory, owner, tmp_path, b"%PDF", "paper.pdf", "application/pdf"
+        )
+        extraction = {
+            "text": "x" * 1500,
+            "metadata": {"page_count": 3, "page_offsets": [0, 500, 1000]},
+            "extraction_method": "pdfplumber",
+            "format": "text",
+            "has_tables": False,
+            "has_images": False,
+            "has_formulas": False,
+        }
+
+        with patch.object(
+            service.content_service,
+            "extract_content_enhanced",
+            AsyncMock(return_value=extraction),
+        ) as mock_extract:
+            await service.process_job(job.id)
+
+        path, ext = mock_extract.call_args[0]
+        assert path.suffix == ".pdf"
+        assert ext == ".pdf"
+        async with session_factory() as db:
+            document = await crud.crud_document.get(db, document.id)
+        assert len(document.content) == 1000
+        assert document.content_length == 1500
+        assert document.meta_data["page_count"] == 3
+        assert document.meta_data["extraction_method"] == "pdfplumber"
+        # 页索引存为紧凑数组，不进入元数据
+        assert "page_offsets" not in document.meta_data
+        assert decode_page_offsets(document.page_offsets) == [0, 500, 1000]
+
+    async def test_reupload_uses_extraction_cache(
+        self, service, session_factory, owner, tmp_path
+    ):
+        """测试删除后重新上传的文件使用缓存的提取结果."""
+        document, job, _ = await _submit(
+            service, session_factory, owner, tmp_path, b"%PDF", "paper.pdf", "application/pdf"
+        )
+        extraction = {
+            "text": "论文正文",
+            "metadata": {"page_count": 1},
+            "extraction_method": "pdfplumber",
+            "format": "text",
+            "has_tables": True,
+            "has_images": False,
+            "has_formulas": False,
+        }
+        with patch.object(
+            service.content_service,
+            "extract_content_enhanced",
+            AsyncMock(return_value=extraction),
+        ):
+            await service.process_job(job.id)
+
+        async with session_factory() as db:
+            await db.delete(await crud.crud_document.get(db, document.id))
+            await db.commit()
+
+        document, job, _ = await _submit(
+            service, session_factory, owner, tmp_path, b"%PDF", "again.pdf", "application/pdf"
+        )
+        with patch.object(
+            service.content_service, "extract_content_enhanced", AsyncMock()
+        ) as mock_extract:
+            assert await service.process_job(job.id) == "completed"
+
+        mock_extract.assert_not_called()
+        async with session_factory() as db:
+            document = await crud.crud_document.get(db, document.id)
+        assert document.content == "论文正文"
+        assert document.meta_data["has_tables"] is True
+
+    async def test_failure_retries_then_fails(
+        self, service, session_factory, owner, tmp_path
+    ):
+        """测试失败后重新排队，超过尝试次数后标记失败."""
+        document, job, _ = await _submit(
+            service, session_factory, owner, tmp_path, b"%PDF", "bad.pdf", "application/pdf"
+        )
+        service._scheduled.clear()
+
+        with (
+            patch.object(
+                service.content_service,
+                "extract_content_enhanced",
+                AsyncMock(side_effect=RuntimeError("parse error")),
+            ),
+            patch.object(service, "_schedule_retry") as mock_retry,
+        ):
+            assert await service.process_job(job.id) == "queued"
+            mock_retry.assert_called_once_with(job.id, 0)
+
+            async with session_factory() as db:
+                document = await crud.crud_document.get(db, document.id)
+            assert document.processing_status == "pending"
+            assert document.extraction_status == "pending"
+
+            assert await service.process_job(job.id) == "failed"
+
+        async with session_factory() as db:
+            document = await crud.crud_document.get(db, document.id)
+            job = await crud.crud_ingestion_job.get(db, job.id)
+        assert job.attempts == 2
+        assert job.error_message == "parse error"
+        assert document.processing_status == "failed"
+        assert document.extraction_status == "failed"
+        assert document.meta_data["extraction_error"] == "parse error"
+
+    async def test_worker_timeout_not_retried(
+        self, service, session_factory, owner, tmp_path
+    ):
+        """测试提取超时不重试."""
+        _, job, _ = await _submit(
+            service, session_factory, owner, tmp_path, b"%PDF", "big.pdf", "application/pdf"
+        )
+
+        with patch.object(
+            service.content_service,
+            "extract_content_enhanced",
+            AsyncMock(side_effect=WorkerTimeoutError("timeout")),
+        ):
+            assert await service.process_job(job.id) == "failed"
+
+    async def test_finished_job_skipped(
+        self, service, session_factory, owner, tmp_path
+    ):
+        """测试已完成的任务不重复执行."""
+        _, job, _ = await _submit(
+            service, session_factory, owner, tmp_path, b"text", "a.txt", "text/plain"
+        )
+        await service.process_job(job.id)
+
+        assert await service.process_job(job.id) is None
+        assert await service.process_job(12345) is None
+
+
+class TestJobClaim:
+    """测试多个工作进程之间的任务领取."""
+
+    async def test_job_claimed_once(self, service, session_factory, owner, tmp_path):
+        """测试同一任务只能被领取一次，执行中的任务不会被其他进程重复执行."""
+        _, job, _ = await _submit(
+            service, session_factory, owner, tmp_path, b"text", "a.txt", "text/plain"
+        )
+
+        async with session_factory() as db:
+            first = await crud.crud_ingestion_job.claim(db, job_id=job.id, lease_seconds=60)
+            second = await crud.crud_ingestion_job.claim(db, job_id=job.id, lease_seconds=60)
+            await db.commit()
+            unfinished = await crud.crud_ingestion_job.get_unfinished(db)
+
+        assert first and not second
+        assert unfinished == []
+        # 另一个进程领取不到，直接跳过
+        assert await service.process_job(job.id) is None
+        async with session_factory() as db:
+            current = await crud.crud_ingestion_job.get(db, job.id)
+        assert current.status == "running"
+        assert current.attempts == 1
+
+    async def test_expired_lease_reclaimed(
+        self, service, session_factory, owner, tmp_path
+    ):
+        """测试租约过期的执行中任务（进程已退出）重新入队并执行."""
+        _, job, _ = await _submit(
+            service, session_factory, owner, tmp_path, b"text", "a.txt", "text/plain"
+        )
+        async with session_factory() as db:
+            current = await crud.crud_ingestion_job.get(db, job.id)
+            current.status = "running"
+            current.attempts = 1
+            current.lease_expires_at = datetime.now(UTC) - timedelta(seconds=1)
+            await db.commit()
+            unfinished = await crud.crud_ingestion_job.get_unfinished(db)
+
+        assert [j.id for j in unfinished] == [job.id]
+        assert await service.process_job(job.id) == "completed"
+        async with session_factory() as db:
+            current = await crud.crud_ingestion_job.get(db, job.id)
+        assert current.attempts == 2
+
+
+class TestWorkers:
+    """测试工作协程."""
+
+    async def test_start_recovers_and_processes_jobs(
+        self, service, session_factory, owner, tmp_path
+    ):
+        """测试启动时恢复未完成的任务并在后台执行."""
+        document, job, _ = await _submit(
+            service, session_factory, owner, tmp_path, b"recover me", "r.txt", "text/plain"
+        )
+        # 模拟进程重启：内存队列丢失
+        service._queue = None
+        service._scheduled.clear()
+
+        await service.start()
+        try:
+            await asyncio.wait_for(service._queue.join(), timeout=10)
+        finally:
+            await service.stop()
+
+        async with session_factory() as db:
+            current = await crud.crud_ingestion_job.get(db, job.id)
+            document = await crud.crud_document.get(db, document.id)
+        assert current.status == "completed"
+        assert document.content == "recover me"
@@ -380,3 +380,120 @@ class TestCheckAttachmentsNeedVision:
         ]
 
         assert multimodal_helper.check_attachments_need_vision(attachments) is False
+
+
+class TestAttachmentCache:
+    """测试附件预处理结果缓存."""
+
+    @pytest.mark.asyncio
+    async def test_repeat_document_skips_extraction(
+        self, multimodal_helper, mock_content_service, tmp_path
+    ):
+        """测试相同内容的文档只提取一次."""
+        mock_content_service.extract_content_enhanced.return_value = {
+            "text": "Extracted DOCX content",
+            "extraction_method": "default",
+            "format": "plain_text",
+        }
+        multimodal_helper.content_service = mock_content_service
+
+        first = tmp_path / "a.docx"
+        second = tmp_path / "b.docx"
+        first.write_bytes(b"same bytes")
+        second.write_bytes(b"same bytes")
+
+        result_a = await multimodal_helper.prepare_attachment_for_chat(
+            first, "a.docx", prefer_vision=False
+        )
+        result_b = await multimodal_helper.prepare_attachment_for_chat(
+            second, "b.docx", prefer_vision=True
+        )
+
+        assert result_a == result_b
+        assert mock_content_service.extract_content_enhanced.await_count == 1
+        assert multimodal_helper.cache.stats()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cache_keyed_by_mode(
+        self, multimodal_helper, mock_ai_service, mock_content_service, tmp_path
+    ):
+        """测试PDF的视觉模式和文本模式分别缓存."""
+        mock_content_service.extract_content_enhanced.return_value = {
+            "text": "PDF text",
+            "extraction_method": "default",
+            "has_tables": False,
+            "has_formulas": False,
+        }
+        multimodal_helper.ai_service = mock_ai_service
+        multimodal_helper.content_service = mock_content_service
+        pdf_path = tmp_path / "paper.pdf"
+        pdf_path.write_bytes(b"%PDF-1.4 fake")
+
+        for _ in range(2):
+            vision = await multimodal_helper.prepare_attachment_for_chat(
+                pdf_path, "paper.pdf", prefer_vision=True
+            )
+            text = await multimodal_helper.prepare_attachment_for_chat(
+                pdf_path, "paper.pdf", prefer_vision=False
+            )
+
+        assert vision["content"] == "data:application/pdf;base64,test_pdf_data"
+        assert text["extracted_text"] == "PDF text"
+        mock_ai_service.encode_pdf.assert_called_once()
+        assert mock_content_service.extract_content_enhanced.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_uses_provided_hash(self, multimodal_helper, mock_ai_service):
+        """测试调用方传入哈希时无需读取文件."""
+        multimodal_helper.ai_service = mock_ai_service
+
+        for _ in range(2):
+            result = await multimodal_helper.prepare_attachment_for_chat(
+                Path("/nonexistent/test.png"),
+                "test.png",
+                prefer_vision=True,
+                file_hash="abc123",
+            )
+
+        assert result["content"] == "data:image/png;base64,test_image_data"
+        mock_ai_service.encode_image.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_failed_extraction_not_cached(
+        self, multimodal_helper, mock_content_service, tmp_path
+    ):
+        """测试提取失败的结果不缓存."""
+        mock_content_service.extract_content_enhanced.side_effect = Exception("boom")
+        multimodal_helper.content_service = mock_content_service
+        doc_path = tmp_path / "a.pptx"
+        doc_path.write_bytes(b"pptx bytes")
+
+        await multimodal_helper.prepare_attachment_for_chat(doc_path, "a.pptx")
+        await multimodal_helper.prepare_attachment_for_chat(doc_path, "a.pptx")
+
+        assert mock_content_service.extract_content_enhanced.await_count == 2
+        assert len(multimodal_helper.cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_cached_result_is_isolated(
+        self, multimodal_helper, mock_content_service, tmp_path
+    ):
+        """测试修改返回值不会污染缓存."""
+        mock_content_service.extract_content_enhanced.return_value = {
+            "text": "content",
+            "extraction_method": "default",
+            "format": "plain_text",
+        }
+        multimodal_helper.content_service = mock_content_service
+        doc_path = tmp_path / "a.docx"
+        doc_path.write_bytes(b"docx bytes")
+
+        first = await multimodal_helper.prepare_attachment_for_chat(doc_path, "a.docx")
+        first["extraction_metadata"]["method"] = "mutated"
+        second = await multimodal_helper.prepare_attachment_for_chat(doc_path, "a.docx")
+
+        assert second["extraction_metadata"]["method"] == "default"
+
+    def test_hash_file_missing(self, multimodal_helper):
+        """测试不可读文件返回None."""
+        assert multimodal_helper.hash_file(Path("/nonexistent/file.pdf")) is None
@@ -82,6 +82,7 @@ def mock_document():
     document.title = "Test Document"
     document.filename = "test.pdf"
     document.content = "Document content"
+    document.content_hash = None  # 无分块全文，使用正文列
     document.user_id = 1
     return document
 
@@ -448,6 +449,7 @@ class TestGetDocumentsContent:
         long_doc.title = "Long Doc"
         long_doc.filename = "long.pdf"
         long_doc.content = "A" * 20000  # 超过默认限制
+        long_doc.content_hash = None  # 无分块全文，使用正文列
 
         mock_result = Mock()
         mock_result.scalars.return_value.all.return_value = [long_doc]
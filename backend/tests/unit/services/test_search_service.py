@@ -1,5 +1,6 @@
 """Unit tests for Search Service."""
 
+import asyncio
 from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
@@ -66,7 +67,7 @@ class TestSearch:
 
             mock_client_instance = AsyncMock()
             mock_client_instance.post = AsyncMock(return_value=mock_response)
-            mock_client.return_value.__aenter__.return_value = mock_client_instance
+            mock_client.return_value = mock_client_instance
 
             # 执行搜索
             result = await search_service.search(
@@ -123,7 +124,7 @@ class TestSearch:
 
             mock_client_instance = AsyncMock()
             mock_client_instance.post = AsyncMock(return_value=mock_response)
-            mock_client.return_value.__aenter__.return_value = mock_client_instance
+            mock_client.return_value = mock_client_instance
 
             # 执行搜索
             result = await search_service.search(
@@ -208,7 +209,7 @@ class TestPerplexitySearch:
         with patch('httpx.AsyncClient') as mock_client:
             mock_client_instance = AsyncMock()
             mock_client_instance.post = AsyncMock(side_effect=Exception("Connection error"))
-            mock_client.return_value.__aenter__.return_value = mock_client_instance
+            mock_client.return_value = mock_client_instance
 
             # 执行搜索
             results = await search_service._perplexity_search(
@@ -223,6 +224,109 @@ class TestPerplexitySearch:
             assert all(r.source == "mock" for r in results)
 
 
+class TestSearchCache:
+    """测试搜索结果缓存和请求合并."""
+
+    @staticmethod
+    def _results(source: str = "perplexity") -> list[SearchResult]:
+        return [
+            SearchResult(
+                title="Kafka",
+                url="https://kafka.apache.org",
+                snippet="分布式消息系统",
+                score=1.0,
+                source=source,
+            )
+        ]
+
+    @pytest.mark.asyncio
+    async def test_repeated_query_served_from_cache(self, search_service, mock_user):
+        """测试规范化后相同的查询只调用一次上游，命中时如实报告耗时."""
+        upstream = AsyncMock(return_value=self._results())
+
+        with patch.object(search_service, "_perplexity_search", upstream):
+            first = await search_service.search("Apache  Kafka", user=mock_user)
+            second = await search_service.search(" apache kafka ", user=mock_user)
+            other_scope = await search_service.search(
+                "apache kafka", search_scope="news", user=mock_user
+            )
+
+        assert upstream.await_count == 2
+        assert not first.cached and second.cached and not other_scope.cached
+        assert second.results == first.results
+        assert second.search_time < 0.05
+        stats = search_service.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 2
+        assert stats["upstream_calls"] == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_queries_coalesced(self, search_service):
+        """测试并发的相同查询共享一次上游调用."""
+        release = asyncio.Event()
+
+        async def slow_search(**kwargs):
+            await release.wait()
+            return self._results()
+
+        with patch.object(search_service, "_perplexity_search", side_effect=slow_search) as upstream:
+            waiters = [
+                asyncio.create_task(search_service.search("kafka")) for _ in range(5)
+            ]
+            await asyncio.sleep(0)
+            release.set()
+            responses = await asyncio.gather(*waiters)
+
+        assert upstream.await_count == 1
+        assert all(len(response.results) == 1 for response in responses)
+        assert search_service.stats()["coalesced"] == 4
+        assert search_service.stats()["inflight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_cancel_shared_call(self, search_service):
+        release = asyncio.Event()
+
+        async def slow_search(**kwargs):
+            await release.wait()
+            return self._results()
+
+        with patch.object(search_service, "_perplexity_search", side_effect=slow_search):
+            cancelled = asyncio.create_task(search_service.search("kafka"))
+            waiting = asyncio.create_task(search_service.search("kafka"))
+            await asyncio.sleep(0)
+            cancelled.cancel()
+            release.set()
+            response = await waiting
+
+        assert len(response.results) == 1
+        assert cancelled.cancelled()
+
+    @pytest.mark.asyncio
+    async def test_fallback_results_not_cached(self, search_service):
+        """测试上游失败时的模拟结果和异常都不写入缓存."""
+        upstream = AsyncMock(side_effect=[self._results("mock"), Exception("网络错误"), self._results()])
+
+        with patch.object(search_service, "_perplexity_search", upstream):
+            await search_service.search("kafka")
+            failed = await search_service.search("kafka")
+            recovered = await search_service.search("kafka")
+
+        assert upstream.await_count == 3
+        assert failed.results == []
+        assert not recovered.cached
+        assert len(search_service.cache) == 1
+
+    @pytest.mark.asyncio
+    async def test_client_is_pooled(self, search_service):
+        client = search_service.client
+
+        assert search_service.client is client
+        await search_service.close()
+        assert client.is_closed
+        assert search_service.client is not client
+        await search_service.close()
+
+
 class TestParsePerplexityResponse:
     """测试解析 Perplexity 响应功能."""
 
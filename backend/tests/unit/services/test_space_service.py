@@ -1,6 +1,6 @@
 """Unit tests for Space Service."""
 
-from unittest.mock import AsyncMock, Mock
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -254,13 +254,31 @@ class TestDeleteSpace:
         # Mock CRUD
         from app import crud
         crud.crud_space.remove = AsyncMock()
+        stored = Mock()
+        stored.all.return_value = [("blobs/ab/abc", "hash", "blobs/cd/html", "blobs/ef/md")]
+        mock_db.execute = AsyncMock(return_value=stored)
+        mock_db.commit = AsyncMock()
 
         # 调用服务
-        result = await SpaceService.delete_space(mock_db, mock_space)
+        with (
+            patch("app.services.space_service.blob_service") as mock_blobs,
+            patch("app.services.space_service.document_text_service") as mock_texts,
+            patch("app.services.space_service.web_snapshot_service") as mock_snapshots,
+        ):
+            mock_blobs.release = AsyncMock()
+            mock_texts.release = AsyncMock()
+            mock_snapshots.release = AsyncMock()
+            result = await SpaceService.delete_space(mock_db, mock_space)
 
         # 验证
         assert result is True
         crud.crud_space.remove.assert_called_once_with(mock_db, id=1)
+        mock_blobs.release.assert_called_once_with(mock_db, "blobs/ab/abc")
+        mock_texts.release.assert_called_once_with(mock_db, "hash")
+        mock_snapshots.release.assert_called_once_with(
+            mock_db, "blobs/cd/html", "blobs/ef/md"
+        )
+        mock_db.commit.assert_called_once()
 
 
 class TestCountUserSpaces:
@@ -0,0 +1,141 @@
+"""Unit tests for Typeahead Service."""
+
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects.postgresql import asyncpg
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+from app.models.models import Document, Note, Space, User
+from app.services.typeahead_service import TypeaheadService, word_similarity
+
+
+@pytest.fixture
+async def session_factory():
+    """共享连接的内存SQLite会话工厂."""
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:", poolclass=StaticPool
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest.fixture
+async def data(session_factory):
+    """两个用户：me 的空间、文档、笔记，other 的私有空间和公开空间."""
+    async with session_factory() as db:
+        me = User(username="me", email="me@example.com", hashed_password="x")
+        other = User(username="other", email="other@example.com", hashed_password="x")
+        db.add_all([me, other])
+        await db.flush()
+        mine = Space(name="Kafka Research", user_id=me.id)
+        private = Space(name="Kafka Private", user_id=other.id)
+        public = Space(name="Public Library", user_id=other.id, is_public=True)
+        db.add_all([mine, private, public])
+        await db.flush()
+
+        def document(space, owner, filename, title=None):
+            return Document(
+                space_id=space.id,
+                user_id=owner.id,
+                filename=filename,
+                original_filename=filename,
+                title=title,
+                file_path=f"spaces/{space.id}/{filename}",
+                content_type="application/pdf",
+                file_size=1,
+                file_hash=filename,
+            )
+
+        db.add_all(
+            [
+                document(mine, me, "streams.pdf", "Kafka Streams in Action"),
+                document(public, other, "kafka_guide.pdf"),
+                document(private, other, "kafka_secret.pdf", "Kafka secret"),
+                Note(space_id=mine.id, user_id=me.id, title="kafka", content="x"),
+                Note(space_id=private.id, user_id=other.id, title="Kafka notes", content="x"),
+            ]
+        )
+        await db.commit()
+        return SimpleNamespace(me=me)
+
+
+class TestWordSimilarity:
+    """测试三元组相似度."""
+
+    def test_exact_word_scores_highest(self):
+        assert word_similarity("kafka", "kafka") == 1.0
+        assert word_similarity("kafka", "Apache Kafka Streams") == 1.0
+        assert 0 < word_similarity("kafk", "Apache Kafka") < 1
+        assert word_similarity("kafka", "postgres") == 0.0
+
+    def test_typo_still_similar(self):
+        assert word_similarity("kafak", "Kafka") > word_similarity("kafak", "Karma")
+
+
+class TestSuggest:
+    """测试输入联想（SQLite 回退实现）."""
+
+    async def test_scoped_ranked_and_limited(self, session_factory, data):
+        """测试只返回可访问的对象，按相似度排序并严格限制条数."""
+        service = TypeaheadService(cache_ttl=60)
+        async with session_factory() as db:
+            items, cached = await service.suggest(db, data.me, "  KAFKA ", limit=10)
+
+        assert not cached
+        titles = [(item.type, item.title) for item in items]
+        assert ("note", "kafka") in titles
+        assert ("space", "Kafka Research") in titles
+        assert ("document", "Kafka Streams in Action") in titles
+        # 公开空间中的文档，没有标题时使用文件名
+        assert ("document", "kafka_guide.pdf") in titles
+        # 其他用户的私有空间、其中的文档和笔记都不出现
+        assert ("space", "Kafka Private") not in titles
+        assert ("document", "Kafka secret") not in titles
+        assert ("note", "Kafka notes") not in titles
+        assert [item.score for item in items] == sorted(
+            (item.score for item in items), reverse=True
+        )
+
+        async with session_factory() as db:
+            items, _ = await service.suggest(db, data.me, "kafka", limit=2)
+        assert len(items) == 2
+
+    async def test_types_filter(self, session_factory, data):
+        service = TypeaheadService(cache_ttl=60)
+        async with session_factory() as db:
+            items, _ = await service.suggest(db, data.me, "kafka", types=["space"])
+
+        assert [(item.type, item.title) for item in items] == [("space", "Kafka Research")]
+
+    async def test_cached_per_user(self, session_factory, data):
+        """测试相同用户和查询命中缓存，不再访问数据库."""
+        service = TypeaheadService(cache_ttl=60)
+        async with session_factory() as db:
+            first, _ = await service.suggest(db, data.me, "kafka")
+
+        db = SimpleNamespace()  # 访问数据库会报错
+        second, cached = await service.suggest(db, data.me, "Kafka")
+
+        assert cached
+        assert second == first
+
+
+class TestPostgresQuery:
+    """测试 PostgreSQL 查询使用三元组运算符."""
+
+    def test_union_uses_trigram_operators(self):
+        service = TypeaheadService()
+        stmt = service._source("document", 1, "kafka", postgres=True, limit=5)
+
+        sql = str(
+            stmt.compile(dialect=asyncpg.dialect(), compile_kwargs={"literal_binds": True})
+        )
+
+        assert "'kafka' <% documents.title" in sql
+        assert "greatest(word_similarity('kafka', documents.title)" in sql
+        assert "LIMIT 5" in sql
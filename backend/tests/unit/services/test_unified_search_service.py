@@ -0,0 +1,232 @@
+"""Unit tests for Unified Search Service."""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy.dialects.postgresql import asyncpg
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+from app.models.models import (
+    Annotation,
+    Citation,
+    Conversation,
+    Document,
+    Note,
+    Space,
+    User,
+)
+from app.services.unified_search_service import (
+    InvalidCursorError,
+    UnifiedSearchService,
+)
+
+
+@pytest.fixture
+async def session_factory():
+    """共享连接的内存SQLite会话工厂."""
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:", poolclass=StaticPool
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest.fixture
+async def data(session_factory):
+    """me 的各类对象都提到 kafka，other 的私有数据不可见."""
+    async with session_factory() as db:
+        me = User(username="me", email="me@example.com", hashed_password="x")
+        other = User(username="other", email="other@example.com", hashed_password="x")
+        db.add_all([me, other])
+        await db.flush()
+        mine = Space(name="Research", user_id=me.id)
+        private = Space(name="Private", user_id=other.id)
+        db.add_all([mine, private])
+        await db.flush()
+
+        def document(space, owner, filename, title):
+            return Document(
+                space_id=space.id,
+                user_id=owner.id,
+                filename=filename,
+                original_filename=filename,
+                title=title,
+                content=f"{title} body",
+                file_path=f"spaces/{space.id}/{filename}",
+                content_type="application/pdf",
+                file_size=1,
+                file_hash=filename,
+            )
+
+        doc = document(mine, me, "streams.pdf", "Kafka Streams")
+        db.add_all([doc, document(private, other, "secret.pdf", "Kafka secret")])
+        await db.flush()
+        db.add_all(
+            [
+                Note(space_id=mine.id, user_id=me.id, title="Kafka notes", content="x"),
+                Note(space_id=mine.id, user_id=me.id, title="Other", content="about kafka"),
+                Citation(
+                    space_id=mine.id,
+                    user_id=me.id,
+                    document_id=doc.id,
+                    citation_type="article",
+                    bibtex_key="kreps2011",
+                    title="Kafka: a distributed messaging system",
+                    authors=["Jay Kreps"],
+                ),
+                Annotation(
+                    document_id=doc.id,
+                    user_id=me.id,
+                    type="highlight",
+                    selected_text="Kafka partitions",
+                ),
+                Conversation(user_id=me.id, space_id=mine.id, title="Kafka", mode="chat"),
+                Conversation(user_id=other.id, title="Kafka", mode="chat"),
+            ]
+        )
+        await db.commit()
+        return SimpleNamespace(me=me, doc=doc)
+
+
+class TestUnifiedSearch:
+    """测试统一搜索."""
+
+    async def test_merges_all_entities(self, session_factory, data):
+        """测试各类对象合并排序，只返回当前用户可见的结果."""
+        service = UnifiedSearchService(session_factory)
+
+        result = await service.search(data.me.id, "kafka")
+
+        assert result.counts == {
+            "document": 1,
+            "note": 2,
+            "citation": 1,
+            "annotation": 1,
+            "conversation": 1,
+        }
+        assert not result.timed_out and not result.cached
+        assert result.next_cursor is None
+        scores = [hit.score for hit in result.hits]
+        assert scores == sorted(scores, reverse=True)
+        # 各类最高分归一化后按类型权重排列
+        assert [hit.type for hit in result.hits[:5]] == [
+            "document",
+            "note",
+            "citation",
+            "annotation",
+            "conversation",
+        ]
+        assert result.hits[0].score == 1.0
+        assert result.hits[-1].type == "note"  # 正文命中的笔记排在最后
+        assert "kafka" in (result.hits[-1].snippet or "")
+        citation = next(hit for hit in result.hits if hit.type == "citation")
+        assert citation.document_id == data.doc.id
+
+    async def test_types_and_quotas(self, session_factory, data):
+        service = UnifiedSearchService(session_factory)
+
+        result = await service.search(
+            data.me.id, "kafka", types=["note", "conversation"], quotas={"note": 1}
+        )
+
+        assert result.counts == {"note": 1, "conversation": 1}
+        assert result.hits[0].title == "Kafka notes"
+
+    async def test_cursor_pagination(self, session_factory, data):
+        """测试游标翻页不重复、不遗漏，第二页读取缓存."""
+        service = UnifiedSearchService(session_factory)
+        full = await service.search(data.me.id, "kafka", limit=50)
+
+        pages = []
+        cursor = None
+        while True:
+            page = await service.search(data.me.id, "kafka", limit=2, cursor=cursor)
+            pages.append(page)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+
+        assert [(h.type, h.id) for p in pages for h in p.hits] == [
+            (h.type, h.id) for h in full.hits
+        ]
+        assert len(pages) == 3
+        assert all(page.cached for page in pages)
+
+    async def test_invalid_cursor(self, session_factory, data):
+        service = UnifiedSearchService(session_factory)
+
+        with pytest.raises(InvalidCursorError):
+            await service.search(data.me.id, "kafka", cursor="not-a-cursor")
+
+    async def test_time_budget_returns_partial(self, session_factory, data):
+        """测试超时的类型被取消，其余结果照常返回且不缓存."""
+        service = UnifiedSearchService(session_factory)
+        original = service._search_entity
+
+        async def slow_citations(entity, *args):
+            if entity == "citation":
+                await asyncio.sleep(5)
+            return await original(entity, *args)
+
+        with patch.object(service, "_search_entity", side_effect=slow_citations):
+            result = await service.search(data.me.id, "kafka", time_budget_ms=200)
+
+        assert result.timed_out == ["citation"]
+        assert "citation" not in result.counts
+        assert {hit.type for hit in result.hits} == {
+            "document",
+            "note",
+            "annotation",
+            "conversation",
+        }
+
+        again = await service.search(data.me.id, "kafka")
+        assert not again.cached and not again.timed_out
+
+    async def test_failed_entity_does_not_break_search(self, session_factory, data):
+        service = UnifiedSearchService(session_factory)
+        original = service._search_entity
+
+        async def broken_notes(entity, *args):
+            if entity == "note":
+                raise RuntimeError("boom")
+            return await original(entity, *args)
+
+        with patch.object(service, "_search_entity", side_effect=broken_notes):
+            result = await service.search(data.me.id, "kafka")
+
+        assert result.timed_out == ["note"]
+        assert result.counts["document"] == 1
+
+    async def test_cache_keyed_by_user_and_query(self, session_factory, data):
+        service = UnifiedSearchService(session_factory)
+
+        await service.search(data.me.id, "Kafka ")
+        assert (await service.search(data.me.id, "kafka")).cached
+        assert not (await service.search(data.me.id + 1, "kafka")).cached
+
+
+class TestPostgresStatement:
+    """测试 PostgreSQL 上使用全文索引."""
+
+    def test_statement_uses_full_text_index(self):
+        db = SimpleNamespace(
+            get_bind=lambda: SimpleNamespace(dialect=SimpleNamespace(name="postgresql"))
+        )
+
+        stmt = UnifiedSearchService._statement(db, "citation", 1, "kafka").limit(20)
+        sql = str(
+            stmt.compile(dialect=asyncpg.dialect(), compile_kwargs={"literal_binds": True})
+        )
+
+        assert "citations.search_vector @@ websearch_to_tsquery" in sql
+        assert "ts_headline" in sql
+        assert "ORDER BY ts_rank_cd(citations.search_vector" in sql
+        assert "LIMIT 20" in sql
+        assert "ilike" not in sql.lower()
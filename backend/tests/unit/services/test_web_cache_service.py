@@ -0,0 +1,165 @@
+"""Unit tests for Web Cache Service."""
+
+from datetime import UTC, datetime, timedelta
+
+import httpx
+import pytest
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+from app.models.models import WebPageCache
+from app.services.web_cache_service import WebCacheService
+from app.services.web_scraper_service import WebScraperService
+
+URL = "https://example.com/article"
+
+RESULT = {
+    "url": URL,
+    "title": "Article",
+    "content": "正文内容",
+    "metadata": {"title": "Article", "domain": "example.com"},
+    "snapshot_html": "<html><title>Article</title></html>",
+    "status": "success",
+}
+
+
+@pytest.fixture
+async def session_factory():
+    """共享连接的内存SQLite会话工厂."""
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:", poolclass=StaticPool
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest.fixture
+def cache(session_factory):
+    return WebCacheService(session_factory=session_factory, ttl_seconds=60)
+
+
+async def _expire(session_factory, url: str = URL) -> None:
+    """把确认时间提前到新鲜期之外."""
+    async with session_factory() as db:
+        await db.execute(
+            update(WebPageCache)
+            .where(WebPageCache.url == url)
+            .values(validated_at=datetime.now(UTC) - timedelta(hours=1))
+        )
+        await db.commit()
+
+
+class TestCacheEntries:
+    """测试缓存读写."""
+
+    async def test_round_trip(self, cache):
+        """测试写入后读出相同的抓取结果和验证器."""
+        await cache.put(URL, RESULT, httpx.Headers({"ETag": '"v1"'}))
+
+        entry = await cache.get(URL)
+        result = cache.to_result(entry)
+
+        assert cache.is_fresh(entry)
+        assert cache.conditional_headers(entry) == {"If-None-Match": '"v1"'}
+        assert {key: result[key] for key in RESULT} == RESULT
+        assert entry.snapshot != RESULT["snapshot_html"].encode()
+
+    async def test_no_store_not_cached(self, cache):
+        """测试响应禁止缓存时不写入."""
+        await cache.put(URL, RESULT, httpx.Headers({"Cache-Control": "private, no-store"}))
+
+        assert await cache.get(URL) is None
+
+    async def test_evicts_least_recently_used(self, session_factory):
+        """测试超过上限时淘汰最久未使用的条目."""
+        cache = WebCacheService(session_factory=session_factory, max_entries=2)
+        for name in ("a", "b"):
+            await cache.put(f"https://example.com/{name}", RESULT, httpx.Headers())
+        await cache.touch("https://example.com/a")
+
+        await cache.put("https://example.com/c", RESULT, httpx.Headers())
+
+        assert await cache.get("https://example.com/a") is not None
+        assert await cache.get("https://example.com/b") is None
+        assert await cache.get("https://example.com/c") is not None
+
+
+class TestScraperIntegration:
+    """测试抓取时使用缓存."""
+
+    @staticmethod
+    def _scraper(cache, responses: list[httpx.Response], requests: list[httpx.Request]):
+        def handler(request):
+            requests.append(request)
+            return responses.pop(0)
+
+        scraper = WebScraperService(cache=cache)
+        scraper._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        return scraper
+
+    async def test_fresh_entry_skips_request(self, cache):
+        """测试新鲜期内不访问源站."""
+        requests: list[httpx.Request] = []
+        scraper = self._scraper(
+            cache,
+            [httpx.Response(200, html="<title>Article</title><main>正文</main>")],
+            requests,
+        )
+
+        first = await scraper.fetch_webpage(URL)
+        second = await scraper.fetch_webpage(URL)
+
+        assert len(requests) == 1
+        assert second["content"] == first["content"] == "正文"
+        assert second["snapshot_html"] == first["snapshot_html"]
+
+    async def test_not_modified_reuses_result(self, cache, session_factory):
+        """测试过期后发送条件请求，304时复用已解析的结果."""
+        requests: list[httpx.Request] = []
+        scraper = self._scraper(
+            cache,
+            [
+                httpx.Response(
+                    200,
+                    html="<title>Article</title><main>正文</main>",
+                    headers={"ETag": '"v1"', "Last-Modified": "Mon, 05 Oct 2026 08:00:00 GMT"},
+                ),
+                httpx.Response(304, headers={"ETag": '"v2"'}),
+            ],
+            requests,
+        )
+        await scraper.fetch_webpage(URL)
+        await _expire(session_factory)
+
+        result = await scraper.fetch_webpage(URL)
+
+        assert result["status"] == "success"
+        assert result["content"] == "正文"
+        assert requests[1].headers["If-None-Match"] == '"v1"'
+        assert requests[1].headers["If-Modified-Since"] == "Mon, 05 Oct 2026 08:00:00 GMT"
+        entry = await cache.get(URL)
+        assert cache.is_fresh(entry)
+        assert entry.etag == '"v2"'
+
+    async def test_modified_page_replaces_entry(self, cache, session_factory):
+        """测试内容变化时重新解析并覆盖缓存."""
+        requests: list[httpx.Request] = []
+        scraper = self._scraper(
+            cache,
+            [
+                httpx.Response(200, html="<main>旧内容</main>", headers={"ETag": '"v1"'}),
+                httpx.Response(200, html="<main>新内容</main>", headers={"ETag": '"v2"'}),
+            ],
+            requests,
+        )
+        await scraper.fetch_webpage(URL)
+        await _expire(session_factory)
+
+        result = await scraper.fetch_webpage(URL)
+
+        assert result["content"] == "新内容"
+        assert cache.to_result(await cache.get(URL))["content"] == "新内容"
@@ -1,6 +1,7 @@
 """Unit tests for Web Scraper Service."""
 
-from unittest.mock import AsyncMock, Mock, patch
+import asyncio
+from unittest.mock import patch
 
 import httpx
 import pytest
@@ -57,111 +58,114 @@ def sample_html():
     """
 
 
-@pytest.fixture
-def mock_response_success(sample_html):
-    """模拟成功的HTTP响应."""
-    mock_response = Mock()
-    mock_response.status_code = 200
-    mock_response.text = sample_html
-    mock_response.raise_for_status = Mock()
-    return mock_response
-
-
-@pytest.fixture
-def mock_response_error():
-    """模拟错误的HTTP响应."""
-    mock_response = Mock()
-    mock_response.status_code = 404
-    mock_response.text = "Not Found"
-    return mock_response
+def _use_handler(service: WebScraperService, handler) -> None:
+    """让服务的共享客户端使用模拟传输层."""
+    service._client = httpx.AsyncClient(
+        transport=httpx.MockTransport(handler), follow_redirects=True
+    )
 
 
 class TestFetchWebpage:
     """测试网页抓取功能."""
 
     @pytest.mark.asyncio
-    async def test_fetch_webpage_success(
-        self, web_scraper_service, mock_response_success
-    ):
+    async def test_fetch_webpage_success(self, web_scraper_service, sample_html):
         """测试成功抓取网页."""
         test_url = "https://example.com/test"
-
-        with patch('httpx.AsyncClient') as MockClient:
-            mock_client = AsyncMock()
-            MockClient.return_value.__aenter__.return_value = mock_client
-            mock_client.get.return_value = mock_response_success
-
-            result = await web_scraper_service.fetch_webpage(test_url)
-
-            assert result["status"] == "success"
-            assert result["url"] == test_url
-            assert result["title"] == "Test Page"
-            assert "Main Article Title" in result["content"]
-            assert "fetched_at" in result
-            assert result["metadata"]["domain"] == "example.com"
-            assert result["metadata"]["description"] == "This is a test page for web scraping"
-            assert result["metadata"]["keywords"] == "test, web, scraping"
-            assert result["metadata"]["author"] == "Test Author"
-            assert result["metadata"]["og_title"] == "Test OG Title"
-            assert result["metadata"]["og_description"] == "Test OG Description"
-            assert result["metadata"]["og_image"] == "https://example.com/image.jpg"
-            assert result["metadata"]["published_time"] == "2023-01-01T10:00:00Z"
+        _use_handler(web_scraper_service, lambda request: httpx.Response(200, html=sample_html))
+
+        result = await web_scraper_service.fetch_webpage(test_url)
+
+        assert result["status"] == "success"
+        assert result["url"] == test_url
+        assert result["title"] == "Test Page"
+        assert "Main Article Title" in result["content"]
+        assert "fetched_at" in result
+        assert result["metadata"]["domain"] == "example.com"
+        assert result["metadata"]["description"] == "This is a test page for web scraping"
+        assert result["metadata"]["keywords"] == "test, web, scraping"
+        assert result["metadata"]["author"] == "Test Author"
+        assert result["metadata"]["og_title"] == "Test OG Title"
+        assert result["metadata"]["og_description"] == "Test OG Description"
+        assert result["metadata"]["og_image"] == "https://example.com/image.jpg"
+        assert result["metadata"]["published_time"] == "2023-01-01T10:00:00Z"
 
     @pytest.mark.asyncio
-    async def test_fetch_webpage_http_error(
-        self, web_scraper_service, mock_response_error
-    ):
+    async def test_fetch_webpage_http_error(self, web_scraper_service):
         """测试HTTP错误处理."""
         test_url = "https://example.com/notfound"
+        _use_handler(web_scraper_service, lambda request: httpx.Response(404, text="Not Found"))
 
-        with patch('httpx.AsyncClient') as MockClient:
-            mock_client = AsyncMock()
-            MockClient.return_value.__aenter__.return_value = mock_client
+        result = await web_scraper_service.fetch_webpage(test_url)
 
-            # 模拟HTTP错误
-            error = httpx.HTTPStatusError("404 Not Found", request=Mock(), response=mock_response_error)
-            mock_client.get.side_effect = error
-
-            result = await web_scraper_service.fetch_webpage(test_url)
-
-            assert result["status"] == "error"
-            assert result["url"] == test_url
-            assert "HTTP 404" in result["error"]
-            assert "fetched_at" in result
+        assert result["status"] == "error"
+        assert result["url"] == test_url
+        assert "HTTP 404" in result["error"]
+        assert "fetched_at" in result
 
     @pytest.mark.asyncio
     async def test_fetch_webpage_timeout(self, web_scraper_service):
         """测试超时错误处理."""
         test_url = "https://example.com/timeout"
 
-        with patch('httpx.AsyncClient') as MockClient:
-            mock_client = AsyncMock()
-            MockClient.return_value.__aenter__.return_value = mock_client
-            mock_client.get.side_effect = httpx.TimeoutException("Timeout")
+        def handler(request):
+            raise httpx.TimeoutException("Timeout")
 
-            result = await web_scraper_service.fetch_webpage(test_url)
+        _use_handler(web_scraper_service, handler)
 
-            assert result["status"] == "error"
-            assert result["url"] == test_url
-            assert "Timeout" in result["error"]
-            assert "fetched_at" in result
+        result = await web_scraper_service.fetch_webpage(test_url)
+
+        assert result["status"] == "error"
+        assert result["url"] == test_url
+        assert "Timeout" in result["error"]
+        assert "fetched_at" in result
 
     @pytest.mark.asyncio
     async def test_fetch_webpage_general_exception(self, web_scraper_service):
         """测试一般异常处理."""
         test_url = "https://example.com/error"
 
-        with patch('httpx.AsyncClient') as MockClient:
-            mock_client = AsyncMock()
-            MockClient.return_value.__aenter__.return_value = mock_client
-            mock_client.get.side_effect = Exception("Network error")
+        def handler(request):
+            raise Exception("Network error")
+
+        _use_handler(web_scraper_service, handler)
+
+        result = await web_scraper_service.fetch_webpage(test_url)
+
+        assert result["status"] == "error"
+        assert result["url"] == test_url
+        assert result["error"] == "Network error"
+        assert "fetched_at" in result
+
+    @pytest.mark.asyncio
+    async def test_fetch_webpage_declared_too_large(self):
+        """测试声明的页面大小超过上限时不下载."""
+        service = WebScraperService(max_bytes=100)
+        _use_handler(service, lambda request: httpx.Response(200, html="x" * 1000))
+
+        result = await service.fetch_webpage("https://example.com/big")
+
+        assert result["status"] == "error"
+        assert "上限" in result["error"]
+
+    @pytest.mark.asyncio
+    async def test_fetch_webpage_streaming_too_large(self):
+        """测试未声明大小的页面下载超过上限时立即中止."""
+        service = WebScraperService(max_bytes=100)
+        sent = []
+
+        async def body():
+            for _ in range(100):
+                sent.append(1)
+                yield b"x" * 40
+
+        _use_handler(service, lambda request: httpx.Response(200, content=body()))
 
-            result = await web_scraper_service.fetch_webpage(test_url)
+        result = await service.fetch_webpage("https://example.com/big")
 
-            assert result["status"] == "error"
-            assert result["url"] == test_url
-            assert result["error"] == "Network error"
-            assert "fetched_at" in result
+        assert result["status"] == "error"
+        assert "上限" in result["error"]
+        assert len(sent) == 3
 
 
 class TestExtractMetadata:
@@ -410,6 +414,70 @@ class TestFetchMultipleUrls:
             assert results[1]["status"] == "error"
 
 
+class TestConcurrentFetch:
+    """测试并发抓取."""
+
+    @pytest.mark.asyncio
+    async def test_global_and_per_host_limits(self):
+        """测试全局并发和单主机并发都不超过上限."""
+        service = WebScraperService(max_concurrency=3, per_host_concurrency=2)
+        active: dict[str, int] = {}
+        peak: dict[str, int] = {}
+        peak_total = 0
+
+        async def handler(request):
+            nonlocal peak_total
+            host = request.url.host
+            active[host] = active.get(host, 0) + 1
+            peak[host] = max(peak.get(host, 0), active[host])
+            peak_total = max(peak_total, sum(active.values()))
+            await asyncio.sleep(0.01)
+            active[host] -= 1
+            return httpx.Response(200, html="<title>t</title>")
+
+        _use_handler(service, handler)
+        urls = [f"https://a.com/{i}" for i in range(6)] + [
+            f"https://b.com/{i}" for i in range(2)
+        ]
+
+        results = await service.fetch_multiple_urls(urls)
+
+        assert [result["url"] for result in results] == urls
+        assert all(result["status"] == "success" for result in results)
+        assert peak["a.com"] == 2
+        assert peak["b.com"] <= 2
+        assert peak_total == 3
+        assert service._host_slots == {}
+
+    @pytest.mark.asyncio
+    async def test_iter_webpages_yields_as_completed(self):
+        """测试按完成顺序返回结果."""
+        service = WebScraperService()
+        delays = {"/slow": 0.05, "/fast": 0.0}
+
+        async def handler(request):
+            await asyncio.sleep(delays[request.url.path])
+            return httpx.Response(200, html="<title>t</title>")
+
+        _use_handler(service, handler)
+
+        urls = ["https://a.com/slow", "https://b.com/fast"]
+        results = [result async for result in service.iter_webpages(urls)]
+
+        assert [result["url"] for result in results] == [urls[1], urls[0]]
+
+    @pytest.mark.asyncio
+    async def test_close_shared_client(self):
+        """测试关闭后重新创建共享客户端."""
+        service = WebScraperService()
+        client = service.client
+
+        assert service.client is client
+        await service.close()
+        assert service.client is not client
+        await service.close()
+
+
 class TestExtractLinks:
     """测试链接提取功能."""
 
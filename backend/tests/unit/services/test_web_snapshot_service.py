@@ -0,0 +1,162 @@
+"""Unit tests for Web Snapshot Service."""
+
+import gzip
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.core.blob_store import LocalBlobBackend
+from app.core.database import Base
+from app.models.models import Blob, Document, Space, User
+from app.services.blob_service import BlobService
+from app.services.document_service import DocumentService
+from app.services.web_snapshot_service import SNAPSHOT_KEYS, WebSnapshotService
+
+HTML = "<html><body><h1>标题</h1><p>段落内容</p></body></html>"
+
+
+@pytest.fixture
+async def session_factory():
+    """共享连接的内存SQLite会话工厂."""
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:", poolclass=StaticPool
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest.fixture
+def service(session_factory, tmp_path):
+    return WebSnapshotService(
+        blobs=BlobService(
+            backend=LocalBlobBackend(tmp_path / "blobs"), session_factory=session_factory
+        )
+    )
+
+
+async def _ref_counts(db: AsyncSession) -> list[int]:
+    result = await db.execute(select(Blob.ref_count).order_by(Blob.id))
+    return list(result.scalars().all())
+
+
+class TestSaveLoad:
+    """测试快照保存和读取."""
+
+    async def test_save_and_load(self, service, session_factory):
+        """测试快照压缩存储，读取时直接返回导入时生成的Markdown."""
+        async with session_factory() as db:
+            fields = await service.save(db, HTML)
+            await db.commit()
+
+        assert set(SNAPSHOT_KEYS) <= fields.keys()
+        assert fields["snapshot_size"] == len(HTML.encode())
+        stored = service.blobs.backend.local_path(fields["snapshot_key"]).read_bytes()
+        assert gzip.decompress(stored).decode() == HTML
+
+        snapshot = await service.load(fields)
+
+        assert snapshot["snapshot_html"] == HTML
+        assert snapshot["snapshot_markdown"].startswith("# 标题")
+
+    async def test_same_snapshot_stored_once(self, service, session_factory):
+        """测试相同快照只存一份，引用计数随文档增减."""
+        async with session_factory() as db:
+            first = await service.save(db, HTML)
+            second = await service.save(db, HTML)
+            await db.commit()
+            assert second == first
+            assert await _ref_counts(db) == [2, 2]
+
+            await service.release(db, *(first[key] for key in SNAPSHOT_KEYS))
+            await db.commit()
+            assert await _ref_counts(db) == [1, 1]
+
+    async def test_legacy_inline_snapshot(self, service):
+        """测试旧文档的内联快照仍可读取."""
+        snapshot = await service.load({"snapshot_html": HTML})
+
+        assert snapshot["snapshot_html"] == HTML
+        assert "段落内容" in snapshot["snapshot_markdown"]
+        assert await service.load({"source_url": "https://example.com"}) is None
+
+    async def test_keys_selectable_from_metadata(self, service, session_factory):
+        """测试删除空间时可以直接从元数据列中取出快照键."""
+        async with session_factory() as db:
+            user = User(username="u", email="u@example.com", hashed_password="x")
+            db.add(user)
+            await db.flush()
+            space = Space(name="S", user_id=user.id)
+            db.add(space)
+            await db.flush()
+            fields = await service.save(db, HTML)
+            db.add(
+                Document(
+                    space_id=space.id,
+                    user_id=user.id,
+                    filename="web.html",
+                    original_filename="web.html",
+                    file_path="spaces/1/web/abc",
+                    content_type="text/html",
+                    file_size=1,
+                    file_hash="abc",
+                    meta_data={"source_url": "https://example.com", **fields},
+                )
+            )
+            await db.commit()
+
+            result = await db.execute(
+                select(*(Document.meta_data[key].as_string() for key in SNAPSHOT_KEYS))
+            )
+
+            assert result.one() == tuple(fields[key] for key in SNAPSHOT_KEYS)
+
+
+class TestSaveFailure:
+    """测试保存快照后创建文档失败."""
+
+    async def test_references_rolled_back(self, service, session_factory):
+        """测试文档创建失败时快照引用随事务回滚，会话可以继续导入."""
+        async with session_factory() as db:
+            user = User(username="u", email="u@example.com", hashed_password="x")
+            db.add(user)
+            await db.flush()
+            space = Space(name="S", user_id=user.id)
+            db.add(space)
+            await db.commit()
+            space_id = space.id
+            web_data = {
+                "status": "success",
+                "content": "段落内容",
+                "metadata": {"title": "标题"},
+                "snapshot_html": HTML,
+            }
+
+            with (
+                patch("app.services.document_service.web_snapshot_service", service),
+                patch(
+                    "app.crud.crud_document.create", side_effect=RuntimeError("写入失败")
+                ),
+            ):
+                result = await DocumentService()._save_web_page(
+                    db, "https://example.com", web_data, space_id, user
+                )
+
+            assert result["status"] == "error"
+            assert result["error"] == "写入失败"
+            # 对象已提交但未被引用，由垃圾回收清理
+            assert await _ref_counts(db) == [0, 0]
+            unreferenced = await db.execute(select(Blob.unreferenced_at))
+            assert None not in unreferenced.scalars().all()
+
+            with patch("app.services.document_service.web_snapshot_service", service):
+                result = await DocumentService()._save_web_page(
+                    db, "https://example.com", web_data, space_id, user
+                )
+
+            assert result["status"] == "success", result
+            assert await _ref_counts(db) == [1, 1]
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+网页解析引擎基准测试
+对同一批HTML页面分别运行各解析引擎，统计吞吐量，并与 html.parser 引擎
+（原有实现）的输出逐项比较：正文、标题、meta、链接和Markdown。
+
+用法:
+    uv run python tools/bench_html_extract.py
+    uv run python tools/bench_html_extract.py --corpus ./saved_pages --rounds 5
+    uv run python tools/bench_html_extract.py --synthetic 200 --json bench.json
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.services.html_extractor import (  # noqa: E402
+    ExtractedPage,
+    HtmlExtractor,
+    SoupExtractor,
+    create_html_extractor,
+)
+
+BASE_URL = "https://example.com/articles/1"
+REFERENCE_ENGINE = "html.parser"
+
+
+def synthetic_page(index: int, paragraphs: int = 60) -> str:
+    """生成接近真实文章页结构的HTML（导航、正文、列表、脚本、页脚）."""
+    nav = "".join(f'<li><a href="/section/{i}">栏目 {i}</a></li>' for i in range(20))
+    body = "".join(
+        f"<h2>第 {i} 节</h2>"
+        f"<p>第 {index} 篇文章的第 {i} 段，包含<a href='https://ref.example.org/{i}'>外部链接</a>"
+        f"和<strong>强调</strong>文字。Lorem ipsum dolor sit amet, consectetur adipiscing.</p>"
+        f"<ul><li>要点 {i}.1</li><li>要点 {i}.2</li></ul>"
+        f"<blockquote>引用 {i}\n第二行</blockquote>"
+        for i in range(paragraphs)
+    )
+    return (
+        "<!DOCTYPE html><html><head>"
+        f"<title>文章 {index}</title>"
+        '<meta charset="utf-8">'
+        '<meta name="description" content="基准测试页面">'
+        '<meta name="keywords" content="benchmark,html">'
+        f'<meta property="og:title" content="OG 文章 {index}">'
+        '<style>body { font-family: sans-serif; }</style>'
+        "<script>window.analytics = { track: function () {} };</script>"
+        "</head><body>"
+        f"<header><nav><ul>{nav}</ul></nav></header>"
+        f'<div class="post content">{body}</div>'
+        "<footer><p>版权所有</p><a href='/about'>关于</a></footer>"
+        "<script>console.log('footer');</script>"
+        "</body></html>"
+    )
+
+
+def load_corpus(args: argparse.Namespace) -> list[tuple[str, str]]:
+    """读取语料：目录下的 .html/.htm 文件，没有指定目录时生成合成页面."""
+    if args.corpus:
+        paths = sorted(
+            p for p in Path(args.corpus).rglob("*") if p.suffix.lower() in (".html", ".htm")
+        )
+        return [(p.name, p.read_text(encoding="utf-8", errors="replace")) for p in paths]
+    return [(f"synthetic-{i}", synthetic_page(i)) for i in range(args.synthetic)]
+
+
+def differences(page: ExtractedPage, reference: ExtractedPage) -> list[str]:
+    """与参考输出不一致的字段."""
+    diff = []
+    for field in ("title", "meta", "content", "markdown"):
+        if getattr(page, field) != getattr(reference, field):
+            diff.append(field)
+    if set(page.links) != set(reference.links):
+        diff.append("links")
+    return diff
+
+
+def bench_engine(
+    extractor: HtmlExtractor, corpus: list[tuple[str, str]], rounds: int
+) -> tuple[float, list[ExtractedPage]]:
+    """运行多轮，返回最快一轮的耗时和输出."""
+    best = float("inf")
+    pages: list[ExtractedPage] = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        pages = [extractor.extract(html, BASE_URL) for _, html in corpus]
+        best = min(best, time.perf_counter() - start)
+    return best, pages
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="网页解析引擎基准测试")
+    parser.add_argument("--corpus", help="保存的HTML页面目录（不提供时使用合成页面）")
+    parser.add_argument("--synthetic", type=int, default=100, help="合成页面数")
+    parser.add_argument("--rounds", type=int, default=3, help="每个引擎运行轮数，取最快一轮")
+    parser.add_argument(
+        "--engines",
+        default="html.parser,lxml",
+        help="逗号分隔的引擎列表（html.parser/lxml）",
+    )
+    parser.add_argument("--json", help="将结果写入JSON文件")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args)
+    if not corpus:
+        sys.exit("语料为空")
+    total_bytes = sum(len(html.encode("utf-8")) for _, html in corpus)
+    print(f"\n📄 语料: {len(corpus)} 个页面，{total_bytes / 1024 / 1024:.1f} MB")
+
+    _, reference = bench_engine(SoupExtractor(REFERENCE_ENGINE), corpus, 1)
+
+    report = []
+    for name in args.engines.split(","):
+        try:
+            extractor = create_html_extractor(name.strip())
+        except ImportError:
+            print(f"{name:12} 未安装，跳过")
+            continue
+        elapsed, pages = bench_engine(extractor, corpus, args.rounds)
+        mismatched = {
+            page_name: diff
+            for (page_name, _), page, ref in zip(corpus, pages, reference, strict=True)
+            if (diff := differences(page, ref))
+        }
+        row = {
+            "engine": extractor.name,
+            "seconds": round(elapsed, 4),
+            "pages_per_sec": round(len(corpus) / elapsed, 1),
+            "mb_per_sec": round(total_bytes / 1024 / 1024 / elapsed, 2),
+            "mismatched_pages": len(mismatched),
+            "mismatches": mismatched,
+        }
+        report.append(row)
+        print(
+            f"{row['engine']:12} {row['pages_per_sec']:>8} 页/秒  "
+            f"{row['mb_per_sec']:>6} MB/秒  与参考输出不一致: {row['mismatched_pages']} 页"
+        )
+        for page_name, diff in list(mismatched.items())[:5]:
+            print(f"    {page_name}: {', '.join(diff)}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+聊天接口压测工具
+以指定并发驱动 /chat/completions（流式或非流式），统计吞吐量、首字延迟和延迟分位数。
+配合 tools/mock_llm_server.py 使用可避免消耗真实模型额度。
+
+用法:
+    uv run python tools/load_test_chat.py --requests 200 --concurrency 20
+    uv run python tools/load_test_chat.py --stream --prompt-chars 8000 --json results.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import statistics
+import time
+from dataclasses import asdict, dataclass
+
+import httpx
+
+# API配置
+BASE_URL = "http://localhost:8000/api/v1"
+TEST_USER = {"username": "demo_user", "password": "Demo123456!"}
+
+
+@dataclass
+class RequestResult:
+    """单次请求结果."""
+
+    ok: bool
+    status: int | None
+    latency: float  # 总耗时（秒）
+    ttft: float | None  # 首个内容块耗时（秒）
+    output_chars: int = 0
+    error: str | None = None
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """计算分位数（最近秩法）."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = math.ceil(pct / 100 * len(ordered))
+    return ordered[max(0, min(len(ordered), rank) - 1)]
+
+
+def summarize(results: list[RequestResult], elapsed: float) -> dict:
+    """汇总压测结果."""
+    succeeded = [r for r in results if r.ok]
+    latencies = [r.latency for r in succeeded]
+    ttfts = [r.ttft for r in succeeded if r.ttft is not None]
+    output_chars = sum(r.output_chars for r in succeeded)
+
+    errors: dict[str, int] = {}
+    for r in results:
+        if not r.ok:
+            key = str(r.status) if r.status else (r.error or "error")
+            errors[key] = errors.get(key, 0) + 1
+
+    def dist(values: list[float]) -> dict[str, float]:
+        return {
+            "mean": round(statistics.fmean(values), 4) if values else 0.0,
+            "p50": round(percentile(values, 50), 4),
+            "p95": round(percentile(values, 95), 4),
+            "p99": round(percentile(values, 99), 4),
+            "max": round(max(values), 4) if values else 0.0,
+        }
+
+    return {
+        "requests": len(results),
+        "succeeded": len(succeeded),
+        "failed": len(results) - len(succeeded),
+        "elapsed_sec": round(elapsed, 3),
+        "throughput_rps": round(len(succeeded) / elapsed, 2) if elapsed else 0.0,
+        # 按 4 字符 ≈ 1 token 估算输出速度
+        "output_tokens_per_sec": round(output_chars / 4 / elapsed, 1) if elapsed else 0.0,
+        "latency": dist(latencies),
+        "ttft": dist(ttfts),
+        "errors": errors,
+    }
+
+
+async def login(client: httpx.AsyncClient, username: str, password: str) -> str:
+    """登录获取访问令牌."""
+    response = await client.post(
+        "/auth/login", data={"username": username, "password": password}
+    )
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def send_chat(
+    client: httpx.AsyncClient, payload: dict, stream: bool
+) -> RequestResult:
+    """发送一次聊天请求并记录耗时."""
+    start = time.perf_counter()
+    ttft = None
+    output_chars = 0
+    try:
+        if not stream:
+            response = await client.post("/chat/completions", json=payload)
+            latency = time.perf_counter() - start
+            if response.status_code != 200:
+                return RequestResult(False, response.status_code, latency, None)
+            content = response.json()["choices"][0]["message"]["content"] or ""
+            return RequestResult(True, 200, latency, latency, len(content))
+
+        async with client.stream("POST", "/chat/completions", json=payload) as response:
+            if response.status_code != 200:
+                await response.aread()
+                return RequestResult(
+                    False, response.status_code, time.perf_counter() - start, None
+                )
+            async for line in response.aiter_lines():
+                if not line.startswith("data: ") or line == "data: [DONE]":
+                    continue
+                data = json.loads(line[6:])
+                if "error" in data:
+                    return RequestResult(
+                        False,
+                        200,
+                        time.perf_counter() - start,
+                        ttft,
+                        output_chars,
+                        data["error"].get("message", "stream_error"),
+                    )
+                for choice in data.get("choices", []):
+                    content = choice.get("delta", {}).get("content")
+                    if content:
+                        if ttft is None:
+                            ttft = time.perf_counter() - start
+                        output_chars += len(content)
+        return RequestResult(True, 200, time.perf_counter() - start, ttft, output_chars)
+    except httpx.HTTPError as e:
+        return RequestResult(
+            False, None, time.perf_counter() - start, ttft, output_chars, type(e).__name__
+        )
+
+
+async def run_load_test(args: argparse.Namespace) -> dict:
+    """按配置执行压测."""
+    limits = httpx.Limits(
+        max_connections=args.concurrency, max_keepalive_connections=args.concurrency
+    )
+    async with httpx.AsyncClient(
+        base_url=args.base_url, timeout=args.timeout, limits=limits
+    ) as client:
+        token = args.token or await login(client, args.username, args.password)
+        client.headers["Authorization"] = f"Bearer {token}"
+
+        payload = {
+            "model": args.model,
+            "messages": [
+                {"role": "system", "content": "You are a helpful assistant."},
+                {
+                    "role": "user",
+                    "content": ("load test " * args.prompt_chars)[: args.prompt_chars],
+                },
+            ],
+            "stream": args.stream,
+        }
+        if args.max_tokens:
+            payload["max_tokens"] = args.max_tokens
+
+        # 预热，避免首个连接建立计入统计
+        for _ in range(args.warmup):
+            await send_chat(client, payload, args.stream)
+
+        queue: asyncio.Queue[int] = asyncio.Queue()
+        for i in range(args.requests):
+            queue.put_nowait(i)
+        results: list[RequestResult] = []
+
+        async def worker() -> None:
+            while True:
+                try:
+                    queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                results.append(await send_chat(client, payload, args.stream))
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - start
+
+    summary = summarize(results, elapsed)
+    summary["config"] = {
+        "stream": args.stream,
+        "concurrency": args.concurrency,
+        "prompt_chars": args.prompt_chars,
+        "model": args.model,
+    }
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(
+                {"summary": summary, "results": [asdict(r) for r in results]},
+                f,
+                ensure_ascii=False,
+                indent=2,
+            )
+    return summary
+
+
+def print_summary(summary: dict) -> None:
+    """打印压测报告."""
+    config = summary["config"]
+    mode = "流式" if config["stream"] else "非流式"
+    print(f"\n📊 压测结果（{mode}，并发 {config['concurrency']}）")
+    print(
+        f"请求: {summary['requests']}  成功: {summary['succeeded']}  "
+        f"失败: {summary['failed']}  耗时: {summary['elapsed_sec']}s"
+    )
+    print(
+        f"吞吐量: {summary['throughput_rps']} req/s  "
+        f"输出: {summary['output_tokens_per_sec']} tokens/s（估算）"
+    )
+    for name in ("ttft", "latency"):
+        d = summary[name]
+        print(
+            f"{name:8} mean={d['mean']:.3f}s p50={d['p50']:.3f}s "
+            f"p95={d['p95']:.3f}s p99={d['p99']:.3f}s max={d['max']:.3f}s"
+        )
+    if summary["errors"]:
+        print(f"错误分布: {summary['errors']}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="聊天接口压测")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--token", help="访问令牌（不提供时使用演示账号登录）")
+    parser.add_argument("--username", default=TEST_USER["username"])
+    parser.add_argument("--password", default=TEST_USER["password"])
+    parser.add_argument("--model", default="openrouter/auto")
+    parser.add_argument("--requests", type=int, default=100, help="总请求数")
+    parser.add_argument("--concurrency", type=int, default=10, help="并发数")
+    parser.add_argument("--stream", action="store_true", help="使用流式响应")
+    parser.add_argument("--prompt-chars", type=int, default=200, help="用户消息长度")
+    parser.add_argument("--max-tokens", type=int, help="最大输出token数")
+    parser.add_argument("--warmup", type=int, default=1, help="预热请求数")
+    parser.add_argument("--timeout", type=float, default=120.0, help="单请求超时（秒）")
+    parser.add_argument("--json", help="将明细结果写入JSON文件")
+    args = parser.parse_args()
+
+    print_summary(asyncio.run(run_load_test(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+模拟LLM服务
+本地 OpenAI 兼容接口，用于在不消耗 OpenRouter 额度的情况下压测聊天链路。
+支持配置首字延迟、生成速度、错误率和响应长度。
+
+用法:
+    uv run python tools/mock_llm_server.py --port 8100 --ttft 0.3 --tokens-per-sec 50
+
+后端配置:
+    MOCK_LLM_ENABLED=true
+    MOCK_LLM_BASE_URL=http://localhost:8100/v1
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from dataclasses import dataclass
+from typing import Any
+from uuid import uuid4
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+MOCK_MODEL = "mock/echo"
+FILLER_WORDS = ["lorem", "ipsum", "dolor", "sit", "amet", "consectetur", "adipiscing"]
+
+
+@dataclass
+class MockConfig:
+    """模拟服务配置."""
+
+    ttft: float = 0.3  # 首个token延迟（秒）
+    tokens_per_sec: float = 50.0  # 生成速度（0表示不限速）
+    completion_tokens: int = 200  # 每次响应的token数
+    error_rate: float = 0.0  # 返回错误的概率（0-1）
+    error_status: int = 500  # 错误时的HTTP状态码
+    jitter: float = 0.1  # 延迟的随机抖动比例
+
+
+def _estimate_tokens(messages: list[dict[str, Any]]) -> int:
+    """按字符数估算提示词token数."""
+    chars = 0
+    for msg in messages:
+        content = msg.get("content")
+        if isinstance(content, str):
+            chars += len(content)
+        elif isinstance(content, list):
+            chars += sum(len(part.get("text", "")) for part in content)
+    return max(1, chars // 4)
+
+
+def _usage(prompt_tokens: int, completion_tokens: int) -> dict[str, Any]:
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+        "prompt_tokens_details": {"cached_tokens": 0},
+    }
+
+
+def create_app(config: MockConfig | None = None) -> FastAPI:
+    """创建模拟服务应用."""
+    config = config or MockConfig()
+    app = FastAPI(title="Mock LLM")
+    app.state.config = config
+
+    def jittered(delay: float) -> float:
+        if delay <= 0 or config.jitter <= 0:
+            return max(delay, 0.0)
+        return max(0.0, random.uniform(1 - config.jitter, 1 + config.jitter) * delay)
+
+    def tokens(count: int) -> list[str]:
+        return [
+            ("" if i == 0 else " ") + FILLER_WORDS[i % len(FILLER_WORDS)]
+            for i in range(count)
+        ]
+
+    @app.get("/v1/models")
+    async def list_models() -> dict[str, Any]:
+        return {"object": "list", "data": [{"id": MOCK_MODEL, "object": "model"}]}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request) -> Any:
+        body = await request.json()
+        messages = body.get("messages", [])
+        prompt_tokens = _estimate_tokens(messages)
+        count = config.completion_tokens
+        if body.get("max_tokens"):
+            count = min(count, int(body["max_tokens"]))
+
+        if random.random() < config.error_rate:
+            await asyncio.sleep(jittered(config.ttft))
+            return JSONResponse(
+                status_code=config.error_status,
+                content={
+                    "error": {
+                        "message": "mock upstream error",
+                        "type": "server_error",
+                        "code": config.error_status,
+                    }
+                },
+            )
+
+        completion_id = f"chatcmpl-mock-{uuid4().hex[:8]}"
+        model = body.get("model") or MOCK_MODEL
+        interval = 1 / config.tokens_per_sec if config.tokens_per_sec > 0 else 0.0
+
+        if not body.get("stream"):
+            await asyncio.sleep(jittered(config.ttft + interval * max(count - 1, 0)))
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": "".join(tokens(count))},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": _usage(prompt_tokens, count),
+            }
+
+        include_usage = (body.get("stream_options") or {}).get("include_usage", False)
+
+        def chunk(delta: dict[str, Any], finish_reason: str | None = None) -> str:
+            data = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [
+                    {"index": 0, "delta": delta, "finish_reason": finish_reason}
+                ],
+            }
+            return f"data: {json.dumps(data)}\n\n"
+
+        async def event_stream():
+            await asyncio.sleep(jittered(config.ttft))
+            for i, token in enumerate(tokens(count)):
+                if i > 0 and interval:
+                    await asyncio.sleep(jittered(interval))
+                yield chunk({"content": token})
+            yield chunk({}, "stop")
+            if include_usage:
+                usage_chunk = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [],
+                    "usage": _usage(prompt_tokens, count),
+                }
+                yield f"data: {json.dumps(usage_chunk)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="OpenAI 兼容的模拟LLM服务")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--ttft", type=float, default=0.3, help="首个token延迟（秒）")
+    parser.add_argument(
+        "--tokens-per-sec", type=float, default=50.0, help="生成速度，0表示不限速"
+    )
+    parser.add_argument(
+        "--completion-tokens", type=int, default=200, help="每次响应的token数"
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0, help="错误率（0-1）")
+    parser.add_argument("--error-status", type=int, default=500, help="错误状态码")
+    parser.add_argument("--jitter", type=float, default=0.1, help="延迟抖动比例")
+    args = parser.parse_args()
+
+    import uvicorn
+
+    config = MockConfig(
+        ttft=args.ttft,
+        tokens_per_sec=args.tokens_per_sec,
+        completion_tokens=args.completion_tokens,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        jitter=args.jitter,
+    )
+    print(f"🤖 模拟LLM服务: http://{args.host}:{args.port}/v1  {config}")
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
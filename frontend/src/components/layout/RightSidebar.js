@@ -687,7 +687,21 @@ const NotesListView = ({ notes: initialNotes }) => {
 
   const handleAddNoteClick = () => { setIsEditing(true); setCurrentNoteTitle(''); setCurrentNoteContent(''); setEditingNoteId(null); };
   const handleCancelEdit = () => { setIsEditing(false); setCurrentNoteTitle(''); setCurrentNoteContent(''); setEditingNoteId(null); };
-  const handleEditNoteClick = (note) => { setIsEditing(true); setCurrentNoteTitle(note.name); setCurrentNoteContent(note.content || ''); setEditingNoteId(note.id); };
+  const handleEditNoteClick = async (note) => {
+    // 列表中的笔记只有预览，编辑前加载完整正文，否则保存时会用空正文覆盖
+    let content = note.content;
+    if (content === undefined && !note.id.toString().startsWith('note-temp-')) {
+      try {
+        const fullNote = await apiService.note.getNote(note.id.toString().replace('note-', ''));
+        content = fullNote.content;
+      } catch (error) {
+        console.error('Failed to load note content:', error);
+        alert('Failed to load the note. Please try again.');
+        return;
+      }
+    }
+    setIsEditing(true); setCurrentNoteTitle(note.name); setCurrentNoteContent(content || ''); setEditingNoteId(note.id);
+  };
 
   const handleSaveNote = async () => {
     if (!currentNoteTitle.trim() && !currentNoteContent.trim()) { alert("Note is empty."); return; }
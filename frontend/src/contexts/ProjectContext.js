@@ -89,8 +89,8 @@ export const ProjectProvider = ({ children }) => {
           ? (notesResponse.value.notes || []).map(note => ({
               id: note.id.toString(),
               name: note.title,
-              content: note.content,
-              preview: note.content?.substring(0, 100) + '...',
+              // 列表接口只返回预览，正文在编辑时按需加载
+              preview: (note.preview || '').substring(0, 100) + '...',
               createdAt: note.created_at,
               updatedAt: note.updated_at
             }))
@@ -314,9 +314,14 @@ export const ProjectProvider = ({ children }) => {
         
         for (const note of projectDetails.notes) {
           try {
+            // 列表中的笔记只有预览，复制前加载完整正文
+            let content = note.content;
+            if (content === undefined && /^\d+$/.test(String(note.id))) {
+              content = (await noteAPI.getNote(note.id)).content;
+            }
             const noteData = {
               title: note.name || 'Untitled Note',
-              content: note.content || note.preview || '',
+              content: content || note.preview || '',
               space_id: newSpace.id,
               tags: ['saved-from-chat']
             };
@@ -636,8 +641,8 @@ export const ProjectProvider = ({ children }) => {
       const convertedNotes = notes.map(note => ({
         id: note.id.toString(),
         name: note.title,
-        preview: note.content?.substring(0, 100) || '',
-        content: note.content,
+        // 列表接口只返回预览，正文在编辑时按需加载
+        preview: note.preview?.substring(0, 100) || '',
         createdAt: note.created_at,
         updatedAt: note.updated_at,
       }));
@@ -262,7 +262,8 @@ const HomePage = () => {
     setCurrentChatNotes(prevFullNotes => {
       return updatedSimplifiedNotes.map(simpleNote => {
         const existingNote = prevFullNotes.find(n => n.id === simpleNote.id);
-        return { ...(existingNote || {}), ...simpleNote, content: simpleNote.content || existingNote?.content || simpleNote.preview };
+        // 不用预览代替正文：列表中的笔记没有正文，编辑时会按需加载
+        return { ...(existingNote || {}), ...simpleNote, content: simpleNote.content ?? existingNote?.content };
       });
     });
   }, []);
@@ -399,7 +399,8 @@ const ProjectPage = () => {
 
     const newFullNotesList = updatedSimplifiedNotes.map(sn => {
       const existing = currentProjectFromContext.notes?.find(n => n.id === sn.id);
-      return existing ? { ...existing, ...sn } : { ...sn, content: sn.content || sn.preview };
+      // 不用预览代替正文：列表中的笔记没有正文，编辑时会按需加载
+      return existing ? { ...existing, ...sn } : { ...sn };
     });
     updateProject(projectId, { ...currentProjectFromContext, notes: newFullNotesList });
   }, [projectId, updateProject, getProjectById]);